@@ -3,7 +3,9 @@
 GET /api/metrics — returns the BioAPEX runtime counters / histograms in the
 Prometheus text exposition format (``text/plain; version=0.0.4``). The
 metric set is produced by :mod:`runtime.metrics_collector`, which is fed
-from the chat turn hot-path in :mod:`runtime.query_engine`.
+from the chat turn hot-path in :mod:`runtime.query_engine`. The rendered text
+is cached for the configured ``metrics.exposition_ttl_s`` and, with
+``metrics.shared_store`` on, covers every uvicorn worker.
 """
 from fastapi import APIRouter, Response
 
@@ -18,6 +20,6 @@ router = APIRouter()
 @router.get("/metrics")
 def metrics() -> Response:
     return Response(
-        content=METRICS.render_exposition(),
+        content=METRICS.exposition(),
         media_type=PROMETHEUS_CONTENT_TYPE,
     )
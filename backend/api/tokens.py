@@ -106,20 +106,56 @@ def _get_configured_context_window_tokens() -> int | None:
     return None
 
 
-def _count_tool_io_tokens(messages: list[dict]) -> int:
+def _count_message_tool_io(message: dict) -> int:
     token_total = 0
-    for message in messages:
-        tool_calls = message.get("tool_calls")
-        if not isinstance(tool_calls, list):
+    tool_calls = message.get("tool_calls")
+    if not isinstance(tool_calls, list):
+        return 0
+    for call in tool_calls:
+        if not isinstance(call, dict):
             continue
-        for call in tool_calls:
-            if not isinstance(call, dict):
-                continue
-            token_total += _count_optional_text(call.get("input"))
-            token_total += _count_optional_text(call.get("output"))
+        token_total += _count_optional_text(call.get("input"))
+        token_total += _count_optional_text(call.get("output"))
     return token_total
 
 
+def message_token_counts(message: dict) -> dict:
+    """Token counts persisted on a session message record as ``token_counts``.
+
+    *message* must be read-normalized (``tool_calls`` derived from blocks).
+    ``backend`` names the tokenizer that produced the counts so a reader can
+    tell when they are stale.
+    """
+    runtime = _get_tokenizer_runtime()
+    return {
+        "backend": runtime.backend,
+        "content": _count_optional_text(message.get("content")),
+        "tool_io": _count_message_tool_io(message),
+    }
+
+
+def cached_message_tokens(message: dict) -> tuple[int, int]:
+    """Return ``(content, tool_io)`` tokens for *message*.
+
+    Uses the persisted ``token_counts`` when the active tokenizer backend
+    matches the one that produced them, and recounts otherwise (legacy
+    records, or tiktoken appearing or disappearing between runs).
+    """
+    counts = message.get("token_counts")
+    if (
+        isinstance(counts, dict)
+        and counts.get("backend") == _get_tokenizer_runtime().backend
+        and isinstance(counts.get("content"), int)
+        and isinstance(counts.get("tool_io"), int)
+    ):
+        return counts["content"], counts["tool_io"]
+    return _count_optional_text(message.get("content")), _count_message_tool_io(message)
+
+
+def _count_tool_io_tokens(messages: list[dict]) -> int:
+    return sum(cached_message_tokens(message)[1] for message in messages)
+
+
 def _validate_token_path(rel_path: str, base: Path) -> Path | None:
     clean = rel_path.strip().lstrip("/").removeprefix("./")
     if not clean:
@@ -175,23 +211,21 @@ def session_tokens(session_id: str, request: Request = None):
     system_prompt = build_system_prompt(agent_manager.base_dir, get_rag_mode())  # type: ignore[arg-type]
     system_tokens = _count(system_prompt)
 
-    prompt_messages = agent_manager.session_manager.load_session_for_agent(session_id)  # type: ignore[union-attr]
-    raw_messages = agent_manager.session_manager.load_session(session_id)  # type: ignore[union-attr]
-    prompt_history_system_tokens = sum(
-        _count_optional_text(message.get("content"))
-        for message in prompt_messages
-        if message.get("role") == "system"
-    )
-    user_tokens = sum(
-        _count_optional_text(message.get("content"))
-        for message in prompt_messages
-        if message.get("role") == "user"
-    )
-    assistant_tokens = sum(
-        _count_optional_text(message.get("content"))
-        for message in prompt_messages
-        if message.get("role") == "assistant"
+    session_manager = agent_manager.session_manager
+    snapshot = session_manager.read_snapshot(session_id)  # type: ignore[union-attr]
+    prompt_messages = session_manager.load_session_for_agent(  # type: ignore[union-attr]
+        session_id, snapshot=snapshot
     )
+    raw_messages = session_manager.load_session(session_id, snapshot=snapshot)  # type: ignore[union-attr]
+    content_tokens_by_role: dict[str, int] = {}
+    for message in prompt_messages:
+        role = message.get("role")
+        content_tokens_by_role[role] = (
+            content_tokens_by_role.get(role, 0) + cached_message_tokens(message)[0]
+        )
+    prompt_history_system_tokens = content_tokens_by_role.get("system", 0)
+    user_tokens = content_tokens_by_role.get("user", 0)
+    assistant_tokens = content_tokens_by_role.get("assistant", 0)
     message_tokens = prompt_history_system_tokens + user_tokens + assistant_tokens
     total_tokens = system_tokens + message_tokens
     tool_tokens = _count_tool_io_tokens(raw_messages)
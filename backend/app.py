@@ -95,8 +95,38 @@ async def lifespan(app: FastAPI):
         except Exception as exc:
             print(f"[WARNING] Retention run failed (non-fatal): {exc}")
 
+    # ── 5. Move audit appends off the request path ─────────────────
+    audit_settings = cfg.get_audit_writer_settings()
+    if audit_settings["async_writer"]:
+        from audit.writer import start_audit_writer
+
+        start_audit_writer(
+            max_queue_events=audit_settings["queue_max_events"],
+            max_batch_events=audit_settings["batch_max_events"],
+            durability=audit_settings["durability"],
+        )
+        print(f"[startup] Audit writer started ({audit_settings['durability']} per batch)")
+
+    # ── 6. Metrics exposition cache / cross-worker store ───────────
+    from runtime.metrics_collector import METRICS
+
+    metrics_settings = cfg.get_metrics_settings()
+    METRICS.exposition_ttl_seconds = metrics_settings["exposition_ttl_s"]
+    if metrics_settings["shared_store"]:
+        from runtime.metrics_store import start_metrics_publisher
+
+        start_metrics_publisher(BASE_DIR, interval_seconds=metrics_settings["publish_interval_s"])
+        print(f"[startup] Metrics shared across workers (pid {os.getpid()})")
+
     yield
-    # (shutdown cleanup goes here if needed)
+    if agent_manager.session_manager is not None:
+        agent_manager.session_manager.flush_session_index()
+    from audit.writer import stop_audit_writer
+
+    stop_audit_writer(timeout=10.0)
+    from runtime.metrics_store import stop_metrics_publisher
+
+    stop_metrics_publisher(timeout=5.0)
 
 
 # ------------------------------------------------------------------ #
@@ -10,6 +10,7 @@ from .naming import (
     RunLayout,
     build_artifact_header,
     build_content_hash_manifest,
+    build_content_hash_manifest_from_digests,
     build_generated_output_relpath,
     build_run_directory,
     build_user_supplied_relpath,
@@ -30,6 +31,7 @@ from .registry import (
     ArtifactRegistryLookupResult,
     ArtifactRegistryRecord,
     ArtifactRegistrySnapshot,
+    artifact_registry_batch,
     lookup_artifact_registry,
     rebuild_artifact_registry,
     refresh_artifact_registry_path,
@@ -81,6 +83,7 @@ from .schemas import (
     schema_format_for_artifact,
     validate_artifact_payload,
 )
+from .content_hashes import refresh_content_hash_manifest
 from qc_policy import QCPolicyDefinition, QCPolicyEvaluation, QCEvidence
 
 __all__ = [
@@ -143,8 +146,10 @@ __all__ = [
     "SlurmStatusObservation",
     "WorkflowRun",
     "artifact_model_for_type",
+    "artifact_registry_batch",
     "build_artifact_header",
     "build_content_hash_manifest",
+    "build_content_hash_manifest_from_digests",
     "build_generated_output_relpath",
     "build_run_directory",
     "build_user_supplied_relpath",
@@ -157,6 +162,7 @@ __all__ = [
     "prepare_run_directory",
     "rebuild_artifact_registry",
     "refresh_artifact_registry_path",
+    "refresh_content_hash_manifest",
     "resolve_artifact_path",
     "schema_format_for_artifact",
     "stable_artifact_name",
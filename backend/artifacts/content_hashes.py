@@ -0,0 +1,63 @@
+"""Incremental ``content_hashes.json`` maintenance for run directories.
+
+Workflows that add an artifact to an existing run refresh the run's content
+hash manifest. Re-reading every file into memory for that made each refresh
+cost the full size of the run (FastQC archives, count matrices, ...), even
+though usually one file changed. ``refresh_content_hash_manifest`` hashes the
+run through :func:`file_digests.hash_files`, so it shares the workspace's
+persistent digest cache with the workflow input hashing and only files whose
+stat changed since they were last hashed are read again. The manifest it
+writes is byte-identical to one built from the full file contents.
+"""
+
+from __future__ import annotations
+
+import json
+import stat
+from pathlib import Path
+
+from file_digests import FileDigestCache, hash_files, shared_file_digest_cache
+
+from .naming import (
+    CONTENT_HASH_MANIFEST_FILENAME,
+    RunLayout,
+    build_content_hash_manifest_from_digests,
+)
+from .schemas import SCHEMA_PACK_VERSION
+
+
+def refresh_content_hash_manifest(
+    layout: RunLayout,
+    *,
+    schema_version: str = SCHEMA_PACK_VERSION,
+    digest_cache: FileDigestCache | None = None,
+) -> dict[str, object]:
+    """Rewrite ``content_hashes.json`` for every file under ``layout.run_dir``."""
+    cache = shared_file_digest_cache(layout.base_dir) if digest_cache is None else digest_cache
+    files: dict[str, Path] = {}
+    for path in sorted(layout.run_dir.rglob("*")):
+        try:
+            stat_result = path.stat()
+        except OSError:
+            continue
+        if not stat.S_ISREG(stat_result.st_mode):
+            continue
+        relative = path.relative_to(layout.run_dir).as_posix()
+        if relative == CONTENT_HASH_MANIFEST_FILENAME:
+            continue
+        files[relative] = path
+    hashed = hash_files(files.values(), cache=cache)
+    digests = {relative: hashed[path] for relative, path in files.items()}
+
+    manifest = build_content_hash_manifest_from_digests(
+        run_id=layout.run_id,
+        schema_version=schema_version,
+        created_at=layout.created_at,
+        source_workflow=layout.workflow,
+        digests=digests,
+    )
+    layout.content_hash_manifest_path.write_text(
+        json.dumps(manifest, ensure_ascii=False, indent=2) + "\n",
+        encoding="utf-8",
+    )
+    return manifest
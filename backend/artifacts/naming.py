@@ -246,18 +246,17 @@ def _refresh_registry_for_path(base_dir: Path, target: Path) -> None:
     except ValueError:
         return
 
-    try:
-        from .registry import refresh_artifact_registry_path
+    relative_paths = [relative.as_posix()]
+    # Keep the run-level ro-crate record fresh when individual entries change.
+    if len(relative.parts) > 5 and relative.parts[4] == "ro-crate":
+        relative_paths.append(PurePosixPath(*relative.parts[:5]).as_posix())
 
-        relative_str = relative.as_posix()
-        refresh_artifact_registry_path(base_dir, relative_str)
+    try:
+        from .registry import defer_artifact_registry_refresh, refresh_artifact_registry_path
 
-        # Keep the run-level ro-crate record fresh when individual entries change.
-        if len(relative.parts) > 5 and relative.parts[4] == "ro-crate":
-            refresh_artifact_registry_path(
-                base_dir,
-                PurePosixPath(*relative.parts[:5]),
-            )
+        for relative_path in relative_paths:
+            if not defer_artifact_registry_refresh(base_dir, relative_path):
+                refresh_artifact_registry_path(base_dir, relative_path)
     except Exception:
         # Registry maintenance must not block artifact writes.
         return
@@ -317,13 +316,32 @@ def build_content_hash_manifest(
     created_at: datetime | None = None,
     source_workflow: str | None = None,
     source_tool: str | None = None,
+) -> dict[str, object]:
+    return build_content_hash_manifest_from_digests(
+        run_id=run_id,
+        schema_version=schema_version,
+        digests={relative_path: compute_content_hash(content) for relative_path, content in entries.items()},
+        created_at=created_at,
+        source_workflow=source_workflow,
+        source_tool=source_tool,
+    )
+
+
+def build_content_hash_manifest_from_digests(
+    *,
+    run_id: str,
+    schema_version: str,
+    digests: Mapping[str | PurePosixPath, str],
+    created_at: datetime | None = None,
+    source_workflow: str | None = None,
+    source_tool: str | None = None,
 ) -> dict[str, object]:
     normalized_entries: dict[str, dict[str, str]] = {}
-    for relative_path, content in entries.items():
+    for relative_path, digest in digests.items():
         relative = _normalize_relative_path(relative_path)
         normalized_entries[str(relative)] = {
             "algorithm": "sha256",
-            "digest": compute_content_hash(content),
+            "digest": digest,
         }
 
     manifest: dict[str, object] = build_artifact_header(
@@ -3,16 +3,22 @@
 from __future__ import annotations
 
 import json
+import logging
 import os
 import re
 import tempfile
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path, PurePosixPath
-from typing import Any, Literal
+from typing import Any, Iterable, Iterator, Literal
 
 import yaml
-from pydantic import BaseModel, ConfigDict, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, field_validator
+
+from snapshot_journal import journal_needs_compaction, snapshot_fingerprint
 
 from .naming import (
     CONTENT_HASH_MANIFEST_FILENAME,
@@ -22,8 +28,18 @@ from .naming import (
     compute_content_hash,
     is_valid_run_id,
 )
+from .registry_journal import (
+    DEFAULT_JOURNAL_COMPACT_MIN_BYTES,
+    append_journal_entries,
+    journal_path_for,
+    read_journal,
+    registry_write_lock,
+    write_fresh_journal,
+)
 from .schemas import ArtifactDocument, WorkflowRun, load_artifact_document
 
+logger = logging.getLogger(__name__)
+
 ARTIFACT_REGISTRY_SCHEMA_VERSION = "1.0.0"
 ARTIFACT_REGISTRY_DIR = PurePosixPath("storage/artifact_registry")
 ARTIFACT_REGISTRY_FILENAME = "registry.json"
@@ -636,12 +652,16 @@ def _sort_records(records: list[ArtifactRegistryRecord]) -> list[ArtifactRegistr
     )
 
 
-def _build_snapshot(records: list[ArtifactRegistryRecord]) -> ArtifactRegistrySnapshot:
+def _build_snapshot(
+    records: list[ArtifactRegistryRecord],
+    *,
+    generated_at: datetime | None = None,
+) -> ArtifactRegistrySnapshot:
     sorted_records = _sort_records(records)
     valid_count = sum(record.status == "valid" for record in sorted_records)
     invalid_count = len(sorted_records) - valid_count
     return ArtifactRegistrySnapshot(
-        generated_at=_now_utc(),
+        generated_at=generated_at or _now_utc(),
         record_count=len(sorted_records),
         valid_count=valid_count,
         invalid_count=invalid_count,
@@ -665,11 +685,145 @@ def _atomic_write_json(path: Path, payload: dict[str, Any]) -> None:
         raise
 
 
+_INDEXED_FIELDS = ("run_id", "artifact_type", "workflow", "date", "dataset_id", "status")
+
+
+class _RegistryState:
+    """Materialised registry for one base directory, shared by the process.
+
+    Holds the last loaded snapshot plus every journal entry replayed on top
+    of it, and the on-disk positions needed to pick up only what changed
+    since: the snapshot fingerprint and the journal inode/offset. Records are
+    keyed by path, with a secondary ``value -> paths`` index per lookup filter
+    that is kept up to date as entries are applied.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.records: dict[str, ArtifactRegistryRecord] = {}
+        self.indexes: dict[str, dict[str, set[str]]] = {field: {} for field in _INDEXED_FIELDS}
+        self.generated_at: datetime | None = None
+        self.artifact_root = "artifacts"
+        self.registry_path = str(ARTIFACT_REGISTRY_PATH)
+        self.fingerprint: list[int] | None = None
+        self.snapshot_size = 0
+        self.journal_inode: int | None = None
+        self.journal_offset = 0
+        # True once the journal header is known to match ``fingerprint``.
+        self.journal_bound = False
+        self._snapshot: ArtifactRegistrySnapshot | None = None
+
+    def load(self, snapshot: ArtifactRegistrySnapshot, fingerprint: list[int], size: int) -> None:
+        self.reset()
+        for record in snapshot.records:
+            existing = self.records.get(record.path)
+            if existing is None or (existing.status != "valid" and record.status == "valid"):
+                self._put(record)
+        self.generated_at = snapshot.generated_at
+        self.artifact_root = snapshot.artifact_root
+        self.registry_path = snapshot.registry_path
+        self.fingerprint = fingerprint
+        self.snapshot_size = size
+        self._snapshot = snapshot if len(self.records) == len(snapshot.records) else None
+
+    def _put(self, record: ArtifactRegistryRecord) -> None:
+        self._drop(record.path)
+        self.records[record.path] = record
+        for field in _INDEXED_FIELDS:
+            value = getattr(record, field)
+            if value:
+                self.indexes[field].setdefault(value, set()).add(record.path)
+
+    def _drop(self, path: str) -> None:
+        record = self.records.pop(path, None)
+        if record is None:
+            return
+        for field in _INDEXED_FIELDS:
+            value = getattr(record, field)
+            paths = self.indexes[field].get(value) if value else None
+            if paths is not None:
+                paths.discard(path)
+                if not paths:
+                    del self.indexes[field][value]
+
+    def apply(self, entry: dict[str, Any]) -> None:
+        upsert = entry.get("upsert")
+        removed = entry.get("remove")
+        if isinstance(upsert, dict):
+            try:
+                record = ArtifactRegistryRecord.model_validate(upsert)
+            except ValidationError:
+                logger.warning("artifact_registry_journal_invalid_record path=%s", upsert.get("path"))
+                return
+            self._put(record)
+        elif isinstance(removed, str):
+            self._drop(removed)
+        else:
+            return
+        self.generated_at = _parse_timestamp(entry.get("at")) or self.generated_at
+        self._snapshot = None
+
+    def select(self, filters: dict[str, str]) -> list[ArtifactRegistryRecord]:
+        """Return records matching every ``field == value`` in *filters*, sorted."""
+        if set(filters) <= {"status"}:
+            # Unfiltered listing: reuse the sorted snapshot instead of
+            # re-sorting the whole registry.
+            records = self.snapshot().records
+            if not filters:
+                return list(records)
+            return [record for record in records if record.status == filters["status"]]
+
+        candidates = sorted(
+            (self.indexes[field].get(value, set()) for field, value in filters.items()),
+            key=len,
+        )
+        matched = candidates[0].intersection(*candidates[1:])
+        return _sort_records([self.records[path] for path in matched])
+
+    def snapshot(self) -> ArtifactRegistrySnapshot:
+        if self._snapshot is None:
+            self._snapshot = _build_snapshot(
+                list(self.records.values()),
+                generated_at=self.generated_at,
+            )
+        return self._snapshot
+
+
+_registry_states: dict[Path, _RegistryState] = {}
+_registry_states_lock = threading.Lock()
+
+
+def _registry_state(base_dir: Path) -> _RegistryState:
+    with _registry_states_lock:
+        state = _registry_states.get(base_dir)
+        if state is None:
+            state = _RegistryState()
+            _registry_states[base_dir] = state
+        return state
+
+
 class ArtifactRegistry:
-    """Manage an on-disk metadata registry for canonical artifact files."""
+    """Manage an on-disk metadata registry for canonical artifact files.
+
+    ``registry.json`` is a snapshot; upserts and removals since the last
+    rebuild or compaction live in an append-only journal beside it (see
+    ``artifacts.registry_journal``). Instances for the same ``base_dir``
+    share one in-memory copy that is caught up incrementally from disk, so
+    the registry is parsed once per process rather than once per call.
+    """
 
-    def __init__(self, base_dir: str | Path) -> None:
+    def __init__(
+        self,
+        base_dir: str | Path,
+        *,
+        journal_compact_min_bytes: int = DEFAULT_JOURNAL_COMPACT_MIN_BYTES,
+    ) -> None:
         self.base_dir = Path(base_dir).resolve()
+        self.journal_compact_min_bytes = journal_compact_min_bytes
+        self._state = _registry_state(self.base_dir)
         self._dataset_id_cache: dict[str, str | None] = {}
         self._run_origin_cache: dict[str, tuple[str | None, str | None]] = {}
 
@@ -688,17 +842,81 @@ class ArtifactRegistry:
                 candidates.append(relative)
         return sorted(set(candidates))
 
-    def _load_snapshot(self) -> ArtifactRegistrySnapshot | None:
+    def _sync_locked(self) -> bool:
+        """Catch the shared state up with the snapshot and journal on disk.
+
+        Returns ``False`` when there is no readable snapshot.
+        """
+        state = self._state
         registry_path = _registry_file(self.base_dir)
-        if not registry_path.exists():
-            return None
         try:
-            return ArtifactRegistrySnapshot.model_validate_json(registry_path.read_text(encoding="utf-8"))
-        except Exception:
-            return None
+            handle = open(registry_path, "rb")
+        except FileNotFoundError:
+            state.reset()
+            return False
+        with handle:
+            stat_result = os.fstat(handle.fileno())
+            fingerprint = snapshot_fingerprint(stat_result)
+            if fingerprint != state.fingerprint:
+                try:
+                    snapshot = ArtifactRegistrySnapshot.model_validate_json(handle.read())
+                except Exception:
+                    state.reset()
+                    return False
+                state.load(snapshot, fingerprint, stat_result.st_size)
+
+        result = read_journal(journal_path_for(registry_path), state.journal_offset, state.journal_inode)
+        if result is None:
+            return True
+        inode, start, entries, committed = result
+        if start == 0 and state.journal_bound:
+            # The journal we replayed was replaced underneath the same
+            # snapshot; its entries cannot be unapplied, so reload.
+            state.fingerprint = None
+            return self._sync_locked()
+        if start == 0:
+            header = entries.pop(0) if entries else None
+            state.journal_bound = header is not None and header.get("snapshot") == state.fingerprint
+        state.journal_inode = inode
+        state.journal_offset = committed
+        if state.journal_bound:
+            for entry in entries:
+                state.apply(entry)
+        return True
+
+    def _load_snapshot(self) -> ArtifactRegistrySnapshot | None:
+        with self._state.lock:
+            if not self._sync_locked():
+                return None
+            return self._state.snapshot()
 
-    def _save_snapshot(self, snapshot: ArtifactRegistrySnapshot) -> None:
-        _atomic_write_json(_registry_file(self.base_dir), snapshot.model_dump(mode="json"))
+    def _save_snapshot_locked(self, snapshot: ArtifactRegistrySnapshot) -> None:
+        """Write *snapshot* and start an empty journal bound to it."""
+        registry_path = _registry_file(self.base_dir)
+        _atomic_write_json(registry_path, snapshot.model_dump(mode="json"))
+        stat_result = registry_path.stat()
+        fingerprint = snapshot_fingerprint(stat_result)
+        inode, size = write_fresh_journal(journal_path_for(registry_path), fingerprint)
+        state = self._state
+        state.load(snapshot, fingerprint, stat_result.st_size)
+        state.journal_inode = inode
+        state.journal_offset = size
+        state.journal_bound = True
+
+    def _append_locked(self, entries: list[dict[str, Any]]) -> None:
+        state = self._state
+        journal_path = journal_path_for(_registry_file(self.base_dir))
+        if not state.journal_bound:
+            assert state.fingerprint is not None
+            state.journal_inode, state.journal_offset = write_fresh_journal(journal_path, state.fingerprint)
+            state.journal_bound = True
+        state.journal_offset = append_journal_entries(journal_path, state.journal_offset, entries)
+        for entry in entries:
+            state.apply(entry)
+        if journal_needs_compaction(
+            state.journal_offset, state.snapshot_size, min_bytes=self.journal_compact_min_bytes
+        ):
+            self._save_snapshot_locked(state.snapshot())
 
     def _read_run_origin(self, context: ArtifactPathContext) -> tuple[str | None, str | None]:
         if context.run_dir is None:
@@ -926,7 +1144,7 @@ class ArtifactRegistry:
             error=" ".join(_payload_mismatches(raw_payload, context)) if raw_payload is not None and _payload_mismatches(raw_payload, context) else None,
         )
 
-    def rebuild(self) -> ArtifactRegistrySnapshot:
+    def _scan_snapshot(self) -> ArtifactRegistrySnapshot:
         self._dataset_id_cache = {}
         self._run_origin_cache = {}
         records = [
@@ -934,32 +1152,59 @@ class ArtifactRegistry:
             for record in (self.build_record(relative_path) for relative_path in self._scan_candidate_paths())
             if record is not None
         ]
-        snapshot = _build_snapshot(records)
-        self._save_snapshot(snapshot)
+        return _build_snapshot(records)
+
+    def rebuild(self) -> ArtifactRegistrySnapshot:
+        snapshot = self._scan_snapshot()
+        with self._state.lock, registry_write_lock(_registry_file(self.base_dir).parent):
+            self._save_snapshot_locked(snapshot)
         return snapshot
 
+    def _synced_state(self) -> _RegistryState:
+        with self._state.lock:
+            if self._sync_locked():
+                return self._state
+        self.rebuild()
+        return self._state
+
     def ensure_snapshot(self) -> ArtifactRegistrySnapshot:
         snapshot = self._load_snapshot()
         if snapshot is None:
             return self.rebuild()
         return snapshot
 
-    def refresh_path(self, relative_path: str | PurePosixPath) -> ArtifactRegistryRecord | None:
-        snapshot = self._load_snapshot()
-        if snapshot is None:
-            snapshot = self.rebuild()
+    def records_for_paths(self, relative_paths: Iterable[str]) -> dict[str, ArtifactRegistryRecord]:
+        """Return the registry record for each of *relative_paths* that has one."""
+        state = self._synced_state()
+        with state.lock:
+            return {path: state.records[path] for path in relative_paths if path in state.records}
 
-        normalized = _normalize_relative_path(relative_path)
-        records_by_path = {record.path: record for record in snapshot.records}
-        record = self.build_record(normalized)
-        if record is None:
-            records_by_path.pop(normalized, None)
-        else:
-            records_by_path[normalized] = record
+    def refresh_path(self, relative_path: str | PurePosixPath) -> ArtifactRegistryRecord | None:
+        return self.refresh_paths([relative_path])[0]
 
-        refreshed = _build_snapshot(list(records_by_path.values()))
-        self._save_snapshot(refreshed)
-        return record
+    def refresh_paths(
+        self,
+        relative_paths: Iterable[str | PurePosixPath],
+    ) -> list[ArtifactRegistryRecord | None]:
+        """Re-index *relative_paths* and journal them in a single append."""
+        self._synced_state()
+
+        normalized = [_normalize_relative_path(relative_path) for relative_path in relative_paths]
+        records = [self.build_record(relative_path) for relative_path in normalized]
+        state = self._state
+        with state.lock, registry_write_lock(_registry_file(self.base_dir).parent):
+            if not self._sync_locked():
+                self._save_snapshot_locked(self._scan_snapshot())
+            at = _now_utc().isoformat()
+            entries: list[dict[str, Any]] = []
+            for relative_path, record in zip(normalized, records):
+                if record is not None:
+                    entries.append({"at": at, "upsert": record.model_dump(mode="json")})
+                elif relative_path in state.records:
+                    entries.append({"at": at, "remove": relative_path})
+            if entries:
+                self._append_locked(entries)
+        return records
 
     def lookup(
         self,
@@ -971,43 +1216,84 @@ class ArtifactRegistry:
         dataset_id: str | None = None,
         include_invalid: bool = False,
     ) -> ArtifactRegistryLookupResult:
-        snapshot = self.ensure_snapshot()
-        records = snapshot.records
-        if not include_invalid:
-            records = [record for record in records if record.status == "valid"]
-
         filters = {
             "run_id": _clean_optional_string(run_id),
             "artifact_type": _clean_optional_string(artifact_type),
             "workflow": _clean_optional_string(workflow),
             "date": _clean_optional_string(date),
             "dataset_id": _clean_optional_string(dataset_id),
+            "status": None if include_invalid else "valid",
         }
+        active_filters = {field: value for field, value in filters.items() if value}
+
+        state = self._synced_state()
+        with state.lock:
+            sorted_records = state.select(active_filters)
+            generated_at = state.generated_at or _now_utc()
+            artifact_root = state.artifact_root
+            registry_path = state.registry_path
+            total_count = len(state.records)
 
-        if filters["run_id"]:
-            records = [record for record in records if record.run_id == filters["run_id"]]
-        if filters["artifact_type"]:
-            records = [record for record in records if record.artifact_type == filters["artifact_type"]]
-        if filters["workflow"]:
-            records = [record for record in records if record.workflow == filters["workflow"]]
-        if filters["date"]:
-            records = [record for record in records if record.date == filters["date"]]
-        if filters["dataset_id"]:
-            records = [record for record in records if record.dataset_id == filters["dataset_id"]]
-
-        sorted_records = _sort_records(records)
+        valid_count = sum(record.status == "valid" for record in sorted_records)
         return ArtifactRegistryLookupResult(
-            generated_at=snapshot.generated_at,
-            artifact_root=snapshot.artifact_root,
-            registry_path=snapshot.registry_path,
-            total_count=snapshot.record_count,
+            generated_at=generated_at,
+            artifact_root=artifact_root,
+            registry_path=registry_path,
+            total_count=total_count,
             matched_count=len(sorted_records),
-            valid_count=sum(record.status == "valid" for record in sorted_records),
-            invalid_count=sum(record.status == "invalid" for record in sorted_records),
+            valid_count=valid_count,
+            invalid_count=len(sorted_records) - valid_count,
             records=sorted_records,
         )
 
 
+_batched_refreshes: ContextVar[dict[Path, set[str]] | None] = ContextVar(
+    "artifact_registry_batched_refreshes",
+    default=None,
+)
+
+
+@contextmanager
+def artifact_registry_batch(base_dir: str | Path) -> Iterator[None]:
+    """Defer tracked-write registry refreshes under *base_dir* to scope exit.
+
+    Paths written through a ``RunLayout`` inside the scope are collected and
+    re-indexed together in one journal append when the scope exits, whether
+    or not it exits cleanly. Nested scopes for the same base directory join
+    the outermost one.
+    """
+    resolved = Path(base_dir).resolve()
+    outer = _batched_refreshes.get()
+    if outer is not None and resolved in outer:
+        yield
+        return
+
+    pending: set[str] = set()
+    token = _batched_refreshes.set({**(outer or {}), resolved: pending})
+    try:
+        yield
+    finally:
+        _batched_refreshes.reset(token)
+        if pending:
+            try:
+                ArtifactRegistry(resolved).refresh_paths(sorted(pending))
+            except Exception:
+                # Registry maintenance must not fail the scope it wraps.
+                logger.warning("artifact_registry_batch_flush_failed base_dir=%s", resolved, exc_info=True)
+
+
+def defer_artifact_registry_refresh(base_dir: str | Path, relative_path: str | PurePosixPath) -> bool:
+    """Queue *relative_path* on the active batch for *base_dir*, if any."""
+    batches = _batched_refreshes.get()
+    if not batches:
+        return False
+    pending = batches.get(Path(base_dir).resolve())
+    if pending is None:
+        return False
+    pending.add(_normalize_relative_path(relative_path))
+    return True
+
+
 def rebuild_artifact_registry(base_dir: str | Path) -> ArtifactRegistrySnapshot:
     return ArtifactRegistry(base_dir).rebuild()
 
@@ -0,0 +1,122 @@
+"""Append-only record journal for the artifact registry.
+
+``registry.json`` used to be rewritten in full for every tracked artifact
+write, so a run that writes N files paid O(N x registry size). The snapshot is
+now only rewritten on rebuild and compaction; every upsert or removal in
+between is one line appended to ``registry.journal.jsonl`` next to it::
+
+    {"snapshot": [ino, size, mtime_ns]}                              <- header
+    {"at": "2026-01-01T00:00:00+00:00", "upsert": {...record...}}
+    {"at": "2026-01-01T00:00:01+00:00", "remove": "artifacts/..."}
+
+Header pinning and compaction follow ``snapshot_journal``. Readers take no
+lock; writers serialise on ``flock`` of ``.lock`` and truncate any torn tail
+before appending.
+
+The registry is derived data (``rebuild`` regenerates it from the artifact
+tree), so appends are not fsynced.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import logging
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from snapshot_journal import (
+    DEFAULT_COMPACT_MIN_BYTES,
+    encode_record,
+    parse_record,
+    write_journal_header,
+)
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_REGISTRY_JOURNAL_FILENAME = "registry.journal.jsonl"
+ARTIFACT_REGISTRY_LOCK_FILENAME = ".lock"
+DEFAULT_JOURNAL_COMPACT_MIN_BYTES = DEFAULT_COMPACT_MIN_BYTES
+
+
+def journal_path_for(snapshot_path: Path) -> Path:
+    return snapshot_path.with_name(ARTIFACT_REGISTRY_JOURNAL_FILENAME)
+
+
+@contextmanager
+def registry_write_lock(registry_dir: Path) -> Iterator[None]:
+    """Hold the cross-process writer lock for the registry directory."""
+    registry_dir.mkdir(parents=True, exist_ok=True)
+    with open(registry_dir / ARTIFACT_REGISTRY_LOCK_FILENAME, "a+") as handle:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+def write_fresh_journal(journal_path: Path, fingerprint: list[int]) -> tuple[int, int]:
+    """Atomically replace the journal with a header bound to *fingerprint*.
+
+    Returns ``(inode, size)`` of the new journal.
+    """
+    stat_result = write_journal_header(journal_path, {"snapshot": fingerprint})
+    return stat_result.st_ino, stat_result.st_size
+
+
+def read_journal(
+    journal_path: Path,
+    offset: int,
+    inode: Optional[int],
+) -> Optional[tuple[int, int, list[dict[str, Any]], int]]:
+    """Read committed journal lines from *offset* of the journal with *inode*.
+
+    Returns ``(inode, start, entries, committed_offset)`` or ``None`` when there
+    is no journal. If the journal on disk is a different file than *inode*
+    (it was replaced since the caller's last read) it is read from ``start=0``
+    instead, and its header is the first entry. A trailing line without
+    ``\\n`` is an in-flight or torn append and is left for the next read.
+    """
+    try:
+        handle = open(journal_path, "rb")
+    except FileNotFoundError:
+        return None
+    with handle:
+        current_inode = os.fstat(handle.fileno()).st_ino
+        start = offset if current_inode == inode else 0
+        handle.seek(start)
+        payload = handle.read()
+    end = payload.rfind(b"\n")
+    if end < 0:
+        return current_inode, start, [], start
+    entries: list[dict[str, Any]] = []
+    for line in payload[: end + 1].splitlines():
+        entry = parse_record(line)
+        if entry is None:
+            logger.warning("artifact_registry_journal_skipped_entry path=%s", journal_path)
+            continue
+        entries.append(entry)
+    return current_inode, start, entries, start + end + 1
+
+
+def append_journal_entries(
+    journal_path: Path,
+    committed_offset: int,
+    entries: list[dict[str, Any]],
+) -> int:
+    """Write *entries* in one write at *committed_offset*, dropping any torn tail.
+
+    Must be called under :func:`registry_write_lock`. Returns the new committed
+    size of the journal.
+    """
+    payload = b"".join(encode_record(entry) for entry in entries)
+    fd = os.open(journal_path, os.O_RDWR)
+    try:
+        os.ftruncate(fd, committed_offset)
+        written = os.pwrite(fd, payload, committed_offset)
+    finally:
+        os.close(fd)
+    if written != len(payload):
+        raise OSError(f"short write to artifact registry journal ({written}/{len(payload)} bytes)")
+    return committed_offset + written
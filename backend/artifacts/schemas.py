@@ -632,7 +632,10 @@ class FastQCRun(ArtifactDocument):
     sequencing_layout: FastQCSequencingLayout
     sample_sheet_path: str
     output_directory: str
-    command: list[str] = Field(min_length=1)
+    # One entry per FastQC process that ran; empty when every report was
+    # reused. ``command`` is the single-process form written by older runs.
+    commands: list[list[str]] = Field(default_factory=list)
+    command: list[str] | None = None
     parameters: dict[str, Any] = Field(default_factory=dict)
     input_files: list[FastQCInputFileRecord] = Field(min_length=1)
     reports: list[FastQCReportArtifactSet] = Field(min_length=1)
@@ -652,9 +655,20 @@ class FastQCRun(ArtifactDocument):
             return None
         return _normalize_relative_path(value)
 
+    @field_validator("commands")
+    @classmethod
+    def _validate_commands(cls, value: list[list[str]]) -> list[list[str]]:
+        if any(not command for command in value):
+            raise ValueError("commands may not contain an empty command.")
+        return [[_require_non_empty(item, field_name="commands") for item in command] for command in value]
+
     @field_validator("command")
     @classmethod
-    def _validate_command(cls, value: list[str]) -> list[str]:
+    def _validate_command(cls, value: list[str] | None) -> list[str] | None:
+        if value is None:
+            return None
+        if not value:
+            raise ValueError("command may not be empty.")
         return [_require_non_empty(item, field_name="command") for item in value]
 
 
@@ -6,6 +6,7 @@ from .store import (
     AUDIT_REDACTION_POLICY,
     AUDIT_RETENTION_EXPECTATION_DAYS,
     AUDIT_ROTATION_STRATEGY,
+    AUDIT_SEGMENT_MAX_BYTES,
     AuditEventRecord,
     AuditEventType,
     append_audit_event,
@@ -27,6 +28,7 @@ __all__ = [
     "AUDIT_REDACTION_POLICY",
     "AUDIT_RETENTION_EXPECTATION_DAYS",
     "AUDIT_ROTATION_STRATEGY",
+    "AUDIT_SEGMENT_MAX_BYTES",
     "AuditEventRecord",
     "AuditEventType",
     "append_audit_event",
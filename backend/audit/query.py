@@ -0,0 +1,321 @@
+"""Indexed reads over the segmented audit log.
+
+Every segment under ``storage/audit`` gets a small JSON sidecar in
+``storage/audit/index`` recording where each line starts, the span of
+``recorded_at`` values it holds, and which lines carry each value of the
+filterable fields.  Queries intersect those postings, then walk the matching
+lines newest-first with block reads, so only lines that can match are parsed
+and validated.  Validation and filtering still run through
+``AuditEventRecord`` exactly as a full scan would; the index only decides which
+lines are worth looking at.
+
+Sidecars are caches: they are rebuilt when missing, unreadable, or when their
+segment was replaced or truncated, and extended in place when the segment grew.
+The unterminated tail of a segment that is still being appended to is never
+indexed; it is always read.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, BinaryIO, Iterator, Mapping
+
+from .store import (
+    AUDIT_LOG_DIR,
+    AuditEventRecord,
+    _audit_segments_newest_first,
+    _matches_filters,
+)
+
+AUDIT_INDEX_DIR = AUDIT_LOG_DIR / "index"
+AUDIT_INDEX_VERSION = 1
+AUDIT_INDEXED_FIELDS = (
+    "event_type",
+    "session_id",
+    "run_id",
+    "step_id",
+    "job_id",
+    "workflow_id",
+    "tool_name",
+    "outcome",
+)
+_READ_BLOCK_BYTES = 256 * 1024
+
+logger = logging.getLogger(__name__)
+
+_loaded_indexes: dict[Path, "SegmentIndex"] = {}
+_loaded_indexes_lock = threading.Lock()
+
+
+class _DuplicateKey(ValueError):
+    pass
+
+
+@dataclass
+class SegmentIndex:
+    """Line offsets and field postings for the complete lines of one segment."""
+
+    segment: str
+    inode: int
+    indexed_bytes: int = 0
+    unreadable: bool = False
+    offsets: list[int] = field(default_factory=list)
+    time_range: list[str] | None = None
+    # Lines the index cannot vouch for (not a single JSON object, duplicate
+    # keys, non-string field values); they are candidates for every query.
+    unparsed: list[int] = field(default_factory=list)
+    postings: dict[str, dict[str, list[int]]] = field(default_factory=dict)
+
+    @property
+    def line_count(self) -> int:
+        return len(self.offsets)
+
+    def line_end(self, line: int) -> int:
+        if line + 1 < len(self.offsets):
+            return self.offsets[line + 1]
+        return self.indexed_bytes
+
+    def candidate_lines(self, filters: Mapping[str, Any]) -> list[int]:
+        """Line numbers that may match *filters*, newest first."""
+        selected: set[int] | None = None
+        for field_name, expected in filters.items():
+            if expected is None or not isinstance(expected, str) or field_name not in AUDIT_INDEXED_FIELDS:
+                continue
+            lines = set(self.postings.get(field_name, {}).get(expected, ()))
+            selected = lines if selected is None else selected & lines
+            if not selected:
+                break
+        if selected is None:
+            return list(range(self.line_count - 1, -1, -1))
+        selected.update(self.unparsed)
+        return sorted(selected, reverse=True)
+
+    def extend(self, data: bytes) -> None:
+        """Index *data*, which must end with a newline, as the next lines of the segment."""
+        try:
+            text = data.decode("utf-8")
+        except UnicodeDecodeError:
+            self.unreadable = True
+            return
+        position = self.indexed_bytes
+        for raw_line, line in zip(data.split(b"\n")[:-1], text.split("\n")[:-1]):
+            line_number = len(self.offsets)
+            self.offsets.append(position)
+            position += len(raw_line) + 1
+            self._index_line(line_number, line)
+        self.indexed_bytes = position
+
+    def _index_line(self, line_number: int, line: str) -> None:
+        pieces = [piece for piece in line.splitlines() if piece.strip()]
+        if not pieces:
+            return
+        if len(pieces) > 1:
+            self.unparsed.append(line_number)
+            return
+        try:
+            payload = json.loads(pieces[0].strip(), object_pairs_hook=_unique_keys)
+        except ValueError:
+            self.unparsed.append(line_number)
+            return
+        if not isinstance(payload, dict):
+            return
+        values = {field_name: payload.get(field_name) for field_name in AUDIT_INDEXED_FIELDS}
+        if any(value is not None and not isinstance(value, str) for value in values.values()):
+            self.unparsed.append(line_number)
+            return
+        for field_name, value in values.items():
+            if value is not None:
+                self.postings.setdefault(field_name, {}).setdefault(value, []).append(line_number)
+        recorded_at = payload.get("recorded_at")
+        if isinstance(recorded_at, str):
+            if self.time_range is None:
+                self.time_range = [recorded_at, recorded_at]
+            else:
+                self.time_range = [min(self.time_range[0], recorded_at), max(self.time_range[1], recorded_at)]
+
+    def to_payload(self) -> dict[str, Any]:
+        return {
+            "version": AUDIT_INDEX_VERSION,
+            "segment": self.segment,
+            "inode": self.inode,
+            "indexed_bytes": self.indexed_bytes,
+            "unreadable": self.unreadable,
+            "offsets": self.offsets,
+            "time_range": self.time_range,
+            "unparsed": self.unparsed,
+            "postings": self.postings,
+        }
+
+    @classmethod
+    def from_payload(cls, payload: Mapping[str, Any]) -> "SegmentIndex":
+        if payload.get("version") != AUDIT_INDEX_VERSION:
+            raise ValueError("unsupported audit index version")
+        return cls(
+            segment=str(payload["segment"]),
+            inode=int(payload["inode"]),
+            indexed_bytes=int(payload["indexed_bytes"]),
+            unreadable=bool(payload["unreadable"]),
+            offsets=[int(offset) for offset in payload["offsets"]],
+            time_range=list(payload["time_range"]) if payload.get("time_range") else None,
+            unparsed=[int(line) for line in payload["unparsed"]],
+            postings={
+                str(field_name): {str(value): [int(line) for line in lines] for value, lines in values.items()}
+                for field_name, values in payload["postings"].items()
+            },
+        )
+
+
+def _unique_keys(pairs: list[tuple[str, Any]]) -> dict[str, Any]:
+    payload = dict(pairs)
+    if len(payload) != len(pairs):
+        raise _DuplicateKey("duplicate key")
+    return payload
+
+
+def audit_index_path(segment_path: Path) -> Path:
+    return segment_path.parent / AUDIT_INDEX_DIR.name / f"{segment_path.name}.idx.json"
+
+
+def query_indexed_audit_events(
+    audit_dir: Path,
+    filters: Mapping[str, Any],
+    *,
+    limit: int,
+) -> list[AuditEventRecord]:
+    """Return up to *limit* events matching *filters*, newest segment and line first."""
+    filters = dict(filters)
+    events: list[AuditEventRecord] = []
+    for path in _audit_segments_newest_first(audit_dir):
+        try:
+            with path.open("rb") as handle:
+                index, tail = _current_index(path, handle)
+                if index.unreadable:
+                    raise UnicodeDecodeError("utf-8", b"", 0, 0, "segment is not valid UTF-8")
+                tail_text = tail.decode("utf-8")
+                for text in _candidate_texts(handle, index, filters, tail_text):
+                    for line in reversed(text.splitlines()):
+                        stripped = line.strip()
+                        if not stripped:
+                            continue
+                        try:
+                            record = AuditEventRecord.model_validate_json(stripped)
+                        except Exception:
+                            continue
+                        if not _matches_filters(record, filters):
+                            continue
+                        events.append(record)
+                        if len(events) >= limit:
+                            return events
+        except Exception:
+            logger.warning("Skipping unreadable audit log %s", path, exc_info=True)
+            continue
+    return events
+
+
+def _candidate_texts(
+    handle: BinaryIO,
+    index: SegmentIndex,
+    filters: Mapping[str, Any],
+    tail_text: str,
+) -> Iterator[str]:
+    if tail_text:
+        yield tail_text
+    for block_start, block, lines in _read_blocks(handle, index, index.candidate_lines(filters)):
+        for line in lines:
+            yield block[index.offsets[line] - block_start : index.line_end(line) - block_start].decode("utf-8")
+
+
+def _read_blocks(
+    handle: BinaryIO,
+    index: SegmentIndex,
+    candidates: list[int],
+) -> Iterator[tuple[int, bytes, list[int]]]:
+    """Group descending *candidates* into reads of at most ``_READ_BLOCK_BYTES``."""
+    position = 0
+    while position < len(candidates):
+        end = index.line_end(candidates[position])
+        stop = position + 1
+        while stop < len(candidates) and end - index.offsets[candidates[stop]] <= _READ_BLOCK_BYTES:
+            stop += 1
+        start = index.offsets[candidates[stop - 1]]
+        handle.seek(start)
+        yield start, handle.read(end - start), candidates[position:stop]
+        position = stop
+
+
+def _current_index(path: Path, handle: BinaryIO) -> tuple[SegmentIndex, bytes]:
+    """Bring the index of the open segment up to date; return it with the unterminated tail."""
+    stat_result = os.fstat(handle.fileno())
+    size = stat_result.st_size
+    with _loaded_indexes_lock:
+        index = _loaded_indexes.get(path)
+        if index is None or not _index_fits(index, path, stat_result.st_ino, handle, size):
+            index = _load_index(path, stat_result.st_ino, handle, size)
+        start = index.indexed_bytes
+        if not index.unreadable and size > start:
+            handle.seek(start)
+            pending = handle.read(size - start)
+            complete = pending.rfind(b"\n") + 1
+            if complete:
+                index.extend(pending[:complete])
+                _write_index(path, index)
+            tail = b"" if index.unreadable else pending[complete:]
+        else:
+            tail = b""
+        _loaded_indexes[path] = index
+        return index, tail
+
+
+def _index_fits(index: SegmentIndex, path: Path, inode: int, handle: BinaryIO, size: int) -> bool:
+    if index.segment != path.name or index.inode != inode or index.indexed_bytes > size:
+        return False
+    if index.indexed_bytes == 0:
+        return True
+    handle.seek(index.indexed_bytes - 1)
+    return handle.read(1) == b"\n"
+
+
+def _load_index(path: Path, inode: int, handle: BinaryIO, size: int) -> SegmentIndex:
+    index_path = audit_index_path(path)
+    try:
+        index = SegmentIndex.from_payload(json.loads(index_path.read_text(encoding="utf-8")))
+    except FileNotFoundError:
+        return SegmentIndex(segment=path.name, inode=inode)
+    except Exception:
+        logger.warning("audit_index_rebuild reason=unreadable path=%s", index_path, exc_info=True)
+        return SegmentIndex(segment=path.name, inode=inode)
+    if not _index_fits(index, path, inode, handle, size):
+        logger.info("audit_index_rebuild reason=stale path=%s", index_path)
+        return SegmentIndex(segment=path.name, inode=inode)
+    return index
+
+
+def _write_index(path: Path, index: SegmentIndex) -> None:
+    index_path = audit_index_path(path)
+    tmp_path = index_path.with_name(f".{index_path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path.write_text(json.dumps(index.to_payload(), separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp_path, index_path)
+    except OSError:
+        logger.warning("audit_index_write_failed path=%s", index_path, exc_info=True)
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+
+
+__all__ = [
+    "AUDIT_INDEXED_FIELDS",
+    "AUDIT_INDEX_DIR",
+    "AUDIT_INDEX_VERSION",
+    "SegmentIndex",
+    "audit_index_path",
+    "query_indexed_audit_events",
+]
@@ -5,6 +5,8 @@ from __future__ import annotations
 import hashlib
 import json
 import logging
+import re
+import threading
 import uuid
 from datetime import datetime, timezone
 from pathlib import Path
@@ -16,7 +18,10 @@ AUDIT_EVENT_CONTRACT_VERSION = "audit_event.v1"
 AUDIT_LOG_DIR = Path("storage") / "audit"
 AUDIT_LOG_PREFIX = "events"
 AUDIT_RETENTION_EXPECTATION_DAYS = 90
-AUDIT_ROTATION_STRATEGY = "daily_jsonl"
+AUDIT_ROTATION_STRATEGY = "daily_segmented_jsonl"
+# Appends roll over to a new segment of the same day once the current one
+# reaches this size, so no single file (or index) grows without bound.
+AUDIT_SEGMENT_MAX_BYTES = 4 * 1024 * 1024
 AUDIT_REDACTION_POLICY = "audit_redaction.v1"
 _MAX_SUMMARY_CHARS = 240
 _MAX_STRING_CHARS = 500
@@ -24,6 +29,12 @@ _MAX_DETAILS_JSON_CHARS = 12_000
 
 logger = logging.getLogger(__name__)
 
+_SEGMENT_NAME = re.compile(
+    rf"^{AUDIT_LOG_PREFIX}-(?P<date>\d{{4}}-\d{{2}}-\d{{2}})(?:\.(?P<sequence>\d+))?\.jsonl$"
+)
+_current_segments: dict[Path, int] = {}
+_current_segments_lock = threading.Lock()
+
 AuditEventType = Literal[
     "chat_request_received",
     "compliance_decision",
@@ -115,59 +126,139 @@ def append_audit_event(
     details: Mapping[str, Any] | None = None,
     recorded_at: datetime | None = None,
 ) -> Path | None:
+    """Append one audit event.
+
+    When the background writer from ``audit.writer`` is running the event is
+    queued for it and ``None`` is returned; otherwise the event is written
+    before returning and the segment it went to is returned. ``None`` also
+    signals a failed (logged, never raised) append.
+    """
+    from .writer import get_audit_writer
+
     base_path = Path(base_dir).resolve()
+    fields: dict[str, Any] = {
+        "event_type": event_type,
+        "summary": summary,
+        "outcome": outcome,
+        "session_id": session_id,
+        "run_id": run_id,
+        "step_id": step_id,
+        "job_id": job_id,
+        "workflow_id": workflow_id,
+        "tool_name": tool_name,
+        "actor": actor,
+        "artifact_paths": list(artifact_paths or []),
+        "external_systems": list(external_systems or []),
+        "details": dict(details or {}),
+        "recorded_at": recorded_at or _utcnow(),
+    }
+    writer = get_audit_writer()
+    if writer is not None:
+        writer.submit(base_path, fields)
+        return None
     try:
-        record = AuditEventRecord(
-            event_id=str(uuid.uuid4()),
-            event_type=event_type,
-            recorded_at=recorded_at or _utcnow(),
-            summary=summary,
-            outcome=_clean_optional_text(outcome),
-            session_id=_clean_optional_text(session_id),
-            run_id=_clean_optional_text(run_id),
-            step_id=_clean_optional_text(step_id),
-            job_id=_clean_optional_text(job_id),
-            workflow_id=_clean_optional_text(workflow_id),
-            tool_name=_clean_optional_text(tool_name),
-            actor=_clean_optional_text(actor) or "system",
-            artifact_paths=_normalize_path_list(base_path, artifact_paths or []),
-            external_systems=_normalize_string_list(external_systems or []),
-            details=_normalize_details(details or {}),
-        )
+        record = _build_audit_record(base_path, fields)
         log_path = audit_log_path(base_path, recorded_at=record.recorded_at)
         log_path.parent.mkdir(parents=True, exist_ok=True)
         with log_path.open("a", encoding="utf-8") as handle:
-            handle.write(json.dumps(record.model_dump(mode="json"), ensure_ascii=False) + "\n")
+            handle.write(_audit_record_line(record))
     except Exception:
-        logger.warning(
-            "Non-fatal audit append failure for event_type=%s outcome=%s session_id=%s run_id=%s "
-            "step_id=%s job_id=%s workflow_id=%s tool_name=%s",
-            event_type,
-            _clean_optional_text(outcome),
-            _clean_optional_text(session_id),
-            _clean_optional_text(run_id),
-            _clean_optional_text(step_id),
-            _clean_optional_text(job_id),
-            _clean_optional_text(workflow_id),
-            _clean_optional_text(tool_name),
-            exc_info=True,
-        )
+        _log_append_failure(fields)
         return None
     return log_path
 
 
+def _build_audit_record(base_path: Path, fields: Mapping[str, Any]) -> AuditEventRecord:
+    return AuditEventRecord(
+        event_id=str(uuid.uuid4()),
+        event_type=fields["event_type"],
+        recorded_at=fields["recorded_at"],
+        summary=fields["summary"],
+        outcome=_clean_optional_text(fields["outcome"]),
+        session_id=_clean_optional_text(fields["session_id"]),
+        run_id=_clean_optional_text(fields["run_id"]),
+        step_id=_clean_optional_text(fields["step_id"]),
+        job_id=_clean_optional_text(fields["job_id"]),
+        workflow_id=_clean_optional_text(fields["workflow_id"]),
+        tool_name=_clean_optional_text(fields["tool_name"]),
+        actor=_clean_optional_text(fields["actor"]) or "system",
+        artifact_paths=_normalize_path_list(base_path, fields["artifact_paths"]),
+        external_systems=_normalize_string_list(fields["external_systems"]),
+        details=_normalize_details(fields["details"]),
+    )
+
+
+def _audit_record_line(record: AuditEventRecord) -> str:
+    return json.dumps(record.model_dump(mode="json"), ensure_ascii=False) + "\n"
+
+
+def _log_append_failure(fields: Mapping[str, Any]) -> None:
+    logger.warning(
+        "Non-fatal audit append failure for event_type=%s outcome=%s session_id=%s run_id=%s "
+        "step_id=%s job_id=%s workflow_id=%s tool_name=%s",
+        fields["event_type"],
+        _clean_optional_text(fields["outcome"]),
+        _clean_optional_text(fields["session_id"]),
+        _clean_optional_text(fields["run_id"]),
+        _clean_optional_text(fields["step_id"]),
+        _clean_optional_text(fields["job_id"]),
+        _clean_optional_text(fields["workflow_id"]),
+        _clean_optional_text(fields["tool_name"]),
+        exc_info=True,
+    )
+
+
 def audit_log_path(base_dir: Path | str, *, recorded_at: datetime | None = None) -> Path:
+    """Return the segment that events recorded at *recorded_at* are appended to.
+
+    A day's first segment is ``events-YYYY-MM-DD.jsonl``; once it reaches
+    ``AUDIT_SEGMENT_MAX_BYTES`` appends move on to ``events-YYYY-MM-DD.0001.jsonl``
+    and so on.
+    """
     base_path = Path(base_dir).resolve()
     timestamp = recorded_at or _utcnow()
     if timestamp.tzinfo is None:
         timestamp = timestamp.replace(tzinfo=timezone.utc)
     date_key = timestamp.astimezone(timezone.utc).strftime("%Y-%m-%d")
-    return base_path / AUDIT_LOG_DIR / f"{AUDIT_LOG_PREFIX}-{date_key}.jsonl"
+    day_path = base_path / AUDIT_LOG_DIR / f"{AUDIT_LOG_PREFIX}-{date_key}.jsonl"
+
+    with _current_segments_lock:
+        sequence = _current_segments.get(day_path, 0)
+    while True:
+        path = _audit_segment_path(day_path, sequence)
+        try:
+            if path.stat().st_size < AUDIT_SEGMENT_MAX_BYTES:
+                break
+        except FileNotFoundError:
+            break
+        sequence += 1
+    with _current_segments_lock:
+        _current_segments[day_path] = sequence
+    return path
+
+
+def _audit_segment_path(day_path: Path, sequence: int) -> Path:
+    if sequence == 0:
+        return day_path
+    return day_path.with_name(f"{day_path.stem}.{sequence:04d}.jsonl")
+
+
+def _audit_segments_newest_first(audit_dir: Path) -> list[Path]:
+    """Every audit log file under *audit_dir*, newest day and segment first."""
+
+    def sort_key(path: Path) -> tuple[str, int]:
+        match = _SEGMENT_NAME.match(path.name)
+        if match is None:
+            return path.name, 0
+        return f"{AUDIT_LOG_PREFIX}-{match['date']}.jsonl", int(match["sequence"] or 0)
+
+    return sorted(audit_dir.glob(f"{AUDIT_LOG_PREFIX}-*.jsonl"), key=sort_key, reverse=True)
 
 
 def audit_retention_policy() -> dict[str, Any]:
     return {
         "rotation_strategy": AUDIT_ROTATION_STRATEGY,
+        "segment_max_bytes": AUDIT_SEGMENT_MAX_BYTES,
         "retention_expectation_days": AUDIT_RETENTION_EXPECTATION_DAYS,
         "automatic_deletion": False,
     }
@@ -186,10 +277,23 @@ def query_audit_events(
     outcome: str | None = None,
     limit: int = 100,
 ) -> list[AuditEventRecord]:
+    """Return up to *limit* matching events, most recently appended first.
+
+    Reads go through the per-segment indexes in ``audit.query``, so only
+    lines that can match are parsed. Events still queued in the background
+    writer are written out first.
+    """
+    from .query import query_indexed_audit_events
+    from .writer import get_audit_writer
+
     base_path = Path(base_dir).resolve()
     if limit < 1:
         raise ValueError("limit must be at least 1.")
 
+    writer = get_audit_writer()
+    if writer is not None:
+        writer.flush()
+
     audit_dir = base_path / AUDIT_LOG_DIR
     if not audit_dir.exists():
         return []
@@ -204,28 +308,7 @@ def query_audit_events(
         "tool_name": _clean_optional_text(tool_name),
         "outcome": _clean_optional_text(outcome),
     }
-
-    events: list[AuditEventRecord] = []
-    for path in sorted(audit_dir.glob(f"{AUDIT_LOG_PREFIX}-*.jsonl"), reverse=True):
-        try:
-            lines = path.read_text(encoding="utf-8").splitlines()
-        except Exception:
-            logger.warning("Skipping unreadable audit log %s", path, exc_info=True)
-            continue
-        for line in reversed(lines):
-            stripped = line.strip()
-            if not stripped:
-                continue
-            try:
-                record = AuditEventRecord.model_validate_json(stripped)
-            except Exception:
-                continue
-            if not _matches_filters(record, normalized_filters):
-                continue
-            events.append(record)
-            if len(events) >= limit:
-                return events
-    return events
+    return query_indexed_audit_events(audit_dir, normalized_filters, limit=limit)
 
 
 def append_chat_request_event(
@@ -597,6 +680,7 @@ __all__ = [
     "AUDIT_REDACTION_POLICY",
     "AUDIT_RETENTION_EXPECTATION_DAYS",
     "AUDIT_ROTATION_STRATEGY",
+    "AUDIT_SEGMENT_MAX_BYTES",
     "AuditEventRecord",
     "AuditEventType",
     "append_audit_event",
@@ -0,0 +1,292 @@
+"""Background group-commit writer for the audit log.
+
+``append_audit_event`` writes synchronously by default: validate, open the
+day's segment, write one line, close. While a writer started here is running
+it instead hands the raw event fields to a bounded in-process queue and
+returns. A single background thread builds and validates the records, keeps
+each day's current segment open, and commits everything that queued up as one
+write per segment, followed by a per-batch ``flush`` or ``fsync`` depending on
+the configured durability. Segments still roll over at
+``AUDIT_SEGMENT_MAX_BYTES``, and a day's segment is closed as soon as an event
+for a later day is written.
+
+When the queue is full new events are dropped rather than blocking the
+request path; queue depth and the dropped/written counts are exported through
+``runtime.metrics_collector.METRICS``.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import threading
+from dataclasses import dataclass, field
+from datetime import timezone
+from pathlib import Path
+from typing import Any, Literal, Mapping, Optional
+
+from runtime.metrics_collector import METRICS
+
+from . import store
+from .store import AuditEventRecord, _audit_record_line, _build_audit_record, _log_append_failure
+
+AuditDurability = Literal["flush", "fsync"]
+AUDIT_DURABILITY_MODES: tuple[AuditDurability, ...] = ("flush", "fsync")
+DEFAULT_AUDIT_QUEUE_MAX_EVENTS = 10_000
+DEFAULT_AUDIT_BATCH_MAX_EVENTS = 512
+_DROP_LOG_EVERY = 1_000
+
+logger = logging.getLogger(__name__)
+
+_active_writer: Optional["AuditWriter"] = None
+_active_writer_lock = threading.Lock()
+
+
+@dataclass
+class _Pending:
+    base_path: Path
+    fields: Mapping[str, Any]
+
+
+@dataclass
+class _Barrier:
+    done: threading.Event = field(default_factory=threading.Event)
+
+
+@dataclass
+class _OpenSegment:
+    path: Path
+    handle: Any
+    size: int
+    lines: list[bytes] = field(default_factory=list)
+
+
+_STOP = object()
+
+
+class AuditWriter:
+    """Bounded queue plus one thread that commits audit events in batches."""
+
+    def __init__(
+        self,
+        *,
+        max_queue_events: int = DEFAULT_AUDIT_QUEUE_MAX_EVENTS,
+        max_batch_events: int = DEFAULT_AUDIT_BATCH_MAX_EVENTS,
+        durability: AuditDurability = "flush",
+    ) -> None:
+        if durability not in AUDIT_DURABILITY_MODES:
+            raise ValueError(f"durability must be one of {AUDIT_DURABILITY_MODES}.")
+        self.max_batch_events = max(1, int(max_batch_events))
+        self.durability = durability
+        self._queue: queue.Queue[Any] = queue.Queue(maxsize=max(1, int(max_queue_events)))
+        self._segments: dict[tuple[Path, str], _OpenSegment] = {}
+        self._latest_day: dict[Path, str] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stats_lock = threading.Lock()
+        self._dropped = 0
+        self._written = 0
+        self._batches = 0
+
+    # ------------------------------------------------------------------ #
+    # Producer side                                                        #
+    # ------------------------------------------------------------------ #
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, base_path: Path, fields: Mapping[str, Any]) -> bool:
+        """Queue one event; return ``False`` if it was dropped because the queue is full."""
+        try:
+            self._queue.put_nowait(_Pending(base_path, fields))
+        except queue.Full:
+            with self._stats_lock:
+                self._dropped += 1
+                dropped = self._dropped
+            METRICS.observe_audit_writer(queue_depth=self._queue.qsize(), dropped=1)
+            if dropped % _DROP_LOG_EVERY == 1:
+                logger.warning(
+                    "audit_event_dropped reason=queue_full event_type=%s dropped_total=%d",
+                    fields.get("event_type"),
+                    dropped,
+                )
+            return False
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until every event queued before this call is written."""
+        if self._thread is None or not self._thread.is_alive():
+            return self._queue.empty()
+        barrier = _Barrier()
+        self._queue.put(barrier)
+        return barrier.done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Write out everything queued, close open segments and stop the thread."""
+        if self._thread is None:
+            self.start()
+        assert self._thread is not None
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.warning("audit_writer_drain_timeout pending=%d", self._queue.qsize())
+
+    def stats(self) -> dict[str, int]:
+        with self._stats_lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "dropped_events": self._dropped,
+                "written_events": self._written,
+                "batches": self._batches,
+            }
+
+    # ------------------------------------------------------------------ #
+    # Writer thread                                                        #
+    # ------------------------------------------------------------------ #
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch: list[_Pending] = []
+            barriers: list[_Barrier] = []
+            item = self._queue.get()
+            while True:
+                if item is _STOP:
+                    stopping = True
+                elif isinstance(item, _Barrier):
+                    barriers.append(item)
+                else:
+                    batch.append(item)
+                if stopping or barriers or len(batch) >= self.max_batch_events:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                try:
+                    self._commit(batch)
+                except Exception:
+                    logger.warning("audit_batch_commit_failed events=%d", len(batch), exc_info=True)
+            for barrier in barriers:
+                barrier.done.set()
+        self._close_segments(list(self._segments))
+        METRICS.observe_audit_writer(queue_depth=self._queue.qsize())
+
+    def _commit(self, batch: list[_Pending]) -> None:
+        written = 0
+        touched: set[tuple[Path, str]] = set()
+        for pending in batch:
+            try:
+                record = _build_audit_record(pending.base_path, pending.fields)
+                line = _audit_record_line(record).encode("utf-8")
+                day = record.recorded_at.astimezone(timezone.utc).strftime("%Y-%m-%d")
+                segment = self._segment_for(pending.base_path, day, record)
+            except Exception:
+                _log_append_failure(pending.fields)
+                continue
+            segment.lines.append(line)
+            segment.size += len(line)
+            touched.add((pending.base_path, day))
+            written += 1
+            if segment.size >= store.AUDIT_SEGMENT_MAX_BYTES:
+                # Later events for this day go to the next segment.
+                self._close_segments([(pending.base_path, day)])
+                touched.discard((pending.base_path, day))
+        for key in touched:
+            self._write_segment(self._segments[key])
+        self._close_segments(
+            [key for key in self._segments if key[1] < self._latest_day.get(key[0], key[1])]
+        )
+        with self._stats_lock:
+            self._written += written
+            self._batches += 1
+        METRICS.observe_audit_writer(queue_depth=self._queue.qsize(), written=written)
+
+    def _segment_for(self, base_path: Path, day: str, record: AuditEventRecord) -> _OpenSegment:
+        key = (base_path, day)
+        segment = self._segments.get(key)
+        if segment is None:
+            path = store.audit_log_path(base_path, recorded_at=record.recorded_at)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            handle = open(path, "ab", buffering=0)
+            segment = _OpenSegment(path=path, handle=handle, size=handle.tell())
+            self._segments[key] = segment
+        if day > self._latest_day.get(base_path, ""):
+            self._latest_day[base_path] = day
+        return segment
+
+    def _write_segment(self, segment: _OpenSegment) -> None:
+        if not segment.lines:
+            return
+        data = memoryview(b"".join(segment.lines))
+        segment.lines = []
+        try:
+            while data:
+                data = data[segment.handle.write(data) :]
+            if self.durability == "fsync":
+                os.fsync(segment.handle.fileno())
+        except OSError:
+            logger.warning("audit_batch_write_failed path=%s", segment.path, exc_info=True)
+        segment.size = segment.handle.tell()
+
+    def _close_segments(self, keys: list[tuple[Path, str]]) -> None:
+        for key in keys:
+            segment = self._segments.pop(key, None)
+            if segment is None:
+                continue
+            self._write_segment(segment)
+            try:
+                segment.handle.close()
+            except OSError:
+                logger.warning("audit_segment_close_failed path=%s", segment.path, exc_info=True)
+
+
+def get_audit_writer() -> Optional[AuditWriter]:
+    """The running background writer, or ``None`` when appends are synchronous."""
+    return _active_writer
+
+
+def start_audit_writer(
+    *,
+    max_queue_events: int = DEFAULT_AUDIT_QUEUE_MAX_EVENTS,
+    max_batch_events: int = DEFAULT_AUDIT_BATCH_MAX_EVENTS,
+    durability: AuditDurability = "flush",
+) -> AuditWriter:
+    """Route ``append_audit_event`` through a new background writer."""
+    global _active_writer
+    with _active_writer_lock:
+        if _active_writer is not None:
+            return _active_writer
+        writer = AuditWriter(
+            max_queue_events=max_queue_events,
+            max_batch_events=max_batch_events,
+            durability=durability,
+        )
+        writer.start()
+        _active_writer = writer
+        return writer
+
+
+def stop_audit_writer(timeout: Optional[float] = None) -> None:
+    """Drain and stop the background writer; later appends are synchronous again."""
+    global _active_writer
+    with _active_writer_lock:
+        writer, _active_writer = _active_writer, None
+    if writer is not None:
+        writer.close(timeout)
+
+
+__all__ = [
+    "AUDIT_DURABILITY_MODES",
+    "AuditDurability",
+    "AuditWriter",
+    "DEFAULT_AUDIT_BATCH_MAX_EVENTS",
+    "DEFAULT_AUDIT_QUEUE_MAX_EVENTS",
+    "get_audit_writer",
+    "start_audit_writer",
+    "stop_audit_writer",
+]
@@ -58,6 +58,17 @@ _DEFAULT_TOOL_WALLCLOCK_DEFAULT_S = 0.0
 # at every H2-H6 heading and can otherwise yield thousands of tiny sections
 # that bloat the index.
 _DEFAULT_MAX_SECTIONS_PER_FILE = 64
+_DEFAULT_MEMORY_EMBED_BATCH_SIZE = 64
+_DEFAULT_MEMORY_EMBED_MAX_WORKERS = 4
+_DEFAULT_EMBEDDING_CACHE_MAX_MB = 512
+_DEFAULT_SESSION_STORAGE_FORMAT = "json"
+_DEFAULT_SESSION_LOG_COMPACT_MIN_KB = 256
+_DEFAULT_SESSION_INDEX_FLUSH_INTERVAL_MS = 250
+_DEFAULT_AUDIT_QUEUE_MAX_EVENTS = 10_000
+_DEFAULT_AUDIT_BATCH_MAX_EVENTS = 512
+_DEFAULT_AUDIT_DURABILITY = "flush"
+_DEFAULT_METRICS_EXPOSITION_TTL_S = 1.0
+_DEFAULT_METRICS_PUBLISH_INTERVAL_S = 5.0
 
 # Normalized values for rag_mode. Historically this was a plain bool
 # (False = no RAG, True = keyword BM25/lexical retrieval). The string form
@@ -164,6 +175,45 @@ _DEFAULT: dict = {
     },
     "memory_indexer": {
         "max_sections_per_file": _DEFAULT_MAX_SECTIONS_PER_FILE,
+        "embed_batch_size": _DEFAULT_MEMORY_EMBED_BATCH_SIZE,
+        "embed_max_workers": _DEFAULT_MEMORY_EMBED_MAX_WORKERS,
+        "embedding_cache_max_mb": _DEFAULT_EMBEDDING_CACHE_MAX_MB,
+    },
+    "session_storage": {
+        # "json" rewrites the session file per save; "log" appends one record
+        # per save to {session_id}.log.jsonl and compacts periodically.
+        "format": _DEFAULT_SESSION_STORAGE_FORMAT,
+        "log_compact_min_kb": _DEFAULT_SESSION_LOG_COMPACT_MIN_KB,
+        # Sidecar (_index.json) updates are buffered and flushed at most this
+        # often, and at turn end; 0 writes the sidecar on every save.
+        "index_flush_interval_ms": _DEFAULT_SESSION_INDEX_FLUSH_INTERVAL_MS,
+    },
+    "audit_log": {
+        # The app lifespan routes audit appends through a background writer
+        # that commits queued events in batches; false keeps every append
+        # synchronous on the calling thread.
+        "async_writer": True,
+        "queue_max_events": _DEFAULT_AUDIT_QUEUE_MAX_EVENTS,
+        "batch_max_events": _DEFAULT_AUDIT_BATCH_MAX_EVENTS,
+        # "flush" hands each batch to the OS; "fsync" also forces it to disk.
+        "durability": _DEFAULT_AUDIT_DURABILITY,
+    },
+    "metrics": {
+        # /api/metrics re-renders at most this often; concurrent scrapes
+        # inside the window share one render.
+        "exposition_ttl_s": _DEFAULT_METRICS_EXPOSITION_TTL_S,
+        # Enable when running several uvicorn workers: each publishes its
+        # snapshot under storage/metrics/ and a scrape merges them all.
+        "shared_store": False,
+        "publish_interval_s": _DEFAULT_METRICS_PUBLISH_INTERVAL_S,
+    },
+    "turn_profile": {
+        # Time each turn's phases (session load, compaction, skill routing,
+        # prompt build, retrieval, model calls, tool dispatch, SSE encoding)
+        # and emit a turn_profile event plus per-phase histograms.
+        "enabled": False,
+        # Also append each profile as OTLP/JSON to storage/traces/.
+        "otlp_file": False,
     },
     "read_file_extra_roots": [],
     "retention": {
@@ -470,6 +520,127 @@ def get_max_sections_per_file() -> int:
     return value if value >= 1 else _DEFAULT_MAX_SECTIONS_PER_FILE
 
 
+def _memory_indexer_positive_int(key: str, default: int) -> int:
+    raw = get_memory_indexer_settings().get(key, default)
+    try:
+        value = int(raw)
+    except (TypeError, ValueError):
+        return default
+    return value if value >= 1 else default
+
+
+def get_memory_embed_batch_size() -> int:
+    """Return how many memory chunks go into one embedding request."""
+    return _memory_indexer_positive_int(
+        "embed_batch_size", _DEFAULT_MEMORY_EMBED_BATCH_SIZE
+    )
+
+
+def get_memory_embed_max_workers() -> int:
+    """Return how many embedding requests the memory indexer keeps in flight."""
+    return _memory_indexer_positive_int(
+        "embed_max_workers", _DEFAULT_MEMORY_EMBED_MAX_WORKERS
+    )
+
+
+def get_embedding_cache_max_bytes() -> int:
+    """Return the per-model size budget of the shared on-disk embedding cache.
+
+    The cache under ``storage/embedding_cache/`` backs both the memory and the
+    knowledge index, so the knob lives with the memory indexer settings.
+    """
+    megabytes = _memory_indexer_positive_int(
+        "embedding_cache_max_mb", _DEFAULT_EMBEDDING_CACHE_MAX_MB
+    )
+    return megabytes * 1024 * 1024
+
+
+def get_session_storage_settings() -> dict[str, Any]:
+    session_storage = _load_runtime().get("session_storage", {})
+    return dict(session_storage) if isinstance(session_storage, dict) else {}
+
+
+def get_session_storage_format() -> str:
+    """Return the on-disk format new session writes use (``json`` or ``log``)."""
+    value = get_session_storage_settings().get("format", _DEFAULT_SESSION_STORAGE_FORMAT)
+    return value if value in ("json", "log") else _DEFAULT_SESSION_STORAGE_FORMAT
+
+
+def get_session_log_compact_min_bytes() -> int:
+    """Return the log size below which a ``log``-format session never compacts."""
+    raw = get_session_storage_settings().get(
+        "log_compact_min_kb", _DEFAULT_SESSION_LOG_COMPACT_MIN_KB
+    )
+    try:
+        value = int(raw)
+    except (TypeError, ValueError):
+        value = _DEFAULT_SESSION_LOG_COMPACT_MIN_KB
+    return max(0, value) * 1024
+
+
+def get_session_index_flush_interval() -> float:
+    """Return the session-index write debounce in seconds (0 = write-through)."""
+    raw = get_session_storage_settings().get(
+        "index_flush_interval_ms", _DEFAULT_SESSION_INDEX_FLUSH_INTERVAL_MS
+    )
+    try:
+        value = int(raw)
+    except (TypeError, ValueError):
+        value = _DEFAULT_SESSION_INDEX_FLUSH_INTERVAL_MS
+    return max(0, value) / 1000.0
+
+
+def get_audit_writer_settings() -> dict[str, Any]:
+    """Return the normalized ``audit_log`` block used to start the background writer."""
+    audit_log = _load_runtime().get("audit_log", {})
+    audit_log = audit_log if isinstance(audit_log, dict) else {}
+
+    def positive_int(key: str, default: int) -> int:
+        try:
+            value = int(audit_log.get(key, default))
+        except (TypeError, ValueError):
+            return default
+        return value if value >= 1 else default
+
+    durability = audit_log.get("durability", _DEFAULT_AUDIT_DURABILITY)
+    return {
+        "async_writer": bool(audit_log.get("async_writer", True)),
+        "queue_max_events": positive_int("queue_max_events", _DEFAULT_AUDIT_QUEUE_MAX_EVENTS),
+        "batch_max_events": positive_int("batch_max_events", _DEFAULT_AUDIT_BATCH_MAX_EVENTS),
+        "durability": durability if durability in ("flush", "fsync") else _DEFAULT_AUDIT_DURABILITY,
+    }
+
+
+def get_metrics_settings() -> dict[str, Any]:
+    """Return the normalized ``metrics`` block (exposition cache, cross-worker store)."""
+    metrics = _load_runtime().get("metrics", {})
+    metrics = metrics if isinstance(metrics, dict) else {}
+
+    def non_negative_float(key: str, default: float) -> float:
+        try:
+            value = float(metrics.get(key, default))
+        except (TypeError, ValueError):
+            return default
+        return value if value >= 0 else default
+
+    publish_interval = non_negative_float("publish_interval_s", _DEFAULT_METRICS_PUBLISH_INTERVAL_S)
+    return {
+        "exposition_ttl_s": non_negative_float("exposition_ttl_s", _DEFAULT_METRICS_EXPOSITION_TTL_S),
+        "shared_store": bool(metrics.get("shared_store", False)),
+        "publish_interval_s": publish_interval or _DEFAULT_METRICS_PUBLISH_INTERVAL_S,
+    }
+
+
+def get_turn_profile_settings() -> dict[str, bool]:
+    """Return the normalized ``turn_profile`` block."""
+    turn_profile = _load_runtime().get("turn_profile", {})
+    turn_profile = turn_profile if isinstance(turn_profile, dict) else {}
+    return {
+        "enabled": bool(turn_profile.get("enabled", False)),
+        "otlp_file": bool(turn_profile.get("otlp_file", False)),
+    }
+
+
 def get_llm_output_token_caps() -> tuple[int, int]:
     """Return (default, escalated) per-request output token caps.
 
@@ -19,9 +19,9 @@ from artifacts import (
     GroundedEntity,
     RunLayout,
     SCHEMA_PACK_VERSION,
-    build_content_hash_manifest,
     normalize_identifier,
     prepare_run_directory,
+    refresh_content_hash_manifest,
 )
 from tools.ensembl_api_tool import fetch_ensembl_response
 from tools.uniprot_api_tool import fetch_uniprot_response
@@ -191,7 +191,7 @@ def run_entity_grounding(
 ) -> PersistedEntityGrounding:
     layout = prepare_run_directory(base_dir, ENTITY_GROUNDING_WORKFLOW_NAME)
     grounded = materialize_entity_grounding(layout, payload)
-    _refresh_content_hash_manifest(layout)
+    refresh_content_hash_manifest(layout)
     return grounded
 
 
@@ -936,29 +936,6 @@ def _nested_optional_text(value: Any, *path: str) -> str | None:
     return _clean_optional_text(current)
 
 
-def _refresh_content_hash_manifest(layout: RunLayout) -> None:
-    entries: dict[str, bytes] = {}
-    for path in sorted(layout.run_dir.rglob("*")):
-        if not path.is_file():
-            continue
-        relative = path.relative_to(layout.run_dir).as_posix()
-        if relative == "content_hashes.json":
-            continue
-        entries[relative] = path.read_bytes()
-
-    manifest = build_content_hash_manifest(
-        run_id=layout.run_id,
-        schema_version=SCHEMA_PACK_VERSION,
-        created_at=layout.created_at,
-        source_workflow=layout.workflow,
-        entries=entries,
-    )
-    layout.content_hash_manifest_path.write_text(
-        json.dumps(manifest, ensure_ascii=False, indent=2) + "\n",
-        encoding="utf-8",
-    )
-
-
 __all__ = [
     "ENTITY_GROUNDING_WORKFLOW_NAME",
     "CachedGroundingPayload",
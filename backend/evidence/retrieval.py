@@ -16,10 +16,10 @@ from artifacts import (
     ArtifactReference,
     EvidenceCard,
     SCHEMA_PACK_VERSION,
-    build_content_hash_manifest,
     load_artifact_document,
     normalize_identifier,
     prepare_run_directory,
+    refresh_content_hash_manifest,
 )
 from entity_grounding import (
     EntityGroundingMentionRequest,
@@ -578,7 +578,7 @@ def _materialize_evidence_card(
     card_payload = yaml.safe_dump(card.model_dump(mode="json"), sort_keys=False, allow_unicode=False)
     artifact_path = layout.stable_artifact_path("evidence_card")
     artifact_path.write_text(card_payload, encoding="utf-8")
-    _refresh_content_hash_manifest(layout)
+    refresh_content_hash_manifest(layout)
 
     return RetrievedEvidenceCard(
         pmid=pmid,
@@ -610,7 +610,7 @@ def _materialize_retrieval_context_run(
 ) -> PersistedRetrievalContext:
     layout = prepare_run_directory(base_path, EVIDENCE_RETRIEVAL_WORKFLOW_NAME)
     _, persisted_paths = _persist_retrieval_context(layout, retrieval_context, selected_pmid=selected_pmid)
-    _refresh_content_hash_manifest(layout)
+    refresh_content_hash_manifest(layout)
 
     retrieval_context_path = persisted_paths["retrieval_context_path"]
     retrieval_context_relpath = persisted_paths["retrieval_context_relpath"]
@@ -953,26 +953,3 @@ def _persist_retrieval_context(
         )
     )
     return refs, persisted_paths
-
-
-def _refresh_content_hash_manifest(layout) -> None:
-    entries: dict[str, bytes] = {}
-    for path in sorted(layout.run_dir.rglob("*")):
-        if not path.is_file():
-            continue
-        relative = path.relative_to(layout.run_dir).as_posix()
-        if relative == "content_hashes.json":
-            continue
-        entries[relative] = path.read_bytes()
-
-    manifest = build_content_hash_manifest(
-        run_id=layout.run_id,
-        schema_version=SCHEMA_PACK_VERSION,
-        created_at=layout.created_at,
-        source_workflow=layout.workflow,
-        entries=entries,
-    )
-    layout.content_hash_manifest_path.write_text(
-        json.dumps(manifest, ensure_ascii=False, indent=2) + "\n",
-        encoding="utf-8",
-    )
@@ -14,10 +14,10 @@ from artifacts import (
     EvidenceCard,
     EvidenceReviewArtifact,
     SCHEMA_PACK_VERSION,
-    build_content_hash_manifest,
     load_artifact_document,
     normalize_identifier,
     prepare_run_directory,
+    refresh_content_hash_manifest,
     resolve_artifact_path,
 )
 from artifacts.schemas import (
@@ -249,7 +249,7 @@ def run_evidence_review(
         json.dumps(review.model_dump(mode="json"), ensure_ascii=False, indent=2) + "\n",
         encoding="utf-8",
     )
-    _refresh_content_hash_manifest(layout)
+    refresh_content_hash_manifest(layout)
 
     return EvidenceReviewResult(
         review=review,
@@ -553,26 +553,3 @@ def _dedupe_text(values: list[str]) -> list[str]:
         seen.add(key)
         deduped.append(normalized)
     return deduped
-
-
-def _refresh_content_hash_manifest(layout) -> None:
-    entries: dict[str, bytes] = {}
-    for path in sorted(layout.run_dir.rglob("*")):
-        if not path.is_file():
-            continue
-        relative = path.relative_to(layout.run_dir).as_posix()
-        if relative == "content_hashes.json":
-            continue
-        entries[relative] = path.read_bytes()
-
-    manifest = build_content_hash_manifest(
-        run_id=layout.run_id,
-        schema_version=SCHEMA_PACK_VERSION,
-        created_at=layout.created_at,
-        source_workflow=layout.workflow,
-        entries=entries,
-    )
-    layout.content_hash_manifest_path.write_text(
-        json.dumps(manifest, ensure_ascii=False, indent=2) + "\n",
-        encoding="utf-8",
-    )
@@ -4,12 +4,19 @@ from __future__ import annotations
 
 import csv
 import hashlib
+import json
+import os
 import re
+import shutil
 import subprocess
+import threading
 import zipfile
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from dataclasses import dataclass
 from pathlib import Path, PurePosixPath
-from typing import Literal, Sequence
+from typing import Callable, Literal, Mapping, Sequence
+
+from file_digests import FileDigestCache, hash_files
 
 FastQCSequencingLayout = Literal["single_end", "paired_end"]
 FastQCReadLabel = Literal["single", "read1", "read2"]
@@ -24,6 +31,13 @@ _FASTQ_SUFFIXES = (
     ".fq",
 )
 _NORMALIZE_IDENTIFIER_CHARS_RE = re.compile(r"[^a-z0-9._:-]+")
+# Reports that later runs can reuse, one directory per (input digest, FastQC
+# version, arguments) key. Each run writes into its own output directory, so
+# the reusable copies have to live outside it.
+FASTQC_REPORT_CACHE_DIR = PurePosixPath("storage/fastqc_reports")
+
+_version_cache: dict[tuple[str, int, int, int], str] = {}
+_version_cache_lock = threading.Lock()
 
 
 @dataclass(frozen=True)
@@ -59,10 +73,14 @@ class FastQCParsedReport:
 @dataclass(frozen=True)
 class FastQCCommandResult:
     executable: str
-    command: tuple[str, ...]
+    # One entry per FastQC process that actually ran, in shard order; empty
+    # when every input was reused.
+    commands: tuple[tuple[str, ...], ...]
     tool_version: str
     stdout: str
     stderr: str
+    shard_count: int = 1
+    reused_inputs: tuple[str, ...] = ()
 
 
 def load_fastqc_inputs(
@@ -170,7 +188,20 @@ def load_fastqc_inputs(
 
 
 def probe_fastqc_version(executable: str, *, base_dir: Path | str) -> str:
+    """Return the first line of ``executable --version``.
+
+    Results are cached per resolved executable file, so the probe subprocess
+    runs once per FastQC install rather than once per workflow step; replacing
+    the executable invalidates its entry.
+    """
     base_path = Path(base_dir).resolve()
+    identity = _executable_identity(executable, base_path)
+    if identity is not None:
+        with _version_cache_lock:
+            cached = _version_cache.get(identity)
+        if cached is not None:
+            return cached
+
     result = _run_subprocess((executable, "--version"), cwd=base_path)
     if result.returncode != 0:
         raise RuntimeError(_process_error_message(result, executable=executable, purpose="version check"))
@@ -182,6 +213,9 @@ def probe_fastqc_version(executable: str, *, base_dir: Path | str) -> str:
     first_line = next((line.strip() for line in combined_output.splitlines() if line.strip()), "")
     if not first_line:
         raise RuntimeError(f"FastQC version check using {executable!r} returned no version output.")
+    if identity is not None:
+        with _version_cache_lock:
+            _version_cache[identity] = first_line
     return first_line
 
 
@@ -192,31 +226,98 @@ def run_fastqc(
     output_dir: str,
     extra_args: Sequence[str] = (),
     base_dir: Path | str,
+    shard_size: int | None = None,
+    max_workers: int | None = None,
+    input_digests: Mapping[str, str] | None = None,
+    report_cache_dir: Path | str | None = None,
+    on_reports_ready: Callable[[Sequence[str]], None] | None = None,
 ) -> FastQCCommandResult:
+    """Run FastQC over *input_paths*, optionally as parallel shards.
+
+    With ``shard_size`` the inputs are split into shards of that many files,
+    each its own ``fastqc`` process, and up to ``max_workers`` shards run at
+    once. When ``input_digests`` maps input paths to sha256 digests, finished
+    reports are also kept in ``report_cache_dir`` (``FASTQC_REPORT_CACHE_DIR``
+    under *base_dir* by default), and an input whose digest, FastQC version
+    and arguments already have reports there is copied into ``output_dir``
+    instead of being run again, even by a later run writing to a different
+    ``output_dir``. ``on_reports_ready`` is called on this thread with the
+    input paths of every finished shard (and of the reused inputs) while the
+    remaining shards keep running, so callers can parse archives as they
+    appear. A failing shard raises after the running shards finish; shards
+    not yet started are cancelled.
+    """
     base_path = Path(base_dir).resolve()
     tool_version = probe_fastqc_version(executable, base_dir=base_path)
-    command = (executable, "--outdir", output_dir, *tuple(extra_args), *tuple(input_paths))
-    result = _run_subprocess(command, cwd=base_path)
-    if result.returncode != 0:
-        raise RuntimeError(_process_error_message(result, executable=executable, purpose="execution"))
+
+    output_abs = base_path / output_dir
+    cache_root = base_path / (report_cache_dir if report_cache_dir is not None else FASTQC_REPORT_CACHE_DIR)
+    cache_entries: dict[str, Path] = {}
+    if input_digests is not None:
+        for input_path in input_paths:
+            digest = input_digests.get(input_path)
+            if digest:
+                cache_entries[input_path] = cache_root / _report_cache_key(
+                    digest, tool_version=tool_version, extra_args=extra_args
+                )
+    reused: list[str] = []
+    pending: list[str] = []
+    for input_path in dict.fromkeys(input_paths):
+        entry = cache_entries.get(input_path)
+        if entry is not None and _restore_cached_reports(entry, output_abs, fastqc_output_prefix(input_path)):
+            reused.append(input_path)
+        else:
+            pending.append(input_path)
+
+    size = len(pending) if not shard_size or shard_size <= 0 else int(shard_size)
+    shards = [pending[start : start + size] for start in range(0, len(pending), size)] if pending else []
+    commands = tuple((executable, "--outdir", output_dir, *tuple(extra_args), *shard) for shard in shards)
+    shard_outputs: list[tuple[str, str]] = [("", "")] * len(shards)
+
+    if reused and on_reports_ready is not None:
+        on_reports_ready(tuple(reused))
+
+    if shards:
+        workers = min(len(shards), max_workers or os.cpu_count() or 1)
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fastqc-shard")
+        try:
+            futures = {
+                pool.submit(_run_subprocess, command, cwd=base_path): index
+                for index, command in enumerate(commands)
+            }
+            remaining = set(futures)
+            while remaining:
+                done, remaining = wait(remaining, return_when=FIRST_COMPLETED)
+                for future in sorted(done, key=futures.__getitem__):
+                    index = futures[future]
+                    result = future.result()
+                    if result.returncode != 0:
+                        raise RuntimeError(
+                            _process_error_message(result, executable=executable, purpose="execution")
+                        )
+                    shard_outputs[index] = (result.stdout, result.stderr)
+                    for input_path in shards[index]:
+                        entry = cache_entries.get(input_path)
+                        if entry is not None:
+                            _store_cached_reports(entry, output_abs, fastqc_output_prefix(input_path))
+                    if on_reports_ready is not None:
+                        on_reports_ready(tuple(shards[index]))
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
     return FastQCCommandResult(
         executable=executable,
-        command=command,
+        commands=commands,
         tool_version=tool_version,
-        stdout=result.stdout,
-        stderr=result.stderr,
+        stdout="".join(stdout for stdout, _ in shard_outputs),
+        stderr="".join(stderr for _, stderr in shard_outputs),
+        shard_count=len(shards),
+        reused_inputs=tuple(reused),
     )
 
 
-def hash_file(path: Path) -> str:
-    digest = hashlib.sha256()
-    with path.open("rb") as handle:
-        while True:
-            chunk = handle.read(1024 * 1024)
-            if not chunk:
-                break
-            digest.update(chunk)
-    return digest.hexdigest()
+def hash_file(path: Path, *, cache: FileDigestCache | None = None) -> str:
+    return hash_files([path], cache=cache)[Path(path)]
 
 
 def fastqc_output_prefix(input_path: str | Path) -> str:
@@ -276,6 +377,65 @@ def _run_subprocess(command: Sequence[str], *, cwd: Path) -> subprocess.Complete
         raise RuntimeError(f"FastQC command {command[0]!r} could not be started: {exc}") from exc
 
 
+def _executable_identity(executable: str, base_dir: Path) -> tuple[str, int, int, int] | None:
+    if os.sep in executable or (os.altsep and os.altsep in executable):
+        candidate: Path | None = base_dir / executable
+    else:
+        found = shutil.which(executable)
+        candidate = Path(found) if found else None
+    if candidate is None:
+        return None
+    try:
+        resolved = candidate.resolve()
+        stat_result = resolved.stat()
+    except OSError:
+        return None
+    return str(resolved), stat_result.st_ino, stat_result.st_size, stat_result.st_mtime_ns
+
+
+def _report_cache_key(sha256: str, *, tool_version: str, extra_args: Sequence[str]) -> str:
+    payload = json.dumps([sha256, tool_version, list(extra_args)], separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _report_filenames(prefix: str) -> tuple[str, str]:
+    return f"{prefix}_fastqc.zip", f"{prefix}_fastqc.html"
+
+
+def _restore_cached_reports(entry: Path, output_dir: Path, prefix: str) -> bool:
+    """Copy *prefix*'s cached reports into *output_dir*; False on a cache miss."""
+    filenames = _report_filenames(prefix)
+    if not all((entry / filename).is_file() for filename in filenames):
+        return False
+    try:
+        for filename in filenames:
+            _copy_atomically(entry / filename, output_dir / filename)
+    except OSError:
+        return False
+    return True
+
+
+def _store_cached_reports(entry: Path, output_dir: Path, prefix: str) -> None:
+    # The archive is stored before the HTML report, and a hit needs both, so
+    # an interrupted store is only ever a miss. A failed store never fails
+    # the run that produced the reports.
+    try:
+        for filename in _report_filenames(prefix):
+            _copy_atomically(output_dir / filename, entry / filename)
+    except OSError:
+        return
+
+
+def _copy_atomically(source: Path, destination: Path) -> None:
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    tmp = destination.with_name(f".{destination.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        shutil.copyfile(source, tmp)
+        os.replace(tmp, destination)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
 def _process_error_message(
     result: subprocess.CompletedProcess[str],
     *,
@@ -0,0 +1,259 @@
+"""Parallel sha256 hashing of workflow input files with a persistent cache.
+
+Workflow stages record the sha256 of every input they consume (FASTQs, count
+matrices, ...). Hashing multi-GB inputs one after the other made every rerun
+pay the full read cost again. ``hash_files`` fans the work out over a thread
+pool (hashlib releases the GIL while digesting large buffers) using large
+page-aligned ``readinto`` calls, or ``mmap`` when asked, and consults a
+:class:`FileDigestCache` persisted under ``storage/file_digests/`` first.
+
+Cache entries are keyed by ``(st_dev, st_ino)`` and are only reused while
+``st_size`` and ``st_mtime_ns`` still match, so a rewritten or touched file is
+hashed again while a renamed or re-linked one is not.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import json
+import logging
+import mmap
+import os
+import stat
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path, PurePosixPath
+from typing import Iterable, Iterator, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+FILE_DIGEST_CACHE_DIR = PurePosixPath("storage/file_digests")
+FILE_DIGEST_CACHE_FILENAME = "digests.json"
+FILE_DIGEST_CACHE_SCHEMA_VERSION = 1
+DEFAULT_FILE_DIGEST_CACHE_MAX_ENTRIES = 200_000
+# A multiple of every common page size; large enough that per-call overhead
+# is negligible next to the digest itself.
+HASH_READ_BYTES = 8 * 1024 * 1024
+
+_CacheIdentity = tuple[int, int]
+
+
+def _cache_key(stat_result: os.stat_result) -> str:
+    return f"{stat_result.st_dev}:{stat_result.st_ino}"
+
+
+def _cache_identity(stat_result: os.stat_result) -> _CacheIdentity:
+    return stat_result.st_size, stat_result.st_mtime_ns
+
+
+def hash_path(path: Path, *, use_mmap: bool = False) -> str:
+    """Return the sha256 hex digest of *path*.
+
+    Reads go into one reused page-aligned buffer; with ``use_mmap`` the file
+    is mapped and digested in slices of the same size instead.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb", buffering=0) as handle:
+        if use_mmap:
+            size = os.fstat(handle.fileno()).st_size
+            if size:
+                with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    view = memoryview(mapped)
+                    try:
+                        for start in range(0, size, HASH_READ_BYTES):
+                            digest.update(view[start : start + HASH_READ_BYTES])
+                    finally:
+                        view.release()
+            return digest.hexdigest()
+
+        buffer = mmap.mmap(-1, HASH_READ_BYTES)  # anonymous maps are page-aligned
+        view = memoryview(buffer)
+        try:
+            while read := handle.readinto(view):
+                digest.update(view[:read])
+        finally:
+            view.release()
+            buffer.close()
+    return digest.hexdigest()
+
+
+class FileDigestCache:
+    """Digests keyed by ``(device, inode)`` and validated by size and mtime.
+
+    Lookups are served from memory. New digests are written back by
+    :meth:`flush`, which merges them into the file on disk under an ``flock``
+    so concurrent workflow processes do not drop each other's entries.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        *,
+        max_entries: int = DEFAULT_FILE_DIGEST_CACHE_MAX_ENTRIES,
+    ) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.path = self.cache_dir / FILE_DIGEST_CACHE_FILENAME
+        self.max_entries = max(1, int(max_entries))
+        self._entries: OrderedDict[str, tuple[_CacheIdentity, str]] = OrderedDict()
+        self._pending: dict[str, tuple[_CacheIdentity, str]] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _read_disk(self) -> OrderedDict[str, tuple[_CacheIdentity, str]]:
+        entries: OrderedDict[str, tuple[_CacheIdentity, str]] = OrderedDict()
+        try:
+            payload = json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return entries
+        except (OSError, ValueError):
+            logger.warning("file_digest_cache_unreadable path=%s", self.path)
+            return entries
+        if not isinstance(payload, dict) or payload.get("schema_version") != FILE_DIGEST_CACHE_SCHEMA_VERSION:
+            return entries
+        raw_entries = payload.get("entries")
+        if not isinstance(raw_entries, dict):
+            return entries
+        for key, value in raw_entries.items():
+            if (
+                isinstance(value, list)
+                and len(value) == 3
+                and isinstance(value[0], int)
+                and isinstance(value[1], int)
+                and isinstance(value[2], str)
+            ):
+                entries[key] = ((value[0], value[1]), value[2])
+        return entries
+
+    def _load_locked(self) -> None:
+        entries = self._read_disk()
+        entries.update(self._pending)
+        self._entries = entries
+        self._loaded = True
+
+    def get(self, stat_result: os.stat_result) -> Optional[str]:
+        key = _cache_key(stat_result)
+        with self._lock:
+            if not self._loaded:
+                self._load_locked()
+            cached = self._entries.get(key)
+        if cached is None or cached[0] != _cache_identity(stat_result):
+            return None
+        return cached[1]
+
+    def put(self, stat_result: os.stat_result, digest: str) -> None:
+        key = _cache_key(stat_result)
+        entry = (_cache_identity(stat_result), digest)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._pending[key] = entry
+
+    @contextmanager
+    def _write_lock(self) -> Iterator[None]:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.cache_dir / ".lock", "a+") as handle:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+    def flush(self) -> None:
+        """Merge digests added since the last flush into the cache file."""
+        with self._lock:
+            if not self._pending:
+                return
+            with self._write_lock():
+                entries = self._read_disk()
+                for key, entry in self._pending.items():
+                    entries.pop(key, None)
+                    entries[key] = entry
+                while len(entries) > self.max_entries:
+                    entries.popitem(last=False)
+                payload = {
+                    "schema_version": FILE_DIGEST_CACHE_SCHEMA_VERSION,
+                    "entries": {
+                        key: [identity[0], identity[1], digest]
+                        for key, (identity, digest) in entries.items()
+                    },
+                }
+                tmp = self.path.with_name(self.path.name + ".tmp")
+                tmp.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+                tmp.replace(self.path)
+                self._entries = entries
+                self._pending.clear()
+                self._loaded = True
+
+
+_shared_caches: dict[Path, FileDigestCache] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_file_digest_cache(base_dir: Path) -> FileDigestCache:
+    """Return the process-wide cache rooted at ``base_dir/storage/file_digests``."""
+    root = (Path(base_dir) / FILE_DIGEST_CACHE_DIR).resolve()
+    with _shared_lock:
+        cache = _shared_caches.get(root)
+        if cache is None:
+            cache = FileDigestCache(root)
+            _shared_caches[root] = cache
+        return cache
+
+
+def default_hash_workers() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        return max(1, len(os.sched_getaffinity(0)))
+    return os.cpu_count() or 1
+
+
+def hash_files(
+    paths: Iterable[Path],
+    *,
+    cache: Optional[FileDigestCache] = None,
+    max_workers: Optional[int] = None,
+    use_mmap: bool = False,
+) -> dict[Path, str]:
+    """Return ``{path: sha256}`` for *paths*, hashing cache misses in parallel.
+
+    Paths that are not regular files raise ``ValueError``. New digests are
+    flushed to *cache* before returning.
+    """
+    unique_paths: list[Path] = list(dict.fromkeys(Path(path) for path in paths))
+    digests: dict[Path, str] = {}
+    misses: list[tuple[Path, os.stat_result]] = []
+    for path in unique_paths:
+        stat_result = path.stat()
+        if not stat.S_ISREG(stat_result.st_mode):
+            raise ValueError(f"Cannot hash {str(path)!r}: not a regular file.")
+        cached = cache.get(stat_result) if cache is not None else None
+        if cached is not None:
+            digests[path] = cached
+        else:
+            misses.append((path, stat_result))
+
+    if misses:
+        workers = min(len(misses), max_workers or default_hash_workers())
+        if workers <= 1:
+            computed: Sequence[str] = [hash_path(path, use_mmap=use_mmap) for path, _ in misses]
+        else:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="file-digest") as pool:
+                computed = list(pool.map(lambda item: hash_path(item[0], use_mmap=use_mmap), misses))
+        for (path, stat_result), digest in zip(misses, computed):
+            digests[path] = digest
+            # Only cache digests of files that did not change while being read.
+            if cache is not None and _cache_identity(path.stat()) == _cache_identity(stat_result):
+                cache.put(stat_result, digest)
+        if cache is not None:
+            try:
+                cache.flush()
+            except OSError:
+                logger.warning("file_digest_cache_flush_failed path=%s", cache.path, exc_info=True)
+
+    return {path: digests[path] for path in unique_paths}
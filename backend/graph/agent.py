@@ -6,6 +6,7 @@ so that live workspace edits are always reflected in the system prompt.
 import asyncio
 import hashlib
 import logging
+import time
 from contextlib import nullcontext
 from datetime import datetime, timezone
 from pathlib import Path
@@ -14,13 +15,23 @@ from typing import Any, AsyncGenerator, Optional
 from langchain.agents import create_agent
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 
-from config import get_agent_runtime_limit, get_max_sections_per_file
+from config import (
+    get_agent_runtime_limit,
+    get_embedding_cache_max_bytes,
+    get_max_sections_per_file,
+    get_memory_embed_batch_size,
+    get_memory_embed_max_workers,
+    get_session_index_flush_interval,
+    get_session_log_compact_min_bytes,
+    get_session_storage_format,
+)
 from evidence.integrity import (
     build_citation_mismatch_event,
     check_citation_integrity,
 )
 from runtime.model_factory import build_chat_model, build_fallback_chat_model, get_role_model_config
 from runtime.model_fallback import is_overload_or_timeout
+from runtime.turn_profile import active_turn_profile, turn_phase
 from audit.store import append_audit_event
 from .memory_indexer import MemoryIndexer
 from .prompt_builder import build_retrieved_memory_block, build_system_prompt_blocks
@@ -137,9 +148,18 @@ class AgentManager:
         from tools import get_runtime_tools
 
         self.tools = get_runtime_tools(base_dir)
-        self.session_manager = SessionManager(base_dir)
+        self.session_manager = SessionManager(
+            base_dir,
+            storage_format=get_session_storage_format(),
+            log_compact_min_bytes=get_session_log_compact_min_bytes(),
+            index_flush_interval=get_session_index_flush_interval(),
+        )
         self.memory_indexer = MemoryIndexer(
-            base_dir, max_sections_per_file=get_max_sections_per_file()
+            base_dir,
+            max_sections_per_file=get_max_sections_per_file(),
+            embed_batch_size=get_memory_embed_batch_size(),
+            embed_max_workers=get_memory_embed_max_workers(),
+            embedding_cache_max_bytes=get_embedding_cache_max_bytes(),
         )
 
     # ------------------------------------------------------------------ #
@@ -182,11 +202,12 @@ class AgentManager:
         fresh each turn and is intentionally excluded from the frozen prefix.
         """
         assert self.base_dir is not None, "AgentManager not initialised"
-        stable_prefix, volatile_suffix = build_system_prompt_blocks(
-            self.base_dir,
-            rag_mode,
-            skill_entries=skill_entries,
-        )
+        with turn_phase("system_prompt"):
+            stable_prefix, volatile_suffix = build_system_prompt_blocks(
+                self.base_dir,
+                rag_mode,
+                skill_entries=skill_entries,
+            )
         stable_prefix_with_harness = (
             f"{stable_prefix}\n\n{_HARNESS_GUIDANCE}" if stable_prefix else _HARNESS_GUIDANCE
         )
@@ -237,23 +258,29 @@ class AgentManager:
         query: str,
         session_id: str | None,
         max_payload_chars: int,
+        memory_state: dict | None = None,
     ) -> list[dict]:
         """Ask the executor LLM to pick relevant memory files for ``query``.
 
         Returns retrieval results in the same shape as ``MemoryIndexer.retrieve``
         so the caller can render them through ``build_retrieved_memory_block``.
         Returns ``[]`` on any failure so the caller falls back to keyword RAG.
+        ``memory_state`` is the caller's ``memory_state_snapshot()`` for this
+        turn; when given, the digest and probe index reuse it instead of
+        re-walking ``memory/``.
         """
         indexer = self.memory_indexer
         if indexer is None or self.llm is None:
             return []
-        corpus_digest = indexer.memory_corpus_digest()
+        if memory_state is None:
+            memory_state = indexer.memory_state_snapshot()
+        corpus_digest = indexer.memory_corpus_digest(memory_state)
         if session_id:
             cached = indexer.get_cached_probe_selection(session_id, corpus_digest)
             if cached:
                 return indexer.build_probe_results(cached)
         index_body, valid_sources = indexer.build_probe_index(
-            max_chars=max_payload_chars
+            max_chars=max_payload_chars, state_map=memory_state
         )
         if not valid_sources:
             return []
@@ -347,18 +374,25 @@ class AgentManager:
             results: list[dict] = []
             retrieval_source = "keyword"
             try:
-                if rag_mode_name == RAG_MODE_LLM_PROBE and (
-                    self.memory_indexer.memory_file_count()
-                    >= get_llm_probe_min_files()
-                ):
-                    results = await self._run_llm_probe_retrieval(
-                        query=message,
-                        session_id=session_id_for_probe,
-                        max_payload_chars=get_llm_probe_max_chars(),
+                with turn_phase("memory_retrieval"):
+                    memory_state = (
+                        self.memory_indexer.memory_state_snapshot()
+                        if rag_mode_name == RAG_MODE_LLM_PROBE
+                        else None
                     )
-                    retrieval_source = "llm_probe" if results else "llm_probe_fallback_keyword"
-                if not results:
-                    results = self.memory_indexer.retrieve(message, top_k=3)
+                    if memory_state is not None and (
+                        self.memory_indexer.memory_file_count(memory_state)
+                        >= get_llm_probe_min_files()
+                    ):
+                        results = await self._run_llm_probe_retrieval(
+                            query=message,
+                            session_id=session_id_for_probe,
+                            max_payload_chars=get_llm_probe_max_chars(),
+                            memory_state=memory_state,
+                        )
+                        retrieval_source = "llm_probe" if results else "llm_probe_fallback_keyword"
+                    if not results:
+                        results = self.memory_indexer.retrieve(message, top_k=3)
                 if results:
                     yield {
                         "type": "retrieval",
@@ -399,11 +433,12 @@ class AgentManager:
         )
 
         # ── Build agent (rebuilt every request) ───────────────────────
-        selected_skill_entries = select_skill_entries_for_query(
-            self.base_dir,
-            message,
-            history=history,
-        )
+        with turn_phase("skill_routing"):
+            selected_skill_entries = select_skill_entries_for_query(
+                self.base_dir,
+                message,
+                history=history,
+            )
         # Share the routed skill set with the in-flight policy context so
         # `tools_allowed` can be enforced at dispatch time.
         from tools.policy import get_tool_policy_context, set_active_skills_on_current_context
@@ -411,11 +446,12 @@ class AgentManager:
         set_active_skills_on_current_context(selected_skill_entries)
         policy_context = get_tool_policy_context()
         session_id = policy_context.session_id if policy_context is not None else None
-        agent = await self._build_agent(
-            rag_mode,
-            skill_entries=selected_skill_entries,
-            session_id=session_id,
-        )
+        with turn_phase("agent_build"):
+            agent = await self._build_agent(
+                rag_mode,
+                skill_entries=selected_skill_entries,
+                session_id=session_id,
+            )
 
         # ── Stream events ──────────────────────────────────────────────
         after_tool = False
@@ -423,6 +459,10 @@ class AgentManager:
         turn_started_at = datetime.now(timezone.utc)
         streamed_any_event = False
         used_fallback = False
+        # Model calls span several stream events, so they are timed by run id
+        # rather than with a ``turn_phase`` block.
+        profile = active_turn_profile()
+        model_call_started: dict[Any, int] = {}
 
         # Biology requests with retrieval and multi-step reasoning often need
         # far more graph turns than LangGraph's small default budget.
@@ -500,7 +540,20 @@ class AgentManager:
                                     streamed_any_event = True
                                     yield {"type": "token", "content": chunk.content}
 
+                            elif kind == "on_chat_model_start":
+                                if profile is not None:
+                                    model_call_started[event.get("run_id")] = time.perf_counter_ns()
+
                             elif kind == "on_chat_model_end":
+                                if profile is not None:
+                                    started_ns = model_call_started.pop(event.get("run_id"), None)
+                                    if started_ns is not None:
+                                        profile.record(
+                                            "model",
+                                            started_ns,
+                                            time.perf_counter_ns(),
+                                            model=str(event.get("name") or ""),
+                                        )
                                 # Schedule speculative execution for any
                                 # read-only, concurrency-safe tool calls the
                                 # model just emitted, then emit any provider
@@ -0,0 +1,334 @@
+"""
+On-disk, content-addressed embedding cache shared by the memory and knowledge
+indexes.
+
+Both `MemoryIndexer` (storage/memory_index/) and `SearchKnowledgeBaseTool`
+(storage/knowledge_index/) persist their own vector stores, but a rebuild of
+either used to re-embed every chunk. `DiskEmbeddingCache` implements the
+`EmbeddingCache` protocol from `graph.memory_embedding` so both go through the
+same store before calling the embedding backend:
+
+    storage/embedding_cache/<model slug>/
+        index.json          offset index: sha256 -> [row, last_used], plus dim
+        vectors-<gen>.f32   row-major float32 matrix, read through mmap
+
+Rows are only ever appended to the current generation file. When the number of
+rows exceeds the size budget, the least recently used entries are dropped by
+compacting the survivors into a new generation file, so a row is never
+overwritten in place and a reader holding an older index still maps the bytes
+it expects. Writers serialise on an ``fcntl.flock`` of ``.lock`` and reload
+the index if another process rewrote it.
+
+The cache is an accelerator, not a source of truth: unreadable or mismatched
+files are treated as misses and I/O errors are logged and swallowed.
+"""
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import json
+import logging
+import mmap
+import os
+import threading
+from array import array
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_CACHE_SCHEMA_VERSION = 1
+DEFAULT_EMBEDDING_CACHE_MAX_BYTES = 512 * 1024 * 1024
+_FLOAT_BYTES = array("f").itemsize
+# Compact down to this fraction of the budget so eviction is amortised over
+# many puts instead of rewriting the matrix on every insert past the limit.
+_COMPACT_TARGET_RATIO = 0.9
+
+
+def _model_slug(model_id: str) -> str:
+    return hashlib.sha256(model_id.encode("utf-8")).hexdigest()[:16]
+
+
+class _ModelStore:
+    """Index and mmap for one embedding model's directory."""
+
+    def __init__(self, directory: Path, model_id: str) -> None:
+        self.directory = directory
+        self.model_id = model_id
+        self.dim: Optional[int] = None
+        self.generation = 0
+        self.row_count = 0
+        self.clock = 0
+        # content hash -> [row, last_used]
+        self.rows: dict[str, list[int]] = {}
+        self.index_mtime_ns: Optional[int] = None
+        self._map: Optional[mmap.mmap] = None
+        self._map_key: tuple[int, int] = (-1, 0)
+
+    @property
+    def index_path(self) -> Path:
+        return self.directory / "index.json"
+
+    def vectors_path(self, generation: Optional[int] = None) -> Path:
+        gen = self.generation if generation is None else generation
+        return self.directory / f"vectors-{gen}.f32"
+
+    def refresh(self) -> None:
+        """Reload the offset index if it changed on disk since the last load."""
+        try:
+            mtime_ns = self.index_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            if self.index_mtime_ns is not None:
+                self._reset()
+            return
+        if mtime_ns == self.index_mtime_ns:
+            return
+        try:
+            payload = json.loads(self.index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            logger.warning("Discarding unreadable embedding cache index %s", self.index_path)
+            self._reset()
+            self.index_mtime_ns = mtime_ns
+            return
+        if (
+            not isinstance(payload, dict)
+            or payload.get("schema_version") != EMBEDDING_CACHE_SCHEMA_VERSION
+            or payload.get("model_id") != self.model_id
+        ):
+            self._reset()
+            self.index_mtime_ns = mtime_ns
+            return
+        rows = payload.get("rows")
+        self.dim = payload.get("dim") if isinstance(payload.get("dim"), int) else None
+        self.generation = int(payload.get("generation", 0))
+        self.row_count = int(payload.get("row_count", 0))
+        self.clock = max(self.clock, int(payload.get("clock", 0)))
+        self.rows = {
+            key: [int(entry[0]), int(entry[1])]
+            for key, entry in (rows or {}).items()
+            if isinstance(entry, list) and len(entry) == 2
+        }
+        self.index_mtime_ns = mtime_ns
+
+    def _reset(self) -> None:
+        self.dim = None
+        self.generation = 0
+        self.row_count = 0
+        self.rows = {}
+        self.index_mtime_ns = None
+        self.close()
+
+    def write_index(self) -> None:
+        payload = {
+            "schema_version": EMBEDDING_CACHE_SCHEMA_VERSION,
+            "model_id": self.model_id,
+            "dim": self.dim,
+            "generation": self.generation,
+            "row_count": self.row_count,
+            "clock": self.clock,
+            "rows": self.rows,
+        }
+        tmp = self.index_path.with_name(self.index_path.name + ".tmp")
+        tmp.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+        tmp.replace(self.index_path)
+        self.index_mtime_ns = self.index_path.stat().st_mtime_ns
+
+    def read_row(self, row: int) -> Optional[list[float]]:
+        assert self.dim is not None
+        row_bytes = self.dim * _FLOAT_BYTES
+        start = row * row_bytes
+        view = self._mapped(start + row_bytes)
+        if view is None:
+            return None
+        values = array("f")
+        values.frombytes(view[start : start + row_bytes])
+        return values.tolist()
+
+    def _mapped(self, needed: int) -> Optional[mmap.mmap]:
+        if self._map is not None and self._map_key[0] == self.generation and (
+            self._map_key[1] >= needed
+        ):
+            return self._map
+        self.close()
+        path = self.vectors_path()
+        try:
+            with open(path, "rb") as handle:
+                size = os.fstat(handle.fileno()).st_size
+                if size < needed:
+                    return None
+                self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        self._map_key = (self.generation, size)
+        return self._map
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+        self._map = None
+        self._map_key = (-1, 0)
+
+
+class DiskEmbeddingCache:
+    """Memory-mapped float32 embedding store keyed by (model id, sha256).
+
+    ``max_bytes`` bounds the vector matrix of each embedding model; entries
+    beyond it are evicted least-recently-used first. Recency from lookups is
+    kept in memory and persisted with the next write.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        *,
+        max_bytes: int = DEFAULT_EMBEDDING_CACHE_MAX_BYTES,
+    ) -> None:
+        self.root = Path(root)
+        self.max_bytes = max(_FLOAT_BYTES, int(max_bytes))
+        self._stores: dict[str, _ModelStore] = {}
+        self._lock = threading.Lock()
+
+    def _store(self, model_id: str) -> _ModelStore:
+        store = self._stores.get(model_id)
+        if store is None:
+            store = _ModelStore(self.root / _model_slug(model_id), model_id)
+            self._stores[model_id] = store
+        return store
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(store.rows) for store in self._stores.values())
+
+    def entry_count(self, model_id: str) -> int:
+        with self._lock:
+            store = self._store(model_id)
+            store.refresh()
+            return len(store.rows)
+
+    def get_many(self, model_id: str, keys: list[str]) -> dict[str, list[float]]:
+        found: dict[str, list[float]] = {}
+        with self._lock:
+            store = self._store(model_id)
+            try:
+                store.refresh()
+                if store.dim is None:
+                    return found
+                for key in keys:
+                    entry = store.rows.get(key)
+                    if entry is None:
+                        continue
+                    vector = store.read_row(entry[0])
+                    if vector is None:
+                        continue
+                    store.clock += 1
+                    entry[1] = store.clock
+                    found[key] = vector
+            except OSError:
+                logger.warning("Embedding cache read failed under %s", self.root, exc_info=True)
+        return found
+
+    def put_many(self, model_id: str, entries: dict[str, list[float]]) -> None:
+        if not entries:
+            return
+        with self._lock:
+            store = self._store(model_id)
+            try:
+                store.directory.mkdir(parents=True, exist_ok=True)
+                with open(store.directory / ".lock", "a+") as lock_handle:
+                    fcntl.flock(lock_handle.fileno(), fcntl.LOCK_EX)
+                    try:
+                        store.refresh()
+                        self._append_locked(store, entries)
+                    finally:
+                        fcntl.flock(lock_handle.fileno(), fcntl.LOCK_UN)
+            except OSError:
+                logger.warning("Embedding cache write failed under %s", self.root, exc_info=True)
+
+    def _append_locked(self, store: _ModelStore, entries: dict[str, list[float]]) -> None:
+        fresh: list[tuple[str, list[float]]] = []
+        for key, vector in entries.items():
+            if store.dim is None and vector:
+                store.dim = len(vector)
+            if len(vector) != store.dim:
+                continue
+            entry = store.rows.get(key)
+            if entry is not None:
+                store.clock += 1
+                entry[1] = store.clock
+                continue
+            fresh.append((key, vector))
+        if fresh:
+            payload = array("f")
+            for _, vector in fresh:
+                payload.extend(vector)
+            vectors_path = store.vectors_path()
+            with open(vectors_path, "ab") as handle:
+                # A crash after a partial append leaves trailing bytes beyond
+                # row_count; seek to the recorded end so they are overwritten.
+                handle.truncate(store.row_count * store.dim * _FLOAT_BYTES)
+                handle.write(payload.tobytes())
+            for offset, (key, _) in enumerate(fresh):
+                store.clock += 1
+                store.rows[key] = [store.row_count + offset, store.clock]
+            store.row_count += len(fresh)
+        max_rows = max(1, self.max_bytes // (store.dim * _FLOAT_BYTES)) if store.dim else 0
+        if max_rows and len(store.rows) > max_rows:
+            self._compact_locked(store, int(max_rows * _COMPACT_TARGET_RATIO) or 1)
+        store.write_index()
+
+    def _compact_locked(self, store: _ModelStore, keep: int) -> None:
+        """Rewrite the ``keep`` most recently used rows into a new generation."""
+        survivors = sorted(store.rows.items(), key=lambda item: item[1][1], reverse=True)[
+            :keep
+        ]
+        survivors.sort(key=lambda item: item[1][0])
+        old_generation = store.generation
+        new_generation = old_generation + 1
+        row_bytes = store.dim * _FLOAT_BYTES
+        new_rows: dict[str, list[int]] = {}
+        with open(store.vectors_path(old_generation), "rb") as source, open(
+            store.vectors_path(new_generation), "wb"
+        ) as target:
+            for new_row, (key, (row, last_used)) in enumerate(survivors):
+                source.seek(row * row_bytes)
+                target.write(source.read(row_bytes))
+                new_rows[key] = [new_row, last_used]
+        logger.info(
+            "Embedding cache evicted %d entries for %s",
+            len(store.rows) - len(new_rows),
+            store.model_id,
+        )
+        store.close()
+        store.rows = new_rows
+        store.row_count = len(new_rows)
+        store.generation = new_generation
+        store.write_index()
+        try:
+            store.vectors_path(old_generation).unlink()
+        except OSError:
+            pass
+
+
+_shared_caches: dict[Path, DiskEmbeddingCache] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_embedding_cache(
+    storage_dir: Path,
+    *,
+    max_bytes: int = DEFAULT_EMBEDDING_CACHE_MAX_BYTES,
+) -> DiskEmbeddingCache:
+    """Return the process-wide cache rooted at ``storage_dir/embedding_cache``.
+
+    Indexers pointed at the same storage directory share one instance, so the
+    memory and knowledge indexes read each other's entries without reloading
+    the offset index. The first caller's ``max_bytes`` wins.
+    """
+    root = (Path(storage_dir) / "embedding_cache").resolve()
+    with _shared_lock:
+        cache = _shared_caches.get(root)
+        if cache is None:
+            cache = DiskEmbeddingCache(root, max_bytes=max_bytes)
+            _shared_caches[root] = cache
+        return cache
+
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import Any, Mapping
+from typing import Any, Iterable, Mapping
 
 from artifacts.registry import ArtifactRegistry, ArtifactRegistryRecord
 from graph.session_manager import SessionManager
@@ -42,8 +42,8 @@ def list_session_files_workspace_items(
 ) -> list[dict[str, Any]]:
     resolved_base_dir = Path(base_dir).resolve()
     messages = session_manager.load_session(session_id)
-    registry_records = _registry_records_by_path(resolved_base_dir)
     observed = _collect_session_artifacts(messages)
+    registry_records = _registry_records_by_path(resolved_base_dir, observed)
 
     items: list[FilesWorkspaceItem] = []
     for artifact in observed.values():
@@ -80,14 +80,11 @@ def list_session_files_workspace_items(
     return [asdict(item) for item in ordered]
 
 
-def _registry_records_by_path(base_dir: Path) -> dict[str, ArtifactRegistryRecord]:
-    snapshot = ArtifactRegistry(base_dir).ensure_snapshot()
-    by_path: dict[str, ArtifactRegistryRecord] = {}
-    for record in snapshot.records:
-        existing = by_path.get(record.path)
-        if existing is None or (existing.status != "valid" and record.status == "valid"):
-            by_path[record.path] = record
-    return by_path
+def _registry_records_by_path(
+    base_dir: Path,
+    paths: Iterable[str],
+) -> dict[str, ArtifactRegistryRecord]:
+    return ArtifactRegistry(base_dir).records_for_paths(paths)
 
 
 def _collect_session_artifacts(
@@ -0,0 +1,209 @@
+"""
+Resident BM25 index for memory retrieval.
+
+`llama_index.retrievers.bm25.BM25Retriever.from_defaults(nodes=...)` tokenizes
+and scores the whole corpus every time it is constructed, which made each
+`MemoryIndexer.retrieve` call O(corpus). This module keeps the inverted index
+(postings, document frequencies and lengths) resident across turns and lets the
+indexer patch it per file as `_apply_incremental_update` adds, edits or drops
+memory files.
+
+Scoring mirrors the retriever it replaces: bm25s "lucene" defaults
+(k1=1.5, b=0.75, idf = log(1 + (N - df + 0.5) / (df + 0.5))), English stopwords,
+the Snowball English stemmer and the same token pattern, applied to
+`node.get_content(metadata_mode=MetadataMode.EMBED)`. Only documents with a
+positive score are returned; bm25s pads its top-k with arbitrary zero-score
+documents, which carry no signal and are intentionally dropped here.
+"""
+from __future__ import annotations
+
+import heapq
+import math
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable
+
+# Same defaults as `bm25s.BM25()` as constructed by `BM25Retriever`.
+_BM25_K1 = 1.5
+_BM25_B = 0.75
+_BM25_TOKEN_PATTERN = r"(?u)\b\w\w+\b"
+
+Tokenizer = Callable[[list[str]], list[list[str]]]
+
+
+@dataclass(frozen=True)
+class _BM25Document:
+    node: Any
+    ref_doc_id: str | None
+    term_freqs: dict[str, int]
+    length: int
+    sequence: int
+
+
+def default_bm25_tokenizer() -> Tokenizer:
+    """Return the bm25s tokenizer configured exactly like `BM25Retriever`.
+
+    Raises ``ImportError`` when bm25s / PyStemmer are not installed so the
+    caller can fall back to lexical-only retrieval.
+    """
+    import bm25s
+    import Stemmer
+
+    stemmer = Stemmer.Stemmer("english")
+
+    def _tokenize(texts: list[str]) -> list[list[str]]:
+        if not texts:
+            return []
+        return bm25s.tokenize(
+            texts,
+            stopwords="en",
+            stemmer=stemmer,
+            token_pattern=_BM25_TOKEN_PATTERN,
+            return_ids=False,
+            show_progress=False,
+        )
+
+    return _tokenize
+
+
+def _node_embed_text(node: Any) -> str:
+    try:
+        from llama_index.core.schema import MetadataMode
+    except Exception:
+        return str(getattr(node, "text", "") or "")
+    return node.get_content(metadata_mode=MetadataMode.EMBED)
+
+
+class MemoryBM25Index:
+    """In-memory BM25 inverted index over LlamaIndex nodes, patched in place.
+
+    Nodes are keyed by ``node_id`` and grouped by ``ref_doc_id`` (the memory
+    section source) so an edited or removed file can be dropped without
+    re-tokenizing the rest of the corpus. A query only walks the posting lists
+    of its own terms. All public methods are safe to call while the background
+    rebuild worker patches the index.
+    """
+
+    def __init__(
+        self,
+        *,
+        tokenizer: Tokenizer | None = None,
+        k1: float = _BM25_K1,
+        b: float = _BM25_B,
+    ) -> None:
+        self._tokenize = tokenizer or default_bm25_tokenizer()
+        self._k1 = k1
+        self._b = b
+        self._docs: dict[str, _BM25Document] = {}
+        # term -> {node_id: term frequency}
+        self._postings: dict[str, dict[str, int]] = {}
+        # ref_doc_id -> node_ids, so a section delete maps to its chunks.
+        self._ref_docs: dict[str, set[str]] = {}
+        self._total_length = 0
+        self._next_sequence = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def __contains__(self, node_id: object) -> bool:
+        return node_id in self._docs
+
+    def add_nodes(self, nodes: Iterable[Any]) -> int:
+        """Tokenize and index ``nodes``; re-adding a known node_id replaces it."""
+        node_list = list(nodes)
+        if not node_list:
+            return 0
+        token_lists = self._tokenize([_node_embed_text(node) for node in node_list])
+        with self._lock:
+            for node, tokens in zip(node_list, token_lists):
+                node_id = str(node.node_id)
+                if node_id in self._docs:
+                    self._remove_locked(node_id)
+                term_freqs: dict[str, int] = {}
+                for token in tokens:
+                    term_freqs[token] = term_freqs.get(token, 0) + 1
+                ref_doc_id = getattr(node, "ref_doc_id", None)
+                self._docs[node_id] = _BM25Document(
+                    node=node,
+                    ref_doc_id=ref_doc_id,
+                    term_freqs=term_freqs,
+                    length=len(tokens),
+                    sequence=self._next_sequence,
+                )
+                self._next_sequence += 1
+                self._total_length += len(tokens)
+                for term, freq in term_freqs.items():
+                    self._postings.setdefault(term, {})[node_id] = freq
+                if ref_doc_id is not None:
+                    self._ref_docs.setdefault(ref_doc_id, set()).add(node_id)
+        return len(node_list)
+
+    def remove_ref_docs(self, ref_doc_ids: Iterable[str]) -> int:
+        """Drop every node chunked from the given ref docs (memory section sources)."""
+        removed = 0
+        with self._lock:
+            for ref_doc_id in ref_doc_ids:
+                for node_id in list(self._ref_docs.get(ref_doc_id, ())):
+                    self._remove_locked(node_id)
+                    removed += 1
+        return removed
+
+    def _remove_locked(self, node_id: str) -> None:
+        document = self._docs.pop(node_id)
+        self._total_length -= document.length
+        for term in document.term_freqs:
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(node_id, None)
+            if not postings:
+                del self._postings[term]
+        if document.ref_doc_id is not None:
+            siblings = self._ref_docs.get(document.ref_doc_id)
+            if siblings is not None:
+                siblings.discard(node_id)
+                if not siblings:
+                    del self._ref_docs[document.ref_doc_id]
+
+    def score(self, query: str) -> dict[str, float]:
+        """Return ``{node_id: bm25_score}`` for every node matching a query term."""
+        query_tokens = self._tokenize([query])[0] if query else []
+        scores: dict[str, float] = {}
+        with self._lock:
+            doc_count = len(self._docs)
+            if not doc_count or not query_tokens:
+                return scores
+            avg_length = self._total_length / doc_count
+            k1 = self._k1
+            b = self._b
+            # Repeated query tokens contribute once per occurrence, as in bm25s.
+            for term in query_tokens:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                doc_freq = len(postings)
+                idf = math.log(1 + (doc_count - doc_freq + 0.5) / (doc_freq + 0.5))
+                for node_id, freq in postings.items():
+                    length = self._docs[node_id].length
+                    norm = k1 * ((1 - b) + b * length / avg_length) if avg_length else k1
+                    scores[node_id] = scores.get(node_id, 0.0) + idf * freq / (
+                        norm + freq
+                    )
+        return scores
+
+    def retrieve(self, query: str, top_k: int) -> list[tuple[Any, float]]:
+        """Return up to ``top_k`` ``(node, score)`` pairs with a positive score."""
+        if top_k <= 0:
+            return []
+        scores = self.score(query)
+        with self._lock:
+            ranked = heapq.nlargest(
+                top_k,
+                (
+                    (score, -self._docs[node_id].sequence, node_id)
+                    for node_id, score in scores.items()
+                    if score > 0 and node_id in self._docs
+                ),
+            )
+            return [(self._docs[node_id].node, score) for score, _, node_id in ranked]
@@ -0,0 +1,256 @@
+"""
+Batched, parallel embedding stage for memory index rebuilds.
+
+`VectorStoreIndex(nodes)` and `index.insert(doc)` embed through the model's
+own serial batching, one request at a time, and re-embed a section every time
+its file is touched. `EmbeddingPipeline` sits in front of both paths:
+
+* node texts are deduplicated and looked up in a cache keyed by
+  (embed model id, sha256 of the embedding input), so a section whose text is
+  unchanged — including one moved to another file — is never re-embedded;
+* cache misses are chunked into fixed-size batches and dispatched to a bounded
+  thread pool as soon as a batch fills, so embedding overlaps with the caller
+  still chunking the remaining documents;
+* each run reports `EmbeddingStats` (batches, cache hits, texts/s).
+
+The embedding input deliberately leaves the ``source`` metadata out: the file
+path is not semantic content, and including it would defeat content addressing
+for moved sections. Nodes are annotated with ``node.embedding`` so the vector
+index skips its own embedding pass.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Iterable, Optional, Protocol
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EMBED_BATCH_SIZE = 64
+DEFAULT_EMBED_MAX_WORKERS = 4
+# In-process cache cap; a memory corpus is thousands of sections, so this
+# keeps every live section resident with room for churn.
+_DEFAULT_CACHE_MAX_ENTRIES = 50_000
+
+
+class EmbeddingCache(Protocol):
+    def get_many(self, model_id: str, keys: list[str]) -> dict[str, list[float]]: ...
+
+    def put_many(self, model_id: str, entries: dict[str, list[float]]) -> None: ...
+
+
+class InMemoryEmbeddingCache:
+    """Thread-safe LRU map of (model id, content hash) -> embedding vector."""
+
+    def __init__(self, max_entries: int = _DEFAULT_CACHE_MAX_ENTRIES) -> None:
+        self._max_entries = max(1, int(max_entries))
+        self._entries: OrderedDict[tuple[str, str], list[float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_many(self, model_id: str, keys: list[str]) -> dict[str, list[float]]:
+        found: dict[str, list[float]] = {}
+        with self._lock:
+            for key in keys:
+                vector = self._entries.get((model_id, key))
+                if vector is not None:
+                    self._entries.move_to_end((model_id, key))
+                    found[key] = vector
+        return found
+
+    def put_many(self, model_id: str, entries: dict[str, list[float]]) -> None:
+        with self._lock:
+            for key, vector in entries.items():
+                self._entries[(model_id, key)] = vector
+                self._entries.move_to_end((model_id, key))
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+
+@dataclass
+class EmbeddingStats:
+    texts: int = 0
+    unique_texts: int = 0
+    cache_hits: int = 0
+    embedded: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Texts sent to the embedding backend per second of wall-clock time."""
+        if self.seconds <= 0:
+            return 0.0
+        return self.embedded / self.seconds
+
+
+def embedding_model_id(embed_model: Any) -> str:
+    """Stable identity for cache keys: class, model name and output dimensions."""
+    name = getattr(embed_model, "model_name", None) or getattr(
+        embed_model, "model", None
+    )
+    model_id = f"{type(embed_model).__name__}:{name or ''}"
+    dimensions = getattr(embed_model, "dimensions", None)
+    if dimensions:
+        model_id += f":{dimensions}"
+    return model_id
+
+
+def embedding_input(node: Any) -> str:
+    """Text sent to the embed model for ``node`` (EMBED metadata minus ``source``)."""
+    from llama_index.core.schema import MetadataMode
+
+    excluded = list(getattr(node, "excluded_embed_metadata_keys", None) or [])
+    if "source" in (node.metadata or {}) and "source" not in excluded:
+        node = node.model_copy(
+            update={"excluded_embed_metadata_keys": excluded + ["source"]}
+        )
+    return node.get_content(metadata_mode=MetadataMode.EMBED)
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingRun:
+    """One pipeline pass: feed nodes with `add`, then `finish` to wait and assign."""
+
+    def __init__(self, pipeline: "EmbeddingPipeline", embed_model: Any) -> None:
+        self._pipeline = pipeline
+        self._embed_model = embed_model
+        self._model_id = embedding_model_id(embed_model)
+        self._executor = ThreadPoolExecutor(
+            max_workers=pipeline.max_workers,
+            thread_name_prefix="memory-embed",
+        )
+        self._started = time.perf_counter()
+        self._nodes_by_key: dict[str, list[Any]] = {}
+        self._inputs: dict[str, str] = {}
+        self._pending: list[str] = []
+        self._futures: list[tuple[list[str], Future]] = []
+        self._vectors: dict[str, list[float]] = {}
+        self.stats = EmbeddingStats()
+
+    def __enter__(self) -> "EmbeddingRun":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        # Idempotent after `finish`; on an early exit it drops queued batches.
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def add(self, nodes: Iterable[Any]) -> None:
+        new_keys: list[str] = []
+        for node in nodes:
+            text = embedding_input(node)
+            key = content_hash(text)
+            self.stats.texts += 1
+            siblings = self._nodes_by_key.get(key)
+            if siblings is not None:
+                siblings.append(node)
+                continue
+            self._nodes_by_key[key] = [node]
+            self._inputs[key] = text
+            new_keys.append(key)
+        if not new_keys:
+            return
+        self.stats.unique_texts += len(new_keys)
+        cached = self._pipeline.cache.get_many(self._model_id, new_keys)
+        self._vectors.update(cached)
+        self.stats.cache_hits += len(cached)
+        self._pending.extend(key for key in new_keys if key not in cached)
+        batch_size = self._pipeline.batch_size
+        while len(self._pending) >= batch_size:
+            self._submit(self._pending[:batch_size])
+            self._pending = self._pending[batch_size:]
+
+    def _submit(self, keys: list[str]) -> None:
+        texts = [self._inputs[key] for key in keys]
+        future = self._executor.submit(self._embed_model.get_text_embedding_batch, texts)
+        self._futures.append((keys, future))
+        self.stats.batches += 1
+
+    def finish(self) -> EmbeddingStats:
+        """Flush the last partial batch, wait for every batch and set ``node.embedding``.
+
+        Re-raises the first batch failure after cancelling outstanding work so
+        the caller can fall back exactly as it did when the embed model failed
+        inside `VectorStoreIndex`.
+        """
+        try:
+            if self._pending:
+                self._submit(self._pending)
+                self._pending = []
+            fresh: dict[str, list[float]] = {}
+            for keys, future in self._futures:
+                vectors = future.result()
+                if len(vectors) != len(keys):
+                    raise ValueError(
+                        f"embed model returned {len(vectors)} vectors for {len(keys)} texts"
+                    )
+                for key, vector in zip(keys, vectors):
+                    fresh[key] = list(vector)
+        finally:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+        self._pipeline.cache.put_many(self._model_id, fresh)
+        self._vectors.update(fresh)
+        for key, nodes in self._nodes_by_key.items():
+            vector = self._vectors[key]
+            for node in nodes:
+                node.embedding = vector
+        self.stats.embedded = len(fresh)
+        self.stats.seconds = time.perf_counter() - self._started
+        self._pipeline.last_stats = self.stats
+        logger.info(
+            "Embedded %d memory chunks (%d unique, %d cached) in %d batches: "
+            "%.1f texts/s",
+            self.stats.texts,
+            self.stats.unique_texts,
+            self.stats.cache_hits,
+            self.stats.batches,
+            self.stats.throughput,
+        )
+        return self.stats
+
+
+class EmbeddingPipeline:
+    """Content-addressed, batched embedding front-end for the memory index.
+
+    ``embed_model`` defaults to LlamaIndex's ``Settings.embed_model`` resolved
+    at run time, so the model configured in ``app.lifespan`` is picked up.
+    """
+
+    def __init__(
+        self,
+        embed_model: Any = None,
+        *,
+        batch_size: int = DEFAULT_EMBED_BATCH_SIZE,
+        max_workers: int = DEFAULT_EMBED_MAX_WORKERS,
+        cache: Optional[EmbeddingCache] = None,
+    ) -> None:
+        self._embed_model = embed_model
+        self.batch_size = max(1, int(batch_size))
+        self.max_workers = max(1, int(max_workers))
+        self.cache: EmbeddingCache = cache if cache is not None else InMemoryEmbeddingCache()
+        self.last_stats: Optional[EmbeddingStats] = None
+
+    def resolve_embed_model(self) -> Any:
+        if self._embed_model is not None:
+            return self._embed_model
+        from llama_index.core import Settings
+
+        return Settings.embed_model
+
+    def start(self) -> EmbeddingRun:
+        return EmbeddingRun(self, self.resolve_embed_model())
+
+    def embed_nodes(self, nodes: Iterable[Any]) -> EmbeddingStats:
+        run = self.start()
+        run.add(nodes)
+        return run.finish()
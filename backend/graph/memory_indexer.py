@@ -7,6 +7,15 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Iterable, Optional
 
+from .memory_bm25 import MemoryBM25Index
+from .embedding_cache import DEFAULT_EMBEDDING_CACHE_MAX_BYTES, shared_embedding_cache
+from .memory_embedding import (
+    DEFAULT_EMBED_BATCH_SIZE,
+    DEFAULT_EMBED_MAX_WORKERS,
+    EmbeddingCache,
+    EmbeddingPipeline,
+)
+from .memory_lexical import MemoryLexicalIndex
 from .memory_types import (
     ParsedMemoryDocument,
     TypedMemoryMetadata,
@@ -114,6 +123,11 @@ class MemoryIndexer:
         base_dir: Path,
         *,
         max_sections_per_file: int | None = None,
+        embed_model: Any = None,
+        embed_batch_size: int = DEFAULT_EMBED_BATCH_SIZE,
+        embed_max_workers: int = DEFAULT_EMBED_MAX_WORKERS,
+        embedding_cache: Optional[EmbeddingCache] = None,
+        embedding_cache_max_bytes: int = DEFAULT_EMBEDDING_CACHE_MAX_BYTES,
     ) -> None:
         self.base_dir = base_dir
         self.memory_dir = base_dir / "memory"
@@ -121,6 +135,10 @@ class MemoryIndexer:
         self._storage_path = base_dir / "storage" / "memory_index"
         self._index: Optional[Any] = None
         self._nodes: list = []
+        # Resident BM25 index mirroring `_nodes`. Seeded on cold rebuilds and
+        # patched per file by `_apply_incremental_update`, so `retrieve()` no
+        # longer re-tokenizes the whole corpus on every query.
+        self._bm25: Optional[MemoryBM25Index] = None
         self._sections: list[_MemorySection] = []
         self._last_md5: str = ""
         # Upper bound on the sections produced per markdown file. Invalid or
@@ -137,6 +155,22 @@ class MemoryIndexer:
         self._max_sections_per_file = (
             cap if cap >= 1 else _DEFAULT_MAX_SECTIONS_PER_FILE
         )
+        # Batched, content-addressed embedding stage shared by the cold and
+        # incremental paths. `embed_model=None` defers to LlamaIndex's
+        # `Settings.embed_model` at embed time. Vectors are cached on disk in
+        # storage/embedding_cache/, which the knowledge index also reads.
+        if embedding_cache is None:
+            embedding_cache = shared_embedding_cache(
+                base_dir / "storage", max_bytes=embedding_cache_max_bytes
+            )
+        self._embedding = EmbeddingPipeline(
+            embed_model,
+            batch_size=embed_batch_size,
+            max_workers=embed_max_workers,
+            cache=embedding_cache,
+        )
+        self._explicit_embed_model = embed_model
+        self._splitter: Optional[Any] = None
         # Per-file state map: file source (relative posix path) ->
         # (mtime, size, md5). Drives the incremental diff in `_maybe_rebuild`
         # so we only re-embed the files that actually changed since last scan.
@@ -144,10 +178,17 @@ class MemoryIndexer:
         # file source -> sections currently indexed for that file. Lets us
         # locate the stale doc_ids to delete when a file is removed or edited.
         self._file_sections: dict[str, list[_MemorySection]] = {}
+        # Term -> posting-list index over `_file_sections` that backs
+        # `_lexical_results`; swapped per file alongside `_file_sections`.
+        self._lexical = MemoryLexicalIndex()
         # (session_id, corpus_digest) -> cached probe-selected source paths.
         # In-process only: invalidates on restart and whenever the memory
         # corpus digest changes (i.e. any file added/modified/removed).
         self._probe_cache: dict[tuple[str, str], list[str]] = {}
+        # file source -> (md5, rendered probe-index entry or None when the
+        # file has no body). Keyed by the same md5 as `_file_states`, so
+        # `build_probe_index` only re-reads files whose content changed.
+        self._probe_entries: dict[str, tuple[str, str | None]] = {}
         # Background rebuild coordination. `_schedule_lock` guards the
         # `_rebuild_in_flight` flag so concurrent `_maybe_rebuild` callers
         # coalesce to a single worker rather than queueing duplicates. The
@@ -569,22 +610,17 @@ class MemoryIndexer:
 
         scored_results: list[dict[str, Any]] = []
         phrase = " ".join(terms)
-        for section in self._sections:
-            if not self._section_matches_filters(
-                section.memory_kind,
-                section.memory_scope,
-                section.memory_tags,
-                kind_filter=kind_filter,
-                scope_filter=scope_filter,
-                tag_filter=tag_filter,
-            ):
-                continue
-            matched_terms = [term for term in terms if term in section.search_text]
-            if not matched_terms:
-                continue
-
-            score = len(matched_terms) / len(terms)
-            score += sum(section.search_text.count(term) for term in matched_terms) * 0.05
+        # Only sections on a query term's posting list (and inside the filter
+        # buckets) are visited; see memory_lexical.py for why the run-level
+        # postings reproduce the substring `in` / `str.count` semantics.
+        for section, term_counts in self._lexical.match(
+            terms,
+            kind_filter=kind_filter,
+            scope_filter=scope_filter,
+            tag_filter=tag_filter,
+        ):
+            score = len(term_counts) / len(terms)
+            score += sum(term_counts.values()) * 0.05
             if phrase and phrase in section.search_text:
                 score += 0.35
 
@@ -706,6 +742,68 @@ class MemoryIndexer:
         # `index.delete_ref_doc(section.source)` during incremental updates.
         return Document(text=section.text, metadata=metadata, doc_id=section.source)
 
+    def _split_nodes(self, docs: list[Any]) -> list:
+        if self._splitter is None:
+            from llama_index.core.node_parser import SentenceSplitter
+
+            self._splitter = SentenceSplitter(chunk_size=256, chunk_overlap=32)
+        return self._splitter.get_nodes_from_documents(docs)
+
+    def _split_and_embed(self, docs: list[Any]) -> tuple[list, bool]:
+        """Chunk ``docs`` into nodes, embedding each batch as soon as it fills.
+
+        Returns ``(nodes, embedded)``. ``embedded`` is False when the embed
+        model is unavailable or a batch failed; the nodes are still returned
+        so BM25 keeps serving.
+        """
+        try:
+            run = self._embedding.start()
+        except Exception:
+            return self._split_nodes(docs), False
+        nodes: list = []
+        with run:
+            for doc in docs:
+                doc_nodes = self._split_nodes([doc])
+                nodes.extend(doc_nodes)
+                run.add(doc_nodes)
+            try:
+                run.finish()
+            except Exception:
+                logger.warning("Memory embedding batch failed", exc_info=True)
+                return nodes, False
+        return nodes, True
+
+    def _index_kwargs(self) -> dict[str, Any]:
+        if self._explicit_embed_model is None:
+            return {}
+        return {"embed_model": self._explicit_embed_model}
+
+    def _reset_bm25_index(self) -> None:
+        """Re-seed the resident BM25 index from `_nodes` (cold paths only)."""
+        if not self._nodes:
+            self._bm25 = None
+            return
+        try:
+            bm25 = MemoryBM25Index()
+            bm25.add_nodes(self._nodes)
+        except Exception:
+            # bm25s / PyStemmer missing — lexical retrieval still answers.
+            self._bm25 = None
+            return
+        self._bm25 = bm25
+
+    def _patch_bm25_index(self, stale_sources: Iterable[str]) -> None:
+        """Drop chunks of stale sections and index any node not yet in BM25."""
+        bm25 = self._bm25
+        if bm25 is None:
+            return
+        try:
+            bm25.remove_ref_docs(stale_sources)
+            bm25.add_nodes(node for node in self._nodes if node.node_id not in bm25)
+        except Exception:
+            logger.exception("Incremental BM25 update failed; re-seeding")
+            self._reset_bm25_index()
+
     def _persist_state_map(self) -> None:
         try:
             self._storage_path.mkdir(parents=True, exist_ok=True)
@@ -734,8 +832,56 @@ class MemoryIndexer:
                 continue
         return loaded
 
-    def _maybe_rebuild(self) -> None:
-        current_map = self._memory_state_map()
+    def _render_probe_entry(self, document: ParsedMemoryDocument) -> str:
+        metadata = document.metadata
+        name = metadata.name.strip() if metadata and metadata.name else ""
+        description = (
+            metadata.description.strip()
+            if metadata and metadata.description
+            else ""
+        )
+        entry = f"- {document.source}"
+        if name:
+            entry += f" — {name}"
+        if description:
+            entry += f": {description}"
+        entry, _ = _truncate_entry(entry, _PROBE_INDEX_ENTRY_CHARS)
+        return entry
+
+    def _remember_probe_entries(
+        self,
+        documents: list[ParsedMemoryDocument],
+        current_map: dict[str, tuple[float, int, str]],
+    ) -> None:
+        """Seed the probe-entry cache from a full parse (cold rebuild)."""
+        entries: dict[str, tuple[str, str | None]] = {
+            source: (file_md5, None)
+            for source, (_, _, file_md5) in current_map.items()
+        }
+        for document in documents:
+            state = current_map.get(document.source)
+            if state is not None:
+                entries[document.source] = (
+                    state[2],
+                    self._render_probe_entry(document),
+                )
+        self._probe_entries = entries
+
+    def _load_probe_entry(self, source: str) -> str | None:
+        try:
+            content = (self.base_dir / source).read_text(encoding="utf-8")
+        except OSError:
+            return None
+        parsed = parse_memory_document(source, content)
+        if not parsed.body:
+            return None
+        return self._render_probe_entry(parsed)
+
+    def _maybe_rebuild(
+        self, current_map: dict[str, tuple[float, int, str]] | None = None
+    ) -> None:
+        if current_map is None:
+            current_map = self._memory_state_map()
         current_digest = self._digest_state_map(current_map)
         if current_digest == self._last_md5:
             return
@@ -828,10 +974,18 @@ class MemoryIndexer:
                     parsed.source,
                     "; ".join(parsed.errors),
                 )
+            file_md5 = current_map[source][2] if source in current_map else ""
             if not parsed.body:
                 new_sections_by_file[source] = []
+                self._probe_entries[source] = (file_md5, None)
                 continue
             new_sections_by_file[source] = self._split_document_sections(parsed)
+            self._probe_entries[source] = (
+                file_md5,
+                self._render_probe_entry(parsed),
+            )
+        for source in removed:
+            self._probe_entries.pop(source, None)
 
         # Collect sections to remove *before* we mutate _file_sections so we
         # can issue the matching `delete_ref_doc` calls against the index.
@@ -844,6 +998,8 @@ class MemoryIndexer:
         for source, sections in new_sections_by_file.items():
             if sections:
                 self._file_sections[source] = sections
+        for source in stale_files | fresh_files:
+            self._lexical.replace_file(source, self._file_sections.get(source, []))
 
         # Rebuild the flat section list in deterministic (file-sorted) order so
         # retrieval behavior matches what rebuild_index would produce.
@@ -876,9 +1032,16 @@ class MemoryIndexer:
                         pass
                 if new_sections_flat:
                     try:
-                        for section in new_sections_flat:
-                            doc = self._section_to_document(Document, section)
-                            self._index.insert(doc)
+                        docs = [
+                            self._section_to_document(Document, section)
+                            for section in new_sections_flat
+                        ]
+                        nodes, embedded = self._split_and_embed(docs)
+                        if not embedded:
+                            raise RuntimeError("memory embedding unavailable")
+                        self._index.insert_nodes(nodes)
+                        for doc in docs:
+                            self._index.docstore.set_document_hash(doc.id_, doc.hash)
                     except Exception:
                         # Embedding backend unavailable — drop the index so
                         # retrieval falls back to the lexical path and the
@@ -899,6 +1062,31 @@ class MemoryIndexer:
                         self._nodes = list(self._index.docstore.docs.values())
                     except Exception:
                         pass
+        elif self._nodes and (sections_to_delete or new_sections_flat):
+            # No vector index (embedding backend unavailable) but BM25 still
+            # serves from `_nodes`: chunk only the changed sections so keyword
+            # retrieval tracks edits instead of serving the cold-start corpus.
+            try:
+                from llama_index.core import Document
+            except Exception:
+                self._nodes = []
+            else:
+                stale_sources = {section.source for section in sections_to_delete}
+                self._nodes = [
+                    node
+                    for node in self._nodes
+                    if node.ref_doc_id not in stale_sources
+                ] + self._split_nodes(
+                    [
+                        self._section_to_document(Document, section)
+                        for section in new_sections_flat
+                    ]
+                )
+
+        if self._nodes:
+            self._patch_bm25_index(section.source for section in sections_to_delete)
+        else:
+            self._bm25 = None
 
         self._file_states = dict(current_map)
         self._last_md5 = current_digest
@@ -951,12 +1139,18 @@ class MemoryIndexer:
 
         self._log_malformed_documents()
 
-        sections = self._memory_sections()
+        documents = self._parsed_memory_documents()
+        self._remember_probe_entries(documents, current_map)
+        sections: list[_MemorySection] = []
+        for document in documents:
+            sections.extend(self._split_document_sections(document))
         self._sections = sections
         self._file_sections = self._group_sections_by_file(sections)
+        self._lexical = MemoryLexicalIndex.from_file_sections(self._file_sections)
         if not sections:
             self._index = None
             self._nodes = []
+            self._bm25 = None
             self._file_states = dict(current_map)
             self._last_md5 = current_digest
             return
@@ -966,6 +1160,7 @@ class MemoryIndexer:
         # embedding backend is unavailable.
         self._index = None
         self._nodes = []
+        self._bm25 = None
         self._file_states = dict(current_map)
         self._last_md5 = current_digest
 
@@ -976,7 +1171,6 @@ class MemoryIndexer:
                 VectorStoreIndex,
                 load_index_from_storage,
             )
-            from llama_index.core.node_parser import SentenceSplitter
         except Exception:
             return
 
@@ -987,8 +1181,11 @@ class MemoryIndexer:
                     storage_context = StorageContext.from_defaults(
                         persist_dir=str(self._storage_path)
                     )
-                    self._index = load_index_from_storage(storage_context)
+                    self._index = load_index_from_storage(
+                        storage_context, **self._index_kwargs()
+                    )
                     self._nodes = list(self._index.docstore.docs.values())
+                    self._reset_bm25_index()
                     # Prefer the persisted per-file state (it was written
                     # atomically with the index) so stat values round-trip
                     # exactly across restarts.
@@ -1000,14 +1197,20 @@ class MemoryIndexer:
                     pass  # Fall through to full rebuild
 
         docs = [self._section_to_document(Document, section) for section in sections]
-        splitter = SentenceSplitter(chunk_size=256, chunk_overlap=32)
-        self._nodes = splitter.get_nodes_from_documents(docs)
+        self._nodes, embedded = self._split_and_embed(docs)
+        self._reset_bm25_index()
 
-        if self._nodes:
+        if self._nodes and embedded:
             try:
                 self._storage_path.mkdir(parents=True, exist_ok=True)
                 storage_context = StorageContext.from_defaults()
-                self._index = VectorStoreIndex(self._nodes, storage_context=storage_context)
+                # Nodes already carry embeddings, so the index skips its own
+                # embedding pass and only writes the vector store.
+                self._index = VectorStoreIndex(
+                    self._nodes,
+                    storage_context=storage_context,
+                    **self._index_kwargs(),
+                )
                 self._index.storage_context.persist(persist_dir=str(self._storage_path))
                 md5_file.write_text(current_digest, encoding="utf-8")
                 self._persist_state_map()
@@ -1020,15 +1223,37 @@ class MemoryIndexer:
     # LLM-probe retrieval                                                  #
     # ------------------------------------------------------------------ #
 
-    def memory_file_count(self) -> int:
+    def memory_state_snapshot(self) -> dict[str, tuple[float, int, str]]:
+        """Scan ``memory/`` once and return ``{source: (mtime, size, md5)}``.
+
+        Callers that need the file count, corpus digest and probe index for
+        the same turn pass this snapshot to each of them instead of letting
+        every call re-walk the tree.
+        """
+        return self._memory_state_map()
+
+    def memory_file_count(
+        self, state_map: dict[str, tuple[float, int, str]] | None = None
+    ) -> int:
         """Return the number of eligible memory files currently on disk."""
+        if state_map is not None:
+            return len(state_map)
         return len(self._memory_files())
 
-    def memory_corpus_digest(self) -> str:
+    def memory_corpus_digest(
+        self, state_map: dict[str, tuple[float, int, str]] | None = None
+    ) -> str:
         """Return the stable digest used as the probe-cache invalidation key."""
+        if state_map is not None:
+            return self._digest_state_map(state_map)
         return self._memory_state_md5()
 
-    def build_probe_index(self, *, max_chars: int) -> tuple[str, list[str]]:
+    def build_probe_index(
+        self,
+        *,
+        max_chars: int,
+        state_map: dict[str, tuple[float, int, str]] | None = None,
+    ) -> tuple[str, list[str]]:
         """Render a compact ``<source> — <name>: <description>`` listing for the probe LLM.
 
         Returns ``(rendered_index, valid_sources)`` where ``valid_sources`` is
@@ -1036,33 +1261,33 @@ class MemoryIndexer:
         char budget). The caller sends ``rendered_index`` to the probe and
         constrains parsed results to ``valid_sources`` to reject hallucinated
         paths.
+
+        Entries are cached per file against the md5 in the state map, so only
+        files added or edited since the last call are read and parsed.
         """
-        self._maybe_rebuild()
-        documents = self._parsed_memory_documents()
+        current_map = state_map if state_map is not None else self._memory_state_map()
+        self._maybe_rebuild(current_map)
+        entries = self._probe_entries
         lines: list[str] = []
         valid_sources: list[str] = []
         total_chars = 0
-        for document in documents:
-            source = document.source
-            metadata = document.metadata
-            name = metadata.name.strip() if metadata and metadata.name else ""
-            description = (
-                metadata.description.strip()
-                if metadata and metadata.description
-                else ""
-            )
-            entry = f"- {source}"
-            if name:
-                entry += f" — {name}"
-            if description:
-                entry += f": {description}"
-            entry, _ = _truncate_entry(entry, _PROBE_INDEX_ENTRY_CHARS)
+        for source in sorted(current_map):
+            file_md5 = current_map[source][2]
+            cached = entries.get(source)
+            if cached is None or cached[0] != file_md5:
+                cached = (file_md5, self._load_probe_entry(source))
+                entries[source] = cached
+            entry = cached[1]
+            if entry is None:
+                continue
             # +1 for the newline separator we will join with below.
             if total_chars + len(entry) + 1 > max_chars and lines:
                 break
             lines.append(entry)
             valid_sources.append(source)
             total_chars += len(entry) + 1
+        for source in [s for s in list(entries) if s not in current_map]:
+            entries.pop(source, None)
         return "\n".join(lines), valid_sources
 
     def parse_probe_selection(
@@ -1315,16 +1540,14 @@ class MemoryIndexer:
             except Exception:
                 pass
 
-        # BM25 retrieval
-        if self._nodes:
+        # BM25 retrieval against the resident index (see memory_bm25.py).
+        bm25 = self._bm25
+        if bm25 is not None:
             try:
-                from llama_index.retrievers.bm25 import BM25Retriever
-
-                bm25 = BM25Retriever.from_defaults(nodes=self._nodes, similarity_top_k=top_k)
-                for node in bm25.retrieve(query):
+                for node, score in bm25.retrieve(query, top_k):
                     remember_result(
                         node.text,
-                        float(node.score or 0.0),
+                        float(score or 0.0),
                         str(node.metadata.get("source", "memory/MEMORY.md")),
                         **_node_kwargs(node.metadata),
                     )
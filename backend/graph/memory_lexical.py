@@ -0,0 +1,205 @@
+"""
+Token-level inverted index behind `MemoryIndexer._lexical_results`.
+
+The lexical fallback scores a section by whether each query term occurs as a
+substring of its `search_text` (`term in search_text`) and by how often
+(`search_text.count(term)`). Query terms are `[a-z0-9]+` runs, so an occurrence
+can never straddle a non-alphanumeric character: it always lies inside one
+maximal `[a-z0-9]+` run of `search_text`. Indexing those runs with their
+per-section frequencies therefore reproduces the substring semantics exactly:
+
+* a term matches a section iff it is a substring of one of the section's runs;
+* ``search_text.count(term) == sum(run.count(term) * freq(run))``.
+
+A query term is expanded once to the vocabulary runs that contain it (cached
+until the vocabulary changes) and scoring only visits the sections on those
+posting lists. Kind, scope and tag filters are answered from pre-built buckets
+instead of a per-section predicate.
+"""
+from __future__ import annotations
+
+import re
+import threading
+from typing import Any, Iterable
+
+# Case-sensitive on purpose: `search_text` may carry display labels with
+# upper-case letters, which a lower-case query term can never match.
+_RUN_RE = re.compile(r"[a-z0-9]+")
+
+
+class MemoryLexicalIndex:
+    """Posting lists (run -> {section source: frequency}) plus filter buckets.
+
+    Sections are registered per file so `_apply_incremental_update` can swap
+    one file's sections without touching the rest. Iteration order of matches
+    follows `MemoryIndexer._sections` (file-sorted, then in-file order) so tie
+    ordering is unchanged from the linear scan.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # file source -> section sources registered for that file
+        self._file_sources: dict[str, list[str]] = {}
+        # section source -> (section, sort key)
+        self._sections: dict[str, tuple[Any, tuple[str, int]]] = {}
+        # run -> {section source: occurrences of that run}
+        self._postings: dict[str, dict[str, int]] = {}
+        # section source -> runs it contributed (for removal)
+        self._section_runs: dict[str, tuple[str, ...]] = {}
+        self._kind_buckets: dict[str, set[str]] = {}
+        self._scope_buckets: dict[str, set[str]] = {}
+        self._tag_buckets: dict[str, set[str]] = {}
+        # query term -> vocabulary runs containing it; dropped on vocab change
+        self._expansions: dict[str, tuple[str, ...]] = {}
+
+    @classmethod
+    def from_file_sections(
+        cls, file_sections: dict[str, list[Any]]
+    ) -> "MemoryLexicalIndex":
+        index = cls()
+        for file_source, sections in file_sections.items():
+            index.replace_file(file_source, sections)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._sections)
+
+    def replace_file(self, file_source: str, sections: Iterable[Any]) -> None:
+        """Swap the sections indexed for ``file_source`` (empty drops the file)."""
+        section_list = list(sections)
+        with self._lock:
+            self._remove_file_locked(file_source)
+            if not section_list:
+                return
+            sources: list[str] = []
+            for position, section in enumerate(section_list):
+                self._add_section_locked(section, (file_source, position))
+                sources.append(section.source)
+            self._file_sources[file_source] = sources
+
+    def remove_file(self, file_source: str) -> None:
+        with self._lock:
+            self._remove_file_locked(file_source)
+
+    def _add_section_locked(self, section: Any, sort_key: tuple[str, int]) -> None:
+        source = section.source
+        if source in self._sections:
+            self._remove_section_locked(source)
+        self._sections[source] = (section, sort_key)
+        run_counts: dict[str, int] = {}
+        for run in _RUN_RE.findall(section.search_text):
+            run_counts[run] = run_counts.get(run, 0) + 1
+        vocab_grew = False
+        for run, count in run_counts.items():
+            postings = self._postings.get(run)
+            if postings is None:
+                postings = self._postings[run] = {}
+                vocab_grew = True
+            postings[source] = count
+        self._section_runs[source] = tuple(run_counts)
+        if vocab_grew:
+            self._expansions.clear()
+        if section.memory_kind:
+            self._kind_buckets.setdefault(section.memory_kind, set()).add(source)
+        if section.memory_scope:
+            self._scope_buckets.setdefault(section.memory_scope, set()).add(source)
+        for tag in {tag.lower() for tag in section.memory_tags or ()}:
+            self._tag_buckets.setdefault(tag, set()).add(source)
+
+    def _remove_file_locked(self, file_source: str) -> None:
+        for source in self._file_sources.pop(file_source, ()):
+            self._remove_section_locked(source)
+
+    def _remove_section_locked(self, source: str) -> None:
+        entry = self._sections.pop(source, None)
+        if entry is None:
+            return
+        section = entry[0]
+        vocab_shrank = False
+        for run in self._section_runs.pop(source, ()):
+            postings = self._postings.get(run)
+            if postings is None:
+                continue
+            postings.pop(source, None)
+            if not postings:
+                del self._postings[run]
+                vocab_shrank = True
+        if vocab_shrank:
+            self._expansions.clear()
+        _discard_from_bucket(self._kind_buckets, section.memory_kind, source)
+        _discard_from_bucket(self._scope_buckets, section.memory_scope, source)
+        for tag in {tag.lower() for tag in section.memory_tags or ()}:
+            _discard_from_bucket(self._tag_buckets, tag, source)
+
+    def _expand_locked(self, term: str) -> tuple[str, ...]:
+        expansion = self._expansions.get(term)
+        if expansion is None:
+            expansion = tuple(run for run in self._postings if term in run)
+            self._expansions[term] = expansion
+        return expansion
+
+    def _allowed_locked(
+        self,
+        kind_filter: set[str] | None,
+        scope_filter: set[str] | None,
+        tag_filter: set[str] | None,
+    ) -> set[str] | None:
+        allowed: set[str] | None = None
+        for buckets, wanted in (
+            (self._kind_buckets, kind_filter),
+            (self._scope_buckets, scope_filter),
+            (self._tag_buckets, tag_filter),
+        ):
+            if wanted is None:
+                continue
+            matching: set[str] = set()
+            for value in wanted:
+                matching |= buckets.get(value, set())
+            allowed = matching if allowed is None else allowed & matching
+            if not allowed:
+                return set()
+        return allowed
+
+    def match(
+        self,
+        terms: list[str],
+        *,
+        kind_filter: set[str] | None = None,
+        scope_filter: set[str] | None = None,
+        tag_filter: set[str] | None = None,
+    ) -> list[tuple[Any, dict[str, int]]]:
+        """Return ``(section, {term: search_text.count(term)})`` per matching section.
+
+        Only sections containing at least one term and passing every filter are
+        returned, in `MemoryIndexer._sections` order.
+        """
+        with self._lock:
+            allowed = self._allowed_locked(kind_filter, scope_filter, tag_filter)
+            if allowed is not None and not allowed:
+                return []
+            counts_by_source: dict[str, dict[str, int]] = {}
+            for term in terms:
+                for run in self._expand_locked(term):
+                    occurrences = run.count(term)
+                    for source, freq in self._postings[run].items():
+                        if allowed is not None and source not in allowed:
+                            continue
+                        term_counts = counts_by_source.setdefault(source, {})
+                        term_counts[term] = term_counts.get(term, 0) + occurrences * freq
+            matched = [
+                (self._sections[source], term_counts)
+                for source, term_counts in counts_by_source.items()
+            ]
+        matched.sort(key=lambda item: item[0][1])
+        return [(entry[0], term_counts) for entry, term_counts in matched]
+
+
+def _discard_from_bucket(buckets: dict[str, set[str]], key: str | None, source: str) -> None:
+    if not key:
+        return
+    members = buckets.get(key)
+    if members is None:
+        return
+    members.discard(source)
+    if not members:
+        del buckets[key]
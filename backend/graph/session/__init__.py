@@ -12,11 +12,12 @@ from graph.session.session_schema import (
     SessionCorruptError,
     _validate_session_id,
 )
-from graph.session.session_store import FrozenSessionPrefix
+from graph.session.session_store import FrozenSessionPrefix, SessionSnapshot
 
 __all__ = [
     "FrozenSessionPrefix",
     "SessionManager",
+    "SessionSnapshot",
     "SESSION_SCHEMA_VERSION",
     "SessionCorruptError",
     "_validate_session_id",
@@ -23,7 +23,7 @@ from graph.session.session_schema import (
     _ARCHIVE_ID_RE,
     _validate_session_id,
 )
-from graph.session.session_store import SessionStore
+from graph.session.session_store import SessionSnapshot, SessionStore
 from graph.session_summary import (
     append_compressed_summary,
     generate_structured_summary,
@@ -78,6 +78,7 @@ class SessionManager(SessionStore):
         *,
         phase: str | None = None,
         replace_compressed_context: bool = False,
+        snapshot: SessionSnapshot | None = None,
     ) -> tuple[int, int]:
         """
         Archive the first *n* messages and store *summary* in compressed_context.
@@ -95,6 +96,9 @@ class SessionManager(SessionStore):
         the sole entry, and the archive index is compacted to just this
         batch. The ``autocompact`` rung uses this so cheap-phase summary
         accumulation cannot grow the prompt without bound.
+
+        ``snapshot`` (from :meth:`read_snapshot`) supplies the session data
+        instead of a fresh read and is updated to the compressed state.
         """
         if phase is not None and phase not in COMPRESSION_PHASES:
             raise ValueError(
@@ -109,6 +113,7 @@ class SessionManager(SessionStore):
                 n,
                 phase=phase,
                 replace_compressed_context=replace_compressed_context,
+                snapshot=snapshot,
             )
 
     def _compress_history_locked(
@@ -119,8 +124,12 @@ class SessionManager(SessionStore):
         *,
         phase: str | None,
         replace_compressed_context: bool,
+        snapshot: SessionSnapshot | None = None,
     ) -> tuple[int, int]:
-        data = self._read(session_id)
+        if snapshot is not None:
+            data = self._writable_snapshot_data_locked(snapshot)
+        else:
+            data = self._read_locked(session_id)
         messages = _normalize_messages_for_storage(data.get("messages", []))
 
         archived = messages[:n]
@@ -170,6 +179,8 @@ class SessionManager(SessionStore):
         else:
             data["context_compression_phase"] = phase
         self._write(session_id, data)
+        if snapshot is not None:
+            self._rebind_snapshot_locked(snapshot, data)
 
         return len(archived), len(remaining)
 
@@ -180,8 +191,10 @@ class SessionManager(SessionStore):
             return value
         return None
 
-    def get_compressed_context(self, session_id: str) -> str:
-        return self._read(session_id).get("compressed_context", "")
+    def get_compressed_context(
+        self, session_id: str, *, snapshot: SessionSnapshot | None = None
+    ) -> str:
+        return self._data_for(session_id, snapshot).get("compressed_context", "")
 
     def get_compressed_summaries(self, session_id: str) -> list[dict]:
         summaries = parse_compressed_context(self.get_compressed_context(session_id))
@@ -277,7 +290,12 @@ class SessionManager(SessionStore):
         return continuity
 
     async def auto_compress_if_needed(
-        self, session_id: str, llm, threshold: int = 40
+        self,
+        session_id: str,
+        llm,
+        threshold: int = 40,
+        *,
+        snapshot: SessionSnapshot | None = None,
     ) -> bool:
         """
         If the session has >= *threshold* messages, compress the oldest 50%.
@@ -289,14 +307,20 @@ class SessionManager(SessionStore):
         the same session simultaneously (which would double-archive messages).
         """
         async with self.get_or_create_compress_lock(session_id):
-            return await self._do_compress_if_needed(session_id, llm, threshold)
+            return await self._do_compress_if_needed(
+                session_id, llm, threshold, snapshot=snapshot
+            )
 
     async def _do_compress_if_needed(
-        self, session_id: str, llm, threshold: int
+        self,
+        session_id: str,
+        llm,
+        threshold: int,
+        *,
+        snapshot: SessionSnapshot | None = None,
     ) -> bool:
         """Inner compress logic — must be called with the session lock held."""
-        data = self._read(session_id)
-        messages = self.load_session(session_id)
+        messages = self.load_session(session_id, snapshot=snapshot)
 
         if len(messages) < threshold:
             return False
@@ -309,5 +333,5 @@ class SessionManager(SessionStore):
         except Exception:
             return False  # non-fatal — skip compression this turn
 
-        self.compress_history(session_id, summary, n)
+        self.compress_history(session_id, summary, n, snapshot=snapshot)
         return True
@@ -9,19 +9,34 @@ by caching the displayable metadata.
 The file stays plain JSON (no database) so it remains inspectable and aligns
 with the repository's file-first convention. It self-heals on miss or
 corruption by scanning the directory once.
+
+Every update is a read-merge-write of the whole sidecar under an ``fcntl``
+lock on ``_index.lock``, so concurrent workers do not lose each other's
+entries. Because that costs O(total sessions) per write, ``SessionIndexWriter``
+lets a ``SessionStore`` buffer upserts and flush them in one merge per
+interval (and at turn end); listings overlay the buffer so they stay current
+in the writing process.
 """
 
 from __future__ import annotations
 
+import contextlib
+import fcntl
 import json
+import logging
 import os
+import threading
 import uuid
 from pathlib import Path
-from typing import Any, TypedDict
+from typing import Any, Iterator, Optional, TypedDict
 
+from graph.session.session_log import read_tail_state
 from graph.session.session_schema import _SESSION_ID_RE
 
+logger = logging.getLogger(__name__)
+
 SESSION_INDEX_FILENAME = "_index.json"
+SESSION_INDEX_LOCK_FILENAME = "_index.lock"
 SESSION_INDEX_SCHEMA_VERSION = "session_index.v1"
 
 
@@ -35,6 +50,21 @@ def _index_path(sessions_dir: Path) -> Path:
     return sessions_dir / SESSION_INDEX_FILENAME
 
 
+@contextlib.contextmanager
+def _index_locked(sessions_dir: Path) -> Iterator[None]:
+    """Serialise sidecar read-merge-write cycles across threads and processes."""
+    sessions_dir.mkdir(parents=True, exist_ok=True)
+    fd = os.open(sessions_dir / SESSION_INDEX_LOCK_FILENAME, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+    finally:
+        os.close(fd)
+
+
 def _scan_sessions_dir(sessions_dir: Path) -> dict[str, SessionIndexEntry]:
     """Rebuild the index by reading every session file in *sessions_dir*."""
     index: dict[str, SessionIndexEntry] = {}
@@ -68,11 +98,24 @@ def _scan_sessions_dir(sessions_dir: Path) -> dict[str, SessionIndexEntry]:
             message_count = len(messages) if isinstance(messages, list) else 0
         else:
             continue
-        index[session_id] = {
+        entry: SessionIndexEntry = {
             "title": title,
             "updated_at": updated_at,
             "message_count": message_count,
         }
+        if isinstance(raw, dict) and raw.get("message_log"):
+            # Log-format session: the snapshot lags behind the appended
+            # records, whose tail carries the live title and count.
+            tail_state = read_tail_state(path)
+            if tail_state:
+                entry.update(
+                    {
+                        key: tail_state[key]
+                        for key in ("title", "updated_at", "message_count")
+                        if key in tail_state
+                    }
+                )
+        index[session_id] = entry
     return index
 
 
@@ -207,9 +250,42 @@ def _load_index(sessions_dir: Path) -> dict[str, SessionIndexEntry]:
     return rebuilt
 
 
-def list_index_entries(sessions_dir: Path) -> list[dict[str, Any]]:
-    """Return session entries (sorted by updated_at desc) from the sidecar."""
+def _session_file_exists(sessions_dir: Path, session_id: str) -> bool:
+    return (sessions_dir / f"{session_id}.json").exists()
+
+
+def _merge_entries(
+    sessions_dir: Path,
+    index: dict[str, SessionIndexEntry],
+    entries: dict[str, SessionIndexEntry],
+) -> None:
+    """Apply buffered *entries* onto *index* in place.
+
+    An entry only replaces a newer one if it is at least as recent, so a
+    worker flushing late cannot roll back another worker's update, and
+    entries for sessions deleted in the meantime are dropped.
+    """
+    for session_id, entry in entries.items():
+        current = index.get(session_id)
+        if current is not None and current["updated_at"] > entry["updated_at"]:
+            continue
+        if current is None and not _session_file_exists(sessions_dir, session_id):
+            continue
+        index[session_id] = entry
+
+
+def list_index_entries(
+    sessions_dir: Path,
+    *,
+    overlay: Optional[dict[str, SessionIndexEntry]] = None,
+) -> list[dict[str, Any]]:
+    """Return session entries (sorted by updated_at desc) from the sidecar.
+
+    *overlay* holds not-yet-flushed entries from this process's writer.
+    """
     index = _load_index(sessions_dir)
+    if overlay:
+        _merge_entries(sessions_dir, index, overlay)
     rows = [
         {
             "id": session_id,
@@ -236,13 +312,14 @@ def upsert_session_entry(
     Idempotent: calling with the same session_id overwrites the previous
     entry rather than creating a duplicate.
     """
-    index = _load_index(sessions_dir)
-    index[session_id] = {
-        "title": title,
-        "updated_at": float(updated_at),
-        "message_count": int(message_count),
-    }
-    _write_index(sessions_dir, index)
+    with _index_locked(sessions_dir):
+        index = _load_index(sessions_dir)
+        index[session_id] = {
+            "title": title,
+            "updated_at": float(updated_at),
+            "message_count": int(message_count),
+        }
+        _write_index(sessions_dir, index)
 
 
 def remove_session_from_index(sessions_dir: Path, session_id: str) -> None:
@@ -250,14 +327,106 @@ def remove_session_from_index(sessions_dir: Path, session_id: str) -> None:
     path = _index_path(sessions_dir)
     if not path.exists():
         return
-    index = _load_index(sessions_dir)
-    if session_id in index:
-        index.pop(session_id)
-        _write_index(sessions_dir, index)
+    with _index_locked(sessions_dir):
+        index = _load_index(sessions_dir)
+        if session_id in index:
+            index.pop(session_id)
+            _write_index(sessions_dir, index)
+
+
+class SessionIndexWriter:
+    """Coalescing sidecar writer owned by one ``SessionStore``.
+
+    With ``flush_interval`` of 0 every upsert is written through immediately.
+    Otherwise upserts are buffered (the latest per session wins) and merged
+    into the sidecar by one locked read-merge-write at most every
+    ``flush_interval`` seconds, or when ``flush`` is called at turn end.
+    """
+
+    def __init__(self, sessions_dir: Path, *, flush_interval: float = 0.0) -> None:
+        self.sessions_dir = sessions_dir
+        self.flush_interval = max(0.0, float(flush_interval))
+        self._pending: dict[str, SessionIndexEntry] = {}
+        # Entries taken by an in-progress flush stay visible to listings
+        # until they are on disk.
+        self._flushing: dict[str, SessionIndexEntry] = {}
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+    def upsert(
+        self,
+        session_id: str,
+        *,
+        title: str,
+        updated_at: float,
+        message_count: int,
+    ) -> None:
+        if self.flush_interval <= 0:
+            upsert_session_entry(
+                self.sessions_dir,
+                session_id,
+                title=title,
+                updated_at=updated_at,
+                message_count=message_count,
+            )
+            return
+        entry: SessionIndexEntry = {
+            "title": title,
+            "updated_at": float(updated_at),
+            "message_count": int(message_count),
+        }
+        with self._lock:
+            self._pending[session_id] = entry
+            if self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def remove(self, session_id: str) -> None:
+        with self._lock:
+            self._pending.pop(session_id, None)
+        with self._flush_lock:
+            remove_session_from_index(self.sessions_dir, session_id)
+
+    def overlay(self) -> dict[str, SessionIndexEntry]:
+        """Buffered entries not yet on disk, newest last."""
+        with self._lock:
+            return {**self._flushing, **self._pending}
+
+    def flush(self) -> None:
+        """Merge every buffered entry into the sidecar now."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                timer, self._timer = self._timer, None
+                self._flushing = pending
+            if timer is not None:
+                timer.cancel()
+            if not pending:
+                return
+            try:
+                with _index_locked(self.sessions_dir):
+                    index = _load_index(self.sessions_dir)
+                    _merge_entries(self.sessions_dir, index, pending)
+                    _write_index(self.sessions_dir, index)
+            except OSError:
+                logger.warning(
+                    "session_index_flush_failed sessions_dir=%s",
+                    self.sessions_dir,
+                    exc_info=True,
+                )
+                with self._lock:
+                    # Keep anything newer that arrived during the failed flush.
+                    self._pending = {**pending, **self._pending}
+            finally:
+                with self._lock:
+                    self._flushing = {}
 
 
 def rebuild_index(sessions_dir: Path) -> dict[str, SessionIndexEntry]:
     """Force a full rescan and overwrite the sidecar. Exposed for tooling."""
-    rebuilt = _scan_sessions_dir(sessions_dir)
-    _write_index(sessions_dir, rebuilt)
+    with _index_locked(sessions_dir):
+        rebuilt = _scan_sessions_dir(sessions_dir)
+        _write_index(sessions_dir, rebuilt)
     return rebuilt
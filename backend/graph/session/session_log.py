@@ -0,0 +1,250 @@
+"""Append-only message log for the ``"log"`` session storage format.
+
+The default ``"json"`` format rewrites the whole ``{session_id}.json`` blob on
+every save, which is O(session size) per turn. In ``"log"`` format the JSON
+file becomes a *snapshot* (same v3 schema, plus a ``message_log`` marker) and
+every later mutation is one line appended to ``{session_id}.log.jsonl``::
+
+    {"snapshot": [ino, size, mtime_ns], "state": {...}}          <- header
+    {"ts": 1.0, "append": [...], "state": {...}}                  <- one per save
+    {"ts": 2.0, "merge": {"runtime_config": {...}}, "state": {...}}
+
+The snapshot/header/compaction scheme is the one in ``snapshot_journal``.
+Each record is written with a single ``os.write`` + ``fsync`` under the
+session's ``flock``, so a turn's messages land together. Readers take no lock:
+they replay only newline-terminated records, so a record that is still being
+written (or was torn by a crash) is invisible. Compaction, ``compress_history``,
+a v1/v2 migration and ``"json"``-format writers all rewrite the snapshot and so
+orphan the old log.
+
+Every record carries a ``state`` summary (title, message count) so the session
+index can be updated from the log tail without parsing the snapshot.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from pathlib import Path
+from typing import Any, Optional
+
+from snapshot_journal import (
+    DEFAULT_COMPACT_MIN_BYTES,
+    encode_record as _encode,
+    parse_record as _parse_line,
+    snapshot_fingerprint,
+    write_journal_header,
+)
+
+logger = logging.getLogger(__name__)
+
+SESSION_STORAGE_FORMATS: tuple[str, ...] = ("json", "log")
+MESSAGE_LOG_MARKER = "message_log"
+DEFAULT_LOG_COMPACT_MIN_BYTES = DEFAULT_COMPACT_MIN_BYTES
+_TAIL_CHUNK = 64 * 1024
+
+
+def log_path_for(snapshot_path: Path) -> Path:
+    return snapshot_path.with_name(snapshot_path.stem + ".log.jsonl")
+
+
+def log_state(data: dict[str, Any]) -> dict[str, Any]:
+    """Index-facing summary of a materialised session dict."""
+    messages = data.get("messages", [])
+    return {
+        "title": data.get("title", ""),
+        "message_count": len(messages) if isinstance(messages, list) else 0,
+    }
+
+
+def write_fresh_log(
+    log_path: Path, fingerprint: list[int], state: dict[str, Any]
+) -> None:
+    """Atomically replace the log with a header bound to *fingerprint*."""
+    write_journal_header(log_path, {"snapshot": fingerprint, "state": state})
+
+
+def read_log_records(
+    log_path: Path, fingerprint: list[int]
+) -> Optional[list[dict[str, Any]]]:
+    """Return the committed records bound to *fingerprint*.
+
+    ``None`` means there is no usable log for this snapshot (missing, or its
+    header names another snapshot), which callers treat as "nothing to
+    replay". A trailing line without ``\\n`` is an in-flight or torn append and
+    is skipped.
+    """
+    try:
+        payload = log_path.read_bytes()
+    except FileNotFoundError:
+        return None
+    lines = payload.split(b"\n")
+    # The element after the last newline is either b"" or an incomplete record.
+    complete = lines[:-1]
+    if not complete:
+        return None
+    header = _parse_line(complete[0])
+    if header is None or header.get("snapshot") != fingerprint:
+        return None
+    records: list[dict[str, Any]] = []
+    for line in complete[1:]:
+        record = _parse_line(line)
+        if record is None:
+            logger.warning("session_log_skipped_record path=%s", log_path)
+            continue
+        records.append(record)
+    return records
+
+
+def replay(data: dict[str, Any], records: list[dict[str, Any]]) -> dict[str, Any]:
+    """Apply log *records* to a snapshot dict in place and return it."""
+    messages = data.get("messages")
+    if not isinstance(messages, list):
+        messages = []
+        data["messages"] = messages
+    for record in records:
+        appended = record.get("append")
+        if isinstance(appended, list):
+            messages.extend(appended)
+        fields = record.get("set")
+        if isinstance(fields, dict):
+            data.update(fields)
+        merged = record.get("merge")
+        if isinstance(merged, dict):
+            for key, value in merged.items():
+                current = data.get(key)
+                if isinstance(current, dict) and isinstance(value, dict):
+                    current.update(value)
+                else:
+                    data[key] = value
+        for key in record.get("unset") or ():
+            data.pop(key, None)
+        ts = record.get("ts")
+        if isinstance(ts, (int, float)):
+            data["updated_at"] = float(ts)
+    return data
+
+
+class LogTail:
+    """Header and last committed record of an open log, for one append."""
+
+    def __init__(self, fd: int) -> None:
+        self.fd = fd
+        self.header: Optional[dict[str, Any]] = None
+        self.last: Optional[dict[str, Any]] = None
+        self.committed_size = 0
+
+    @classmethod
+    def open(cls, log_path: Path) -> Optional["LogTail"]:
+        try:
+            fd = os.open(log_path, os.O_RDWR)
+        except FileNotFoundError:
+            return None
+        tail = cls(fd)
+        try:
+            tail._load()
+        except BaseException:
+            os.close(fd)
+            raise
+        return tail
+
+    def _load(self) -> None:
+        size = os.fstat(self.fd).st_size
+        first = self._read_line_at(0, size)
+        if first is None:
+            return
+        self.header = _parse_line(first[0])
+        # Walk back from EOF to the last newline: everything after it is an
+        # uncommitted partial record that the next append must overwrite.
+        end = size
+        while end > 0:
+            start = max(0, end - _TAIL_CHUNK)
+            chunk = os.pread(self.fd, end - start, start)
+            newline = chunk.rfind(b"\n")
+            if newline >= 0:
+                self.committed_size = start + newline + 1
+                break
+            end = start
+        else:
+            self.committed_size = 0
+        self.last = self._last_record()
+
+    def _read_line_at(self, offset: int, size: int) -> Optional[tuple[bytes, int]]:
+        buffer = b""
+        position = offset
+        while position < size:
+            chunk = os.pread(self.fd, min(_TAIL_CHUNK, size - position), position)
+            if not chunk:
+                break
+            newline = chunk.find(b"\n")
+            if newline >= 0:
+                return buffer + chunk[:newline], position + newline + 1
+            buffer += chunk
+            position += len(chunk)
+        return None
+
+    def _last_record(self) -> Optional[dict[str, Any]]:
+        if self.committed_size == 0:
+            return None
+        end = self.committed_size - 1  # drop the terminating newline
+        buffer = b""
+        while end > 0:
+            start = max(0, end - _TAIL_CHUNK)
+            chunk = os.pread(self.fd, end - start, start)
+            newline = chunk.rfind(b"\n")
+            if newline >= 0:
+                return _parse_line(chunk[newline + 1 :] + buffer)
+            buffer = chunk + buffer
+            end = start
+        return _parse_line(buffer)
+
+    @property
+    def state(self) -> Optional[dict[str, Any]]:
+        for record in (self.last, self.header):
+            if record is not None and isinstance(record.get("state"), dict):
+                return record["state"]
+        return None
+
+    def append(self, record: dict[str, Any]) -> int:
+        """Durably append *record*; returns the new log size in bytes."""
+        os.ftruncate(self.fd, self.committed_size)
+        payload = _encode(record)
+        written = os.pwrite(self.fd, payload, self.committed_size)
+        if written != len(payload):
+            # Leave the short write as an uncommitted tail; the next append
+            # truncates it away.
+            raise OSError(f"short write to session log ({written}/{len(payload)} bytes)")
+        os.fsync(self.fd)
+        self.committed_size += written
+        self.last = record
+        return self.committed_size
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def read_tail_state(snapshot_path: Path) -> Optional[dict[str, Any]]:
+    """Return ``{"title", "message_count", "updated_at"}`` from a live log.
+
+    Used by the session index when it rebuilds from disk, so a log-format
+    session is listed with its current title and count rather than the
+    snapshot's.
+    """
+    try:
+        stat_result = snapshot_path.stat()
+    except OSError:
+        return None
+    tail = LogTail.open(log_path_for(snapshot_path))
+    if tail is None:
+        return None
+    try:
+        if tail.header is None or tail.header.get("snapshot") != snapshot_fingerprint(
+            stat_result
+        ):
+            return None
+        state = dict(tail.state or {})
+        if tail.last is not None and isinstance(tail.last.get("ts"), (int, float)):
+            state["updated_at"] = float(tail.last["ts"])
+        return state
+    finally:
+        tail.close()
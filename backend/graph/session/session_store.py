@@ -11,6 +11,11 @@ means a concurrent reader ever sees only the pre- or post-write blob, never
 a torn file. Pure readers don't take the lock — they rely on the atomic
 rename alone.
 
+In the ``"log"`` storage format (see ``graph.session.session_log``) appends
+skip the read-modify-write entirely: they add one record to the session's
+``.log.jsonl`` under the same lock, and the snapshot JSON is only rewritten
+when the log is compacted or the session is restructured.
+
 **NFS caveat.** Advisory ``flock`` is only reliable on a local filesystem.
 On NFSv3, ``flock`` is typically a no-op (silently ignored by the server)
 and on NFSv4 it only works when the server's ``lockd``/``nfsd`` stack is
@@ -22,6 +27,7 @@ prevent.
 """
 
 import asyncio
+import atexit
 import contextlib
 import fcntl
 import hashlib
@@ -31,7 +37,7 @@ import os
 import threading
 import time
 import uuid
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any, Iterator, Optional
 
@@ -39,14 +45,25 @@ from graph.session.session_archive_index import (
     _atomic_write_text,
     remove_session_from_index as _remove_session_from_archive_index,
 )
+from graph.session.session_log import (
+    DEFAULT_LOG_COMPACT_MIN_BYTES,
+    MESSAGE_LOG_MARKER,
+    SESSION_STORAGE_FORMATS,
+    LogTail,
+    log_path_for,
+    log_state,
+    read_log_records,
+    replay,
+    write_fresh_log,
+)
 from graph.session.session_index import (
+    SessionIndexWriter,
     list_index_entries as _list_session_index_entries,
-    remove_session_from_index as _remove_session_from_session_index,
-    upsert_session_entry as _upsert_session_index_entry,
 )
 from graph.session.session_normalizer import (
     _build_blocks_from_legacy_message,
     _normalize_blocks,
+    _normalize_message,
     _normalize_messages,
     _normalize_record_list,
 )
@@ -55,6 +72,7 @@ from graph.session.session_schema import (
     SessionCorruptError,
     _validate_session_id,
 )
+from snapshot_journal import journal_needs_compaction, snapshot_fingerprint
 
 logger = logging.getLogger(__name__)
 
@@ -77,6 +95,12 @@ _turn_locks: dict[str, asyncio.Lock] = {}
 # same session id.
 _lock_creation_mutex = threading.Lock()
 
+# A lock-free reader retries when a log-format snapshot is swapped by a
+# compaction between its stat and its read, then falls back to one read under
+# the session flock. Callers that already hold the flock use ``_read_locked``,
+# which cannot race a compaction and never re-takes the (non-reentrant) lock.
+_SNAPSHOT_READ_ATTEMPTS = 3
+
 
 @dataclass(frozen=True)
 class FrozenSessionPrefix:
@@ -94,6 +118,28 @@ class FrozenSessionPrefix:
     prefix_fingerprint: str
 
 
+@dataclass
+class SessionSnapshot:
+    """One turn's parsed view of a session, read once and written back once.
+
+    ``SessionStore.read_snapshot`` parses the session a single time; the turn
+    runtime then threads the snapshot through compaction, prompt history and
+    the ``TurnLedger`` instead of letting each step re-read the file. Every
+    use re-checks ``version`` (snapshot stat plus log size) against disk, so a
+    write from another worker is picked up with one extra read rather than
+    clobbered.
+
+    ``pending`` holds top-level merges (the runtime-config stamp) that are
+    already applied to ``data`` but only reach disk with the next write, or
+    with ``SessionStore.flush_snapshot`` when a turn fails before writing.
+    """
+
+    session_id: str
+    data: dict
+    version: Optional[tuple] = None
+    pending: dict[str, dict] = field(default_factory=dict)
+
+
 # Per-session frozen prefix cache. Sub-agent contracts read this to reuse the
 # byte-identical leading prompt and maximise prompt-cache hits.
 _frozen_prefixes: dict[str, FrozenSessionPrefix] = {}
@@ -134,13 +180,54 @@ def _fingerprint_prefix(stable_prefix: str, tool_names: tuple[str, ...]) -> str:
     return hasher.hexdigest()
 
 
+def _merge_token_counts(target: dict, appended: dict) -> None:
+    """Fold *appended*'s content tokens into a merged assistant message.
+
+    The sum ignores the joining blank line, which is within the estimate's
+    tolerance. Counts from different tokenizer backends are dropped so the
+    reader recounts the merged text instead.
+    """
+    counts = target.get("token_counts")
+    extra = appended.get("token_counts")
+    if (
+        isinstance(counts, dict)
+        and isinstance(extra, dict)
+        and counts.get("backend") == extra.get("backend")
+        and isinstance(counts.get("content"), int)
+        and isinstance(extra.get("content"), int)
+    ):
+        target["token_counts"] = {**counts, "content": counts["content"] + extra["content"]}
+    else:
+        target.pop("token_counts", None)
+
+
 class SessionStore:
-    def __init__(self, base_dir: Path) -> None:
+    def __init__(
+        self,
+        base_dir: Path,
+        *,
+        storage_format: str = "json",
+        log_compact_min_bytes: int = DEFAULT_LOG_COMPACT_MIN_BYTES,
+        index_flush_interval: float = 0.0,
+    ) -> None:
+        if storage_format not in SESSION_STORAGE_FORMATS:
+            raise ValueError(f"Unknown session storage format: {storage_format!r}")
+        # Format used for new writes. Reads accept either format per session,
+        # so flipping the setting migrates sessions lazily on their next save.
+        self.storage_format = storage_format
+        self.log_compact_min_bytes = max(0, int(log_compact_min_bytes))
         self.sessions_dir = base_dir / "sessions"
         self.archive_dir = self.sessions_dir / "archive"
         self.quarantine_dir = self.sessions_dir / "_quarantine"
         self.sessions_dir.mkdir(parents=True, exist_ok=True)
         self.archive_dir.mkdir(parents=True, exist_ok=True)
+        # ``index_flush_interval`` > 0 buffers ``_index.json`` updates and
+        # merges them in batches; 0 keeps the sidecar write-through.
+        self._index_writer = SessionIndexWriter(
+            self.sessions_dir, flush_interval=index_flush_interval
+        )
+        if self._index_writer.flush_interval > 0:
+            atexit.register(self._index_writer.flush)
 
     # ------------------------------------------------------------------ #
     # Internal helpers                                                     #
@@ -203,35 +290,63 @@ class SessionStore:
         return quarantined
 
     def _read(self, session_id: str, *, raise_on_corrupt: bool = False) -> dict:
+        """Read *session_id* without holding its lock; see ``_read_locked``."""
+        return self._read_session(session_id, raise_on_corrupt=raise_on_corrupt, lock_held=False)
+
+    def _read_locked(self, session_id: str, *, raise_on_corrupt: bool = False) -> dict:
+        """Read *session_id*; the caller holds its lock."""
+        return self._read_session(session_id, raise_on_corrupt=raise_on_corrupt, lock_held=True)
+
+    def _read_session(self, session_id: str, *, raise_on_corrupt: bool, lock_held: bool) -> dict:
         path = self._path(session_id)
         if not path.exists():
             return self._empty(session_id)
 
-        try:
-            raw = json.loads(path.read_text(encoding="utf-8"))
-        except (json.JSONDecodeError, UnicodeDecodeError) as exc:
-            quarantined = self._quarantine_corrupt_file(path, session_id)
-            if raise_on_corrupt:
-                raise SessionCorruptError(
-                    session_id, str(quarantined), original_error=exc
-                ) from exc
-            # Default: behave like the pre-quarantine code path and return an
-            # empty session so internal call sites (turn runtime, files
-            # workspace summary, token stats, compaction) do not start raising
-            # generic 500s when a single session file is corrupt. The bytes
-            # were preserved in ``_quarantine`` and the API endpoints that
-            # want a typed 422 opt in via ``raise_on_corrupt=True``.
-            return self._empty(session_id)
-        except OSError as exc:
-            # Transient read failure (permissions, EBUSY, etc.) — surface as
-            # an empty session rather than destroying the file.
-            logger.warning(
-                "session_read_fallback session_id=%s path=%s error=%s",
-                session_id,
-                path,
-                exc,
-            )
-            return self._empty(session_id)
+        for attempt in range(_SNAPSHOT_READ_ATTEMPTS + 1):
+            # Compactions swap the snapshot under the session flock. A caller
+            # holding it reads once; otherwise, once the lock-free attempts
+            # are used up, the last read takes the lock and cannot race them.
+            take_lock = not lock_held and attempt == _SNAPSHOT_READ_ATTEMPTS
+            locked = lock_held or take_lock
+            with self._locked(session_id) if take_lock else contextlib.nullcontext():
+                try:
+                    before = path.stat()
+                    raw = json.loads(path.read_text(encoding="utf-8"))
+                except (json.JSONDecodeError, UnicodeDecodeError) as exc:
+                    quarantined = self._quarantine_corrupt_file(path, session_id)
+                    if raise_on_corrupt:
+                        raise SessionCorruptError(
+                            session_id, str(quarantined), original_error=exc
+                        ) from exc
+                    # Default: behave like the pre-quarantine code path and return an
+                    # empty session so internal call sites (turn runtime, files
+                    # workspace summary, token stats, compaction) do not start raising
+                    # generic 500s when a single session file is corrupt. The bytes
+                    # were preserved in ``_quarantine`` and the API endpoints that
+                    # want a typed 422 opt in via ``raise_on_corrupt=True``.
+                    return self._empty(session_id)
+                except OSError as exc:
+                    # Transient read failure (permissions, EBUSY, etc.) — surface as
+                    # an empty session rather than destroying the file.
+                    logger.warning(
+                        "session_read_fallback session_id=%s path=%s error=%s",
+                        session_id,
+                        path,
+                        exc,
+                    )
+                    return self._empty(session_id)
+
+                if not (isinstance(raw, dict) and MESSAGE_LOG_MARKER in raw):
+                    break
+                fingerprint = snapshot_fingerprint(before)
+                try:
+                    unchanged = snapshot_fingerprint(path.stat()) == fingerprint
+                except OSError:
+                    unchanged = False
+                if not unchanged and not locked:
+                    continue
+                replay(raw, read_log_records(log_path_for(path), fingerprint) or [])
+                break
 
         # v1 migration: plain list → v2 dict
         if isinstance(raw, list):
@@ -248,16 +363,27 @@ class SessionStore:
         return raw
 
     def _write(self, session_id: str, data: dict) -> None:
+        """Rewrite the full session blob (and, in log format, reset the log)."""
         data.setdefault("schema_version", SESSION_SCHEMA_VERSION)
         data["updated_at"] = time.time()
         self._stamp_deterministic_mode(data)
-        _atomic_write_text(
-            self._path(session_id),
-            json.dumps(data, ensure_ascii=False, indent=2),
-        )
+        log_format = self.storage_format == "log"
+        if log_format:
+            data[MESSAGE_LOG_MARKER] = {"format": "jsonl"}
+        else:
+            data.pop(MESSAGE_LOG_MARKER, None)
+        path = self._path(session_id)
+        _atomic_write_text(path, json.dumps(data, ensure_ascii=False, indent=2))
+        # The snapshot swap above is the commit point: any previous log is
+        # bound to the old snapshot's fingerprint and is ignored from here on.
+        log_path = log_path_for(path)
+        if log_format:
+            write_fresh_log(log_path, snapshot_fingerprint(path.stat()), log_state(data))
+        else:
+            with contextlib.suppress(FileNotFoundError):
+                log_path.unlink()
         messages = data.get("messages", [])
-        _upsert_session_index_entry(
-            self.sessions_dir,
+        self._index_writer.upsert(
             session_id,
             title=data.get("title", session_id),
             updated_at=data.get("updated_at", 0.0),
@@ -275,6 +401,163 @@ class SessionStore:
         else:
             data["deterministic"] = {"seed": seed}
 
+    def _append_to_log(
+        self, session_id: str, change: dict[str, Any]
+    ) -> Optional[dict[str, Any]]:
+        """Append one change record to a log-format session; caller holds the lock.
+
+        Returns the appended record, or None when the session has no live log
+        (missing file, a ``"json"``-format snapshot, or a log left behind by an
+        interrupted compaction); the caller then falls back to a full
+        read-modify-write, which in ``"log"`` format also (re)creates the log.
+        """
+        path = self._path(session_id)
+        try:
+            snapshot_stat = path.stat()
+        except FileNotFoundError:
+            return None
+        tail = LogTail.open(log_path_for(path))
+        if tail is None:
+            return None
+        try:
+            header = tail.header
+            if header is None or header.get("snapshot") != snapshot_fingerprint(
+                snapshot_stat
+            ):
+                return None
+            record: dict[str, Any] = {"ts": time.time(), **change}
+            stamped: dict[str, Any] = {}
+            self._stamp_deterministic_mode(stamped)
+            if stamped:
+                record.setdefault("set", {}).update(stamped)
+            else:
+                record["unset"] = ["deterministic"]
+            state = dict(tail.state or {})
+            state["message_count"] = int(state.get("message_count", 0)) + len(
+                change.get("append", ())
+            )
+            record["state"] = state
+            log_size = tail.append(record)
+        finally:
+            tail.close()
+        self._index_writer.upsert(
+            session_id,
+            title=state.get("title", session_id),
+            updated_at=record["ts"],
+            message_count=state["message_count"],
+        )
+        if journal_needs_compaction(log_size, snapshot_stat.st_size, min_bytes=self.log_compact_min_bytes):
+            self._write(session_id, self._read_locked(session_id))
+        return record
+
+    def _append_messages_locked(
+        self,
+        session_id: str,
+        records: list[dict],
+        snapshot: Optional[SessionSnapshot] = None,
+    ) -> None:
+        if snapshot is None:
+            if self.storage_format == "log" and self._append_to_log(
+                session_id, {"append": records}
+            ):
+                return
+            data = self._read_locked(session_id)
+            data["messages"].extend(records)
+            self._write(session_id, data)
+            return
+
+        data = self._writable_snapshot_data_locked(snapshot)
+        if self.storage_format == "log":
+            change: dict[str, Any] = {"append": records}
+            if snapshot.pending:
+                change["merge"] = {key: dict(value) for key, value in snapshot.pending.items()}
+            record = self._append_to_log(session_id, change)
+            if record is not None:
+                self._rebind_snapshot_locked(snapshot, replay(data, [record]))
+                return
+        data["messages"].extend(records)
+        self._write(session_id, data)
+        self._rebind_snapshot_locked(snapshot, data)
+
+    # ------------------------------------------------------------------ #
+    # Per-turn snapshots                                                   #
+    # ------------------------------------------------------------------ #
+
+    def _disk_version(self, session_id: str) -> Optional[tuple]:
+        """Cheap change token for a session: snapshot stat plus log size."""
+        path = self._path(session_id)
+        try:
+            snapshot_stat = path.stat()
+        except FileNotFoundError:
+            return None
+        try:
+            log_size = log_path_for(path).stat().st_size
+        except FileNotFoundError:
+            log_size = -1
+        return (*snapshot_fingerprint(snapshot_stat), log_size)
+
+    def read_snapshot(
+        self, session_id: str, *, raise_on_corrupt: bool = False
+    ) -> SessionSnapshot:
+        """Parse *session_id* once for a turn; see :class:`SessionSnapshot`.
+
+        The read happens under the session lock so ``version`` describes
+        exactly the bytes that were parsed.
+        """
+        with self._locked(session_id):
+            data = self._read_locked(session_id, raise_on_corrupt=raise_on_corrupt)
+            return SessionSnapshot(session_id, data, self._disk_version(session_id))
+
+    def _reload_snapshot_locked(self, snapshot: SessionSnapshot) -> None:
+        data = self._read_locked(snapshot.session_id)
+        for key, value in snapshot.pending.items():
+            current = data.get(key)
+            data[key] = {**current, **value} if isinstance(current, dict) else dict(value)
+        snapshot.data = data
+        snapshot.version = self._disk_version(snapshot.session_id)
+
+    def _snapshot_data(self, snapshot: SessionSnapshot) -> dict:
+        """Return *snapshot*'s data, re-reading first if the session changed on disk."""
+        if self._disk_version(snapshot.session_id) != snapshot.version:
+            with self._locked(snapshot.session_id):
+                self._reload_snapshot_locked(snapshot)
+        return snapshot.data
+
+    def _writable_snapshot_data_locked(self, snapshot: SessionSnapshot) -> dict:
+        """Copy of the snapshot's data to modify and write; caller holds the lock.
+
+        The copy keeps a failed write from leaving half-applied changes in the
+        snapshot, which a retried save would then duplicate.
+        """
+        if self._disk_version(snapshot.session_id) != snapshot.version:
+            self._reload_snapshot_locked(snapshot)
+        data = dict(snapshot.data)
+        messages = data.get("messages")
+        data["messages"] = list(messages) if isinstance(messages, list) else []
+        return data
+
+    def _rebind_snapshot_locked(self, snapshot: SessionSnapshot, data: dict) -> None:
+        """Point *snapshot* at what was just written for it."""
+        snapshot.data = data
+        snapshot.version = self._disk_version(snapshot.session_id)
+        snapshot.pending.clear()
+
+    def flush_snapshot(self, snapshot: Optional[SessionSnapshot]) -> None:
+        """Write *snapshot*'s deferred merges now rather than with the next write."""
+        if snapshot is None or not snapshot.pending:
+            return
+        session_id = snapshot.session_id
+        with self._locked(session_id):
+            data = self._writable_snapshot_data_locked(snapshot)
+            if self.storage_format == "log":
+                change = {"merge": {key: dict(value) for key, value in snapshot.pending.items()}}
+                record = self._append_to_log(session_id, change)
+                if record is not None:
+                    self._rebind_snapshot_locked(snapshot, replay(data, [record]))
+                    return
+            self._write(session_id, data)
+            self._rebind_snapshot_locked(snapshot, data)
+
     @staticmethod
     def _empty(session_id: str) -> dict:
         now = time.time()
@@ -329,10 +612,31 @@ class SessionStore:
         # missing, malformed, or has an unknown schema version. Corrupt
         # session files are quarantined on demand by ``_read`` when any caller
         # attempts to load them directly.
-        return _list_session_index_entries(self.sessions_dir)
+        return _list_session_index_entries(
+            self.sessions_dir, overlay=self._index_writer.overlay()
+        )
+
+    def flush_session_index(self) -> None:
+        """Write buffered ``_index.json`` updates now (called at turn end)."""
+        self._index_writer.flush()
+
+    def _data_for(
+        self,
+        session_id: str,
+        snapshot: Optional[SessionSnapshot],
+        *,
+        raise_on_corrupt: bool = False,
+    ) -> dict:
+        if snapshot is not None:
+            return self._snapshot_data(snapshot)
+        return self._read(session_id, raise_on_corrupt=raise_on_corrupt)
 
     def load_session(
-        self, session_id: str, *, raise_on_corrupt: bool = False
+        self,
+        session_id: str,
+        *,
+        raise_on_corrupt: bool = False,
+        snapshot: Optional[SessionSnapshot] = None,
     ) -> list[dict]:
         """Return the raw message array (for display / history endpoint).
 
@@ -340,11 +644,8 @@ class SessionStore:
         underlying file fails to decode; the default mirrors prior behavior
         and returns an empty session so internal callers do not regress.
         """
-        return _normalize_messages(
-            self._read(session_id, raise_on_corrupt=raise_on_corrupt).get(
-                "messages", []
-            )
-        )
+        data = self._data_for(session_id, snapshot, raise_on_corrupt=raise_on_corrupt)
+        return _normalize_messages(data.get("messages", []))
 
     def load_request_messages(self, session_id: str, request_id: str) -> list[dict]:
         """Return normalized messages associated with a persisted request id."""
@@ -358,7 +659,11 @@ class SessionStore:
         ]
 
     def load_session_for_agent(
-        self, session_id: str, *, raise_on_corrupt: bool = False
+        self,
+        session_id: str,
+        *,
+        raise_on_corrupt: bool = False,
+        snapshot: Optional[SessionSnapshot] = None,
     ) -> list[dict]:
         """
         Return history optimised for the LLM:
@@ -370,8 +675,8 @@ class SessionStore:
         underlying file fails to decode; the default mirrors prior behavior
         and returns an empty history so the turn runtime keeps working.
         """
-        data = self._read(session_id, raise_on_corrupt=raise_on_corrupt)
-        messages = self.load_session(session_id)
+        data = self._data_for(session_id, snapshot, raise_on_corrupt=raise_on_corrupt)
+        messages = _normalize_messages(data.get("messages", []))
         compressed = data.get("compressed_context", "")
 
         # Merge consecutive assistant messages
@@ -379,6 +684,7 @@ class SessionStore:
         for msg in messages:
             if merged and merged[-1]["role"] == "assistant" and msg["role"] == "assistant":
                 merged[-1]["content"] += "\n\n" + msg["content"]
+                _merge_token_counts(merged[-1], msg)
             else:
                 merged.append(dict(msg))
 
@@ -419,6 +725,12 @@ class SessionStore:
         if normalized_blocks:
             msg["blocks"] = normalized_blocks
 
+        # Count once at persist time so compaction and the token inspector
+        # sum stored counts instead of re-tokenizing history every turn.
+        # Deferred import: api.tokens pulls in FastAPI.
+        from api.tokens import message_token_counts
+
+        msg["token_counts"] = message_token_counts(_normalize_message(msg))
         return msg
 
     def save_message(
@@ -444,16 +756,19 @@ class SessionStore:
         # worker racing on the same session_id cannot read a stale message
         # list and clobber our append when it writes back.
         with self._locked(session_id):
-            data = self._read(session_id)
-            data["messages"].append(msg)
-            self._write(session_id, data)
+            self._append_messages_locked(session_id, [msg])
 
     def save_messages_batch(
         self,
         session_id: str,
         messages: list[dict[str, Any]],
+        *,
+        snapshot: Optional[SessionSnapshot] = None,
     ) -> None:
-        """Append multiple messages in one read-modify-write under one flock.
+        """Append multiple messages in one atomic write under one flock.
+
+        In ``"json"`` format that is one read-modify-write of the session
+        blob; in ``"log"`` format it is a single appended log record.
 
         Each dict in *messages* accepts the same keys as :meth:`save_message`
         (``role``, ``content``, plus optional ``tool_calls``/``retrievals``/
@@ -461,6 +776,10 @@ class SessionStore:
         user message and every assistant segment land in a single atomic
         write — cross-process readers observe either the pre-turn or the
         post-turn message list, never a partially-committed turn.
+
+        With a *snapshot* from :meth:`read_snapshot` the batch is applied to
+        the already-parsed session (plus any deferred runtime-config stamp)
+        instead of re-reading it, unless the file changed in the meantime.
         """
         if not messages:
             return
@@ -481,15 +800,13 @@ class SessionStore:
             )
 
         with self._locked(session_id):
-            data = self._read(session_id)
-            data["messages"].extend(records)
-            self._write(session_id, data)
+            self._append_messages_locked(session_id, records, snapshot)
 
     def rename_session(
         self, session_id: str, title: str, *, raise_on_corrupt: bool = False
     ) -> None:
         with self._locked(session_id):
-            data = self._read(session_id, raise_on_corrupt=raise_on_corrupt)
+            data = self._read_locked(session_id, raise_on_corrupt=raise_on_corrupt)
             data["title"] = title
             self._write(session_id, data)
 
@@ -514,13 +831,15 @@ class SessionStore:
         with self._locked(session_id):
             if path.exists():
                 path.unlink()
+            with contextlib.suppress(FileNotFoundError):
+                log_path_for(path).unlink()
             for archive_path in self.archive_dir.glob(f"{session_id}_*.json"):
                 try:
                     archive_path.unlink()
                 except FileNotFoundError:
                     continue
         _remove_session_from_archive_index(self.archive_dir, session_id)
-        _remove_session_from_session_index(self.sessions_dir, session_id)
+        self._index_writer.remove(session_id)
         # Best-effort cleanup of the on-disk lock file — failure is fine
         # (a concurrent worker may still hold it open).
         with contextlib.suppress(FileNotFoundError):
@@ -623,6 +942,7 @@ class SessionStore:
         session_id: str,
         *,
         loaded_at: float,
+        snapshot: Optional[SessionSnapshot] = None,
     ) -> None:
         """Record when the runtime config was frozen for the current turn.
 
@@ -630,14 +950,35 @@ class SessionStore:
         key on the session JSON. Later inspection tools can use it to prove
         that a turn's behavior was bound to the config that was live at
         turn entry — not a mid-turn mutation.
+
+        With a *snapshot* the stamp is applied in memory and reaches disk
+        with the turn's next write (compaction or the ledger's message batch),
+        so stamping costs no I/O of its own; a turn that fails before writing
+        calls :meth:`flush_snapshot` instead.
         """
+        if snapshot is not None:
+            data = self._snapshot_data(snapshot)
+            if snapshot.version is None:
+                return
+            stamp = {"_loaded_at": float(loaded_at)}
+            snapshot.pending.setdefault("runtime_config", {}).update(stamp)
+            current = data.get("runtime_config")
+            data["runtime_config"] = (
+                {**current, **stamp} if isinstance(current, dict) else dict(stamp)
+            )
+            return
         path = self._path(session_id)
         if not path.exists():
             # Nothing to stamp if the session file has not been materialized
             # yet; the first save_message call will create it.
             return
         with self._locked(session_id):
-            data = self._read(session_id)
+            if self.storage_format == "log" and self._append_to_log(
+                session_id,
+                {"merge": {"runtime_config": {"_loaded_at": float(loaded_at)}}},
+            ):
+                return
+            data = self._read_locked(session_id)
             runtime_config = data.get("runtime_config")
             if not isinstance(runtime_config, dict):
                 runtime_config = {}
@@ -30,6 +30,7 @@ from __future__ import annotations
 from typing import Any
 
 from config import get_max_tokens_per_turn
+from graph.session import SessionSnapshot
 from graph.session_summary import (
     build_deterministic_summary,
     generate_structured_summary,
@@ -77,13 +78,14 @@ def estimate_history_tokens(history: list[dict]) -> int:
 
     Counts message content plus any attached tool-call ``input``/``output``
     strings so the estimate tracks what the executor will actually pay for.
+    Messages persisted with ``token_counts`` are summed without tokenizing.
     """
+    from api.tokens import cached_message_tokens
+
     total = 0
     for message in history:
-        total += _count_tokens(message.get("content"))
-        for call in message.get("tool_calls") or []:
-            total += _count_tokens(call.get("input"))
-            total += _count_tokens(call.get("output"))
+        content_tokens, tool_io_tokens = cached_message_tokens(message)
+        total += content_tokens + tool_io_tokens
     return total
 
 
@@ -156,6 +158,7 @@ async def maybe_compact_turn_boundary(
     *,
     budget_ratio: float | None = None,
     phase_thresholds: dict[str, float] | None = None,
+    snapshot: SessionSnapshot | None = None,
 ) -> dict[str, Any] | None:
     """Run one compaction pass if the session is near its per-turn budget.
 
@@ -172,6 +175,9 @@ async def maybe_compact_turn_boundary(
     still delays *all* compaction until 95% of budget; passing ``0.50``
     brings every rung down by the same factor (0.50/0.85 ≈ 0.59). Prefer
     ``phase_thresholds`` for per-rung tuning.
+
+    ``snapshot`` is the turn's ``SessionSnapshot``; when given, every session
+    read and the compression write go through it instead of the file.
     """
     budget = get_max_tokens_per_turn()
     if budget <= 0:
@@ -189,7 +195,7 @@ async def maybe_compact_turn_boundary(
     if phase_thresholds:
         thresholds.update(phase_thresholds)
 
-    history = session_manager.load_session_for_agent(session_id)
+    history = session_manager.load_session_for_agent(session_id, snapshot=snapshot)
     current_tokens = estimate_history_tokens(history)
     ratio = current_tokens / budget if budget > 0 else 0.0
 
@@ -202,7 +208,7 @@ async def maybe_compact_turn_boundary(
         return None
 
     async with session_manager.get_or_create_compress_lock(session_id):
-        raw_messages = session_manager.load_session(session_id)
+        raw_messages = session_manager.load_session(session_id, snapshot=snapshot)
         phase = _select_phase(ratio, len(raw_messages), thresholds)
         if phase is None:
             return None
@@ -229,7 +235,9 @@ async def maybe_compact_turn_boundary(
         replace_compressed_context = False
         if phase == "autocompact":
             prior_compressed = (
-                session_manager.get_compressed_context(session_id).strip()
+                session_manager.get_compressed_context(
+                    session_id, snapshot=snapshot
+                ).strip()
             )
             if prior_compressed:
                 summary_input = [
@@ -254,6 +262,7 @@ async def maybe_compact_turn_boundary(
             n,
             phase=phase,
             replace_compressed_context=replace_compressed_context,
+            snapshot=snapshot,
         )
 
     summary_tokens = _count_tokens(summary)
@@ -8,10 +8,15 @@ silently.
 """
 from __future__ import annotations
 
+import json
+import types
+from json.encoder import encode_basestring
 from pathlib import Path
-from typing import Annotated, Any, Literal, Optional, Union
+from typing import Annotated, Any, Callable, Literal, Optional, Union, get_args, get_origin
 
+from annotated_types import Ge
 from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
+from pydantic_core import PydanticUndefined
 
 RUNTIME_EVENT_SCHEMA_VERSION: int = 2
 
@@ -241,6 +246,20 @@ class WarningRuntimeEvent(_RuntimeEventBase):
     review_path: Optional[str] = None
 
 
+class TurnProfileRuntimeEvent(_RuntimeEventBase):
+    """Phase timings for the turn, emitted just before ``done`` when profiling is on.
+
+    Each ``phases`` entry carries ``name``, ``span_id``, ``parent_id`` (0 for
+    top-level phases), ``start_ms`` relative to the turn start and
+    ``duration_ms``; accumulated phases add ``count`` and tool spans add
+    ``attributes``. Transport-only — not persisted in session JSON.
+    """
+
+    type: Literal["turn_profile"] = "turn_profile"
+    total_ms: float = Field(ge=0)
+    phases: list[dict[str, Any]] = Field(default_factory=list)
+
+
 class DoneRuntimeEvent(_RuntimeEventBase):
     type: Literal["done"] = "done"
     content: str
@@ -329,6 +348,7 @@ RuntimeEvent = Annotated[
         NewResponseRuntimeEvent,
         CompactionRuntimeEvent,
         WarningRuntimeEvent,
+        TurnProfileRuntimeEvent,
         DoneRuntimeEvent,
         ErrorRuntimeEvent,
         WorkflowStepStartedRuntimeEvent,
@@ -352,6 +372,7 @@ RUNTIME_EVENT_TYPES: tuple[str, ...] = (
     "new_response",
     "compaction_event",
     "warning",
+    "turn_profile",
     "done",
     "error",
     "workflow_step_started",
@@ -373,6 +394,138 @@ def dump_runtime_event(payload: dict[str, Any]) -> dict[str, Any]:
     return _RUNTIME_EVENT_ADAPTER.dump_python(event, mode="json", exclude_none=True)
 
 
+def encode_runtime_event_sse(payload: dict[str, Any], *, trusted: bool = False) -> str:
+    """Return ``payload`` as one SSE frame, ``data: <json>\\n\\n``.
+
+    The JSON is exactly ``json.dumps(dump_runtime_event(payload), ensure_ascii=False)``.
+    ``trusted`` payloads are the ones the engine builds itself: they skip the
+    union validation and go through a serializer compiled per event type,
+    which only type-checks each field against its model. Anything those checks
+    do not vouch for, and every untrusted payload, is validated in full, so an
+    invalid event raises the same ``ValidationError`` either way.
+    """
+    if trusted:
+        encoder = _SSE_ENCODERS.get(payload.get("type"))  # type: ignore[arg-type]
+        if encoder is not None:
+            body = encoder(payload)
+            if body is not None:
+                return f"data: {body}\n\n"
+    return f"data: {json.dumps(dump_runtime_event(payload), ensure_ascii=False)}\n\n"
+
+
+_FieldEncoder = Callable[[Any], Optional[str]]
+
+
+def _json_scalar_encoder(annotation: Any, metadata: list[Any]) -> Optional[_FieldEncoder]:
+    """Encoder for a field whose validated value is always the input itself."""
+    minimum = None
+    for constraint in metadata:
+        if not isinstance(constraint, Ge):
+            return None
+        minimum = constraint.ge
+    if annotation is str:
+        return lambda value: encode_basestring(value) if type(value) is str else None
+    if annotation is int:
+        if minimum is None:
+            return lambda value: int.__repr__(value) if type(value) is int else None
+        return lambda value: int.__repr__(value) if type(value) is int and value >= minimum else None
+    if metadata:
+        return None
+    if annotation is bool:
+        return lambda value: ("true" if value else "false") if type(value) is bool else None
+    if get_origin(annotation) is Literal and all(type(option) is str for option in get_args(annotation)):
+        allowed = {option: encode_basestring(option) for option in get_args(annotation)}
+        return lambda value: allowed.get(value) if type(value) is str else None
+    return None
+
+
+def _json_container_encoder(annotation: Any) -> Optional[_FieldEncoder]:
+    """Encoder for ``dict[str, Any]``, ``list[str]`` and ``list[dict[str, Any]]`` fields."""
+    adapter = TypeAdapter(annotation)
+
+    def dump(value: Any) -> str:
+        return json.dumps(adapter.dump_python(value, mode="json"), ensure_ascii=False)
+
+    def is_object(value: Any) -> bool:
+        return type(value) is dict and all(type(key) is str for key in value)
+
+    if annotation == dict[str, Any]:
+        return lambda value: dump(value) if is_object(value) else None
+    if annotation == list[str]:
+        return lambda value: (
+            dump(value) if type(value) is list and all(type(item) is str for item in value) else None
+        )
+    if annotation == list[dict[str, Any]]:
+        return lambda value: (
+            dump(value) if type(value) is list and all(is_object(item) for item in value) else None
+        )
+    return None
+
+
+def _compile_sse_encoder(model: type[BaseModel]) -> Optional[Callable[[dict[str, Any]], Optional[str]]]:
+    """Build the trusted serializer for ``model``, or ``None`` if a field type is not supported.
+
+    The serializer returns ``None`` whenever the payload has an unknown key,
+    misses a required field, or carries a value whose validation could change
+    it, so the caller can fall back to full validation.
+    """
+    fields: list[tuple[str, str, bool, bool, Optional[str], _FieldEncoder]] = []
+    for name, info in model.model_fields.items():
+        annotation, optional = info.annotation, False
+        if get_origin(annotation) in (Union, types.UnionType) and type(None) in get_args(annotation):
+            remaining = [arg for arg in get_args(annotation) if arg is not type(None)]
+            if len(remaining) != 1:
+                return None
+            annotation, optional = remaining[0], True
+        encoder = _json_scalar_encoder(annotation, info.metadata) or (
+            None if info.metadata else _json_container_encoder(annotation)
+        )
+        if encoder is None:
+            return None
+        if info.default_factory is not None:
+            default = info.default_factory()  # type: ignore[call-arg]
+        else:
+            default = None if info.default is PydanticUndefined else info.default
+        default_json = None if default is None else encoder(default)
+        fields.append(
+            (name, f"{encode_basestring(name)}: ", optional, info.is_required(), default_json, encoder)
+        )
+    known = frozenset(name for name, *_ in fields)
+
+    def encode(payload: dict[str, Any]) -> Optional[str]:
+        if not known.issuperset(payload):
+            return None
+        parts: list[str] = []
+        for name, prefix, optional, required, default_json, encoder in fields:
+            if name in payload:
+                value = payload[name]
+                if value is None:
+                    if not optional:
+                        return None
+                    continue
+                encoded = encoder(value)
+                if encoded is None:
+                    return None
+            elif default_json is not None:
+                encoded = default_json
+            elif required:
+                return None
+            else:
+                continue
+            parts.append(prefix + encoded)
+        return "{" + ", ".join(parts) + "}"
+
+    return encode
+
+
+_SSE_ENCODERS: dict[str, Callable[[dict[str, Any]], Optional[str]]] = {
+    event_type: encoder
+    for model in get_args(get_args(RuntimeEvent)[0])
+    for event_type in get_args(model.model_fields["type"].annotation)
+    if (encoder := _compile_sse_encoder(model)) is not None
+}
+
+
 def generate_runtime_events_schema() -> dict[str, Any]:
     """Return the JSON schema describing the RuntimeEvent union."""
     return _RUNTIME_EVENT_ADAPTER.json_schema(ref_template="#/$defs/{model}")
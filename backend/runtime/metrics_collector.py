@@ -1,20 +1,34 @@
 """In-process Prometheus metrics collector for BioAPEX runtime.
 
 The collector is intentionally framework-free: the project prefers minimal
-dependencies (see CLAUDE.md), so metric state lives in plain dicts guarded
-by a lock and the Prometheus text exposition format is hand-formatted.
+dependencies (see CLAUDE.md), so metric state lives in plain dicts and the
+Prometheus text exposition format is hand-formatted.
+
+Counters and histograms accumulate in per-thread shards, each with its own
+lock that only the owning thread and :meth:`MetricsCollector.snapshot`
+ever take, so recording on the token path never waits on another stream or
+on a scrape. ``snapshot`` copies and merges the shards; the exposition is
+rendered from that merged copy without holding any recording lock. Derived
+gauges (hit ratios) are computed from the merged counters at snapshot time.
 
 Feed the collector with runtime events via :meth:`MetricsCollector.observe_event`
 on the chat turn hot-path (``runtime/query_engine.py``). Miss signals that do
 not correspond to emitted events (e.g. empty retrievals) can be recorded with
-explicit ``observe_*`` helpers. ``render_exposition`` produces the bytes the
-``/api/metrics`` route returns.
+explicit ``observe_*`` helpers. ``exposition`` produces the text the
+``/api/metrics`` route returns: cached for ``exposition_ttl_seconds`` and,
+when a :class:`runtime.metrics_store.MetricsFileStore` is attached, merged
+with the snapshots other uvicorn workers published there.
 """
 from __future__ import annotations
 
 import threading
 import time
-from typing import Any, Iterable
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Iterable, Optional
+
+if TYPE_CHECKING:
+    from runtime.metrics_store import MetricsFileStore
 
 
 # Keep buckets aligned with Prometheus' default histogram buckets so Grafana
@@ -56,20 +70,198 @@ def _format_float(value: float) -> str:
     return f"{value:.6f}".rstrip("0").rstrip(".")
 
 
+LabelKey = tuple[tuple[str, str], ...]
+
+# Gauges computed from merged counters at snapshot time:
+# name -> (numerator counters, denominator counters).
+_RATIO_GAUGES: dict[str, tuple[tuple[str, ...], tuple[str, ...]]] = {
+    "bioapex_retrieval_cache_hit_ratio": (
+        ("bioapex_retrieval_cache_hits_total",),
+        ("bioapex_retrieval_cache_hits_total", "bioapex_retrieval_cache_misses_total"),
+    ),
+    "bioapex_prompt_cache_hit_rate": (
+        ("bioapex_prompt_cache_read_tokens_total",),
+        (
+            "bioapex_prompt_cache_read_tokens_total",
+            "bioapex_prompt_cache_creation_tokens_total",
+            "bioapex_prompt_cache_uncached_tokens_total",
+        ),
+    ),
+}
+
+
+class _HistogramCell:
+    """Per-bucket (non-cumulative) counts; the last slot is the +Inf overflow."""
+
+    __slots__ = ("buckets", "sum", "count")
+
+    def __init__(self) -> None:
+        self.buckets = [0] * (len(_DEFAULT_BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+
+class _Shard:
+    """One thread's accumulators.
+
+    Only the owning thread writes to a shard, so its lock is contended only
+    by an occasional snapshot copying it.
+    """
+
+    __slots__ = ("lock", "thread", "counters", "histograms")
+
+    def __init__(self, thread: Optional[threading.Thread]) -> None:
+        self.lock = threading.Lock()
+        self.thread = thread
+        self.counters: dict[tuple[str, LabelKey], float] = {}
+        self.histograms: dict[tuple[str, LabelKey], _HistogramCell] = {}
+
+    def merge_into(self, snapshot: "MetricsSnapshot") -> None:
+        with self.lock:
+            counters = list(self.counters.items())
+            histograms = [
+                (key, list(cell.buckets), cell.sum, cell.count)
+                for key, cell in self.histograms.items()
+            ]
+        for (name, label_key), value in counters:
+            family = snapshot.counters.setdefault(name, {})
+            family[label_key] = family.get(label_key, 0.0) + value
+        for (name, label_key), buckets, total, count in histograms:
+            snapshot.add_histogram(name, label_key, buckets, total, count)
+
+    def absorb(self, other: "_Shard") -> None:
+        """Fold a finished thread's shard into this one."""
+        with other.lock:
+            counters = list(other.counters.items())
+            histograms = list(other.histograms.items())
+        with self.lock:
+            for key, value in counters:
+                self.counters[key] = self.counters.get(key, 0.0) + value
+            for key, cell in histograms:
+                target = self.histograms.get(key)
+                if target is None:
+                    target = self.histograms[key] = _HistogramCell()
+                for index, bucket_count in enumerate(cell.buckets):
+                    target.buckets[index] += bucket_count
+                target.sum += cell.sum
+                target.count += cell.count
+
+
+@dataclass
+class MetricsSnapshot:
+    """A point-in-time copy of metric values that can be merged and rendered.
+
+    Histogram values are ``(per-bucket counts, sum, count)`` with one count per
+    ``_DEFAULT_BUCKETS`` bound plus a trailing +Inf overflow slot.
+    """
+
+    counters: dict[str, dict[LabelKey, float]] = field(default_factory=dict)
+    gauges: dict[str, dict[LabelKey, float]] = field(default_factory=dict)
+    histograms: dict[str, dict[LabelKey, tuple[list[int], float, int]]] = field(default_factory=dict)
+
+    def add_histogram(
+        self,
+        name: str,
+        label_key: LabelKey,
+        buckets: list[int],
+        total: float,
+        count: int,
+    ) -> None:
+        family = self.histograms.setdefault(name, {})
+        existing = family.get(label_key)
+        if existing is None:
+            family[label_key] = (list(buckets), float(total), int(count))
+            return
+        merged = [left + right for left, right in zip(existing[0], buckets)]
+        family[label_key] = (merged, existing[1] + total, existing[2] + count)
+
+    def merge(self, other: "MetricsSnapshot") -> None:
+        """Add ``other`` into this snapshot.
+
+        Counters, histograms and gauges are summed: the only set-style gauge
+        is a per-process queue depth, whose total across workers is what a
+        dashboard wants. Ratio gauges are recomputed by
+        :meth:`derive_ratio_gauges` after merging.
+        """
+        for name, family in other.counters.items():
+            target = self.counters.setdefault(name, {})
+            for label_key, value in family.items():
+                target[label_key] = target.get(label_key, 0.0) + value
+        for name, family in other.gauges.items():
+            if name in _RATIO_GAUGES:
+                continue
+            target = self.gauges.setdefault(name, {})
+            for label_key, value in family.items():
+                target[label_key] = target.get(label_key, 0.0) + value
+        for name, family in other.histograms.items():
+            for label_key, (buckets, total, count) in family.items():
+                self.add_histogram(name, label_key, buckets, total, count)
+
+    def derive_ratio_gauges(self) -> None:
+        for gauge, (numerator, denominator) in _RATIO_GAUGES.items():
+            top = sum(self.counters.get(name, {}).get((), 0.0) for name in numerator)
+            bottom = sum(self.counters.get(name, {}).get((), 0.0) for name in denominator)
+            if bottom > 0:
+                self.gauges.setdefault(gauge, {})[()] = top / bottom
+            else:
+                self.gauges.pop(gauge, None)
+
+    def to_payload(self) -> dict[str, Any]:
+        def families(metrics: dict[str, dict[LabelKey, Any]]) -> dict[str, list[Any]]:
+            return {
+                name: [[[list(pair) for pair in label_key], value] for label_key, value in family.items()]
+                for name, family in metrics.items()
+            }
+
+        return {
+            "counters": families(self.counters),
+            "gauges": families(self.gauges),
+            "histograms": families(
+                {
+                    name: {key: list(value) for key, value in family.items()}
+                    for name, family in self.histograms.items()
+                }
+            ),
+        }
+
+    @classmethod
+    def from_payload(cls, payload: dict[str, Any]) -> "MetricsSnapshot":
+        def families(raw: Any) -> Iterable[tuple[str, LabelKey, Any]]:
+            for name, entries in dict(raw or {}).items():
+                for label_pairs, value in entries:
+                    yield str(name), tuple((str(key), str(val)) for key, val in label_pairs), value
+
+        snapshot = cls()
+        for name, label_key, value in families(payload.get("counters")):
+            snapshot.counters.setdefault(name, {})[label_key] = float(value)
+        for name, label_key, value in families(payload.get("gauges")):
+            snapshot.gauges.setdefault(name, {})[label_key] = float(value)
+        for name, label_key, (buckets, total, count) in families(payload.get("histograms")):
+            if len(buckets) != len(_DEFAULT_BUCKETS) + 1:
+                raise ValueError(f"histogram {name} has {len(buckets)} buckets")
+            snapshot.add_histogram(name, label_key, [int(b) for b in buckets], float(total), int(count))
+        return snapshot
+
+
 class MetricsCollector:
     """Thread-safe in-process counter/histogram/gauge registry."""
 
-    def __init__(self) -> None:
-        self._lock = threading.Lock()
-        self._counters: dict[str, dict[tuple[tuple[str, str], ...], float]] = {}
-        self._gauges: dict[str, dict[tuple[tuple[str, str], ...], float]] = {}
-        self._histograms: dict[
-            str,
-            dict[tuple[tuple[str, str], ...], dict[str, Any]],
-        ] = {}
+    def __init__(self, *, exposition_ttl_seconds: float = 0.0) -> None:
+        self.exposition_ttl_seconds = exposition_ttl_seconds
+        self._local = threading.local()
+        self._shards_lock = threading.Lock()
+        self._shards: list[_Shard] = []
+        self._retired = _Shard(None)
+        # Gauges are last-write-wins across threads, and written rarely.
+        self._gauge_lock = threading.Lock()
+        self._gauges: dict[str, dict[LabelKey, float]] = {}
+        self._tool_lock = threading.Lock()
+        self._tool_start_times: dict[str, tuple[str, float]] = {}
         self._help: dict[str, str] = {}
         self._types: dict[str, str] = {}
-        self._tool_start_times: dict[str, tuple[str, float]] = {}
+        self._render_lock = threading.Lock()
+        self._cached_exposition: Optional[tuple[float, str]] = None
+        self._store: Optional["MetricsFileStore"] = None
 
         self._register_defaults()
 
@@ -80,12 +272,6 @@ class MetricsCollector:
     def _register(self, name: str, mtype: str, help_text: str) -> None:
         self._help[name] = help_text
         self._types[name] = mtype
-        if mtype == "counter":
-            self._counters.setdefault(name, {})
-        elif mtype == "gauge":
-            self._gauges.setdefault(name, {})
-        elif mtype == "histogram":
-            self._histograms.setdefault(name, {})
 
     def _register_defaults(self) -> None:
         self._register(
@@ -188,6 +374,26 @@ class MetricsCollector:
             "gauge",
             "Rolling ratio cache_read_tokens / total_input_tokens across LLM calls.",
         )
+        self._register(
+            "bioapex_audit_queue_depth",
+            "gauge",
+            "Audit events waiting in the background writer queue.",
+        )
+        self._register(
+            "bioapex_audit_events_written_total",
+            "counter",
+            "Audit events committed by the background writer.",
+        )
+        self._register(
+            "bioapex_audit_events_dropped_total",
+            "counter",
+            "Audit events dropped because the background writer queue was full.",
+        )
+        self._register(
+            "bioapex_turn_phase_duration_seconds",
+            "histogram",
+            "Per-turn time spent in each profiled phase (turn_profile.enabled), labeled by phase.",
+        )
 
     # ------------------------------------------------------------------ #
     # Mutation helpers                                                     #
@@ -199,6 +405,15 @@ class MetricsCollector:
             return ()
         return tuple(sorted((k, str(v)) for k, v in labels.items()))
 
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = _Shard(threading.current_thread())
+            with self._shards_lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        return shard
+
     def _inc_counter(
         self,
         name: str,
@@ -206,10 +421,10 @@ class MetricsCollector:
         amount: float = 1.0,
         labels: dict[str, str] | None = None,
     ) -> None:
-        key = self._label_key(labels)
-        with self._lock:
-            family = self._counters.setdefault(name, {})
-            family[key] = family.get(key, 0.0) + amount
+        key = (name, self._label_key(labels))
+        shard = self._shard()
+        with shard.lock:
+            shard.counters[key] = shard.counters.get(key, 0.0) + amount
 
     def _set_gauge(
         self,
@@ -219,7 +434,7 @@ class MetricsCollector:
         labels: dict[str, str] | None = None,
     ) -> None:
         key = self._label_key(labels)
-        with self._lock:
+        with self._gauge_lock:
             family = self._gauges.setdefault(name, {})
             family[key] = float(value)
 
@@ -230,24 +445,17 @@ class MetricsCollector:
         *,
         labels: dict[str, str] | None = None,
     ) -> None:
-        key = self._label_key(labels)
-        with self._lock:
-            family = self._histograms.setdefault(name, {})
-            entry = family.get(key)
-            if entry is None:
-                entry = {
-                    "buckets": {bound: 0 for bound in _DEFAULT_BUCKETS},
-                    "inf": 0,
-                    "sum": 0.0,
-                    "count": 0,
-                }
-                family[key] = entry
-            for bound in _DEFAULT_BUCKETS:
-                if value <= bound:
-                    entry["buckets"][bound] += 1
-            entry["inf"] += 1
-            entry["sum"] += float(value)
-            entry["count"] += 1
+        key = (name, self._label_key(labels))
+        # First bound >= value, i.e. the smallest ``le`` bucket it falls in.
+        index = bisect_left(_DEFAULT_BUCKETS, value)
+        shard = self._shard()
+        with shard.lock:
+            cell = shard.histograms.get(key)
+            if cell is None:
+                cell = shard.histograms[key] = _HistogramCell()
+            cell.buckets[index] += 1
+            cell.sum += float(value)
+            cell.count += 1
 
     # ------------------------------------------------------------------ #
     # Public recording API                                                 #
@@ -267,7 +475,6 @@ class MetricsCollector:
             self._inc_counter("bioapex_retrieval_cache_hits_total")
         else:
             self._inc_counter("bioapex_retrieval_cache_misses_total")
-        self._recompute_hit_ratio()
 
     def observe_retrieval_error(self, *, error_type: str) -> None:
         """Record a retrieval attempt that raised.
@@ -282,14 +489,6 @@ class MetricsCollector:
             labels={"error_type": label},
         )
 
-    def _recompute_hit_ratio(self) -> None:
-        with self._lock:
-            hits = self._counters.get("bioapex_retrieval_cache_hits_total", {}).get((), 0.0)
-            misses = self._counters.get("bioapex_retrieval_cache_misses_total", {}).get((), 0.0)
-            total = hits + misses
-            ratio = (hits / total) if total > 0 else 0.0
-            self._gauges.setdefault("bioapex_retrieval_cache_hit_ratio", {})[()] = ratio
-
     def observe_llm_usage(
         self,
         *,
@@ -325,22 +524,23 @@ class MetricsCollector:
                 "bioapex_prompt_cache_uncached_tokens_total",
                 amount=float(uncached),
             )
-        self._recompute_prompt_cache_hit_rate()
-
-    def _recompute_prompt_cache_hit_rate(self) -> None:
-        with self._lock:
-            read = self._counters.get(
-                "bioapex_prompt_cache_read_tokens_total", {}
-            ).get((), 0.0)
-            creation = self._counters.get(
-                "bioapex_prompt_cache_creation_tokens_total", {}
-            ).get((), 0.0)
-            uncached = self._counters.get(
-                "bioapex_prompt_cache_uncached_tokens_total", {}
-            ).get((), 0.0)
-            total = read + creation + uncached
-            rate = (read / total) if total > 0 else 0.0
-            self._gauges.setdefault("bioapex_prompt_cache_hit_rate", {})[()] = rate
+
+    def observe_audit_writer(self, *, queue_depth: int, written: int = 0, dropped: int = 0) -> None:
+        """Record a background audit writer batch or a dropped event."""
+        self._set_gauge("bioapex_audit_queue_depth", float(queue_depth))
+        if written:
+            self._inc_counter("bioapex_audit_events_written_total", amount=float(written))
+        if dropped:
+            self._inc_counter("bioapex_audit_events_dropped_total", amount=float(dropped))
+
+    def observe_turn_phases(self, phases: Iterable[tuple[str, float]]) -> None:
+        """Record one finished turn profile as ``(phase, seconds)`` samples."""
+        for phase, seconds in phases:
+            self._observe_histogram(
+                "bioapex_turn_phase_duration_seconds",
+                seconds,
+                labels={"phase": phase},
+            )
 
     def observe_event(self, event: dict[str, Any]) -> None:
         """Update metrics from a runtime event payload.
@@ -366,7 +566,7 @@ class MetricsCollector:
             if tool_input is not None:
                 self.record_input_tokens(_token_estimate(tool_input))
             if run_id:
-                with self._lock:
+                with self._tool_lock:
                     self._tool_start_times[run_id] = (tool, time.monotonic())
             return
 
@@ -380,7 +580,7 @@ class MetricsCollector:
             started_at: float | None = None
             started_tool: str | None = None
             if run_id:
-                with self._lock:
+                with self._tool_lock:
                     entry = self._tool_start_times.pop(run_id, None)
                 if entry is not None:
                     started_tool, started_at = entry
@@ -467,66 +667,96 @@ class MetricsCollector:
     # Exposition                                                           #
     # ------------------------------------------------------------------ #
 
+    def snapshot(self) -> MetricsSnapshot:
+        """Copy and merge every thread's accumulators plus the current gauges."""
+        snapshot = MetricsSnapshot()
+        with self._shards_lock:
+            live: list[_Shard] = []
+            for shard in self._shards:
+                if shard.thread is not None and shard.thread.is_alive():
+                    live.append(shard)
+                else:
+                    self._retired.absorb(shard)
+            self._shards = live
+            for shard in (*live, self._retired):
+                shard.merge_into(snapshot)
+        with self._gauge_lock:
+            snapshot.gauges = {name: dict(family) for name, family in self._gauges.items()}
+        snapshot.derive_ratio_gauges()
+        return snapshot
+
     def render_exposition(self) -> str:
-        """Render the Prometheus text exposition format."""
-        with self._lock:
-            lines: list[str] = []
-            ordered_names: list[str] = sorted(self._types.keys())
-            for name in ordered_names:
-                mtype = self._types[name]
-                help_text = self._help.get(name, "")
-                lines.append(f"# HELP {name} {help_text}")
-                lines.append(f"# TYPE {name} {mtype}")
-                if mtype == "counter":
-                    family = self._counters.get(name, {})
-                    if not family:
-                        lines.append(f"{name} 0")
-                    else:
-                        for label_key in sorted(family.keys()):
-                            value = family[label_key]
-                            labels = dict(label_key)
-                            lines.append(f"{name}{_format_labels(labels)} {_format_float(value)}")
-                elif mtype == "gauge":
-                    family = self._gauges.get(name, {})
-                    if not family:
-                        lines.append(f"{name} 0")
-                    else:
-                        for label_key in sorted(family.keys()):
-                            value = family[label_key]
-                            labels = dict(label_key)
-                            lines.append(f"{name}{_format_labels(labels)} {_format_float(value)}")
-                elif mtype == "histogram":
-                    family = self._histograms.get(name, {})
-                    if not family:
-                        for bound in _DEFAULT_BUCKETS:
-                            lines.append(f'{name}_bucket{{le="{_format_float(bound)}"}} 0')
-                        lines.append(f'{name}_bucket{{le="+Inf"}} 0')
-                        lines.append(f"{name}_sum 0")
-                        lines.append(f"{name}_count 0")
-                    else:
-                        for label_key in sorted(family.keys()):
-                            entry = family[label_key]
-                            labels = dict(label_key)
-                            cumulative = 0
-                            for bound in _DEFAULT_BUCKETS:
-                                cumulative = entry["buckets"][bound]
-                                bucket_labels = dict(labels)
-                                bucket_labels["le"] = _format_float(bound)
-                                lines.append(
-                                    f"{name}_bucket{_format_labels(bucket_labels)} {cumulative}"
-                                )
-                            inf_labels = dict(labels)
-                            inf_labels["le"] = "+Inf"
-                            lines.append(
-                                f"{name}_bucket{_format_labels(inf_labels)} {entry['inf']}"
-                            )
-                            lines.append(
-                                f"{name}_sum{_format_labels(labels)} {_format_float(entry['sum'])}"
-                            )
-                            lines.append(
-                                f"{name}_count{_format_labels(labels)} {entry['count']}"
-                            )
-            return "\n".join(lines) + "\n"
+        """Render this process's metrics in the Prometheus text exposition format."""
+        return self.render_snapshot(self.snapshot())
+
+    def exposition(self) -> str:
+        """The text ``/api/metrics`` serves.
+
+        Rendered at most once per ``exposition_ttl_seconds`` (concurrent
+        scrapes share one render) and merged with peer workers' snapshots when
+        a shared store is attached.
+        """
+        with self._render_lock:
+            now = time.monotonic()
+            cached = self._cached_exposition
+            if cached is not None and now - cached[0] < self.exposition_ttl_seconds:
+                return cached[1]
+            snapshot = self.snapshot()
+            store = self._store
+            if store is not None:
+                for peer in store.peer_snapshots():
+                    snapshot.merge(peer)
+                snapshot.derive_ratio_gauges()
+            text = self.render_snapshot(snapshot)
+            self._cached_exposition = (now, text)
+            return text
+
+    def attach_store(self, store: Optional["MetricsFileStore"]) -> None:
+        """Merge snapshots published by other workers into :meth:`exposition`."""
+        with self._render_lock:
+            self._store = store
+            self._cached_exposition = None
+
+    def render_snapshot(self, snapshot: MetricsSnapshot) -> str:
+        """Render ``snapshot`` in the Prometheus text exposition format."""
+        lines: list[str] = []
+        for name in sorted(self._types.keys()):
+            mtype = self._types[name]
+            help_text = self._help.get(name, "")
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {mtype}")
+            if mtype in ("counter", "gauge"):
+                family = (snapshot.counters if mtype == "counter" else snapshot.gauges).get(name, {})
+                if not family:
+                    lines.append(f"{name} 0")
+                    continue
+                for label_key in sorted(family.keys()):
+                    labels = dict(label_key)
+                    lines.append(f"{name}{_format_labels(labels)} {_format_float(family[label_key])}")
+            elif mtype == "histogram":
+                family = snapshot.histograms.get(name, {})
+                if not family:
+                    for bound in _DEFAULT_BUCKETS:
+                        lines.append(f'{name}_bucket{{le="{_format_float(bound)}"}} 0')
+                    lines.append(f'{name}_bucket{{le="+Inf"}} 0')
+                    lines.append(f"{name}_sum 0")
+                    lines.append(f"{name}_count 0")
+                    continue
+                for label_key in sorted(family.keys()):
+                    buckets, total, count = family[label_key]
+                    labels = dict(label_key)
+                    cumulative = 0
+                    for bound, bucket_count in zip(_DEFAULT_BUCKETS, buckets):
+                        cumulative += bucket_count
+                        bucket_labels = dict(labels)
+                        bucket_labels["le"] = _format_float(bound)
+                        lines.append(f"{name}_bucket{_format_labels(bucket_labels)} {cumulative}")
+                    inf_labels = dict(labels)
+                    inf_labels["le"] = "+Inf"
+                    lines.append(f"{name}_bucket{_format_labels(inf_labels)} {count}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {_format_float(total)}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
 
     # ------------------------------------------------------------------ #
     # Test / maintenance                                                   #
@@ -534,14 +764,17 @@ class MetricsCollector:
 
     def reset(self) -> None:
         """Clear accumulated metric state. Intended for tests."""
-        with self._lock:
-            for family in self._counters.values():
-                family.clear()
-            for family in self._gauges.values():
-                family.clear()
-            for family in self._histograms.values():
-                family.clear()
+        with self._shards_lock:
+            for shard in (*self._shards, self._retired):
+                with shard.lock:
+                    shard.counters.clear()
+                    shard.histograms.clear()
+        with self._gauge_lock:
+            self._gauges.clear()
+        with self._tool_lock:
             self._tool_start_times.clear()
+        with self._render_lock:
+            self._cached_exposition = None
 
     def documented_metric_names(self) -> Iterable[str]:
         return tuple(sorted(self._types.keys()))
@@ -0,0 +1,198 @@
+"""File-backed metric sharing between uvicorn workers.
+
+Each worker process keeps its own :class:`~runtime.metrics_collector.MetricsCollector`.
+When several workers serve the same app, a scrape of ``/api/metrics`` lands on
+just one of them, so every worker also publishes its snapshot to
+``storage/metrics/worker-<pid>.json`` from a background thread, and the worker
+that answers a scrape merges its live snapshot with its peers' files.
+
+Snapshot files are replaced atomically. A file whose process has exited is
+deleted on the next read, and one not refreshed within ``stale_after_seconds``
+is ignored, so counters from a worker that exits drop out of the merged total
+(Prometheus treats that like any other counter reset). A worker removes its own
+file on clean shutdown.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+
+from runtime.metrics_collector import METRICS, MetricsCollector, MetricsSnapshot
+
+METRICS_STORE_DIR = Path("storage") / "metrics"
+METRICS_STORE_VERSION = 1
+DEFAULT_METRICS_PUBLISH_INTERVAL_SECONDS = 5.0
+
+logger = logging.getLogger(__name__)
+
+_active_publisher: Optional["MetricsPublisher"] = None
+_active_publisher_lock = threading.Lock()
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class MetricsFileStore:
+    """One snapshot file per worker process in a shared directory."""
+
+    def __init__(
+        self,
+        directory: Path,
+        *,
+        pid: Optional[int] = None,
+        stale_after_seconds: float = 60.0,
+    ) -> None:
+        self.directory = Path(directory)
+        self.pid = os.getpid() if pid is None else pid
+        self.stale_after_seconds = stale_after_seconds
+
+    @property
+    def path(self) -> Path:
+        return self.directory / f"worker-{self.pid}.json"
+
+    def publish(self, snapshot: MetricsSnapshot) -> None:
+        payload = {
+            "version": METRICS_STORE_VERSION,
+            "pid": self.pid,
+            "published_at": time.time(),
+            "snapshot": snapshot.to_payload(),
+        }
+        tmp_path = self.path.with_name(f".{self.path.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+            os.replace(tmp_path, self.path)
+        except OSError:
+            logger.warning("metrics_snapshot_write_failed path=%s", self.path, exc_info=True)
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+
+    def peer_snapshots(self) -> list[MetricsSnapshot]:
+        """Snapshots published by the other live workers."""
+        snapshots: list[MetricsSnapshot] = []
+        now = time.time()
+        for path in sorted(self.directory.glob("worker-*.json")):
+            if path == self.path:
+                continue
+            try:
+                payload = json.loads(path.read_text(encoding="utf-8"))
+                if payload.get("version") != METRICS_STORE_VERSION:
+                    continue
+                pid = int(payload["pid"])
+                if not _process_alive(pid):
+                    path.unlink(missing_ok=True)
+                    continue
+                if now - float(payload["published_at"]) > self.stale_after_seconds:
+                    continue
+                snapshots.append(MetricsSnapshot.from_payload(payload["snapshot"]))
+            except FileNotFoundError:
+                continue
+            except Exception:
+                logger.warning("metrics_snapshot_read_failed path=%s", path, exc_info=True)
+        return snapshots
+
+    def remove(self) -> None:
+        try:
+            self.path.unlink(missing_ok=True)
+        except OSError:
+            logger.warning("metrics_snapshot_remove_failed path=%s", self.path, exc_info=True)
+
+
+class MetricsPublisher:
+    """Thread that publishes a collector's snapshot to a store at a fixed interval."""
+
+    def __init__(
+        self,
+        store: MetricsFileStore,
+        collector: MetricsCollector = METRICS,
+        *,
+        interval_seconds: float = DEFAULT_METRICS_PUBLISH_INTERVAL_SECONDS,
+    ) -> None:
+        self.store = store
+        self.collector = collector
+        self.interval_seconds = max(0.1, float(interval_seconds))
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self.collector.attach_store(self.store)
+        self._thread = threading.Thread(target=self._run, name="metrics-publisher", daemon=True)
+        self._thread.start()
+
+    def publish_now(self) -> None:
+        try:
+            self.store.publish(self.collector.snapshot())
+        except Exception:
+            logger.warning("metrics_snapshot_publish_failed path=%s", self.store.path, exc_info=True)
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.collector.attach_store(None)
+        self.store.remove()
+
+    def _run(self) -> None:
+        while True:
+            self.publish_now()
+            if self._stop.wait(self.interval_seconds):
+                return
+
+
+def start_metrics_publisher(
+    base_dir: Path,
+    *,
+    interval_seconds: float = DEFAULT_METRICS_PUBLISH_INTERVAL_SECONDS,
+) -> MetricsPublisher:
+    """Share ``METRICS`` with the other workers using ``base_dir/storage/metrics``."""
+    global _active_publisher
+    with _active_publisher_lock:
+        if _active_publisher is not None:
+            return _active_publisher
+        store = MetricsFileStore(
+            Path(base_dir) / METRICS_STORE_DIR,
+            # Three missed publishes mark a worker as stale.
+            stale_after_seconds=max(30.0, 3 * interval_seconds),
+        )
+        publisher = MetricsPublisher(store, METRICS, interval_seconds=interval_seconds)
+        publisher.start()
+        _active_publisher = publisher
+        return publisher
+
+
+def stop_metrics_publisher(timeout: Optional[float] = None) -> None:
+    """Stop publishing and withdraw this worker's snapshot from the store."""
+    global _active_publisher
+    with _active_publisher_lock:
+        publisher, _active_publisher = _active_publisher, None
+    if publisher is not None:
+        publisher.close(timeout)
+
+
+__all__ = [
+    "DEFAULT_METRICS_PUBLISH_INTERVAL_SECONDS",
+    "METRICS_STORE_DIR",
+    "METRICS_STORE_VERSION",
+    "MetricsFileStore",
+    "MetricsPublisher",
+    "start_metrics_publisher",
+    "stop_metrics_publisher",
+]
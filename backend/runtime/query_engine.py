@@ -12,16 +12,18 @@ from typing import Any, AsyncIterator, Awaitable, Callable, AsyncGenerator, Sequ
 from config import (
     get_max_tokens_per_turn,
     get_max_turn_wallclock_s,
+    get_turn_profile_settings,
     get_verification_settings,
     snapshot_runtime_config,
 )
 from runtime.events import (
     RUNTIME_EVENT_SCHEMA_VERSION,
-    dump_runtime_event,
+    encode_runtime_event_sse,
     turn_status_to_exit,
 )
 from runtime.metrics_collector import METRICS
 from runtime.turn_ledger import TurnLedger, TurnResult
+from runtime.turn_profile import TurnProfile, record_turn_profile, turn_profile_scope
 from tools.registry import ToolManifestEntry, is_concurrency_safe_tier
 
 
@@ -715,36 +717,71 @@ class QueryEngine:
         session_manager = self.agent_manager.session_manager
         assert session_manager is not None
 
+        request_id = str(uuid.uuid4())
+        profile_settings = get_turn_profile_settings()
+        profile = (
+            TurnProfile(request_id=request_id, session_id=session_id)
+            if profile_settings["enabled"]
+            else None
+        )
+
+        def _phase(name: str) -> Any:
+            return profile.span(name) if profile is not None else contextlib.nullcontext()
+
         # Freeze runtime config for the duration of the turn. Mid-turn edits
         # to backend/config.json or env overrides are rejected at the file
         # API boundary, and the captured ``loaded_at`` is stamped onto the
         # session so later inspection tools can trace which config shaped
         # this turn's decisions.
         runtime_snapshot = snapshot_runtime_config()
-        try:
-            session_manager.stamp_runtime_config_snapshot(
-                session_id,
-                loaded_at=runtime_snapshot.loaded_at,
-            )
-        except Exception:
-            _logger.warning(
-                "Failed to stamp runtime-config snapshot onto session %s",
-                session_id,
-                exc_info=True,
-            )
 
-        await session_manager.auto_compress_if_needed(
-            session_id,
-            self.agent_manager.llm,
-        )
-        compaction_event = await maybe_compact_turn_boundary(
-            session_manager,
-            session_id,
-            self.agent_manager.llm,
-        )
-        history = session_manager.load_session_for_agent(session_id)
+        # Parse the session once for the whole turn: the config stamp,
+        # both compaction passes, prompt history and the ledger's final
+        # write all share this snapshot instead of re-reading the file.
+        with _phase("session_load"):
+            session_snapshot = session_manager.read_snapshot(session_id)
+            try:
+                session_manager.stamp_runtime_config_snapshot(
+                    session_id,
+                    loaded_at=runtime_snapshot.loaded_at,
+                    snapshot=session_snapshot,
+                )
+            except Exception:
+                _logger.warning(
+                    "Failed to stamp runtime-config snapshot onto session %s",
+                    session_id,
+                    exc_info=True,
+                )
+
+        try:
+            with _phase("auto_compress"):
+                await session_manager.auto_compress_if_needed(
+                    session_id,
+                    self.agent_manager.llm,
+                    snapshot=session_snapshot,
+                )
+            with _phase("turn_boundary_compaction"):
+                compaction_event = await maybe_compact_turn_boundary(
+                    session_manager,
+                    session_id,
+                    self.agent_manager.llm,
+                    snapshot=session_snapshot,
+                )
+            with _phase("history_load"):
+                history = session_manager.load_session_for_agent(
+                    session_id, snapshot=session_snapshot
+                )
+        except BaseException:
+            # The stamp above only reaches disk with the turn's next write,
+            # and a turn that fails this early never makes one.
+            try:
+                session_manager.flush_snapshot(session_snapshot)
+            except Exception:
+                _logger.warning(
+                    "Failed to flush the session snapshot of %s", session_id, exc_info=True
+                )
+            raise
 
-        request_id = str(uuid.uuid4())
         base_dir = getattr(self.agent_manager, "base_dir", None)
         approved_tool_runs: frozenset[str] = frozenset()
         denied_tool_runs: frozenset[str] = frozenset()
@@ -772,6 +809,7 @@ class QueryEngine:
             session_id=session_id,
             request_id=request_id,
             user_message=message,
+            snapshot=session_snapshot,
         )
 
         event_index = 0
@@ -782,11 +820,17 @@ class QueryEngine:
             event_index += 1
             envelope.setdefault("request_id", request_id)
             envelope.setdefault("event_index", event_index)
-            # Validate + stamp schema_version through the transport-neutral
+            # Stamp schema_version and shape through the transport-neutral
             # RuntimeEvent schema so SSE, WebSocket, and any future adapter share
-            # one source of truth for event shapes.
-            validated = dump_runtime_event(envelope)
-            return f"data: {json.dumps(validated, ensure_ascii=False)}\n\n"
+            # one source of truth for event shapes. The engine built every
+            # payload here, so the per-type compiled encoder stands in for full
+            # validation; it defers to it for any field it cannot vouch for.
+            if profile is None:
+                return encode_runtime_event_sse(envelope, trusted=True)
+            started = time.perf_counter_ns()
+            frame = encode_runtime_event_sse(envelope, trusted=True)
+            profile.accumulate("event_serialization", started, time.perf_counter_ns())
+            return frame
 
         turn = QueryTurnInput(
             message=message,
@@ -795,7 +839,7 @@ class QueryEngine:
         )
 
         terminal_turn_status: str | None = None
-        with tool_policy_context(policy_context):
+        with tool_policy_context(policy_context), turn_profile_scope(profile):
             try:
                 if (
                     isinstance(client_schema_version, int)
@@ -851,6 +895,8 @@ class QueryEngine:
                                 approval_store.consume(base_dir, session_id)
                             except Exception:
                                 pass
+                        if profile is not None:
+                            yield _sse(profile.to_event())
                         yield _sse(done_payload)
                         return
 
@@ -862,6 +908,8 @@ class QueryEngine:
                             turn_result = ledger.finalize(turn_status="error")
                         ledger.persist_segments(turn_result)
                         terminal_turn_status = "error"
+                        if profile is not None:
+                            yield _sse(profile.to_event())
                         yield _sse({"type": "error", "error": event["error"]})
                         return
 
@@ -902,3 +950,19 @@ class QueryEngine:
                         "Failed to persist partial turn state on stream exit",
                         exc_info=True,
                     )
+                # The session index buffers sidecar updates; publish this
+                # turn's entry so other workers list it promptly.
+                flush_session_index = getattr(session_manager, "flush_session_index", None)
+                if flush_session_index is not None:
+                    try:
+                        flush_session_index()
+                    except Exception:
+                        _logger.warning("Failed to flush the session index", exc_info=True)
+                if profile is not None:
+                    try:
+                        record_turn_profile(
+                            profile,
+                            base_dir=base_dir if profile_settings["otlp_file"] else None,
+                        )
+                    except Exception:
+                        _logger.warning("Failed to record the turn profile", exc_info=True)
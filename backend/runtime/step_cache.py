@@ -0,0 +1,597 @@
+"""Content-addressed memoisation of workflow step results.
+
+Rerunning a workflow after changing one late input (the DE contrast, say)
+used to repeat every upstream step. ``run_workflow`` can instead consult a
+``StepResultCache``: before a Python step runs, its key is computed from
+
+* the executor's module and function, plus the workflow and step ids the
+  executor sees on its ``ExecutionContext``;
+* a code digest over the executor module and every project module it reaches
+  through its globals (stdlib and installed packages are left out);
+* the resolved inputs, as canonical JSON;
+* the content digests of every file those inputs reference. References are
+  followed through JSON documents and CSV/TSV sheets, so a manifest that
+  names a sample sheet that names FASTQs pins the FASTQ contents too;
+* the versions of any external tools the executor module declares for the
+  function in ``STEP_CACHE_TOOL_PROBES``, so upgrading FastQC or MultiQC
+  invalidates the steps that ran it.
+
+On a hit the stored outputs are reused. Files the original step wrote inside
+its run directory are copied into the new run directory (as reflinks where
+the filesystem supports them, so unchanged data shares blocks without the
+two runs sharing one writable inode). JSON documents among them are
+rewritten on the way, as are the outputs themselves, so paths and run ids
+that named the original run name the new one. Files outside the run
+directory are referenced as-is. Every referenced file must still have the
+digest it had when the entry was stored, or the entry is ignored and the
+step runs. Runs without a known run directory reuse outputs by reference
+only. The ``step_cache.json`` record written next to the step's generated
+outputs ties the two runs together.
+
+Entries live under ``storage/step_cache/`` as one JSON file per key.
+Steps opt out with ``cache_policy: disabled`` in the workflow spec.
+"""
+
+from __future__ import annotations
+
+import csv
+import errno
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sys
+import sysconfig
+import tempfile
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from importlib import import_module
+from pathlib import Path, PurePosixPath
+from types import ModuleType
+from typing import Any, Callable, Iterator, Literal, Optional
+
+from artifacts.naming import build_generated_output_relpath
+from file_digests import hash_files, shared_file_digest_cache
+
+logger = logging.getLogger(__name__)
+
+STEP_CACHE_DIR = PurePosixPath("storage/step_cache")
+STEP_CACHE_SCHEMA_VERSION = 1
+STEP_CACHE_PROVENANCE_FILENAME = "step_cache.json"
+# Referenced documents larger than this are hashed but not searched for
+# further references.
+MAX_FOLLOWED_DOCUMENT_BYTES = 16 * 1024 * 1024
+MAX_REFERENCE_DEPTH = 3
+
+_FOLLOWED_SUFFIXES = {".json": None, ".csv": ",", ".tsv": "\t"}
+_MAX_PATH_CANDIDATE_LENGTH = 1024
+
+MaterializeMode = Literal["reflink", "copy"]
+
+# ``STEP_CACHE_TOOL_PROBES`` in an executor module maps function names to
+# callables returning ``{tool: version}`` for the external tools that
+# function runs, given its resolved inputs and the project base directory.
+ToolVersionProbe = Callable[[dict[str, Any], Path], dict[str, str]]
+
+# Linux FICLONE: share the source file's blocks copy-on-write.
+_FICLONE = 0x40049409
+
+
+@dataclass(frozen=True)
+class StepCacheKey:
+    digest: str
+    workflow_id: str
+    step_id: str
+    executor: str
+    code_digest: str
+    input_digests: dict[str, str]
+    tool_versions: dict[str, str] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class StepCacheHit:
+    key: StepCacheKey
+    outputs: dict[str, Any]
+    source_run_id: str
+    materialized: list[dict[str, str]] = field(default_factory=list)
+    provenance_path: Optional[str] = None
+
+
+class StepResultCache:
+    """Step results keyed by code, inputs and input file contents under *base_dir*."""
+
+    def __init__(
+        self,
+        base_dir: Path | str,
+        *,
+        materialize: MaterializeMode = "reflink",
+        cache_dir: Path | str | None = None,
+    ) -> None:
+        self.base_dir = Path(base_dir).resolve()
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else self.base_dir / STEP_CACHE_DIR
+        self.materialize = materialize
+        self._digest_cache = shared_file_digest_cache(self.base_dir)
+
+    def key_for(
+        self,
+        *,
+        workflow_id: str,
+        step_id: str,
+        module: str,
+        function: str,
+        resolved_inputs: dict[str, Any],
+    ) -> Optional[StepCacheKey]:
+        """Return the cache key for one step invocation, or ``None`` if it is not cacheable.
+
+        Steps whose executor module has no source file, whose inputs are not
+        JSON-serialisable, or whose declared tool versions cannot be probed
+        are never cached.
+        """
+        executor_module = import_module(module)
+        code_files = _project_module_files(executor_module)
+        if not code_files:
+            return None
+        try:
+            canonical_inputs = _canonical_json(resolved_inputs)
+        except (TypeError, ValueError):
+            return None
+        probe: Optional[ToolVersionProbe] = getattr(executor_module, "STEP_CACHE_TOOL_PROBES", {}).get(function)
+        tool_versions: dict[str, str] = {}
+        if probe is not None:
+            try:
+                tool_versions = dict(sorted(probe(resolved_inputs, self.base_dir).items()))
+            except (LookupError, OSError, RuntimeError, ValueError):
+                logger.info("step_cache_tool_probe_failed executor=%s:%s", module, function, exc_info=True)
+                return None
+
+        code_digests = self._hash(code_files)
+        code_digest = hashlib.sha256(
+            "\n".join(code_digests[path] for path in code_files).encode("ascii")
+        ).hexdigest()
+        input_files = _referenced_files(resolved_inputs, self.base_dir, follow=True)
+        input_digests = {
+            self._relative(path): digest for path, digest in sorted(self._hash(input_files).items())
+        }
+        executor = f"{module}:{function}"
+        digest = hashlib.sha256(
+            _canonical_json(
+                {
+                    "schema_version": STEP_CACHE_SCHEMA_VERSION,
+                    "workflow_id": workflow_id,
+                    "step_id": step_id,
+                    "executor": executor,
+                    "code_digest": code_digest,
+                    "inputs": canonical_inputs,
+                    "input_digests": input_digests,
+                    "tool_versions": tool_versions,
+                }
+            ).encode("utf-8")
+        ).hexdigest()
+        return StepCacheKey(
+            digest=digest,
+            workflow_id=workflow_id,
+            step_id=step_id,
+            executor=executor,
+            code_digest=code_digest,
+            input_digests=input_digests,
+            tool_versions=tool_versions,
+        )
+
+    def store(
+        self,
+        key: StepCacheKey,
+        outputs: dict[str, Any],
+        *,
+        run_id: str,
+        relative_run_dir: Optional[PurePosixPath],
+    ) -> bool:
+        """Record *outputs* for *key*; return ``False`` if they cannot be reused later."""
+        try:
+            canonical_outputs = json.loads(_canonical_json(outputs))
+        except (TypeError, ValueError):
+            return False
+        output_files = _referenced_files(outputs, self.base_dir, follow=False)
+        entry = {
+            "schema_version": STEP_CACHE_SCHEMA_VERSION,
+            "key": key.digest,
+            "workflow_id": key.workflow_id,
+            "step_id": key.step_id,
+            "executor": key.executor,
+            "code_digest": key.code_digest,
+            "input_digests": key.input_digests,
+            "tool_versions": key.tool_versions,
+            "source_run_id": run_id,
+            "source_run_dir": None if relative_run_dir is None else str(relative_run_dir),
+            "stored_at": _utcnow(),
+            "outputs": canonical_outputs,
+            "files": {
+                self._relative(path): digest for path, digest in sorted(self._hash(output_files).items())
+            },
+        }
+        path = self._entry_path(key.digest)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _write_json_atomic(path, entry)
+        return True
+
+    def restore(
+        self,
+        key: StepCacheKey,
+        *,
+        run_id: str,
+        relative_run_dir: Optional[PurePosixPath],
+    ) -> Optional[StepCacheHit]:
+        """Reuse the stored result for *key* in run *run_id*, or return ``None``."""
+        entry = self._load_entry(key.digest)
+        if entry is None:
+            return None
+        files: dict[str, str] = entry["files"]
+        if not self._files_unchanged(files):
+            return None
+
+        source_run_id = str(entry["source_run_id"])
+        source_run_dir = entry.get("source_run_dir")
+        source_prefix = f"{source_run_dir}/" if source_run_dir else None
+        target_run_dir = None if relative_run_dir is None else str(relative_run_dir)
+        run_local = [path for path in files if source_prefix and path.startswith(source_prefix)]
+        if run_local and target_run_dir is None:
+            return None
+
+        placements: list[tuple[str, str]] = []
+        if target_run_dir is not None and target_run_dir != source_run_dir:
+            placements = [(source, f"{target_run_dir}/{source[len(source_prefix):]}") for source in run_local]
+        rewritten = {
+            source: content
+            for source, _ in placements
+            if (
+                content := _rebased_document(
+                    self.base_dir / source,
+                    source_run_dir=source_run_dir,
+                    target_run_dir=target_run_dir,
+                    source_run_id=source_run_id,
+                    run_id=run_id,
+                )
+            )
+            is not None
+        }
+        expected = {
+            target: hashlib.sha256(rewritten[source]).hexdigest() if source in rewritten else files[source]
+            for source, target in placements
+        }
+        existing = {target for _, target in placements if (self.base_dir / target).exists()}
+        if existing:
+            # A rerun into the same directory, or an earlier hit, already
+            # placed these; anything else there means the run has diverged.
+            current = self._hash([self.base_dir / target for target in existing])
+            if any(current[self.base_dir / target] != expected[target] for target in existing):
+                return None
+
+        materialized: list[dict[str, str]] = []
+        try:
+            for source, target in placements:
+                if target in existing:
+                    method = "existing"
+                else:
+                    method = self._materialize(source, target, content=rewritten.get(source))
+                materialized.append({"source": source, "target": target, "method": method})
+        except BaseException:
+            for item in materialized:
+                if item["method"] != "existing":
+                    (self.base_dir / item["target"]).unlink(missing_ok=True)
+            raise
+
+        outputs = _rebase(
+            entry["outputs"],
+            source_run_dir=source_run_dir if target_run_dir is not None else None,
+            target_run_dir=target_run_dir,
+            source_run_id=source_run_id,
+            run_id=run_id,
+        )
+        provenance_path = None
+        if relative_run_dir is not None:
+            provenance_path = self._write_provenance(
+                key,
+                entry,
+                materialized,
+                run_id=run_id,
+                relative_run_dir=relative_run_dir,
+            )
+        return StepCacheHit(
+            key=key,
+            outputs=outputs,
+            source_run_id=source_run_id,
+            materialized=materialized,
+            provenance_path=provenance_path,
+        )
+
+    def _write_provenance(
+        self,
+        key: StepCacheKey,
+        entry: dict[str, Any],
+        materialized: list[dict[str, str]],
+        *,
+        run_id: str,
+        relative_run_dir: PurePosixPath,
+    ) -> str:
+        relative_path = PurePosixPath(relative_run_dir) / build_generated_output_relpath(
+            STEP_CACHE_PROVENANCE_FILENAME, step=key.step_id
+        )
+        target = self.base_dir / relative_path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        materialized_sources = {item["source"] for item in materialized}
+        _write_json_atomic(
+            target,
+            {
+                "schema_version": STEP_CACHE_SCHEMA_VERSION,
+                "run_id": run_id,
+                "workflow_id": key.workflow_id,
+                "step_id": key.step_id,
+                "executor": key.executor,
+                "cache_key": key.digest,
+                "code_digest": key.code_digest,
+                "input_digests": key.input_digests,
+                "tool_versions": key.tool_versions,
+                "source_run_id": entry["source_run_id"],
+                "source_run_dir": entry.get("source_run_dir"),
+                "source_stored_at": entry.get("stored_at"),
+                "reused_at": _utcnow(),
+                "materialized": materialized,
+                "referenced": sorted(path for path in entry["files"] if path not in materialized_sources),
+            },
+        )
+        return str(relative_path)
+
+    def _materialize(self, source: str, target: str, *, content: Optional[bytes] = None) -> str:
+        source_path = self.base_dir / source
+        target_path = self.base_dir / target
+        target_path.parent.mkdir(parents=True, exist_ok=True)
+        if content is not None:
+            target_path.write_bytes(content)
+            shutil.copystat(source_path, target_path)
+            return "rewrite"
+        if self.materialize == "reflink" and _reflink(source_path, target_path):
+            shutil.copystat(source_path, target_path)
+            return "reflink"
+        shutil.copy2(source_path, target_path)
+        return "copy"
+
+    def _files_unchanged(self, files: dict[str, str]) -> bool:
+        paths = {self.base_dir / relative: digest for relative, digest in files.items()}
+        try:
+            current = self._hash(list(paths))
+        except (OSError, ValueError):
+            return False
+        return all(current.get(path) == digest for path, digest in paths.items())
+
+    def _hash(self, paths: list[Path]) -> dict[Path, str]:
+        if not paths:
+            return {}
+        return hash_files(paths, cache=self._digest_cache)
+
+    def _relative(self, path: Path) -> str:
+        return path.relative_to(self.base_dir).as_posix()
+
+    def _entry_path(self, digest: str) -> Path:
+        return self.cache_dir / digest[:2] / f"{digest}.json"
+
+    def _load_entry(self, digest: str) -> Optional[dict[str, Any]]:
+        path = self._entry_path(digest)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            logger.warning("step_cache_entry_unreadable path=%s", path)
+            return None
+        if (
+            not isinstance(entry, dict)
+            or entry.get("schema_version") != STEP_CACHE_SCHEMA_VERSION
+            or entry.get("key") != digest
+            or not isinstance(entry.get("outputs"), dict)
+            or not isinstance(entry.get("files"), dict)
+        ):
+            return None
+        return entry
+
+
+def _utcnow() -> str:
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def _canonical_json(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False, allow_nan=False)
+
+
+def _write_json_atomic(path: Path, payload: dict[str, Any]) -> None:
+    handle, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(handle, "w", encoding="utf-8") as stream:
+            stream.write(json.dumps(payload, indent=2, sort_keys=True, ensure_ascii=False) + "\n")
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def _rebase(
+    value: Any,
+    *,
+    source_run_dir: Optional[str],
+    target_run_dir: Optional[str],
+    source_run_id: str,
+    run_id: str,
+) -> Any:
+    if isinstance(value, dict):
+        return {
+            key: _rebase(
+                item,
+                source_run_dir=source_run_dir,
+                target_run_dir=target_run_dir,
+                source_run_id=source_run_id,
+                run_id=run_id,
+            )
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [
+            _rebase(
+                item,
+                source_run_dir=source_run_dir,
+                target_run_dir=target_run_dir,
+                source_run_id=source_run_id,
+                run_id=run_id,
+            )
+            for item in value
+        ]
+    if not isinstance(value, str):
+        return value
+    if value == source_run_id:
+        return run_id
+    if source_run_dir and target_run_dir:
+        if value == source_run_dir:
+            return target_run_dir
+        if value.startswith(f"{source_run_dir}/"):
+            return target_run_dir + value[len(source_run_dir):]
+    return value
+
+
+def _rebased_document(
+    path: Path,
+    *,
+    source_run_dir: Optional[str],
+    target_run_dir: Optional[str],
+    source_run_id: str,
+    run_id: str,
+) -> Optional[bytes]:
+    """The bytes of JSON document *path* pointed at the new run, or ``None`` to copy it unchanged."""
+    if path.suffix.lower() != ".json":
+        return None
+    document = _read_document(path)
+    if not isinstance(document, (dict, list)):
+        return None
+    rebased = _rebase(
+        document,
+        source_run_dir=source_run_dir,
+        target_run_dir=target_run_dir,
+        source_run_id=source_run_id,
+        run_id=run_id,
+    )
+    if rebased == document:
+        return None
+    return (json.dumps(rebased, ensure_ascii=False, indent=2) + "\n").encode("utf-8")
+
+
+def _reflink(source: Path, target: Path) -> bool:
+    """Clone *source* to the new file *target*; ``False`` (and no *target*) where unsupported."""
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    try:
+        with source.open("rb") as src, target.open("xb") as dst:
+            fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+        return True
+    except OSError as error:
+        if error.errno == errno.EEXIST:
+            raise
+        target.unlink(missing_ok=True)
+        return False
+
+
+def _strings(value: Any) -> Iterator[str]:
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _strings(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _strings(item)
+
+
+def _resolve_reference(base_dir: Path, text: str) -> Optional[Path]:
+    text = text.strip()
+    if not text or len(text) > _MAX_PATH_CANDIDATE_LENGTH or "\n" in text or "\x00" in text:
+        return None
+    try:
+        candidate = (base_dir / text).resolve()
+        candidate.relative_to(base_dir)
+        return candidate if candidate.is_file() else None
+    except (OSError, ValueError):
+        return None
+
+
+def _referenced_files(value: Any, base_dir: Path, *, follow: bool) -> list[Path]:
+    """Regular files under *base_dir* named by strings in *value*.
+
+    With ``follow``, JSON documents and CSV/TSV sheets among them are searched
+    for further references, up to ``MAX_REFERENCE_DEPTH`` levels deep.
+    """
+    found: set[Path] = set()
+    frontier = [value]
+    for depth in range(MAX_REFERENCE_DEPTH + 1):
+        documents: list[Path] = []
+        for item in frontier:
+            for text in _strings(item):
+                path = _resolve_reference(base_dir, text)
+                if path is None or path in found:
+                    continue
+                found.add(path)
+                if follow and path.suffix.lower() in _FOLLOWED_SUFFIXES:
+                    documents.append(path)
+        if not documents or depth == MAX_REFERENCE_DEPTH:
+            break
+        frontier = [parsed for parsed in map(_read_document, documents) if parsed is not None]
+    return sorted(found)
+
+
+def _read_document(path: Path) -> Any:
+    try:
+        if path.stat().st_size > MAX_FOLLOWED_DOCUMENT_BYTES:
+            return None
+        with path.open("r", encoding="utf-8", newline="") as handle:
+            delimiter = _FOLLOWED_SUFFIXES[path.suffix.lower()]
+            if delimiter is None:
+                return json.load(handle)
+            return list(csv.reader(handle, delimiter=delimiter))
+    except (OSError, UnicodeDecodeError, ValueError, csv.Error):
+        return None
+
+
+def _library_roots() -> tuple[Path, ...]:
+    roots = set()
+    for name in ("stdlib", "platstdlib", "purelib", "platlib"):
+        location = sysconfig.get_path(name)
+        if location:
+            roots.add(Path(location).resolve())
+    return tuple(roots)
+
+
+_LIBRARY_ROOTS = _library_roots()
+
+
+def _project_module_files(module: ModuleType) -> list[Path]:
+    """Source files of *module* and the project modules reachable from its globals."""
+    files: set[Path] = set()
+    seen: set[str] = set()
+    pending = [module]
+    while pending:
+        current = pending.pop()
+        if current.__name__ in seen:
+            continue
+        seen.add(current.__name__)
+        location = getattr(current, "__file__", None)
+        if not location:
+            continue
+        path = Path(location).resolve()
+        if path.suffix != ".py" or any(path.is_relative_to(root) for root in _LIBRARY_ROOTS):
+            continue
+        files.add(path)
+        for value in list(vars(current).values()):
+            if isinstance(value, ModuleType):
+                pending.append(value)
+                continue
+            owner = sys.modules.get(getattr(value, "__module__", None) or "")
+            if owner is not None:
+                pending.append(owner)
+    return sorted(files)
@@ -26,7 +26,9 @@ class TurnLedger:
     When constructed with ``session_manager``/``session_id``/``request_id``/
     ``user_message`` the ledger also owns finalize-time persistence: the user
     message is written once on demand and assistant segments are written from
-    the ``TurnResult`` produced by ``finalize``.
+    the ``TurnResult`` produced by ``finalize``. ``snapshot`` is the turn's
+    ``SessionSnapshot``; the batch is written back through it so the session
+    is not parsed again at the end of the turn.
     """
 
     def __init__(
@@ -36,6 +38,7 @@ class TurnLedger:
         session_id: Optional[str] = None,
         request_id: Optional[str] = None,
         user_message: Optional[str] = None,
+        snapshot: Any = None,
     ) -> None:
         self._segments: list[TurnSegment] = []
         self._current_content: list[str] = []
@@ -45,6 +48,7 @@ class TurnLedger:
         self._session_id = session_id
         self._request_id = request_id
         self._user_message = user_message
+        self._snapshot = snapshot
         self._user_message_saved = False
         self._persisted_segment_count = 0
 
@@ -186,7 +190,12 @@ class TurnLedger:
         if not pending:
             return
 
-        self._session_manager.save_messages_batch(self._session_id, pending)
+        if self._snapshot is None:
+            self._session_manager.save_messages_batch(self._session_id, pending)
+        else:
+            self._session_manager.save_messages_batch(
+                self._session_id, pending, snapshot=self._snapshot
+            )
         self._user_message_saved = True
         self._persisted_segment_count = len(all_segments)
 
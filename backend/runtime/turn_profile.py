@@ -0,0 +1,290 @@
+"""Per-turn phase timing.
+
+When ``turn_profile.enabled`` is on, ``QueryEngine.stream_turn_sse`` opens a
+:class:`TurnProfile` for the turn and makes it current through a context
+variable. Code on the turn path marks its phases with :func:`turn_phase`
+(``with turn_phase("skill_routing"): ...``). Spans nest through the same
+context variable, so a tool dispatched from a LangGraph task lands under
+whatever span was open when the task was created. Phases that happen once per
+event (SSE serialization) are accumulated into a single span with a count
+instead of one span each.
+
+With no active profile :func:`turn_phase` is one context-variable read that
+returns a shared no-op context manager, so a disabled profile costs nothing
+measurable.
+
+A finished profile is surfaced three ways: the ``turn_profile`` runtime event
+emitted before ``done`` (:meth:`TurnProfile.to_event`), the
+``bioapex_turn_phase_duration_seconds`` histogram, and, when
+``turn_profile.otlp_file`` is on, one OTLP/JSON ``ExportTraceServiceRequest``
+per turn appended to ``storage/traces/turn-profiles-<date>.jsonl``, the
+layout the OpenTelemetry collector's file exporter writes and its
+``otlpjsonfile`` receiver reads.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import itertools
+import json
+import logging
+import threading
+import time
+import uuid
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, ContextManager, Iterator, Optional
+
+from runtime.metrics_collector import METRICS
+
+TURN_PROFILE_TRACE_DIR = Path("storage") / "traces"
+TURN_PROFILE_SERVICE_NAME = "bioapex"
+TURN_PROFILE_SCOPE_NAME = "bioapex.turn_profile"
+_ROOT_SPAN_ID = 0
+
+logger = logging.getLogger(__name__)
+
+_ACTIVE_PROFILE: ContextVar[Optional["TurnProfile"]] = ContextVar(
+    "bioapex_turn_profile",
+    default=None,
+)
+_PARENT_SPAN: ContextVar[int] = ContextVar("bioapex_turn_profile_span", default=_ROOT_SPAN_ID)
+_NO_PHASE: ContextManager[None] = nullcontext()
+_export_lock = threading.Lock()
+
+
+@dataclass
+class PhaseSpan:
+    span_id: int
+    parent_id: int
+    name: str
+    start_ns: int
+    duration_ns: int
+    count: int = 1
+    attributes: Optional[dict[str, str]] = None
+
+
+class TurnProfile:
+    """Nested phase timings for one chat turn."""
+
+    def __init__(self, *, request_id: str, session_id: Optional[str] = None) -> None:
+        self.request_id = request_id
+        self.session_id = session_id
+        self.started_ns = time.perf_counter_ns()
+        self.started_unix_ns = time.time_ns()
+        self.ended_ns: Optional[int] = None
+        self._span_ids = itertools.count(_ROOT_SPAN_ID + 1)
+        self._lock = threading.Lock()
+        self._spans: list[PhaseSpan] = []
+        self._accumulated: dict[str, PhaseSpan] = {}
+
+    @contextmanager
+    def span(self, name: str, **attributes: str) -> Iterator[None]:
+        """Time the enclosed block as ``name``, nested under the current span."""
+        span_id = next(self._span_ids)
+        parent_id = _PARENT_SPAN.get()
+        token = _PARENT_SPAN.set(span_id)
+        started = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            ended = time.perf_counter_ns()
+            try:
+                _PARENT_SPAN.reset(token)
+            except ValueError:
+                # Exited from a different context than it was entered in.
+                _PARENT_SPAN.set(parent_id)
+            self._append(
+                PhaseSpan(span_id, parent_id, name, started, ended - started, attributes=attributes or None)
+            )
+
+    def record(self, name: str, started_ns: int, ended_ns: int, **attributes: str) -> None:
+        """Add a span timed by the caller, for phases that cannot be a ``with`` block."""
+        self._append(
+            PhaseSpan(
+                next(self._span_ids),
+                _PARENT_SPAN.get(),
+                name,
+                started_ns,
+                max(0, ended_ns - started_ns),
+                attributes=attributes or None,
+            )
+        )
+
+    def accumulate(self, name: str, started_ns: int, ended_ns: int) -> None:
+        """Fold one occurrence of a high-frequency phase into its per-turn span."""
+        duration = max(0, ended_ns - started_ns)
+        with self._lock:
+            span = self._accumulated.get(name)
+            if span is None:
+                self._accumulated[name] = PhaseSpan(
+                    next(self._span_ids), _ROOT_SPAN_ID, name, started_ns, duration
+                )
+                return
+            span.duration_ns += duration
+            span.count += 1
+
+    def finish(self) -> None:
+        if self.ended_ns is None:
+            self.ended_ns = time.perf_counter_ns()
+
+    @property
+    def total_ns(self) -> int:
+        ended = self.ended_ns if self.ended_ns is not None else time.perf_counter_ns()
+        return ended - self.started_ns
+
+    def spans(self) -> list[PhaseSpan]:
+        """Finished spans plus accumulated phases, in start order."""
+        with self._lock:
+            spans = [*self._spans, *self._accumulated.values()]
+        return sorted(spans, key=lambda span: (span.start_ns, span.span_id))
+
+    def to_event(self) -> dict[str, Any]:
+        """The ``turn_profile`` runtime event payload (finishes the profile)."""
+        self.finish()
+        phases: list[dict[str, Any]] = []
+        for span in self.spans():
+            phase: dict[str, Any] = {
+                "name": span.name,
+                "span_id": span.span_id,
+                "parent_id": span.parent_id,
+                "start_ms": round((span.start_ns - self.started_ns) / 1e6, 3),
+                "duration_ms": round(span.duration_ns / 1e6, 3),
+            }
+            if span.count != 1:
+                phase["count"] = span.count
+            if span.attributes:
+                phase["attributes"] = dict(span.attributes)
+            phases.append(phase)
+        return {
+            "type": "turn_profile",
+            "total_ms": round(self.total_ns / 1e6, 3),
+            "phases": phases,
+        }
+
+    def to_otlp(self) -> dict[str, Any]:
+        """One OTLP/JSON ``ExportTraceServiceRequest`` holding this turn's spans."""
+        self.finish()
+        trace_id = _trace_id(self.request_id)
+
+        def unix_nanos(perf_ns: int) -> str:
+            return str(self.started_unix_ns + perf_ns - self.started_ns)
+
+        def otlp_span(span: PhaseSpan) -> dict[str, Any]:
+            attributes = [
+                {"key": key, "value": {"stringValue": str(value)}}
+                for key, value in sorted((span.attributes or {}).items())
+            ]
+            if span.count != 1:
+                attributes.append({"key": "bioapex.phase.count", "value": {"intValue": str(span.count)}})
+            payload: dict[str, Any] = {
+                "traceId": trace_id,
+                "spanId": f"{span.span_id + 1:016x}",
+                "name": span.name,
+                "kind": 1,
+                "startTimeUnixNano": unix_nanos(span.start_ns),
+                "endTimeUnixNano": unix_nanos(span.start_ns + span.duration_ns),
+                "attributes": attributes,
+            }
+            if span.span_id != _ROOT_SPAN_ID:
+                payload["parentSpanId"] = f"{span.parent_id + 1:016x}"
+            return payload
+
+        root_attributes = {"bioapex.request_id": self.request_id}
+        if self.session_id:
+            root_attributes["bioapex.session_id"] = self.session_id
+        root = PhaseSpan(_ROOT_SPAN_ID, _ROOT_SPAN_ID, "turn", self.started_ns, self.total_ns, attributes=root_attributes)
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [
+                            {"key": "service.name", "value": {"stringValue": TURN_PROFILE_SERVICE_NAME}}
+                        ]
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": TURN_PROFILE_SCOPE_NAME},
+                            "spans": [otlp_span(span) for span in (root, *self.spans())],
+                        }
+                    ],
+                }
+            ]
+        }
+
+    def _append(self, span: PhaseSpan) -> None:
+        with self._lock:
+            self._spans.append(span)
+
+
+def _trace_id(request_id: str) -> str:
+    try:
+        return uuid.UUID(request_id).hex
+    except ValueError:
+        return hashlib.sha256(request_id.encode("utf-8")).hexdigest()[:32]
+
+
+def active_turn_profile() -> Optional[TurnProfile]:
+    return _ACTIVE_PROFILE.get()
+
+
+def turn_phase(name: str, **attributes: str) -> ContextManager[None]:
+    """Time a block as phase ``name`` of the current turn; a no-op when not profiling."""
+    profile = _ACTIVE_PROFILE.get()
+    if profile is None:
+        return _NO_PHASE
+    return profile.span(name, **attributes)
+
+
+@contextmanager
+def turn_profile_scope(profile: Optional[TurnProfile]) -> Iterator[None]:
+    """Make ``profile`` the current turn's profile for the enclosed block."""
+    if profile is None:
+        yield
+        return
+    token = _ACTIVE_PROFILE.set(profile)
+    parent_token = _PARENT_SPAN.set(_ROOT_SPAN_ID)
+    try:
+        yield
+    finally:
+        _PARENT_SPAN.reset(parent_token)
+        _ACTIVE_PROFILE.reset(token)
+
+
+def turn_profile_trace_path(base_dir: Path, *, recorded_at: Optional[datetime] = None) -> Path:
+    day = (recorded_at or datetime.now(timezone.utc)).astimezone(timezone.utc).strftime("%Y-%m-%d")
+    return Path(base_dir) / TURN_PROFILE_TRACE_DIR / f"turn-profiles-{day}.jsonl"
+
+
+def record_turn_profile(profile: TurnProfile, *, base_dir: Optional[Path] = None) -> None:
+    """Finish ``profile``, observe its phases, and export it when ``base_dir`` is given."""
+    profile.finish()
+    METRICS.observe_turn_phases(
+        [("turn", profile.total_ns / 1e9)]
+        + [(span.name, span.duration_ns / 1e9) for span in profile.spans()]
+    )
+    if base_dir is None:
+        return
+    path = turn_profile_trace_path(base_dir)
+    line = json.dumps(profile.to_otlp(), separators=(",", ":")) + "\n"
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with _export_lock, path.open("a", encoding="utf-8") as handle:
+            handle.write(line)
+    except OSError:
+        logger.warning("turn_profile_export_failed path=%s", path, exc_info=True)
+
+
+__all__ = [
+    "PhaseSpan",
+    "TURN_PROFILE_TRACE_DIR",
+    "TurnProfile",
+    "active_turn_profile",
+    "record_turn_profile",
+    "turn_phase",
+    "turn_profile_scope",
+    "turn_profile_trace_path",
+]
@@ -1,12 +1,19 @@
 """Minimal workflow step runner that drives typed step events.
 
-Purpose of this module is narrow: iterate the declared steps of a
-``WorkflowSpec``, invoke each step's Python executor, and emit the three
-step-level ``RuntimeEvent`` shapes (``workflow_step_started``,
-``workflow_step_ended``, ``workflow_step_failed``) through an ``emit``
-callback. The emitter is transport-neutral — the SSE adapter wraps it in the
-standard envelope via ``dump_runtime_event`` the same way every other runtime
-event goes out.
+Purpose of this module is narrow: schedule the declared steps of a
+``WorkflowSpec`` along their dependency graph, invoke each step's Python
+executor, and emit the three step-level ``RuntimeEvent`` shapes
+(``workflow_step_started``, ``workflow_step_ended``, ``workflow_step_failed``)
+through an ``emit`` callback. The emitter is transport-neutral — the SSE
+adapter wraps it in the standard envelope via ``dump_runtime_event`` the same
+way every other runtime event goes out.
+
+A step depends on its ``prerequisites`` and on every step whose outputs its
+inputs bind to. Steps whose dependencies have all succeeded run concurrently
+on a bounded thread pool, so independent branches (per-sample QC, say) no
+longer wait for one another. Events from concurrent steps interleave, but
+each step's own events keep their order and shape, and ``step_index`` is
+still the step's position in ``spec.steps``.
 
 This intentionally does NOT replicate the full DAG runner described in
 ``context/features/10-internal-dag-runner-mvp-spec.md``: no artifact
@@ -17,12 +24,19 @@ workflow spec.
 """
 from __future__ import annotations
 
+import heapq
+import logging
+import threading
 import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextvars import copy_context
 from dataclasses import dataclass, field
 from importlib import import_module
-from pathlib import Path
+from pathlib import Path, PurePosixPath
 from typing import Any, Callable, Literal, Optional
 
+from artifacts.registry import artifact_registry_batch, defer_artifact_registry_refresh
+from runtime.step_cache import StepCacheHit, StepCacheKey, StepResultCache
 from workflow_specs import (
     LiteralBindingSource,
     PythonExecutor,
@@ -34,19 +48,33 @@ from workflow_specs import (
 
 EmitFn = Callable[[dict[str, Any]], None]
 
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_PARALLEL_STEPS = 4
+
 
 @dataclass
 class ExecutionContext:
     """Runtime context passed to each Python step executor.
 
     Mirrors the attribute surface the existing runners under
-    ``workflows/runners/`` already rely on (``base_dir``, ``relative_path``).
+    ``workflows/runners/`` already rely on (``base_dir``, ``relative_path``,
+    and ``run_dir``/``relative_run_dir`` when the run has a directory).
     """
 
     base_dir: Path
     run_id: str
     workflow_id: str
     step_id: str
+    relative_run_dir: Optional[PurePosixPath] = None
+
+    @property
+    def run_dir(self) -> Path:
+        if self.relative_run_dir is None:
+            raise AttributeError(
+                f"Run {self.run_id!r} has no run directory; pass relative_run_dir to run_workflow."
+            )
+        return self.base_dir / self.relative_run_dir
 
     def relative_path(self, value: Any) -> str:
         raw = Path(str(value))
@@ -66,6 +94,7 @@ class StepOutcome:
     error: Optional[str] = None
     duration_ms: int = 0
     attempts: int = 1
+    cache_hit: Optional[StepCacheHit] = None
 
 
 @dataclass
@@ -135,6 +164,73 @@ def _load_python_executor(executor: PythonExecutor) -> Callable[..., Any]:
         ) from exc
 
 
+def _step_dependencies(step: WorkflowStepDefinition, known_step_ids: set[str]) -> set[str]:
+    dependencies = set(step.prerequisites)
+    dependencies.update(
+        binding.source.step_id
+        for binding in step.inputs
+        if isinstance(binding.source, StepOutputSource)
+    )
+    dependencies.discard(step.id)
+    # Unknown ids are left to ``_resolve_input`` to report as a step failure.
+    return dependencies & known_step_ids
+
+
+# The step cache is an optimisation: failing to key, restore or store an
+# entry logs and falls back to running the step, never fails it.
+
+
+def _step_cache_key(
+    cache: StepResultCache,
+    step: WorkflowStepDefinition,
+    *,
+    spec: WorkflowSpec,
+    resolved_inputs: dict[str, Any],
+) -> Optional[StepCacheKey]:
+    try:
+        return cache.key_for(
+            workflow_id=spec.workflow_id,
+            step_id=step.id,
+            module=step.executor.module,
+            function=step.executor.function,
+            resolved_inputs=resolved_inputs,
+        )
+    except Exception:
+        logger.warning("workflow_step_cache_key_failed step_id=%s", step.id, exc_info=True)
+        return None
+
+
+def _restore_cached_step(
+    cache: StepResultCache,
+    key: StepCacheKey,
+    *,
+    context: ExecutionContext,
+) -> Optional[StepCacheHit]:
+    try:
+        hit = cache.restore(key, run_id=context.run_id, relative_run_dir=context.relative_run_dir)
+    except Exception:
+        logger.warning("workflow_step_cache_restore_failed step_id=%s", context.step_id, exc_info=True)
+        return None
+    if hit is not None:
+        for relative_path in [item["target"] for item in hit.materialized] + [hit.provenance_path]:
+            if relative_path:
+                defer_artifact_registry_refresh(context.base_dir, relative_path)
+    return hit
+
+
+def _store_cached_step(
+    cache: StepResultCache,
+    key: StepCacheKey,
+    outputs: dict[str, Any],
+    *,
+    context: ExecutionContext,
+) -> None:
+    try:
+        cache.store(key, outputs, run_id=context.run_id, relative_run_dir=context.relative_run_dir)
+    except Exception:
+        logger.warning("workflow_step_cache_store_failed step_id=%s", context.step_id, exc_info=True)
+
+
 def run_workflow(
     spec: WorkflowSpec,
     inputs: dict[str, Any],
@@ -142,8 +238,27 @@ def run_workflow(
     base_dir: Path | str,
     run_id: str,
     emit: EmitFn,
+    max_parallel_steps: Optional[int] = None,
+    relative_run_dir: str | PurePosixPath | None = None,
+    step_cache: Optional[StepResultCache] = None,
 ) -> WorkflowRunResult:
-    """Execute every step in ``spec.steps`` in declared order.
+    """Execute the steps of ``spec`` in dependency order, up to
+    ``max_parallel_steps`` (default ``DEFAULT_MAX_PARALLEL_STEPS``) at a time.
+
+    Ready steps start in declared order, so ``max_parallel_steps=1`` runs a
+    spec whose prerequisites precede their dependents exactly as declared.
+
+    A failed step's dependents never run and are reported as ``skipped``.
+    ``fail_workflow`` and ``block_workflow`` failures additionally stop any
+    new step from starting; steps already running finish and keep their
+    outcome. ``continue_with_warning`` failures leave independent branches
+    running.
+
+    With a ``step_cache``, a step whose code, inputs and input files match an
+    earlier run reuses that run's outputs instead of executing (see
+    ``runtime.step_cache``); its outcome carries the ``cache_hit`` record.
+    ``relative_run_dir`` (relative to ``base_dir``) is exposed to executors
+    as ``context.run_dir`` and is where reused files are placed.
 
     Only ``python`` executors are supported today; spec-level validation already
     establishes that steps declare their executor type, so attempts to run a
@@ -151,44 +266,88 @@ def run_workflow(
     swallowed silently.
     """
     base_path = Path(base_dir)
-    total = len(spec.steps)
-    outcomes: list[StepOutcome] = []
+    run_dir = None if relative_run_dir is None else PurePosixPath(relative_run_dir)
+    steps = list(spec.steps)
+    total = len(steps)
+    index_by_id = {step.id: index for index, step in enumerate(steps)}
+    dependents: dict[str, list[str]] = {step.id: [] for step in steps}
+    waiting_on: dict[str, int] = {}
+    for step in steps:
+        dependencies = _step_dependencies(step, set(index_by_id))
+        waiting_on[step.id] = len(dependencies)
+        for dependency in dependencies:
+            dependents[dependency].append(step.id)
+
+    ready = [index for index, step in enumerate(steps) if not waiting_on[step.id]]
+    heapq.heapify(ready)
+    outcomes: dict[str, StepOutcome] = {}
     step_outputs: dict[str, dict[str, Any]] = {}
     workflow_status: Literal["ok", "failed"] = "ok"
     aborted = False
 
-    for index, step in enumerate(spec.steps, start=1):
-        if aborted:
-            outcomes.append(StepOutcome(step_id=step.id, status="skipped"))
-            continue
-
-        outcome = _execute_step(
-            step,
-            spec=spec,
-            step_index=index,
-            total_steps=total,
-            workflow_inputs=inputs,
-            step_outputs=step_outputs,
-            base_dir=base_path,
-            run_id=run_id,
-            emit=emit,
-        )
-        outcomes.append(outcome)
-
-        if outcome.status == "ok":
-            step_outputs[step.id] = outcome.outputs
-            continue
-
-        workflow_status = "failed"
-        if step.failure_policy in ("fail_workflow", "block_workflow"):
-            aborted = True
-        # continue_with_warning: keep iterating.
+    # ``emit`` is called from worker threads; callers should never see two
+    # events delivered at once.
+    emit_lock = threading.Lock()
+
+    def emit_serialized(event: dict[str, Any]) -> None:
+        with emit_lock:
+            emit(event)
+
+    workers = max(1, min(max_parallel_steps or DEFAULT_MAX_PARALLEL_STEPS, total or 1))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="workflow-step") as pool:
+        running: dict[Future[StepOutcome], WorkflowStepDefinition] = {}
+        while True:
+            # Only submit what can start now, so an abort never has queued
+            # steps to cancel.
+            while ready and not aborted and len(running) < workers:
+                index = heapq.heappop(ready)
+                step = steps[index]
+                future = pool.submit(
+                    copy_context().run,
+                    _execute_step,
+                    step,
+                    spec=spec,
+                    step_index=index + 1,
+                    total_steps=total,
+                    workflow_inputs=inputs,
+                    step_outputs=dict(step_outputs),
+                    base_dir=base_path,
+                    run_id=run_id,
+                    relative_run_dir=run_dir,
+                    step_cache=step_cache,
+                    emit=emit_serialized,
+                )
+                running[future] = step
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in sorted(done, key=lambda item: index_by_id[running[item].id]):
+                step = running.pop(future)
+                outcome = future.result()
+                outcomes[step.id] = outcome
+
+                if outcome.status == "ok":
+                    step_outputs[step.id] = outcome.outputs
+                    for dependent in dependents[step.id]:
+                        waiting_on[dependent] -= 1
+                        if not waiting_on[dependent]:
+                            heapq.heappush(ready, index_by_id[dependent])
+                    continue
+
+                workflow_status = "failed"
+                if step.failure_policy in ("fail_workflow", "block_workflow"):
+                    aborted = True
+                # continue_with_warning: only this step's dependents are held back.
 
     return WorkflowRunResult(
         workflow_id=spec.workflow_id,
         run_id=run_id,
         status=workflow_status,
-        step_outcomes=outcomes,
+        step_outcomes=[
+            outcomes.get(step.id) or StepOutcome(step_id=step.id, status="skipped")
+            for step in steps
+        ],
     )
 
 
@@ -202,6 +361,8 @@ def _execute_step(
     step_outputs: dict[str, dict[str, Any]],
     base_dir: Path,
     run_id: str,
+    relative_run_dir: Optional[PurePosixPath],
+    step_cache: Optional[StepResultCache],
     emit: EmitFn,
 ) -> StepOutcome:
     max_attempts = step.retry_policy.max_attempts
@@ -247,8 +408,23 @@ def _execute_step(
                 run_id=run_id,
                 workflow_id=spec.workflow_id,
                 step_id=step.id,
+                relative_run_dir=relative_run_dir,
             )
-            outputs = executor_fn(resolved_inputs, context)
+            cache_key = None
+            if step_cache is not None and step.cache_policy == "reuse":
+                cache_key = _step_cache_key(step_cache, step, spec=spec, resolved_inputs=resolved_inputs)
+            # Steps write many artifacts; index them with one registry
+            # append when the step returns instead of one per write.
+            with artifact_registry_batch(base_dir):
+                cache_hit = None
+                if cache_key is not None:
+                    cache_hit = _restore_cached_step(step_cache, cache_key, context=context)
+                if cache_hit is not None:
+                    outputs = cache_hit.outputs
+                else:
+                    outputs = executor_fn(resolved_inputs, context)
+                    if cache_key is not None and isinstance(outputs, dict):
+                        _store_cached_step(step_cache, cache_key, outputs, context=context)
         except Exception as exc:  # noqa: BLE001 — surface any runner failure as an event
             last_duration_ms = max(0, (time.perf_counter_ns() - start_ns) // 1_000_000)
             last_error = f"{type(exc).__name__}: {exc}"
@@ -301,6 +477,7 @@ def _execute_step(
             outputs=outputs_dict,
             duration_ms=duration_ms,
             attempts=attempt,
+            cache_hit=cache_hit,
         )
 
     # Unreachable: loop either returns on success or on terminal failure.
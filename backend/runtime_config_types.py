@@ -216,6 +216,41 @@ class MemoryIndexerModel(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
     max_sections_per_file: int = Field(default=64, ge=0)
+    embed_batch_size: int = Field(default=64, ge=1)
+    embed_max_workers: int = Field(default=4, ge=1)
+    embedding_cache_max_mb: int = Field(default=512, ge=1)
+
+
+class SessionStorageModel(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    format: Literal["json", "log"] = "json"
+    log_compact_min_kb: int = Field(default=256, ge=0)
+    index_flush_interval_ms: int = Field(default=250, ge=0)
+
+
+class AuditLogModel(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    async_writer: bool = True
+    queue_max_events: int = Field(default=10_000, ge=1)
+    batch_max_events: int = Field(default=512, ge=1)
+    durability: Literal["flush", "fsync"] = "flush"
+
+
+class MetricsModel(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    exposition_ttl_s: float = Field(default=1.0, ge=0)
+    shared_store: bool = False
+    publish_interval_s: float = Field(default=5.0, gt=0)
+
+
+class TurnProfileModel(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    enabled: bool = False
+    otlp_file: bool = False
 
 
 class RetentionModel(BaseModel):
@@ -271,6 +306,10 @@ class RuntimeConfigModel(BaseModel):
     skills: SkillsModel = Field(default_factory=SkillsModel)
     read_file_extra_roots: list[str] = Field(default_factory=list)
     memory_indexer: MemoryIndexerModel = Field(default_factory=MemoryIndexerModel)
+    session_storage: SessionStorageModel = Field(default_factory=SessionStorageModel)
+    audit_log: AuditLogModel = Field(default_factory=AuditLogModel)
+    metrics: MetricsModel = Field(default_factory=MetricsModel)
+    turn_profile: TurnProfileModel = Field(default_factory=TurnProfileModel)
     retention: RetentionModel = Field(default_factory=RetentionModel)
     api_rate_limits: dict[str, ApiRateLimitModel] = Field(default_factory=dict)
 
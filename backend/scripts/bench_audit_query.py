@@ -0,0 +1,159 @@
+"""Time audit-log queries over a synthetic year of events.
+
+Writes a year of daily, size-segmented audit logs into a temporary directory,
+times building every segment index once, then times a set of
+``query_audit_events`` calls three ways: the whole-file scan the indexed engine
+replaced, the indexed engine as a fresh process sees it (indexes loaded from
+their sidecars), and the indexed engine with warm indexes.  The indexed results
+are checked against the scan for every query.
+
+    python backend/scripts/bench_audit_query.py [--days 365] [--events-per-day 600]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from audit import query as audit_query  # noqa: E402
+from audit.store import (  # noqa: E402
+    AUDIT_LOG_DIR,
+    AUDIT_SEGMENT_MAX_BYTES,
+    AuditEventRecord,
+    _audit_segment_path,
+    _audit_segments_newest_first,
+    query_audit_events,
+)
+
+_EVENT_TYPES = ("tool_invoked", "chat_request_received", "file_written", "job_submitted", "compliance_decision")
+_QUERIES: tuple[tuple[str, dict[str, Any]], ...] = (
+    ("latest 100", {}),
+    ("event_type", {"event_type": "job_submitted"}),
+    ("session, 1000", {"session_id": "session-00042", "limit": 1000}),
+    ("rare session", {"session_id": "session-rare"}),
+    ("tool+outcome", {"tool_name": "terminal", "outcome": "blocked", "limit": 1000}),
+    ("no match", {"job_id": "job-missing"}),
+)
+
+
+def _write_year(base_dir: Path, *, days: int, events_per_day: int, seed: int) -> int:
+    rng = random.Random(seed)
+    audit_dir = base_dir / AUDIT_LOG_DIR
+    audit_dir.mkdir(parents=True)
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    total_bytes = 0
+    for day in range(days):
+        day_start = start + timedelta(days=day)
+        segment, size = 0, 0
+        lines: list[str] = []
+
+        def flush() -> None:
+            path = _audit_segment_path(audit_dir / f"events-{day_start:%Y-%m-%d}.jsonl", segment)
+            path.write_text("".join(lines), encoding="utf-8")
+
+        for index in range(events_per_day):
+            event_type = rng.choice(_EVENT_TYPES)
+            session_id = "session-rare" if (day, index) == (3, 7) else f"session-{rng.randrange(500):05d}"
+            record = {
+                "contract_version": "audit_event.v1",
+                "event_id": str(uuid.UUID(int=rng.getrandbits(128))),
+                "event_type": event_type,
+                "recorded_at": (day_start + timedelta(seconds=index * 86_400 // events_per_day)).isoformat(),
+                "summary": f"Synthetic {event_type} {index}",
+                "outcome": rng.choice(["ok", "ok", "ok", "blocked", "error"]),
+                "session_id": session_id,
+                "run_id": f"run-{rng.randrange(2_000)}",
+                "step_id": None,
+                "job_id": f"job-{rng.randrange(10_000)}" if event_type == "job_submitted" else None,
+                "workflow_id": None,
+                "tool_name": rng.choice(["terminal", "read_file", "write_file", "python_repl"]),
+                "actor": "system",
+                "artifact_paths": [f"artifacts/run-{index}/report.html"],
+                "external_systems": [],
+                "redaction_policy": "audit_redaction.v1",
+                "details": {"duration_ms": rng.randrange(5_000), "message_chars": rng.randrange(4_000)},
+            }
+            line = json.dumps(record, ensure_ascii=False) + "\n"
+            if size >= AUDIT_SEGMENT_MAX_BYTES:
+                flush()
+                segment, size, lines = segment + 1, 0, []
+            lines.append(line)
+            size += len(line.encode("utf-8"))
+            total_bytes += len(line.encode("utf-8"))
+        flush()
+    return total_bytes
+
+
+def _full_scan(base_dir: Path, *, limit: int = 100, **filters: Any) -> list[AuditEventRecord]:
+    events: list[AuditEventRecord] = []
+    for path in _audit_segments_newest_first(base_dir / AUDIT_LOG_DIR):
+        for line in reversed(path.read_text(encoding="utf-8").splitlines()):
+            stripped = line.strip()
+            if not stripped:
+                continue
+            try:
+                record = AuditEventRecord.model_validate_json(stripped)
+            except Exception:
+                continue
+            if any(getattr(record, name) != value for name, value in filters.items()):
+                continue
+            events.append(record)
+            if len(events) >= limit:
+                return events
+    return events
+
+
+def _timed(function: Any, *args: Any, **kwargs: Any) -> tuple[float, list[AuditEventRecord]]:
+    started = time.perf_counter()
+    result = function(*args, **kwargs)
+    return time.perf_counter() - started, result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--events-per-day", type=int, default=600)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base_dir = Path(tmp)
+        total_bytes = _write_year(base_dir, days=args.days, events_per_day=args.events_per_day, seed=args.seed)
+        segments = len(_audit_segments_newest_first(base_dir / AUDIT_LOG_DIR))
+        print(
+            f"{args.days * args.events_per_day} events, {segments} segments, "
+            f"{total_bytes / 1024 / 1024:.1f} MiB"
+        )
+
+        build_seconds, _ = _timed(query_audit_events, base_dir, job_id="job-missing")
+        print(f"cold index build: {build_seconds:.2f}s")
+        audit_query._loaded_indexes.clear()
+
+        print(f"{'query':>14} {'results':>7} {'scan':>9} {'reopen':>9} {'warm':>9}")
+        for label, kwargs in _QUERIES:
+            scan_seconds, expected = _timed(_full_scan, base_dir, **kwargs)
+            audit_query._loaded_indexes.clear()
+            reopen_seconds, reopened = _timed(query_audit_events, base_dir, **kwargs)
+            warm_seconds, warm = _timed(query_audit_events, base_dir, **kwargs)
+            expected_ids = [event.event_id for event in expected]
+            if any([event.event_id for event in result] != expected_ids for result in (reopened, warm)):
+                print(f"{label}: indexed results differ from the full scan", file=sys.stderr)
+                return 1
+            print(
+                f"{label:>14} {len(expected):>7} {scan_seconds:>8.3f}s {reopen_seconds:>8.3f}s {warm_seconds:>8.3f}s"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
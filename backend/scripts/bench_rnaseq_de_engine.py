@@ -0,0 +1,124 @@
+"""Time the RNA-seq differential-expression engine across matrix sizes.
+
+Writes a synthetic count TSV per size into a temporary directory and times
+each stage ``plan_differential_expression`` runs: parsing the matrix TSV,
+reopening it from its binary sidecar, size-factor normalisation, batch
+mean-centring, Welch statistics, Benjamini-Hochberg adjustment and writing the
+normalised-counts TSV.
+
+    python backend/scripts/bench_rnaseq_de_engine.py [--genes 6000 20000 60000] [--samples 24 200]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from workflows.runners.count_matrix_io import (  # noqa: E402
+    read_count_matrix,
+    write_count_matrix,
+    write_matrix_tsv,
+)
+from workflows.runners.rnaseq_de_engine import (  # noqa: E402
+    batch_mean_center,
+    benjamini_hochberg,
+    normalize_counts,
+    welch_statistics,
+)
+
+_STAGES = ("read", "reopen", "normalize", "batch", "welch", "bh", "write")
+
+
+def _write_matrix(path: Path, *, genes: int, samples: int, seed: int) -> list[str]:
+    rng = np.random.default_rng(seed)
+    sample_ids = [f"S{index:04d}" for index in range(samples)]
+    means = rng.lognormal(3.0, 2.0, size=(genes, 1))
+    write_count_matrix(
+        path,
+        gene_ids=[f"ENSG{gene:011d}" for gene in range(genes)],
+        gene_symbols=[f"G{gene}" for gene in range(genes)],
+        sample_ids=sample_ids,
+        counts=rng.poisson(means, size=(genes, samples)),
+    )
+    return sample_ids
+
+
+def _measure(path: Path, sample_ids: list[str], *, batches: int) -> dict[str, float]:
+    timings: dict[str, float] = {}
+
+    started = time.perf_counter()
+    read_count_matrix(path, sample_ids, use_sidecar=False)
+    timings["read"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    table = read_count_matrix(path, sample_ids)
+    timings["reopen"] = time.perf_counter() - started
+
+    library_sizes = table.counts.sum(axis=0)
+    median_size = float(np.median(library_sizes))
+    size_factors = [round(int(size) / median_size, 6) for size in library_sizes.tolist()]
+    started = time.perf_counter()
+    normalized = normalize_counts(table.counts, size_factors)
+    timings["normalize"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    adjusted = batch_mean_center(normalized, [(f"b{index % batches}",) for index in range(len(sample_ids))])
+    timings["batch"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    statistics = welch_statistics(
+        normalized,
+        adjusted,
+        list(range(0, len(sample_ids), 2)),
+        list(range(1, len(sample_ids), 2)),
+    )
+    timings["welch"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    benjamini_hochberg(statistics.p_value)
+    timings["bh"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    write_matrix_tsv(
+        path.with_suffix(".normalized.tsv"),
+        gene_ids=table.gene_ids,
+        gene_symbols=table.gene_symbols,
+        sample_ids=sample_ids,
+        values=normalized,
+    )
+    timings["write"] = time.perf_counter() - started
+    return timings
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--genes", type=int, nargs="+", default=[6_000, 20_000, 60_000])
+    parser.add_argument("--samples", type=int, nargs="+", default=[24, 200])
+    parser.add_argument("--batches", type=int, default=4)
+    args = parser.parse_args()
+
+    print(f"{'genes':>7} {'samples':>7} " + " ".join(f"{stage:>9}" for stage in _STAGES) + f" {'total':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for samples in args.samples:
+            for genes in args.genes:
+                path = Path(tmp) / f"counts_{genes}x{samples}.tsv"
+                sample_ids = _write_matrix(path, genes=genes, samples=samples, seed=genes + samples)
+                timings = _measure(path, sample_ids, batches=args.batches)
+                print(
+                    f"{genes:>7} {samples:>7} "
+                    + " ".join(f"{timings[stage]:>8.3f}s" for stage in _STAGES)
+                    + f" {sum(timings.values()):>8.3f}s"
+                )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,116 @@
+"""Count session-file JSON parses per chat turn, with and without a snapshot.
+
+Drives the session I/O that ``QueryEngine.stream_turn_sse`` performs around a
+turn — runtime-config stamp, ``auto_compress_if_needed``,
+``maybe_compact_turn_boundary``, prompt history, and the ``TurnLedger``
+write-back — against a seeded session in a temporary directory. No LLM is
+called: the session is kept below every compaction threshold, which is the
+common case per turn.
+
+    python backend/scripts/bench_session_turn_reads.py [--messages 400] [--turns 20]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from graph.session import session_store  # noqa: E402
+from graph.session_manager import SessionManager  # noqa: E402
+from runtime.compaction import maybe_compact_turn_boundary  # noqa: E402
+from runtime.turn_ledger import TurnLedger  # noqa: E402
+
+
+class _CountingJson:
+    """Stand-in for the ``json`` module inside ``session_store`` that counts parses."""
+
+    def __init__(self) -> None:
+        self.loads_calls = 0
+
+    def loads(self, *args: Any, **kwargs: Any) -> Any:
+        self.loads_calls += 1
+        return json.loads(*args, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(json, name)
+
+
+async def _run_turn(manager: SessionManager, session_id: str, *, use_snapshot: bool) -> None:
+    snapshot = manager.read_snapshot(session_id) if use_snapshot else None
+    kwargs: dict[str, Any] = {} if snapshot is None else {"snapshot": snapshot}
+
+    manager.stamp_runtime_config_snapshot(session_id, loaded_at=time.time(), **kwargs)
+    await manager.auto_compress_if_needed(session_id, None, **kwargs)
+    await maybe_compact_turn_boundary(manager, session_id, None, **kwargs)
+    manager.load_session_for_agent(session_id, **kwargs)
+
+    ledger = TurnLedger(
+        session_manager=manager,
+        session_id=session_id,
+        request_id="bench",
+        user_message="next question",
+        snapshot=snapshot,
+    )
+    ledger.consume({"type": "token", "content": "an answer"})
+    ledger.persist_segments(ledger.finalize(turn_status="ok"))
+
+
+async def _measure(
+    base_dir: Path, *, messages: int, turns: int, use_snapshot: bool, storage_format: str
+) -> tuple[float, float]:
+    manager = SessionManager(base_dir, storage_format=storage_format)
+    session_id = manager.create_session()
+    manager.save_messages_batch(
+        session_id,
+        [
+            {"role": "user" if i % 2 == 0 else "assistant", "content": f"message {i} " * 20}
+            for i in range(messages)
+        ],
+    )
+    counter = _CountingJson()
+    original = session_store.json
+    session_store.json = counter  # type: ignore[assignment]
+    try:
+        started = time.perf_counter()
+        for _ in range(turns):
+            await _run_turn(manager, session_id, use_snapshot=use_snapshot)
+        elapsed = time.perf_counter() - started
+    finally:
+        session_store.json = original  # type: ignore[assignment]
+    return counter.loads_calls / turns, elapsed * 1000 / turns
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=30, help="seeded history length")
+    parser.add_argument("--turns", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'format':<6} {'mode':<9} {'parses/turn':>12} {'ms/turn':>9}")
+    for storage_format in ("json", "log"):
+        for use_snapshot in (False, True):
+            with tempfile.TemporaryDirectory() as tmp:
+                parses, ms = asyncio.run(
+                    _measure(
+                        Path(tmp),
+                        messages=args.messages,
+                        turns=args.turns,
+                        use_snapshot=use_snapshot,
+                        storage_format=storage_format,
+                    )
+                )
+            mode = "snapshot" if use_snapshot else "per-call"
+            print(f"{storage_format:<6} {mode:<9} {parses:>12.1f} {ms:>9.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
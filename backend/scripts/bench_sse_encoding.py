@@ -0,0 +1,86 @@
+"""Time SSE frame encoding for runtime events.
+
+Encodes the same event payloads through the validated path
+(``dump_runtime_event`` + ``json.dumps``) and the trusted fast path
+``encode_runtime_event_sse(..., trusted=True)`` used by the query engine, checks
+that both produce identical frames, and reports events per second.
+
+    python backend/scripts/bench_sse_encoding.py [--events 50000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from runtime.events import encode_runtime_event_sse  # noqa: E402
+
+
+def _envelope(index: int) -> dict[str, Any]:
+    return {"request_id": "bench-request", "event_index": index + 1}
+
+
+def _token(index: int) -> dict[str, Any]:
+    return {"type": "token", "content": f"tok{index % 97} ", **_envelope(index)}
+
+
+def _tool_end(index: int) -> dict[str, Any]:
+    return {
+        "type": "tool_end",
+        "tool": "read_file",
+        "output": "line of output\n" * 8,
+        "run_id": f"run-{index % 13}",
+        "result": {"status": "success", "path": "data/counts.tsv", "rows": index, "preview": ["a", "b", "c"]},
+        **_envelope(index),
+    }
+
+
+def _mixed(index: int) -> dict[str, Any]:
+    # Roughly the shape of a tool-using turn: mostly tokens, some tool traffic.
+    kind = index % 20
+    if kind == 0:
+        return {"type": "tool_start", "tool": "terminal", "input": '{"command": "ls"}', "run_id": "run-1", **_envelope(index)}
+    if kind in (1, 2):
+        return {"type": "tool_chunk", "tool": "terminal", "run_id": "run-1", "chunk_index": index, "chunk": "out\n", **_envelope(index)}
+    if kind == 3:
+        return _tool_end(index)
+    return _token(index)
+
+
+_WORKLOADS: tuple[tuple[str, Callable[[int], dict[str, Any]]], ...] = (
+    ("token", _token),
+    ("tool_end", _tool_end),
+    ("mixed", _mixed),
+)
+
+
+def _rate(payloads: list[dict[str, Any]], *, trusted: bool) -> tuple[float, list[str]]:
+    started = time.perf_counter()
+    frames = [encode_runtime_event_sse(payload, trusted=trusted) for payload in payloads]
+    return len(payloads) / (time.perf_counter() - started), frames
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=50_000)
+    args = parser.parse_args()
+
+    print(f"{'workload':>9} {'validated ev/s':>15} {'trusted ev/s':>13} {'speedup':>8}")
+    for label, build in _WORKLOADS:
+        payloads = [build(index) for index in range(args.events)]
+        strict_rate, strict_frames = _rate(payloads, trusted=False)
+        trusted_rate, trusted_frames = _rate(payloads, trusted=True)
+        if trusted_frames != strict_frames:
+            print(f"{label}: trusted frames differ from validated frames", file=sys.stderr)
+            return 1
+        print(f"{label:>9} {strict_rate:>15,.0f} {trusted_rate:>13,.0f} {trusted_rate / strict_rate:>7.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
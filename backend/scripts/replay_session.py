@@ -310,6 +310,8 @@ def _normalize_session(session: dict[str, Any]) -> dict[str, Any]:
     normalized_messages: list[dict[str, Any]] = []
     for msg in messages:
         m = copy.deepcopy(msg)
+        # Derived from the content at write time; older recordings lack it.
+        m.pop("token_counts", None)
         if isinstance(m.get("request_id"), str):
             m["request_id"] = _ordinalize(m["request_id"], req_table, "req")
         if isinstance(m.get("blocks"), list):
@@ -0,0 +1,66 @@
+"""Snapshot plus append-only journal, the storage scheme shared by session logs
+(``graph.session.session_log``) and the artifact registry
+(``artifacts.registry_journal``).
+
+A JSON snapshot is rewritten rarely and every change in between is one line
+appended to a ``.jsonl`` journal next to it. The journal's first line is a
+header that pins it to one snapshot by ``(inode, size, mtime_ns)``::
+
+    {"snapshot": [ino, size, mtime_ns], ...}                        <- header
+    {...one change...}
+
+Rewriting the snapshot replaces the file atomically and therefore changes its
+fingerprint, so a journal whose header names another snapshot has already been
+folded in and is ignored. That makes "write snapshot, then reset journal"
+crash-safe without a second commit point. Readers only trust
+newline-terminated lines; a trailing line without ``\\n`` is an in-flight or
+torn append.
+
+The same fingerprint ties derived files to their source elsewhere, e.g. the
+count-matrix ``.npy`` sidecar to its TSV.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Optional
+
+# Compaction never triggers below this many journal bytes, however small the
+# snapshot; above it the journal is folded once it outgrows the snapshot, which
+# keeps compaction cost amortised O(1) per appended byte.
+DEFAULT_COMPACT_MIN_BYTES = 256 * 1024
+
+
+def snapshot_fingerprint(stat_result: os.stat_result) -> list[int]:
+    return [stat_result.st_ino, stat_result.st_size, stat_result.st_mtime_ns]
+
+
+def path_fingerprint(path: Path) -> list[int]:
+    return snapshot_fingerprint(path.stat())
+
+
+def journal_needs_compaction(journal_bytes: int, snapshot_bytes: int, *, min_bytes: int) -> bool:
+    return journal_bytes > max(min_bytes, snapshot_bytes)
+
+
+def encode_record(record: dict[str, Any]) -> bytes:
+    return (json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def parse_record(line: bytes) -> Optional[dict[str, Any]]:
+    """Decode one journal line; ``None`` for anything but a JSON object."""
+    try:
+        record = json.loads(line)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+    return record if isinstance(record, dict) else None
+
+
+def write_journal_header(journal_path: Path, header: dict[str, Any]) -> os.stat_result:
+    """Atomically replace *journal_path* with a journal holding only *header*."""
+    tmp = journal_path.with_name(journal_path.name + ".tmp")
+    tmp.write_bytes(encode_record(header))
+    tmp.replace(journal_path)
+    return journal_path.stat()
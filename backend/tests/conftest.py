@@ -1,7 +1,59 @@
 from __future__ import annotations
 
+import sys
+from pathlib import Path
+from typing import Optional
+
 import pytest
 
+_REPO_ROOT = Path(__file__).resolve().parents[2]
+
+
+def _is_repo_root(entry: str) -> bool:
+    try:
+        return Path(entry or ".").resolve() == _REPO_ROOT
+    except OSError:
+        return False
+
+
+def _workflows_shadowing() -> Optional[str]:
+    """Describe how the repo-root ``workflows`` package is shadowing llama-index's.
+
+    llama-index imports its own top-level ``workflows`` package. Once the
+    repo-root one is cached under that name, every later ``llama_index.core``
+    import in the session fails on ``workflows.context``, so whether those
+    tests pass depends on file order. Tests load runner modules through
+    ``tests.runner_modules`` instead.
+    """
+    module = sys.modules.get("workflows")
+    module_file = getattr(module, "__file__", None)
+    if module_file is not None and Path(module_file).resolve().parent == _REPO_ROOT / "workflows":
+        return "the repo-root workflows package was imported as top-level 'workflows'"
+    if module is None and any(_is_repo_root(entry) for entry in sys.path):
+        return "the repo root is on sys.path, so the next 'import workflows' finds the repo-root package"
+    return None
+
+
+_SHADOWING_HINT = "load workflow runners with tests.runner_modules.load_runner_module instead"
+
+
+def pytest_collection_finish(session: pytest.Session) -> None:
+    problem = _workflows_shadowing()
+    if problem is not None:
+        raise pytest.UsageError(f"After collection {problem}; {_SHADOWING_HINT}.")
+
+
+@pytest.fixture(autouse=True)
+def _no_workflows_shadowing():
+    yield
+    problem = _workflows_shadowing()
+    if problem is not None:
+        # Undo it so only the offending test fails, not every later one.
+        sys.path[:] = [entry for entry in sys.path if not _is_repo_root(entry)]
+        for name in [name for name in sys.modules if name == "workflows" or name.startswith("workflows.")]:
+            del sys.modules[name]
+        pytest.fail(f"After this test {problem}; {_SHADOWING_HINT}.", pytrace=False)
+
 
 @pytest.fixture(autouse=True)
 def _isolated_tool_trace_dir(monkeypatch, tmp_path):
@@ -0,0 +1,41 @@
+"""Load repo-root ``workflows/runners`` modules by file path.
+
+The repo-root ``workflows`` package shares its top-level name with
+llama-index's ``workflows`` dependency. Importing ``workflows.runners`` with
+the repo root on ``sys.path`` claims ``sys.modules["workflows"]`` for the rest
+of the session, and every later ``llama_index.core`` import then fails on
+``workflows.context`` (or the other way round, depending on which test file
+runs first). Loading the runner files under their own module names leaves
+``workflows`` to llama-index, so the result does not depend on test order.
+
+Only runners that import nothing from the ``workflows`` package itself can be
+loaded this way.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import sys
+from pathlib import Path
+from types import ModuleType
+
+RUNNERS_DIR = Path(__file__).resolve().parents[2] / "workflows" / "runners"
+
+
+def load_runner_module(name: str) -> ModuleType:
+    """Return ``workflows/runners/<name>.py`` loaded as ``workflow_runners_<name>``."""
+    module_name = f"workflow_runners_{name.strip('_')}"
+    module = sys.modules.get(module_name)
+    if module is not None:
+        return module
+    spec = importlib.util.spec_from_file_location(module_name, RUNNERS_DIR / f"{name}.py")
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    # Registered before executing so dataclasses can resolve the module.
+    sys.modules[module_name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        sys.modules.pop(module_name, None)
+        raise
+    return module
@@ -0,0 +1,334 @@
+"""Tests for the artifact registry's append-only journal and shared state."""
+
+import json
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from artifacts import registry as registry_module  # noqa: E402
+from artifacts.naming import prepare_run_directory  # noqa: E402
+from artifacts.registry import (  # noqa: E402
+    ARTIFACT_REGISTRY_PATH,
+    ArtifactRegistry,
+    ArtifactRegistrySnapshot,
+    artifact_registry_batch,
+    lookup_artifact_registry,
+    refresh_artifact_registry_path,
+)
+from artifacts.registry_journal import ARTIFACT_REGISTRY_JOURNAL_FILENAME, registry_write_lock  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def _fresh_process_state():
+    """Each test starts as a new process would, with no loaded registry."""
+    registry_module._registry_states.clear()
+    yield
+    registry_module._registry_states.clear()
+
+
+@pytest.fixture
+def layout(tmp_path):
+    return prepare_run_directory(
+        tmp_path,
+        "RNA Seq QC",
+        created_at=datetime(2026, 3, 18, 19, 2, 3, tzinfo=timezone.utc),
+        run_id="run-20260318T190203Z-deadbeef",
+    )
+
+
+def _registry_path(base_dir: Path) -> Path:
+    return base_dir / ARTIFACT_REGISTRY_PATH
+
+
+def _journal_path(base_dir: Path) -> Path:
+    return _registry_path(base_dir).with_name(ARTIFACT_REGISTRY_JOURNAL_FILENAME)
+
+
+def _paths(base_dir: Path) -> set[str]:
+    result = lookup_artifact_registry(base_dir, include_invalid=True)
+    return {record.path for record in result.records}
+
+
+def _write_outputs(layout, count: int) -> list[str]:
+    relpaths = []
+    existing = len(list((Path(layout.run_dir) / "outputs" / "generated").glob("table_*.tsv")))
+    for index in range(existing, existing + count):
+        layout.generated_output_path(f"table_{index}.tsv").write_text(f"gene\t{index}\n", encoding="utf-8")
+        relpaths.append(str(layout.generated_output_relpath(f"table_{index}.tsv")))
+    return relpaths
+
+
+class TestArtifactRegistryJournal:
+    def test_tracked_writes_append_without_rewriting_the_snapshot(self, layout, tmp_path):
+        _write_outputs(layout, 1)
+        snapshot_stat = _registry_path(tmp_path).stat()
+        journal_size = _journal_path(tmp_path).stat().st_size
+
+        relpaths = _write_outputs(layout, 5)
+
+        after = _registry_path(tmp_path).stat()
+        assert (after.st_ino, after.st_mtime_ns) == (snapshot_stat.st_ino, snapshot_stat.st_mtime_ns)
+        assert _journal_path(tmp_path).stat().st_size > journal_size
+        assert set(relpaths) <= _paths(tmp_path)
+
+    def test_another_process_replays_the_journal(self, layout, tmp_path):
+        relpaths = _write_outputs(layout, 3)
+
+        registry_module._registry_states.clear()
+        snapshot = ArtifactRegistry(tmp_path).ensure_snapshot()
+
+        assert set(relpaths) <= {record.path for record in snapshot.records}
+        assert snapshot.record_count == len(snapshot.records)
+
+    def test_registry_is_parsed_once_per_process(self, layout, tmp_path, monkeypatch):
+        _write_outputs(layout, 1)
+        registry_module._registry_states.clear()
+        calls = []
+        original = ArtifactRegistrySnapshot.model_validate_json.__func__
+
+        def counting(cls, *args, **kwargs):
+            calls.append(1)
+            return original(cls, *args, **kwargs)
+
+        monkeypatch.setattr(ArtifactRegistrySnapshot, "model_validate_json", classmethod(counting))
+
+        _write_outputs(layout, 10)
+        lookup_artifact_registry(tmp_path)
+
+        assert len(calls) == 1
+
+    def test_compaction_folds_the_journal_into_the_snapshot(self, layout, tmp_path):
+        relpaths = _write_outputs(layout, 2)
+        registry = ArtifactRegistry(tmp_path, journal_compact_min_bytes=0)
+        before = _registry_path(tmp_path).stat().st_ino
+
+        registry.refresh_path(relpaths[0])
+
+        assert _registry_path(tmp_path).stat().st_ino != before
+        header, *entries = _journal_path(tmp_path).read_text(encoding="utf-8").splitlines()
+        assert entries == []
+        assert "snapshot" in json.loads(header)
+        on_disk = ArtifactRegistrySnapshot.model_validate_json(_registry_path(tmp_path).read_text(encoding="utf-8"))
+        assert set(relpaths) <= {record.path for record in on_disk.records}
+
+    def test_journal_for_a_replaced_snapshot_is_ignored(self, layout, tmp_path):
+        relpaths = _write_outputs(layout, 2)
+        journal = _journal_path(tmp_path).read_bytes()
+        (tmp_path / relpaths[1]).unlink()
+        ArtifactRegistry(tmp_path).rebuild()
+        _journal_path(tmp_path).write_bytes(journal)
+
+        registry_module._registry_states.clear()
+
+        paths = _paths(tmp_path)
+        assert relpaths[0] in paths
+        assert relpaths[1] not in paths
+
+    def test_torn_tail_is_invisible_and_overwritten(self, layout, tmp_path):
+        relpaths = _write_outputs(layout, 1)
+        with open(_journal_path(tmp_path), "ab") as handle:
+            handle.write(b'{"at": "2026-03-18T19:02:03+00:00", "upsert": {"pa')
+
+        registry_module._registry_states.clear()
+        assert relpaths[0] in _paths(tmp_path)
+
+        more = _write_outputs(layout, 2)
+        registry_module._registry_states.clear()
+        assert set(more) <= _paths(tmp_path)
+        for line in _journal_path(tmp_path).read_text(encoding="utf-8").splitlines():
+            json.loads(line)
+
+    def test_deleted_artifact_is_recorded_as_invalid(self, layout, tmp_path):
+        relpaths = _write_outputs(layout, 2)
+        (tmp_path / relpaths[0]).unlink()
+
+        refresh_artifact_registry_path(tmp_path, relpaths[0])
+
+        registry_module._registry_states.clear()
+        by_path = {
+            record.path: record
+            for record in lookup_artifact_registry(tmp_path, include_invalid=True).records
+        }
+        assert by_path[relpaths[0]].status == "invalid"
+        assert by_path[relpaths[1]].status == "valid"
+
+    def test_corrupt_snapshot_is_rebuilt(self, layout, tmp_path):
+        relpaths = _write_outputs(layout, 2)
+        _registry_path(tmp_path).write_text("{not json", encoding="utf-8")
+
+        registry_module._registry_states.clear()
+
+        assert set(relpaths) <= _paths(tmp_path)
+
+
+class TestArtifactRegistryBatch:
+    def test_writes_are_indexed_in_one_append_at_scope_exit(self, layout, tmp_path, monkeypatch):
+        _write_outputs(layout, 1)
+        appends = []
+        original_append = registry_module.append_journal_entries
+
+        def counting_append(path, offset, entries):
+            appends.append(len(entries))
+            return original_append(path, offset, entries)
+
+        monkeypatch.setattr(registry_module, "append_journal_entries", counting_append)
+
+        with artifact_registry_batch(tmp_path):
+            relpaths = _write_outputs(layout, 4)
+            assert appends == []
+            assert not set(relpaths) & _paths(tmp_path)
+
+        assert appends == [4]
+        assert set(relpaths) <= _paths(tmp_path)
+
+    def test_scope_flushes_when_the_body_raises(self, layout, tmp_path):
+        with pytest.raises(RuntimeError):
+            with artifact_registry_batch(tmp_path):
+                relpaths = _write_outputs(layout, 2)
+                raise RuntimeError("step failed")
+
+        assert set(relpaths) <= _paths(tmp_path)
+
+    def test_nested_scopes_join_the_outermost(self, layout, tmp_path):
+        with artifact_registry_batch(tmp_path):
+            with artifact_registry_batch(tmp_path):
+                relpaths = _write_outputs(layout, 1)
+            assert relpaths[0] not in _paths(tmp_path)
+
+        assert relpaths[0] in _paths(tmp_path)
+
+    def test_ro_crate_entries_refresh_the_crate_once(self, layout, tmp_path, monkeypatch):
+        _write_outputs(layout, 1)
+        appends = []
+        original_append = registry_module.append_journal_entries
+
+        def counting_append(path, offset, entries):
+            appends.append([entry["upsert"]["path"] for entry in entries])
+            return original_append(path, offset, entries)
+
+        monkeypatch.setattr(registry_module, "append_journal_entries", counting_append)
+        crate = layout._track_path(Path(layout.run_dir) / "ro-crate")
+
+        with artifact_registry_batch(tmp_path):
+            crate.mkdir()
+            (crate / "ro-crate-metadata.json").write_text("{}\n", encoding="utf-8")
+            (crate / "README.md").write_text("crate\n", encoding="utf-8")
+
+        crate_relpath = str(layout.relative_run_dir / "ro-crate")
+        assert len(appends) == 1
+        assert appends[0].count(crate_relpath) == 1
+
+
+_SYNTHETIC_RECORD_COUNT = 100_000
+_SYNTHETIC_WORKFLOWS = ("rna-seq-qc", "differential-expression", "evidence-retrieval", "eln-export")
+_SYNTHETIC_TYPES = ("generated_output", "figure", "qa_report", "workflow_run", "evidence_card")
+
+
+def _synthetic_record(index: int) -> dict:
+    workflow = _SYNTHETIC_WORKFLOWS[index % len(_SYNTHETIC_WORKFLOWS)]
+    day = 1 + (index // 1000) % 28
+    run_id = f"run-202603{day:02d}T000000Z-{index // 50:08x}"
+    return {
+        "artifact_id": f"synthetic:{index}",
+        "artifact_type": _SYNTHETIC_TYPES[index % len(_SYNTHETIC_TYPES)],
+        "path": f"artifacts/{workflow}/2026-03-{day:02d}/{run_id}/outputs/generated/file_{index}.tsv",
+        "hash": f"{index:064x}",
+        "created_at": f"2026-03-{day:02d}T00:00:00Z",
+        "run_id": run_id,
+        "workflow": workflow,
+        "date": f"2026-03-{day:02d}",
+        "dataset_id": f"dataset-{index % 300}",
+        "status": "invalid" if index % 97 == 0 else "valid",
+        "error": "synthetic" if index % 97 == 0 else None,
+        "indexed_at": "2026-03-28T00:00:00Z",
+    }
+
+
+@pytest.fixture(scope="module")
+def synthetic_registry(tmp_path_factory):
+    """A base dir whose registry holds ``_SYNTHETIC_RECORD_COUNT`` records."""
+    base_dir = tmp_path_factory.mktemp("synthetic_registry")
+    records = [_synthetic_record(index) for index in range(_SYNTHETIC_RECORD_COUNT)]
+    registry_path = _registry_path(base_dir)
+    registry_path.parent.mkdir(parents=True)
+    registry_path.write_text(
+        json.dumps(
+            {
+                "generated_at": "2026-03-28T00:00:00Z",
+                "record_count": len(records),
+                "valid_count": sum(record["status"] == "valid" for record in records),
+                "invalid_count": sum(record["status"] == "invalid" for record in records),
+                "records": records,
+            }
+        ),
+        encoding="utf-8",
+    )
+    return base_dir, records
+
+
+class TestArtifactRegistryIndexedLookup:
+    def test_lookups_match_a_linear_scan(self, synthetic_registry):
+        base_dir, records = synthetic_registry
+        queries = [
+            {"run_id": records[12_345]["run_id"]},
+            {"artifact_type": "qa_report", "workflow": "rna-seq-qc", "date": "2026-03-05"},
+            {"dataset_id": "dataset-7", "artifact_type": "figure"},
+            {"dataset_id": "dataset-7", "include_invalid": True},
+            {"run_id": "run-20260301T000000Z-ffffffff"},
+        ]
+        for query in queries:
+            include_invalid = query.get("include_invalid", False)
+            filters = {key: value for key, value in query.items() if key != "include_invalid"}
+            expected = sorted(
+                record["path"]
+                for record in records
+                if (include_invalid or record["status"] == "valid")
+                and all(record[key] == value for key, value in filters.items())
+            )
+
+            result = lookup_artifact_registry(base_dir, **query)
+
+            assert sorted(record.path for record in result.records) == expected
+            assert result.matched_count == len(expected)
+            assert result.total_count == len(records)
+
+    def test_filtered_lookup_on_100k_records_is_fast(self, synthetic_registry):
+        base_dir, records = synthetic_registry
+        registry = ArtifactRegistry(base_dir)
+        registry.lookup(run_id=records[0]["run_id"])
+
+        timings = []
+        for index in range(0, _SYNTHETIC_RECORD_COUNT, 5_000):
+            started = time.perf_counter()
+            result = registry.lookup(run_id=records[index]["run_id"], artifact_type=records[index]["artifact_type"])
+            timings.append(time.perf_counter() - started)
+            assert result.matched_count >= 1
+
+        timings.sort()
+        # Sub-millisecond on a developer machine; the bound leaves headroom
+        # for slow CI runners.
+        assert timings[len(timings) // 2] < 0.005
+
+    def test_journaled_upsert_moves_a_record_between_indexes(self, synthetic_registry):
+        base_dir, records = synthetic_registry
+        registry = ArtifactRegistry(base_dir)
+        moved = registry.lookup(dataset_id="dataset-11").records[0]
+        state = registry._synced_state()
+
+        def upsert(record: dict) -> None:
+            with state.lock, registry_write_lock(_registry_path(base_dir).parent):
+                registry._append_locked([{"at": "2026-03-29T00:00:00Z", "upsert": record}])
+
+        upsert({**moved.model_dump(mode="json"), "dataset_id": "dataset-new"})
+        try:
+            assert moved.path not in {record.path for record in registry.lookup(dataset_id="dataset-11").records}
+            assert [record.path for record in registry.lookup(dataset_id="dataset-new").records] == [moved.path]
+        finally:
+            upsert(moved.model_dump(mode="json"))
+
+        assert registry.lookup(dataset_id="dataset-new").matched_count == 0
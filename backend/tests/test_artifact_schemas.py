@@ -786,7 +786,7 @@ class TestArtifactSchemas:
             "sequencing_layout": "paired_end",
             "sample_sheet_path": "backend/artifacts/examples/rnaseq/sample_sheet.tsv",
             "output_directory": "artifacts/rnaseq-qc-de/2026-03-19/run-20260319T210000Z-deadbeef/outputs/generated/raw-qc/fastqc",
-            "command": ["fastqc", "--outdir", "artifacts/rnaseq-qc-de/.../fastqc", "sample1_R1.fastq.gz"],
+            "commands": [["fastqc", "--outdir", "artifacts/rnaseq-qc-de/.../fastqc", "sample1_R1.fastq.gz"]],
             "parameters": {"extra_args": ["--quiet"], "input_count": 2},
             "input_files": [
                 {
@@ -902,6 +902,14 @@ class TestArtifactSchemas:
 
         assert isinstance(run_document, FastQCRun)
         assert run_document.reports[0].zip_archive.artifact_type == "fastqc_zip_archive"
+        legacy_document = validate_artifact_payload(
+            {key: value for key, value in run_payload.items() if key != "commands"}
+            | {"command": run_payload["commands"][0]}
+        )
+        assert legacy_document.command == run_payload["commands"][0]
+        assert legacy_document.commands == []
+        with pytest.raises(ValueError, match="empty command"):
+            validate_artifact_payload(run_payload | {"commands": [[]]})
         assert isinstance(metrics_document, FastQCMetrics)
         assert metrics_document.aggregate_metrics.fastqc_pass_rate == 1.0
 
@@ -0,0 +1,220 @@
+"""Tests for the segmented audit log and its indexed query path."""
+
+import json
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from audit import query as audit_query  # noqa: E402
+from audit import store as audit_store  # noqa: E402
+from audit.query import audit_index_path  # noqa: E402
+from audit.store import (  # noqa: E402
+    AUDIT_LOG_DIR,
+    AuditEventRecord,
+    append_audit_event,
+    audit_log_path,
+    query_audit_events,
+)
+
+_START = datetime(2026, 3, 1, 8, 0, tzinfo=timezone.utc)
+
+
+def _full_scan(base_dir: Path, *, limit: int = 100, **filters) -> list[AuditEventRecord]:
+    """The whole-file scan the indexed query replaced."""
+    audit_dir = base_dir / AUDIT_LOG_DIR
+    events: list[AuditEventRecord] = []
+    # Newest segment first; for unsegmented day files this is the old name order.
+    for path in audit_store._audit_segments_newest_first(audit_dir):
+        try:
+            lines = path.read_text(encoding="utf-8").splitlines()
+        except Exception:
+            continue
+        for line in reversed(lines):
+            stripped = line.strip()
+            if not stripped:
+                continue
+            try:
+                record = AuditEventRecord.model_validate_json(stripped)
+            except Exception:
+                continue
+            if any(value is not None and getattr(record, name) != value for name, value in filters.items()):
+                continue
+            events.append(record)
+            if len(events) >= limit:
+                return events
+    return events
+
+
+def _assert_same_as_full_scan(base_dir: Path, **kwargs) -> list[AuditEventRecord]:
+    indexed = query_audit_events(base_dir, **kwargs)
+    assert [event.event_id for event in indexed] == [event.event_id for event in _full_scan(base_dir, **kwargs)]
+    return indexed
+
+
+def _append_events(
+    base_dir: Path,
+    count: int,
+    *,
+    seed: int = 0,
+    start: datetime = _START,
+    spacing: timedelta = timedelta(hours=7),
+) -> None:
+    rng = random.Random(seed)
+    for index in range(count):
+        append_audit_event(
+            base_dir,
+            event_type=rng.choice(["tool_invoked", "file_written", "job_submitted"]),
+            summary=f"event {index}",
+            outcome=rng.choice(["ok", "blocked", None]),
+            session_id=f"session-{rng.randrange(5)}",
+            run_id=rng.choice([None, f"run-{rng.randrange(3)}"]),
+            tool_name=rng.choice(["terminal", "read_file", None]),
+            details={"index": index},
+            recorded_at=start + spacing * index,
+        )
+
+
+@pytest.fixture
+def small_segments(monkeypatch):
+    monkeypatch.setattr(audit_store, "AUDIT_SEGMENT_MAX_BYTES", 2_000)
+
+
+def test_appends_roll_over_into_numbered_segments(tmp_path, small_segments):
+    day = datetime(2026, 3, 2, tzinfo=timezone.utc)
+    for index in range(12):
+        append_audit_event(tmp_path, event_type="tool_invoked", summary=f"call {index}", recorded_at=day)
+
+    names = sorted(path.name for path in (tmp_path / AUDIT_LOG_DIR).glob("events-*.jsonl"))
+    assert names[0] == "events-2026-03-02.0001.jsonl"
+    assert names[-1] == "events-2026-03-02.jsonl"
+    assert len(names) > 2
+    assert audit_log_path(tmp_path, recorded_at=day).name == names[-2]
+    assert [event.summary for event in query_audit_events(tmp_path, limit=12)] == [
+        f"call {index}" for index in reversed(range(12))
+    ]
+
+
+def test_filtered_queries_match_full_scan(tmp_path, small_segments):
+    _append_events(tmp_path, 300)
+
+    _assert_same_as_full_scan(tmp_path, limit=1000)
+    _assert_same_as_full_scan(tmp_path, limit=7)
+    for name, value in [
+        ("event_type", "job_submitted"),
+        ("session_id", "session-3"),
+        ("run_id", "run-1"),
+        ("tool_name", "terminal"),
+        ("outcome", "blocked"),
+        ("job_id", "never-seen"),
+    ]:
+        _assert_same_as_full_scan(tmp_path, limit=1000, **{name: value})
+        _assert_same_as_full_scan(tmp_path, limit=3, **{name: value})
+    matches = _assert_same_as_full_scan(
+        tmp_path, limit=1000, event_type="tool_invoked", session_id="session-1", outcome="ok"
+    )
+    assert matches
+    assert all(audit_index_path(path).exists() for path in (tmp_path / AUDIT_LOG_DIR).glob("events-*.jsonl"))
+
+
+def test_only_candidate_lines_are_validated(tmp_path, monkeypatch):
+    _append_events(tmp_path, 200)
+    query_audit_events(tmp_path, limit=1)
+
+    validated: list[str] = []
+    original = AuditEventRecord.model_validate_json
+
+    def counting_validate(data, *args, **kwargs):
+        validated.append(data)
+        return original(data, *args, **kwargs)
+
+    monkeypatch.setattr(audit_query.AuditEventRecord, "model_validate_json", counting_validate)
+    events = query_audit_events(tmp_path, session_id="session-2", tool_name="terminal", limit=1000)
+
+    assert events
+    assert len(validated) == len(events)
+
+
+def test_irregular_lines_match_full_scan(tmp_path):
+    _append_events(tmp_path, 40, seed=3)
+    log_path = audit_store._audit_segments_newest_first(tmp_path / AUDIT_LOG_DIR)[0]
+    record = AuditEventRecord.model_validate_json(log_path.read_text(encoding="utf-8").splitlines()[0])
+    event_ids = iter(range(100))
+
+    def line(**updates) -> str:
+        payload = record.model_dump(mode="json") | {"event_id": f"irregular-{next(event_ids)}"}
+        return json.dumps(payload | updates, ensure_ascii=False)
+
+    duplicate = line(session_id="session-0")[:-1] + ', "session_id": "session-dup"}'
+    with log_path.open("a", encoding="utf-8", newline="") as handle:
+        handle.write(
+            "\n   \nnot json\n[1, 2]\n"
+            + duplicate
+            + "\n"
+            # A bare CR splits one physical line into two records for str.splitlines().
+            + line(summary="first", session_id="session-cr")
+            + "\r"
+            + line(summary="second", session_id="session-1")
+            + "\r\n"
+            + line(summary="line\u2028separator", session_id="session-1")
+            + "\n"
+            + line(session_id=7)
+            + "\n"
+            + line(outcome="tail", session_id="session-1")
+        )
+
+    for session_id in (None, "session-0", "session-dup", "session-cr", "session-1"):
+        _assert_same_as_full_scan(tmp_path, limit=1000, session_id=session_id)
+    assert query_audit_events(tmp_path, limit=1)[0].outcome == "tail"
+    assert [event.summary for event in query_audit_events(tmp_path, session_id="session-cr")] == ["first"]
+
+
+def test_index_catches_up_after_appends_and_rebuilds_after_replacement(tmp_path):
+    _append_events(tmp_path, 30, spacing=timedelta(seconds=1))
+    [log_path] = (tmp_path / AUDIT_LOG_DIR).glob("events-*.jsonl")
+    _assert_same_as_full_scan(tmp_path, session_id="session-1")
+    indexed_bytes = json.loads(audit_index_path(log_path).read_text(encoding="utf-8"))["indexed_bytes"]
+
+    _append_events(tmp_path, 30, seed=9, start=_START + timedelta(minutes=5), spacing=timedelta(seconds=1))
+    _assert_same_as_full_scan(tmp_path, session_id="session-1")
+    assert json.loads(audit_index_path(log_path).read_text(encoding="utf-8"))["indexed_bytes"] > indexed_bytes
+
+    replacement = log_path.with_suffix(".tmp")
+    replacement.write_text("".join(log_path.read_text(encoding="utf-8").splitlines(True)[:5]), encoding="utf-8")
+    replacement.replace(log_path)
+    _assert_same_as_full_scan(tmp_path, session_id="session-1")
+
+    audit_index_path(log_path).write_text("{not json", encoding="utf-8")
+    audit_query._loaded_indexes.clear()
+    _assert_same_as_full_scan(tmp_path, limit=1000)
+
+
+def test_undecodable_segment_is_skipped_like_full_scan(tmp_path, caplog):
+    _append_events(tmp_path, 10)
+    bad_path = tmp_path / AUDIT_LOG_DIR / "events-2030-01-01.jsonl"
+    bad_path.write_bytes(
+        (
+            json.dumps(
+                AuditEventRecord(
+                    event_id="bad-file", event_type="tool_invoked", recorded_at=_START, summary="valid line"
+                ).model_dump(mode="json")
+            )
+            + "\n"
+        ).encode("utf-8")
+        + b"\xff\xfe broken\n"
+    )
+
+    events = _assert_same_as_full_scan(tmp_path, limit=1000)
+
+    assert "bad-file" not in {event.event_id for event in events}
+    assert "Skipping unreadable audit log" in caplog.text
+    assert json.loads(audit_index_path(bad_path).read_text(encoding="utf-8"))["unreadable"] is True
+
+
+def test_limit_must_be_positive(tmp_path):
+    with pytest.raises(ValueError, match="limit must be at least 1"):
+        query_audit_events(tmp_path, limit=0)
@@ -0,0 +1,154 @@
+"""Tests for the background group-commit audit writer."""
+
+import json
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from audit import store as audit_store  # noqa: E402
+from audit import writer as audit_writer  # noqa: E402
+from audit.store import AUDIT_LOG_DIR, append_audit_event, query_audit_events  # noqa: E402
+from audit.writer import AuditWriter, get_audit_writer, start_audit_writer, stop_audit_writer  # noqa: E402
+from runtime.metrics_collector import METRICS  # noqa: E402
+
+_DAY = datetime(2026, 5, 4, 23, 59, tzinfo=timezone.utc)
+
+
+def _fields(summary: str, *, recorded_at: datetime = _DAY, **overrides) -> dict:
+    fields = {
+        "event_type": "tool_invoked",
+        "summary": summary,
+        "outcome": "ok",
+        "session_id": "session-1",
+        "run_id": None,
+        "step_id": None,
+        "job_id": None,
+        "workflow_id": None,
+        "tool_name": "terminal",
+        "actor": "system",
+        "artifact_paths": [],
+        "external_systems": [],
+        "details": {},
+        "recorded_at": recorded_at,
+    }
+    return fields | overrides
+
+
+def _logged_summaries(base_dir: Path) -> dict[str, list[str]]:
+    return {
+        path.name: [json.loads(line)["summary"] for line in path.read_text(encoding="utf-8").splitlines()]
+        for path in sorted((base_dir / AUDIT_LOG_DIR).glob("events-*.jsonl"))
+    }
+
+
+@pytest.fixture(autouse=True)
+def no_active_writer():
+    yield
+    stop_audit_writer()
+
+
+def test_queued_events_are_committed_in_batches_and_in_order(tmp_path):
+    writer = AuditWriter(max_batch_events=16)
+    for index in range(100):
+        assert writer.submit(tmp_path, _fields(f"call {index}"))
+    writer.start()
+    writer.close()
+
+    assert _logged_summaries(tmp_path) == {"events-2026-05-04.jsonl": [f"call {index}" for index in range(100)]}
+    stats = writer.stats()
+    assert stats["written_events"] == 100
+    assert stats["batches"] == 7
+    assert stats["queue_depth"] == 0
+
+
+def test_day_segment_stays_open_until_midnight(tmp_path):
+    writer = AuditWriter()
+    writer.start()
+    writer.submit(tmp_path, _fields("before midnight"))
+    writer.flush()
+    assert list(writer._segments) == [(tmp_path, "2026-05-04")]
+
+    writer.submit(tmp_path, _fields("after midnight", recorded_at=_DAY + timedelta(minutes=2)))
+    writer.flush()
+    assert list(writer._segments) == [(tmp_path, "2026-05-05")]
+    writer.close()
+
+    assert writer._segments == {}
+    assert _logged_summaries(tmp_path) == {
+        "events-2026-05-04.jsonl": ["before midnight"],
+        "events-2026-05-05.jsonl": ["after midnight"],
+    }
+
+
+def test_batches_roll_over_into_new_segments(tmp_path, monkeypatch):
+    monkeypatch.setattr(audit_store, "AUDIT_SEGMENT_MAX_BYTES", 1_500)
+    writer = AuditWriter()
+    for index in range(12):
+        writer.submit(tmp_path, _fields(f"call {index}"))
+    writer.close()
+
+    summaries = _logged_summaries(tmp_path)
+    assert len(summaries) > 2
+    assert all(path.stat().st_size < 3_000 for path in (tmp_path / AUDIT_LOG_DIR).glob("events-*.jsonl"))
+    assert [event.summary for event in query_audit_events(tmp_path, limit=20)] == [
+        f"call {index}" for index in reversed(range(12))
+    ]
+
+
+def test_full_queue_drops_and_exports_counters(tmp_path):
+    METRICS.reset()
+    writer = AuditWriter(max_queue_events=3)
+    accepted = [writer.submit(tmp_path, _fields(f"call {index}")) for index in range(5)]
+
+    assert accepted == [True, True, True, False, False]
+    assert writer.stats()["dropped_events"] == 2
+    exposition = METRICS.render_exposition()
+    assert "bioapex_audit_events_dropped_total 2" in exposition
+    assert "bioapex_audit_queue_depth 3" in exposition
+
+    writer.close()
+    exposition = METRICS.render_exposition()
+    assert "bioapex_audit_events_written_total 3" in exposition
+    assert "bioapex_audit_queue_depth 0" in exposition
+
+
+def test_fsync_durability_syncs_once_per_segment_batch(tmp_path, monkeypatch):
+    synced: list[int] = []
+    monkeypatch.setattr(audit_writer.os, "fsync", synced.append)
+    writer = AuditWriter(durability="fsync")
+    for index in range(50):
+        writer.submit(tmp_path, _fields(f"call {index}"))
+    writer.close()
+
+    assert len(synced) == writer.stats()["batches"] == 1
+    with pytest.raises(ValueError, match="durability"):
+        AuditWriter(durability="sometimes")
+
+
+def test_invalid_event_is_logged_without_stopping_the_writer(tmp_path, caplog):
+    writer = AuditWriter()
+    writer.submit(tmp_path, _fields("   "))
+    writer.submit(tmp_path, _fields("valid"))
+    writer.close()
+
+    assert _logged_summaries(tmp_path) == {"events-2026-05-04.jsonl": ["valid"]}
+    assert "Non-fatal audit append failure" in caplog.text
+
+
+def test_append_audit_event_routes_through_running_writer(tmp_path):
+    writer = start_audit_writer()
+    assert get_audit_writer() is writer
+
+    details = {"command": "ls"}
+    assert append_audit_event(tmp_path, event_type="tool_invoked", summary="queued", details=details) is None
+    details["command"] = "rm -rf /"
+    events = query_audit_events(tmp_path, event_type="tool_invoked")
+
+    assert [(event.summary, event.details) for event in events] == [("queued", {"command": "ls"})]
+    stop_audit_writer()
+    assert get_audit_writer() is None
+    assert append_audit_event(tmp_path, event_type="tool_invoked", summary="direct") is not None
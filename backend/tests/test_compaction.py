@@ -185,3 +185,84 @@ async def test_compaction_event_reports_running_turn_range(sm, monkeypatch):
     assert second is not None
     assert second["from_turn"] == first["to_turn"]
     assert second["to_turn"] > second["from_turn"]
+
+
+# ---------------------------------------------------------------------------
+# Persisted per-message token counts
+# ---------------------------------------------------------------------------
+
+
+def _tool_call_message() -> dict:
+    return {
+        "role": "assistant",
+        "content": "Checked the run.",
+        "tool_calls": [
+            {
+                "tool": "read_file",
+                "input": "artifacts/rnaseq-qc/run.json",
+                "output": '{"status": "completed"}',
+            }
+        ],
+    }
+
+
+def test_saved_messages_carry_token_counts(tmp_path):
+    import api.tokens as tokens_api
+
+    sm = SessionManager(base_dir=tmp_path)
+    session_id = sm.create_session()
+    message = _tool_call_message()
+    sm.save_message(session_id, **message)
+
+    stored = sm.load_session(session_id)[0]["token_counts"]
+
+    assert stored == {
+        "backend": tokens_api._get_tokenizer_runtime().backend,
+        "content": tokens_api._count("Checked the run."),
+        "tool_io": tokens_api._count("artifacts/rnaseq-qc/run.json")
+        + tokens_api._count('{"status": "completed"}'),
+    }
+
+
+def test_history_estimate_sums_stored_counts_without_tokenizing(
+    tmp_path, monkeypatch
+):
+    import api.tokens as tokens_api
+
+    sm = SessionManager(base_dir=tmp_path)
+    session_id = sm.create_session()
+    sm.save_message(session_id, "user", "Plan a CRISPR screen")
+    sm.save_message(session_id, **_tool_call_message())
+    sm.save_message(session_id, "assistant", "A second segment.")
+    expected = estimate_history_tokens(sm.load_session(session_id))
+
+    def _no_tokenizing(_text: str) -> int:
+        raise AssertionError("history tokens were recounted")
+
+    monkeypatch.setattr(tokens_api, "_count", _no_tokenizing)
+
+    assert estimate_history_tokens(sm.load_session(session_id)) == expected
+    prompt_history = sm.load_session_for_agent(session_id)
+    assert len(prompt_history) == 2
+    assert estimate_history_tokens(prompt_history) == expected
+
+
+def test_history_is_recounted_when_the_tokenizer_backend_changes(
+    tmp_path, monkeypatch
+):
+    import api.tokens as tokens_api
+
+    sm = SessionManager(base_dir=tmp_path)
+    session_id = sm.create_session()
+    sm.save_message(session_id, "user", "Plan a CRISPR screen")
+    sm.save_message(session_id, **_tool_call_message())
+
+    other_backend = tokens_api._TokenizerRuntime(
+        backend="other_tokenizer",
+        accuracy="approximate",
+        count_text=lambda text: 1000 if text else 0,
+    )
+    monkeypatch.setattr(tokens_api, "_get_tokenizer_runtime", lambda: other_backend)
+
+    # Two content strings plus the tool input and output.
+    assert estimate_history_tokens(sm.load_session(session_id)) == 4000
@@ -174,3 +174,44 @@ class TestSessionRuntimeConfigStamp:
         manager.stamp_runtime_config_snapshot(session_id, loaded_at=42.0)
 
         assert not (tmp_path / "sessions" / f"{session_id}.json").exists()
+
+    @pytest.mark.parametrize("storage_format", ["json", "log"])
+    def test_flush_snapshot_writes_the_deferred_stamp(self, tmp_path, storage_format):
+        from graph.session_manager import SessionManager
+
+        manager = SessionManager(base_dir=tmp_path, storage_format=storage_format)
+        session_id = manager.create_session()
+        snapshot = manager.read_snapshot(session_id)
+
+        manager.stamp_runtime_config_snapshot(session_id, loaded_at=7.5, snapshot=snapshot)
+        fresh = SessionManager(base_dir=tmp_path, storage_format=storage_format)
+        assert "runtime_config" not in fresh.get_session_meta(session_id)
+
+        manager.flush_snapshot(snapshot)
+
+        fresh = SessionManager(base_dir=tmp_path, storage_format=storage_format)
+        assert fresh.get_session_meta(session_id)["runtime_config"]["_loaded_at"] == 7.5
+        assert snapshot.pending == {}
+
+    @pytest.mark.asyncio
+    async def test_turn_failing_before_its_first_write_keeps_the_stamp(self, tmp_path, monkeypatch):
+        from graph.session_manager import SessionManager
+        from runtime.query_engine import QueryEngine
+
+        async def _fail(*args, **kwargs):
+            raise RuntimeError("compaction failed")
+
+        monkeypatch.setattr("runtime.compaction.maybe_compact_turn_boundary", _fail)
+        manager = SessionManager(base_dir=tmp_path)
+        session_id = manager.create_session()
+        agent_manager = MagicMock(session_manager=manager, base_dir=None, llm=None)
+
+        with pytest.raises(RuntimeError, match="compaction failed"):
+            async for _ in QueryEngine(agent_manager).stream_turn_sse(
+                message="hello", session_id=session_id
+            ):
+                pass
+
+        fresh = SessionManager(base_dir=tmp_path)
+        assert "_loaded_at" in fresh.get_session_meta(session_id)["runtime_config"]
+        assert fresh.load_session(session_id) == []
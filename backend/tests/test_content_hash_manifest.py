@@ -0,0 +1,109 @@
+"""Tests for the shared incremental content-hash manifest service."""
+
+import json
+import os
+import sys
+from datetime import datetime, timezone
+from hashlib import sha256
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from artifacts import SCHEMA_PACK_VERSION, build_content_hash_manifest, prepare_run_directory  # noqa: E402
+import file_digests  # noqa: E402
+from artifacts.content_hashes import refresh_content_hash_manifest  # noqa: E402
+from file_digests import FileDigestCache, hash_path  # noqa: E402
+
+
+@pytest.fixture
+def layout(tmp_path):
+    layout = prepare_run_directory(
+        tmp_path,
+        "Evidence Retrieval",
+        created_at=datetime(2026, 3, 18, 19, 2, 3, tzinfo=timezone.utc),
+        run_id="run-20260318T190203Z-deadbeef",
+    )
+    layout.generated_output_path("table.tsv").write_text("gene\tcount\nTP53\t7\n", encoding="utf-8")
+    layout.generated_output_path("reads.bin", step="fastqc").write_bytes(os.urandom(3 * 1024 * 1024 + 17))
+    layout.stable_artifact_path("evidence_card").write_text("id: card\n", encoding="utf-8")
+    return layout
+
+
+def _full_read_manifest_text(layout) -> str:
+    """The manifest as it was built before hashing became incremental."""
+    entries = {}
+    for path in sorted(layout.run_dir.rglob("*")):
+        if not path.is_file():
+            continue
+        relative = path.relative_to(layout.run_dir).as_posix()
+        if relative == "content_hashes.json":
+            continue
+        entries[relative] = path.read_bytes()
+    manifest = build_content_hash_manifest(
+        run_id=layout.run_id,
+        schema_version=SCHEMA_PACK_VERSION,
+        created_at=layout.created_at,
+        source_workflow=layout.workflow,
+        entries=entries,
+    )
+    return json.dumps(manifest, ensure_ascii=False, indent=2) + "\n"
+
+
+def _counting_hasher(monkeypatch) -> list[str]:
+    hashed: list[str] = []
+    original = file_digests.hash_path
+
+    def counting(path, **kwargs):
+        hashed.append(Path(path).name)
+        return original(path, **kwargs)
+
+    monkeypatch.setattr(file_digests, "hash_path", counting)
+    return hashed
+
+
+class TestRefreshContentHashManifest:
+    def test_output_is_byte_identical_to_full_read_manifest(self, layout, tmp_path):
+        expected = _full_read_manifest_text(layout)
+
+        refresh_content_hash_manifest(layout, digest_cache=FileDigestCache(tmp_path / "digests"))
+
+        assert layout.content_hash_manifest_path.read_text(encoding="utf-8") == expected
+
+    def test_only_changed_files_are_rehashed(self, layout, monkeypatch, tmp_path):
+        cache = FileDigestCache(tmp_path / "digests")
+        refresh_content_hash_manifest(layout, digest_cache=cache)
+        hashed = _counting_hasher(monkeypatch)
+
+        refresh_content_hash_manifest(layout, digest_cache=cache)
+        assert hashed == []
+
+        table = layout.run_dir / "outputs" / "generated" / "table.tsv"
+        table.write_text("gene\tcount\nTP53\t8\nBRCA1\t3\n", encoding="utf-8")
+        refresh_content_hash_manifest(layout, digest_cache=cache)
+
+        assert hashed == ["table.tsv"]
+        assert layout.content_hash_manifest_path.read_text(encoding="utf-8") == _full_read_manifest_text(layout)
+
+    def test_large_files_are_hashed_in_chunks(self, layout):
+        reads = layout.run_dir / "outputs" / "generated" / "fastqc" / "reads.bin"
+
+        assert hash_path(reads) == sha256(reads.read_bytes()).hexdigest()
+
+    def test_digest_cache_is_bounded(self, layout, tmp_path):
+        cache = FileDigestCache(tmp_path / "digests", max_entries=2)
+
+        refresh_content_hash_manifest(layout, digest_cache=cache)
+
+        assert len(cache) == 2
+
+    def test_default_cache_is_shared_with_input_hashing(self, layout, monkeypatch):
+        refresh_content_hash_manifest(layout)
+        hashed = _counting_hasher(monkeypatch)
+        reads = layout.run_dir / "outputs" / "generated" / "fastqc" / "reads.bin"
+
+        digests = file_digests.hash_files([reads], cache=file_digests.shared_file_digest_cache(layout.base_dir))
+
+        assert hashed == []
+        assert digests[reads] == sha256(reads.read_bytes()).hexdigest()
@@ -0,0 +1,233 @@
+"""Tests for chunked count-matrix TSV I/O and its binary sidecar."""
+
+import csv
+import os
+import sys
+import tracemalloc
+from pathlib import Path
+from typing import Any, Sequence
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tests.runner_modules import load_runner_module  # noqa: E402
+
+count_matrix_io = load_runner_module("count_matrix_io")
+read_count_matrix = count_matrix_io.read_count_matrix
+sidecar_paths = count_matrix_io.sidecar_paths
+write_count_matrix = count_matrix_io.write_count_matrix
+write_matrix_tsv = count_matrix_io.write_matrix_tsv
+
+
+def _dict_reader_rows(matrix_path: Path, sample_ids: Sequence[str]) -> list[dict[str, Any]]:
+    """The ``csv.DictReader`` loader the chunked reader replaced."""
+    with matrix_path.open("r", encoding="utf-8", newline="") as handle:
+        return [
+            {
+                "gene_id": str(raw_row.get("gene_id", "")).strip(),
+                "gene_symbol": str(raw_row.get("gene_symbol", "")).strip(),
+                "counts": [int(str(raw_row.get(sample_id, "0") or "0")) for sample_id in sample_ids],
+            }
+            for raw_row in csv.DictReader(handle, delimiter="\t")
+        ]
+
+
+def _assert_matches_dict_reader(matrix_path: Path, sample_ids: Sequence[str], **kwargs) -> None:
+    table = read_count_matrix(matrix_path, sample_ids, **kwargs)
+    reference = _dict_reader_rows(matrix_path, sample_ids)
+
+    assert table.gene_ids == [row["gene_id"] for row in reference]
+    assert table.gene_symbols == [row["gene_symbol"] for row in reference]
+    assert table.counts.tolist() == [row["counts"] for row in reference]
+
+
+def _random_counts(genes: int, samples: int, seed: int = 0) -> tuple[list[str], list[str], list[str], np.ndarray]:
+    rng = np.random.default_rng(seed)
+    counts = rng.poisson(rng.lognormal(3.0, 2.0, size=(genes, 1)), size=(genes, samples)).astype(np.int64)
+    return (
+        [f"ENSG{gene:011d}" for gene in range(genes)],
+        [f"G{gene}" for gene in range(genes)],
+        [f"S{index}" for index in range(samples)],
+        counts,
+    )
+
+
+class TestReadCountMatrix:
+    @pytest.mark.parametrize("chunk_rows", [1, 2, 3, 1000])
+    def test_irregular_rows_match_dict_reader(self, tmp_path, chunk_rows):
+        matrix_path = tmp_path / "counts.tsv"
+        matrix_path.write_text(
+            "gene_id\tgene_symbol\tS1\tS2\n"
+            " ENSG1 \tTP53\t10\t4\n"
+            "\n"
+            "ENSG2\tMYC\t7\n"
+            "ENSG3\tKRAS\t\t1_000\n"
+            "ENSG4\tEGFR\t 12 \t+3\t99\n"
+            "ENSG5\n"
+            "ENSG6\tBRCA1\t5\t6\r\n",
+            encoding="utf-8",
+        )
+
+        _assert_matches_dict_reader(matrix_path, ["S1", "S2", "S_missing"], chunk_rows=chunk_rows)
+
+    def test_quoted_fields_fall_back_to_csv(self, tmp_path):
+        matrix_path = tmp_path / "counts.tsv"
+        matrix_path.write_text(
+            "gene_id\tgene_symbol\tS1\tS2\n"
+            "ENSG1\tA\t1\t2\n"
+            'ENSG2\t"quoted\tsymbol"\t3\t4\n'
+            'ENSG3\t"multi\nline"\t"5"\t6\n',
+            encoding="utf-8",
+        )
+
+        _assert_matches_dict_reader(matrix_path, ["S1", "S2"], chunk_rows=1)
+
+    def test_invalid_cell_raises_like_int(self, tmp_path):
+        matrix_path = tmp_path / "counts.tsv"
+        matrix_path.write_text("gene_id\tgene_symbol\tS1\nENSG1\tA\t1.5\n", encoding="utf-8")
+
+        with pytest.raises(ValueError, match="invalid literal for int"):
+            read_count_matrix(matrix_path, ["S1"])
+
+    def test_large_matrix_round_trips_through_chunked_parse(self, tmp_path):
+        gene_ids, gene_symbols, sample_ids, counts = _random_counts(2_500, 17)
+        matrix_path = tmp_path / "counts.tsv"
+        write_count_matrix(
+            matrix_path,
+            gene_ids=gene_ids,
+            gene_symbols=gene_symbols,
+            sample_ids=sample_ids,
+            counts=counts,
+            chunk_rows=300,
+            sidecar=False,
+        )
+
+        table = read_count_matrix(matrix_path, list(reversed(sample_ids)), chunk_rows=256)
+
+        assert table.gene_ids == gene_ids
+        assert table.gene_symbols == gene_symbols
+        assert np.array_equal(table.counts, counts[:, ::-1])
+        _assert_matches_dict_reader(matrix_path, sample_ids[:5], chunk_rows=256)
+
+
+class TestWriteCountMatrix:
+    def test_output_matches_joined_lines(self, tmp_path):
+        gene_ids, gene_symbols, sample_ids, counts = _random_counts(50, 4)
+        values = counts / 3.0
+        matrix_path = tmp_path / "counts.tsv"
+        values_path = tmp_path / "normalized.tsv"
+
+        write_count_matrix(
+            matrix_path,
+            gene_ids=gene_ids,
+            gene_symbols=gene_symbols,
+            sample_ids=sample_ids,
+            counts=counts,
+            chunk_rows=7,
+        )
+        write_matrix_tsv(
+            values_path,
+            gene_ids=gene_ids,
+            gene_symbols=gene_symbols,
+            sample_ids=sample_ids,
+            values=values,
+            chunk_rows=7,
+        )
+
+        header = "\t".join(["gene_id", "gene_symbol", *sample_ids])
+        assert matrix_path.read_text(encoding="utf-8") == "\n".join(
+            [header]
+            + [
+                "\t".join([gene_id, symbol, *(str(int(value)) for value in row)])
+                for gene_id, symbol, row in zip(gene_ids, gene_symbols, counts.tolist())
+            ]
+        ) + "\n"
+        assert values_path.read_text(encoding="utf-8") == "\n".join(
+            [header]
+            + [
+                "\t".join([gene_id, symbol, *(f"{float(value):.6f}" for value in row)])
+                for gene_id, symbol, row in zip(gene_ids, gene_symbols, values.tolist())
+            ]
+        ) + "\n"
+
+    def test_rejects_mismatched_shape(self, tmp_path):
+        with pytest.raises(ValueError, match="does not match"):
+            write_matrix_tsv(
+                tmp_path / "bad.tsv",
+                gene_ids=["g1"],
+                gene_symbols=["G1"],
+                sample_ids=["S1", "S2"],
+                values=np.zeros((1, 3)),
+            )
+
+
+class TestCountMatrixSidecar:
+    def _write(self, tmp_path: Path) -> tuple[Path, list[str], np.ndarray]:
+        gene_ids, gene_symbols, sample_ids, counts = _random_counts(300, 6)
+        matrix_path = tmp_path / "gene_counts.tsv"
+        write_count_matrix(
+            matrix_path,
+            gene_ids=gene_ids,
+            gene_symbols=gene_symbols,
+            sample_ids=sample_ids,
+            counts=counts,
+        )
+        return matrix_path, sample_ids, counts
+
+    def test_sidecar_reopens_memory_mapped_without_parsing(self, tmp_path, monkeypatch):
+        matrix_path, sample_ids, counts = self._write(tmp_path)
+        assert all(path.exists() for path in sidecar_paths(matrix_path))
+
+        def fail_parse(*args, **kwargs):
+            raise AssertionError("TSV was parsed despite a current sidecar")
+
+        monkeypatch.setattr(count_matrix_io, "_parse_tsv", fail_parse)
+        table = read_count_matrix(matrix_path, sample_ids)
+
+        assert isinstance(table.counts, np.memmap)
+        assert np.array_equal(table.counts, counts)
+        assert table.gene_ids[:2] == ["ENSG00000000000", "ENSG00000000001"]
+
+    def test_stale_or_mismatched_sidecar_is_ignored(self, tmp_path):
+        matrix_path, sample_ids, counts = self._write(tmp_path)
+
+        subset = read_count_matrix(matrix_path, sample_ids[:2])
+        assert not isinstance(subset.counts, np.memmap)
+        assert np.array_equal(subset.counts, counts[:, :2])
+
+        lines = matrix_path.read_text(encoding="utf-8").splitlines(keepends=True)
+        matrix_path.write_text("".join(lines[:11]), encoding="utf-8")
+        stat_result = matrix_path.stat()
+        os.utime(matrix_path, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 1_000_000))
+        table = read_count_matrix(matrix_path, sample_ids)
+
+        assert len(table.gene_ids) == 10
+        assert np.array_equal(table.counts, counts[:10])
+
+
+def test_parse_memory_overhead_does_not_grow_with_gene_count(tmp_path):
+    overheads = []
+    for genes in (4_000, 32_000):
+        gene_ids, gene_symbols, sample_ids, counts = _random_counts(genes, 24, seed=genes)
+        matrix_path = tmp_path / f"counts_{genes}.tsv"
+        write_count_matrix(
+            matrix_path,
+            gene_ids=gene_ids,
+            gene_symbols=gene_symbols,
+            sample_ids=sample_ids,
+            counts=counts,
+            sidecar=False,
+        )
+        del gene_ids, gene_symbols, counts
+
+        tracemalloc.start()
+        table = read_count_matrix(matrix_path, sample_ids, chunk_rows=1024)
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        overheads.append(peak - retained)
+        del table
+
+    # Transient parse buffers are bounded by the chunk size, not the matrix.
+    assert overheads[1] < overheads[0] * 2
@@ -7,7 +7,6 @@ import pytest
 import yaml
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
-sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
 
 from artifacts.schemas import SCHEMA_PACK_VERSION  # noqa: E402
 from dataset_intake import (  # noqa: E402
@@ -15,7 +14,9 @@ from dataset_intake import (  # noqa: E402
     ensure_valid_dataset_intake_manifest,
     validate_dataset_intake_manifest,
 )
-from workflows.runners.perturb_seq import validate_inputs as validate_perturb_seq_inputs  # noqa: E402
+from tests.runner_modules import load_runner_module  # noqa: E402
+
+validate_perturb_seq_inputs = load_runner_module("perturb_seq").validate_inputs
 
 
 def _manifest_payload() -> dict:
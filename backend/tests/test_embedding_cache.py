@@ -0,0 +1,167 @@
+"""
+Tests for the shared on-disk embedding cache and its use by the knowledge tool.
+"""
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from graph.embedding_cache import DiskEmbeddingCache, shared_embedding_cache
+
+MODEL = "CountingEmbedding:test"
+
+
+def _vector(seed: int, dim: int = 4) -> list[float]:
+    return [float(seed + offset) for offset in range(dim)]
+
+
+class TestDiskEmbeddingCache:
+    def test_round_trip_survives_a_new_instance(self, tmp_path):
+        cache = DiskEmbeddingCache(tmp_path / "cache")
+        cache.put_many(MODEL, {"a": _vector(1), "b": _vector(2)})
+
+        reopened = DiskEmbeddingCache(tmp_path / "cache")
+        found = reopened.get_many(MODEL, ["a", "b", "missing"])
+
+        assert found == {"a": _vector(1), "b": _vector(2)}
+
+    def test_entries_are_isolated_per_model(self, tmp_path):
+        cache = DiskEmbeddingCache(tmp_path / "cache")
+        cache.put_many(MODEL, {"a": _vector(1)})
+        cache.put_many("OtherEmbedding:large", {"a": _vector(9, dim=8)})
+
+        assert cache.get_many(MODEL, ["a"]) == {"a": _vector(1)}
+        assert cache.get_many("OtherEmbedding:large", ["a"]) == {"a": _vector(9, dim=8)}
+
+    def test_vectors_of_the_wrong_dimension_are_skipped(self, tmp_path):
+        cache = DiskEmbeddingCache(tmp_path / "cache")
+        cache.put_many(MODEL, {"a": _vector(1), "bad": _vector(2, dim=3)})
+
+        assert cache.get_many(MODEL, ["a", "bad"]) == {"a": _vector(1)}
+
+    def test_evicts_least_recently_used_beyond_budget(self, tmp_path):
+        # Budget of ten 4-float rows.
+        cache = DiskEmbeddingCache(tmp_path / "cache", max_bytes=10 * 4 * 4)
+        cache.put_many(MODEL, {f"k{i}": _vector(i) for i in range(10)})
+        # Touch the oldest entries so they survive the next eviction.
+        assert set(cache.get_many(MODEL, ["k0", "k1"])) == {"k0", "k1"}
+
+        cache.put_many(MODEL, {"k10": _vector(10)})
+
+        assert cache.entry_count(MODEL) <= 10
+        survivors = cache.get_many(MODEL, [f"k{i}" for i in range(11)])
+        assert {"k0", "k1", "k10"} <= set(survivors)
+        assert "k2" not in survivors
+        assert survivors["k10"] == _vector(10)
+        assert survivors["k0"] == _vector(0)
+        model_dir = next((tmp_path / "cache").iterdir())
+        assert [p.name for p in model_dir.glob("vectors-*.f32")] == ["vectors-1.f32"]
+
+    def test_reader_picks_up_another_writers_entries(self, tmp_path):
+        reader = DiskEmbeddingCache(tmp_path / "cache")
+        writer = DiskEmbeddingCache(tmp_path / "cache")
+        assert reader.get_many(MODEL, ["a"]) == {}
+
+        writer.put_many(MODEL, {"a": _vector(3)})
+
+        assert reader.get_many(MODEL, ["a"]) == {"a": _vector(3)}
+
+    def test_corrupt_index_is_a_miss_not_an_error(self, tmp_path):
+        cache = DiskEmbeddingCache(tmp_path / "cache")
+        cache.put_many(MODEL, {"a": _vector(1)})
+        index_path = next((tmp_path / "cache").iterdir()) / "index.json"
+        index_path.write_text("{not json", encoding="utf-8")
+
+        fresh = DiskEmbeddingCache(tmp_path / "cache")
+        assert fresh.get_many(MODEL, ["a"]) == {}
+        fresh.put_many(MODEL, {"b": _vector(2)})
+        assert fresh.get_many(MODEL, ["b"]) == {"b": _vector(2)}
+        assert json.loads(index_path.read_text(encoding="utf-8"))["rows"].keys() == {"b"}
+
+    def test_shared_cache_is_one_instance_per_storage_dir(self, tmp_path):
+        first = shared_embedding_cache(tmp_path / "storage")
+        second = shared_embedding_cache(tmp_path / "storage")
+
+        assert first is second
+        assert first.root == (tmp_path / "storage" / "embedding_cache").resolve()
+
+
+def _counting_embed_model():
+    from llama_index.core.bridge.pydantic import PrivateAttr
+    from llama_index.core.embeddings import BaseEmbedding
+
+    class CountingEmbedding(BaseEmbedding):
+        _texts: list = PrivateAttr(default_factory=list)
+        _calls: list = PrivateAttr(default_factory=list)
+
+        def __init__(self) -> None:
+            super().__init__(model_name="counting-knowledge", embed_batch_size=1024)
+
+        @property
+        def texts(self) -> list[str]:
+            return self._texts
+
+        @property
+        def calls(self) -> list[int]:
+            return self._calls
+
+        def _vector(self, text: str) -> list[float]:
+            return [float(len(text)), float(sum(map(ord, text)) % 89), 1.0]
+
+        def _get_text_embeddings(self, texts: list[str]) -> list[list[float]]:
+            self._calls.append(len(texts))
+            self._texts.extend(texts)
+            return [self._vector(text) for text in texts]
+
+        def _get_text_embedding(self, text: str) -> list[float]:
+            return self._get_text_embeddings([text])[0]
+
+        def _get_query_embedding(self, query: str) -> list[float]:
+            return self._vector(query)
+
+        async def _aget_query_embedding(self, query: str) -> list[float]:
+            return self._vector(query)
+
+    return CountingEmbedding()
+
+
+class TestKnowledgeIndexUsesCache:
+    def test_one_line_edit_re_embeds_only_the_changed_file(self, tmp_path, monkeypatch):
+        from llama_index.core import Settings
+
+        from tools.search_knowledge_tool import SearchKnowledgeBaseTool
+
+        model = _counting_embed_model()
+        monkeypatch.setattr(Settings, "_embed_model", model)
+        knowledge = tmp_path / "knowledge"
+        knowledge.mkdir()
+        for i in range(6):
+            (knowledge / f"protocol_{i}.md").write_text(
+                f"# Protocol {i}\nStep one for protocol {i}.\nStep two.\n",
+                encoding="utf-8",
+            )
+        tool = SearchKnowledgeBaseTool(
+            knowledge_dir=str(knowledge), storage_dir=str(tmp_path / "storage")
+        )
+        tool._ensure_index()
+        assert tool._index is not None
+        assert len(model.texts) == 6
+
+        model.texts.clear()
+        model.calls.clear()
+        edited = knowledge / "protocol_3.md"
+        edited.write_text(
+            "# Protocol 3\nStep one for protocol 3, now at 4 C.\nStep two.\n",
+            encoding="utf-8",
+        )
+        stat = edited.stat()
+        os.utime(edited, (stat.st_atime, stat.st_mtime + 5))
+
+        tool._ensure_index()
+
+        assert tool._index is not None
+        assert model.calls == [1]
+        assert len(model.texts) == 1
+        assert "now at 4 C" in model.texts[0]
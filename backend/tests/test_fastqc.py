@@ -1,5 +1,7 @@
 """Tests for FastQC helper functions."""
 
+import json
+import stat
 import sys
 import zipfile
 from pathlib import Path
@@ -8,7 +10,14 @@ import pytest
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from fastqc import load_fastqc_inputs, parse_fastqc_archive  # noqa: E402
+import fastqc  # noqa: E402
+from fastqc import (  # noqa: E402
+    FASTQC_REPORT_CACHE_DIR,
+    load_fastqc_inputs,
+    parse_fastqc_archive,
+    probe_fastqc_version,
+    run_fastqc,
+)
 
 
 def _write_fastq(path: Path) -> None:
@@ -140,3 +149,138 @@ def test_parse_fastqc_archive_extracts_metrics_and_statuses(tmp_path):
         "per-base-sequence-quality",
         "adapter-content",
     }
+
+
+_STUB_FASTQC = """\
+#!{python}
+import json, os, sys, zipfile
+log = os.environ["FASTQC_STUB_LOG"]
+args = sys.argv[1:]
+with open(log, "a") as handle:
+    handle.write(json.dumps(args) + "\\n")
+if args == ["--version"]:
+    print("FastQC v0.12.1")
+    sys.exit(0)
+outdir = args[args.index("--outdir") + 1]
+for path in [arg for arg in args[args.index("--outdir") + 2 :] if not arg.startswith("-")]:
+    if "broken" in path:
+        print("cannot read " + path, file=sys.stderr)
+        sys.exit(2)
+    prefix = os.path.basename(path).split(".")[0]
+    with open(os.path.join(outdir, prefix + "_fastqc.html"), "w") as handle:
+        handle.write("<html></html>")
+    with zipfile.ZipFile(os.path.join(outdir, prefix + "_fastqc.zip"), "w") as archive:
+        archive.writestr(prefix + "_fastqc/summary.txt", "PASS\\tBasic Statistics\\t" + path + "\\n")
+        archive.writestr(
+            prefix + "_fastqc/fastqc_data.txt",
+            ">>Basic Statistics\\tpass\\nTotal Sequences\\t10\\n>>END_MODULE\\n",
+        )
+    print("Analysis complete for " + path)
+"""
+
+
+@pytest.fixture
+def stub_fastqc(tmp_path, monkeypatch):
+    script = tmp_path / "bin" / "fastqc"
+    script.parent.mkdir()
+    script.write_text(_STUB_FASTQC.format(python=sys.executable), encoding="utf-8")
+    script.chmod(script.stat().st_mode | stat.S_IXUSR)
+    log = tmp_path / "fastqc.log"
+    log.touch()
+    monkeypatch.setenv("FASTQC_STUB_LOG", str(log))
+    monkeypatch.setattr(fastqc, "_version_cache", {})
+
+    def invocations():
+        return [json.loads(line) for line in log.read_text(encoding="utf-8").splitlines()]
+
+    return script, invocations
+
+
+def _fastq_inputs(tmp_path: Path, count: int) -> list[str]:
+    paths = []
+    for index in range(count):
+        _write_fastq(tmp_path / "data" / f"s{index}.fastq")
+        paths.append(f"data/s{index}.fastq")
+    (tmp_path / "qc").mkdir()
+    return paths
+
+
+class TestShardedRunFastqc:
+    def test_version_probe_is_cached_per_executable(self, tmp_path, stub_fastqc):
+        script, invocations = stub_fastqc
+
+        assert probe_fastqc_version(str(script), base_dir=tmp_path) == "FastQC v0.12.1"
+        assert probe_fastqc_version(str(script), base_dir=tmp_path) == "FastQC v0.12.1"
+
+        assert invocations() == [["--version"]]
+
+    def test_shards_run_in_parallel_and_report_each_shard(self, tmp_path, stub_fastqc):
+        script, invocations = stub_fastqc
+        inputs = _fastq_inputs(tmp_path, 5)
+        ready: list[tuple[str, ...]] = []
+
+        result = run_fastqc(
+            executable=str(script),
+            input_paths=inputs,
+            output_dir="qc",
+            base_dir=tmp_path,
+            shard_size=2,
+            max_workers=3,
+            on_reports_ready=lambda paths: ready.append(tuple(paths)),
+        )
+
+        assert result.shard_count == 3
+        assert result.commands == (
+            (str(script), "--outdir", "qc", *inputs[0:2]),
+            (str(script), "--outdir", "qc", *inputs[2:4]),
+            (str(script), "--outdir", "qc", *inputs[4:]),
+        )
+        assert sorted(path for shard in ready for path in shard) == inputs
+        assert sorted(args[2:] for args in invocations()[1:]) == [inputs[0:2], inputs[2:4], inputs[4:]]
+        assert [line.split()[-1] for line in result.stdout.splitlines()] == inputs
+        for index in range(5):
+            parsed = parse_fastqc_archive(
+                tmp_path / "qc" / f"s{index}_fastqc.zip",
+                sample_id=f"s{index}",
+                read_label="single",
+                input_relpath=inputs[index],
+            )
+            assert parsed.total_sequences == 10
+
+    def test_a_later_run_reuses_reports_with_matching_input_digest(self, tmp_path, stub_fastqc):
+        script, invocations = stub_fastqc
+        inputs = _fastq_inputs(tmp_path, 3)
+        digests = {path: f"{index:064x}" for index, path in enumerate(inputs)}
+        options = dict(executable=str(script), input_paths=inputs, base_dir=tmp_path, shard_size=1)
+
+        run_fastqc(output_dir="qc", input_digests=digests, **options)
+        assert len(list((tmp_path / FASTQC_REPORT_CACHE_DIR).iterdir())) == 3
+
+        ready: list[tuple[str, ...]] = []
+        digests[inputs[1]] = "f" * 64
+        calls_before = len(invocations())
+        (tmp_path / "qc-rerun").mkdir()
+        result = run_fastqc(output_dir="qc-rerun", input_digests=digests, on_reports_ready=ready.append, **options)
+
+        assert result.reused_inputs == (inputs[0], inputs[2])
+        assert result.shard_count == 1
+        assert result.commands == ((str(script), "--outdir", "qc-rerun", inputs[1]),)
+        assert [args[2:] for args in invocations()[calls_before:]] == [[inputs[1]]]
+        assert ready == [(inputs[0], inputs[2]), (inputs[1],)]
+        for index in range(3):
+            assert (tmp_path / "qc-rerun" / f"s{index}_fastqc.zip").is_file()
+            assert (tmp_path / "qc-rerun" / f"s{index}_fastqc.html").is_file()
+
+    def test_failing_shard_raises(self, tmp_path, stub_fastqc):
+        script, _ = stub_fastqc
+        inputs = _fastq_inputs(tmp_path, 2)
+        _write_fastq(tmp_path / "data" / "broken.fastq")
+
+        with pytest.raises(RuntimeError, match="cannot read data/broken.fastq"):
+            run_fastqc(
+                executable=str(script),
+                input_paths=[*inputs, "data/broken.fastq"],
+                output_dir="qc",
+                base_dir=tmp_path,
+                shard_size=1,
+            )
@@ -0,0 +1,99 @@
+"""Tests for parallel, persistently cached input file hashing."""
+
+import hashlib
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import file_digests  # noqa: E402
+from file_digests import (  # noqa: E402
+    HASH_READ_BYTES,
+    FileDigestCache,
+    hash_files,
+    hash_path,
+)
+
+
+def _write(path: Path, payload: bytes) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(payload)
+    return path
+
+
+@pytest.fixture
+def hash_calls(monkeypatch):
+    calls: list[Path] = []
+    original = file_digests.hash_path
+
+    def counting_hash_path(path, *, use_mmap=False):
+        calls.append(Path(path))
+        return original(path, use_mmap=use_mmap)
+
+    monkeypatch.setattr(file_digests, "hash_path", counting_hash_path)
+    return calls
+
+
+class TestHashPath:
+    @pytest.mark.parametrize("size", [0, 1, HASH_READ_BYTES, HASH_READ_BYTES + 17])
+    def test_streamed_and_mmap_digests_match_sha256(self, tmp_path, size):
+        payload = os.urandom(size)
+        path = _write(tmp_path / "reads.fastq", payload)
+        expected = hashlib.sha256(payload).hexdigest()
+
+        assert hash_path(path) == expected
+        assert hash_path(path, use_mmap=True) == expected
+
+
+class TestHashFiles:
+    def test_parallel_cold_run_matches_sequential_digests(self, tmp_path):
+        paths = [_write(tmp_path / f"s{index}_R1.fastq", os.urandom(4096 + index)) for index in range(12)]
+
+        digests = hash_files(paths, max_workers=4)
+
+        assert list(digests) == paths
+        assert digests == {path: hashlib.sha256(path.read_bytes()).hexdigest() for path in paths}
+
+    def test_rerun_with_persistent_cache_skips_hashing(self, tmp_path, hash_calls):
+        paths = [_write(tmp_path / f"s{index}_R{read}.fastq", os.urandom(2048)) for index in range(48) for read in (1, 2)]
+        cache_dir = tmp_path / "storage" / "file_digests"
+
+        first = hash_files(paths, cache=FileDigestCache(cache_dir))
+        assert len(hash_calls) == len(paths)
+        hash_calls.clear()
+
+        # A fresh instance, as in a new workflow process, reads the persisted cache.
+        second = hash_files(paths, cache=FileDigestCache(cache_dir))
+
+        assert hash_calls == []
+        assert second == first
+
+    def test_modified_file_is_hashed_again(self, tmp_path, hash_calls):
+        unchanged = _write(tmp_path / "a.fastq", b"@a\nACGT\n+\nIIII\n")
+        changed = _write(tmp_path / "b.fastq", b"@b\nACGT\n+\nIIII\n")
+        cache_dir = tmp_path / "cache"
+        hash_files([unchanged, changed], cache=FileDigestCache(cache_dir))
+        hash_calls.clear()
+
+        changed.write_bytes(b"@b\nTTTT\n+\nIIII\n")
+        stat_result = changed.stat()
+        os.utime(changed, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 1_000_000))
+        digests = hash_files([unchanged, changed], cache=FileDigestCache(cache_dir))
+
+        assert hash_calls == [changed]
+        assert digests[changed] == hashlib.sha256(changed.read_bytes()).hexdigest()
+
+    def test_cache_is_bounded(self, tmp_path):
+        paths = [_write(tmp_path / f"{index}.fastq", str(index).encode()) for index in range(5)]
+        cache_dir = tmp_path / "cache"
+
+        hash_files(paths, cache=FileDigestCache(cache_dir, max_entries=3))
+
+        assert len(FileDigestCache(cache_dir)._read_disk()) == 3
+
+    def test_rejects_directories(self, tmp_path):
+        with pytest.raises(ValueError, match="not a regular file"):
+            hash_files([tmp_path])
@@ -8,6 +8,7 @@ import json
 import os
 import sys
 from pathlib import Path
+from typing import Any
 
 import pytest
 
@@ -1105,6 +1106,454 @@ class TestBackgroundRebuild:
         assert indexer._file_states == prior_states
 
 
+class TestResidentBM25Index:
+    """The BM25 index is built once and patched per file, not per query."""
+
+    def _text_nodes(self, count: int, *, rare_every: int = 0) -> list:
+        from llama_index.core.schema import TextNode
+
+        nodes = []
+        for i in range(count):
+            text = f"Western blot transfer note {i} with buffer and antibody details."
+            if rare_every and i % rare_every == 0:
+                text += " Contains the zymogen marker."
+            nodes.append(
+                TextNode(
+                    text=text,
+                    id_=f"node-{i}",
+                    metadata={"source": f"memory/project/n{i}.md"},
+                )
+            )
+        return nodes
+
+    def test_scores_match_llama_index_bm25_retriever(self):
+        from llama_index.retrievers.bm25 import BM25Retriever
+
+        from graph.memory_bm25 import MemoryBM25Index
+
+        nodes = self._text_nodes(40, rare_every=7)
+        index = MemoryBM25Index()
+        index.add_nodes(nodes)
+
+        for query in ("zymogen marker", "antibody buffer", "note 12 transfer"):
+            expected = {
+                hit.node.node_id: hit.score
+                for hit in BM25Retriever.from_defaults(
+                    nodes=nodes, similarity_top_k=len(nodes)
+                ).retrieve(query)
+                if hit.score > 0
+            }
+            actual = {
+                node.node_id: score
+                for node, score in index.retrieve(query, len(nodes))
+            }
+            assert actual.keys() == expected.keys()
+            for node_id, score in expected.items():
+                assert actual[node_id] == pytest.approx(score, rel=1e-5)
+
+    def test_incremental_update_matches_fresh_build(self, indexer, tmp_path):
+        from graph.memory_bm25 import MemoryBM25Index
+
+        _write_memory_file(
+            tmp_path, "memory/project/alpha.md", "# Alpha\nGel casting notes.\n"
+        )
+        _write_memory_file(
+            tmp_path, "memory/project/beta.md", "# Beta\nTransfer buffer recipe.\n"
+        )
+        _write_memory_file(
+            tmp_path, "memory/user/gamma.md", "# Gamma\nAntibody dilution log.\n"
+        )
+        indexer._maybe_rebuild()
+        assert indexer._bm25 is not None
+        seeded = indexer._bm25
+
+        (tmp_path / "memory/project/beta.md").write_text(
+            "# Beta\nTransfer buffer recipe with methanol.\n", encoding="utf-8"
+        )
+        (tmp_path / "memory/user/gamma.md").unlink()
+        _write_memory_file(
+            tmp_path, "memory/project/delta.md", "# Delta\nMethanol storage rules.\n"
+        )
+        indexer._maybe_rebuild()
+        if indexer._rebuild_thread is not None:
+            indexer._rebuild_thread.join(timeout=5.0)
+
+        # Patched in place rather than replaced.
+        assert indexer._bm25 is seeded
+        fresh = MemoryBM25Index()
+        fresh.add_nodes(indexer._nodes)
+        assert len(indexer._bm25) == len(fresh)
+        for query in ("methanol", "antibody dilution", "transfer buffer"):
+            assert indexer._bm25.score(query) == pytest.approx(fresh.score(query))
+        sources = {
+            node.metadata["source"] for node, _ in indexer._bm25.retrieve("methanol", 5)
+        }
+        assert sources == {
+            "memory/project/beta.md#beta",
+            "memory/project/delta.md#delta",
+        }
+
+    def test_retrieve_reuses_resident_index(self, indexer, tmp_path, monkeypatch):
+        import llama_index.retrievers.bm25 as bm25_module
+
+        from graph.memory_bm25 import MemoryBM25Index
+
+        _write_memory_file(
+            tmp_path, "memory/project/alpha.md", "# Alpha\nGel casting notes.\n"
+        )
+        indexer._maybe_rebuild()
+
+        def _fail(*args, **kwargs):
+            raise AssertionError("BM25Retriever must not be rebuilt per query")
+
+        add_calls: list[int] = []
+        original_add = MemoryBM25Index.add_nodes
+
+        def tracking_add(self, nodes):
+            count = original_add(self, nodes)
+            add_calls.append(count)
+            return count
+
+        monkeypatch.setattr(bm25_module.BM25Retriever, "from_defaults", _fail)
+        monkeypatch.setattr(MemoryBM25Index, "add_nodes", tracking_add)
+
+        for _ in range(3):
+            results = indexer.retrieve("gel casting", top_k=2)
+            assert results[0]["source"] == "memory/project/alpha.md#alpha"
+        assert add_calls == []
+
+    def test_benchmark_query_cost_independent_of_corpus_size(self):
+        import time
+
+        from graph.memory_bm25 import MemoryBM25Index
+
+        def _median_query_seconds(corpus_size: int) -> float:
+            index = MemoryBM25Index()
+            # A constant number of documents carry the rare query term, so
+            # the posting lists touched by the query stay the same size.
+            index.add_nodes(self._text_nodes(corpus_size, rare_every=corpus_size // 10))
+            samples = []
+            for _ in range(50):
+                start = time.perf_counter()
+                index.retrieve("zymogen", 5)
+                samples.append(time.perf_counter() - start)
+            samples.sort()
+            return samples[len(samples) // 2]
+
+        small = _median_query_seconds(500)
+        large = _median_query_seconds(20_000)
+
+        # 40x more documents must not make the query meaningfully slower.
+        assert large < max(small * 5, 0.002), (
+            f"query took {large * 1000:.3f}ms at 20k nodes vs "
+            f"{small * 1000:.3f}ms at 500 nodes"
+        )
+
+
+class _CountingEmbedder:
+    """Deterministic local embedder that records every batch it is sent.
+
+    ``EmbeddingPipeline`` only calls ``get_text_embedding_batch``, so the
+    pipeline tests use this plain object; :func:`_counting_embed_model` wraps
+    it for code that needs a LlamaIndex ``BaseEmbedding``.
+    """
+
+    model_name = "counting-test"
+
+    def __init__(self, *, delay: float = 0.0) -> None:
+        import threading
+
+        self.delay = delay
+        self.batches: list[list[str]] = []
+        self.max_in_flight = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def vector(text: str) -> list[float]:
+        return [float(len(text)), float(sum(map(ord, text)) % 97), 1.0]
+
+    def get_text_embedding_batch(self, texts: list[str], **_: Any) -> list[list[float]]:
+        import time
+
+        with self._lock:
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+            self.batches.append(list(texts))
+        try:
+            if self.delay:
+                time.sleep(self.delay)
+            return [self.vector(text) for text in texts]
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+
+def _counting_embed_model(*, delay: float = 0.0):
+    """``BaseEmbedding`` adapter over a :class:`_CountingEmbedder`."""
+    from llama_index.core.bridge.pydantic import PrivateAttr
+    from llama_index.core.embeddings import BaseEmbedding
+
+    class CountingEmbedding(BaseEmbedding):
+        _counter: Any = PrivateAttr()
+
+        def __init__(self) -> None:
+            super().__init__(model_name=_CountingEmbedder.model_name, embed_batch_size=1024)
+            self._counter = _CountingEmbedder(delay=delay)
+
+        @property
+        def batches(self) -> list[list[str]]:
+            return self._counter.batches
+
+        def _get_text_embeddings(self, texts: list[str]) -> list[list[float]]:
+            return self._counter.get_text_embedding_batch(texts)
+
+        def _get_text_embedding(self, text: str) -> list[float]:
+            return self._get_text_embeddings([text])[0]
+
+        def _get_query_embedding(self, query: str) -> list[float]:
+            return _CountingEmbedder.vector(query)
+
+        async def _aget_query_embedding(self, query: str) -> list[float]:
+            return _CountingEmbedder.vector(query)
+
+    return CountingEmbedding()
+
+
+class TestEmbeddingPipeline:
+    """Memory chunks are embedded in parallel batches behind a content cache."""
+
+    def _nodes(self, texts: list[str], source: str = "memory/project/a.md") -> list:
+        from llama_index.core.schema import TextNode
+
+        return [
+            TextNode(text=text, id_=f"{source}-{i}", metadata={"source": source})
+            for i, text in enumerate(texts)
+        ]
+
+    def test_batches_misses_and_bounds_concurrency(self):
+        from graph.memory_embedding import EmbeddingPipeline
+
+        model = _CountingEmbedder(delay=0.02)
+        pipeline = EmbeddingPipeline(model, batch_size=4, max_workers=2)
+        nodes = self._nodes([f"protocol step {i}" for i in range(10)])
+        nodes += self._nodes(["protocol step 0"], source="memory/project/b.md")
+
+        stats = pipeline.embed_nodes(nodes)
+
+        assert [len(batch) for batch in model.batches] == [4, 4, 2]
+        assert model.max_in_flight <= 2
+        assert stats.texts == 11
+        assert stats.unique_texts == 10
+        assert stats.embedded == 10
+        assert stats.batches == 3
+        assert stats.throughput > 0
+        assert pipeline.last_stats is stats
+        assert all(node.embedding for node in nodes)
+        # The duplicate text shares one vector regardless of its source file.
+        assert nodes[-1].embedding == nodes[0].embedding
+
+    def test_cached_content_is_not_re_embedded(self):
+        from graph.memory_embedding import EmbeddingPipeline
+
+        model = _CountingEmbedder()
+        pipeline = EmbeddingPipeline(model, batch_size=8)
+        pipeline.embed_nodes(self._nodes(["gel casting", "buffer recipe"]))
+        model.batches.clear()
+
+        moved = self._nodes(
+            ["buffer recipe", "antibody log"], source="memory/user/moved.md"
+        )
+        stats = pipeline.embed_nodes(moved)
+
+        assert model.batches == [["antibody log"]]
+        assert stats.cache_hits == 1
+        assert stats.embedded == 1
+
+    def test_batch_failure_propagates(self):
+        from graph.memory_embedding import EmbeddingPipeline
+
+        class BrokenModel:
+            model_name = "broken"
+
+            def get_text_embedding_batch(self, texts):
+                raise RuntimeError("embedding backend down")
+
+        pipeline = EmbeddingPipeline(BrokenModel(), batch_size=2)
+        nodes = self._nodes(["a b", "c d", "e f"])
+        with pytest.raises(RuntimeError, match="backend down"):
+            pipeline.embed_nodes(nodes)
+        assert all(node.embedding is None for node in nodes)
+
+    def test_indexer_rebuild_and_moved_section_reuse_embeddings(self, tmp_path):
+        (tmp_path / "memory").mkdir()
+        model = _counting_embed_model()
+        indexer = MemoryIndexer(
+            base_dir=tmp_path, embed_model=model, embed_batch_size=2
+        )
+        _write_memory_file(
+            tmp_path,
+            "memory/project/alpha.md",
+            "# Gel\nCast at 12 percent.\n\n# Transfer\nWet transfer overnight.\n",
+        )
+        _write_memory_file(
+            tmp_path, "memory/project/beta.md", "# Blocking\nFive percent milk.\n"
+        )
+        indexer._maybe_rebuild()
+
+        assert indexer._index is not None
+        assert indexer._embedding.last_stats.embedded == len(indexer._nodes)
+        assert all(len(batch) <= 2 for batch in model.batches)
+        assert all(node.embedding for node in indexer._nodes)
+
+        # Move a section verbatim into a new file: the incremental path must
+        # insert it into the vector index without another embedding request.
+        model.batches.clear()
+        (tmp_path / "memory/project/beta.md").unlink()
+        _write_memory_file(
+            tmp_path, "memory/project/gamma.md", "# Blocking\nFive percent milk.\n"
+        )
+        indexer._maybe_rebuild()
+        if indexer._rebuild_thread is not None:
+            indexer._rebuild_thread.join(timeout=5.0)
+
+        assert indexer._index is not None
+        assert model.batches == []
+        assert indexer._embedding.last_stats.cache_hits >= 1
+        sources = {
+            node.metadata.get("source")
+            for node in indexer._index.docstore.docs.values()
+        }
+        assert any("gamma.md" in str(source) for source in sources)
+        assert not any("beta.md" in str(source) for source in sources)
+
+
+class TestLexicalPostingIndex:
+    """`_lexical_results` answers from posting lists, not a linear scan."""
+
+    def _reference_lexical_results(self, indexer, query, top_k, **filters):
+        # The pre-index linear scan, kept here as the parity oracle.
+        terms = indexer._query_terms(query)
+        phrase = " ".join(terms)
+        scored = []
+        for section in indexer._sections:
+            if not indexer._section_matches_filters(
+                section.memory_kind,
+                section.memory_scope,
+                section.memory_tags,
+                kind_filter=filters.get("kind_filter"),
+                scope_filter=filters.get("scope_filter"),
+                tag_filter=filters.get("tag_filter"),
+            ):
+                continue
+            matched = [term for term in terms if term in section.search_text]
+            if not matched:
+                continue
+            score = len(matched) / len(terms)
+            score += sum(section.search_text.count(term) for term in matched) * 0.05
+            if phrase and phrase in section.search_text:
+                score += 0.35
+            scored.append((round(score, 4), section.source))
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return scored[:top_k]
+
+    def _seed_corpus(self, tmp_path):
+        _write_memory_file(
+            tmp_path,
+            "memory/project/blot.md",
+            "---\ntype: project_fact\nname: Blotting\ndescription: Western blotting notes.\n"
+            "tags: [western, protein]\n---\n# Blotting\nTransfer at 100V; blotblot buffer.\n",
+        )
+        _write_memory_file(
+            tmp_path,
+            "memory/user/prefs.md",
+            "# Prefs\nPrefers concise western blot summaries.\n",
+        )
+        _write_memory_file(
+            tmp_path,
+            "memory/agent/rules.md",
+            "---\ntype: workflow_heuristic\nname: Rules\ndescription: Buffer safety rules.\n"
+            "tags: [safety]\n---\n# Rules\nLabel every buffer bottle.\n",
+        )
+
+    def test_results_match_linear_scan(self, indexer, tmp_path):
+        self._seed_corpus(tmp_path)
+        indexer._maybe_rebuild()
+
+        cases = [
+            ("blot buffer", {}),
+            ("western blot", {}),
+            ("lot", {}),
+            ("fact rules", {}),
+            ("100v transfer", {}),
+            ("blot", {"kind_filter": {"project", "user"}}),
+            ("buffer", {"scope_filter": {"global"}}),
+            ("buffer", {"tag_filter": {"western", "safety"}}),
+            ("buffer", {"kind_filter": {"user"}, "tag_filter": {"safety"}}),
+        ]
+        for query, filters in cases:
+            actual = [
+                (result["score"], result["source"])
+                for result in indexer._lexical_results(query, 10, **filters)
+            ]
+            assert actual == self._reference_lexical_results(
+                indexer, query, 10, **filters
+            ), query
+
+    def test_filters_do_not_call_per_section_predicate(
+        self, indexer, tmp_path, monkeypatch
+    ):
+        self._seed_corpus(tmp_path)
+        indexer._maybe_rebuild()
+
+        def _fail(*args, **kwargs):
+            raise AssertionError("filters must be answered from buckets")
+
+        monkeypatch.setattr(indexer, "_section_matches_filters", _fail)
+
+        results = indexer._lexical_results(
+            "buffer", 10, kind_filter={"agent"}, tag_filter={"safety"}
+        )
+
+        assert [result["source"] for result in results] == [
+            "memory/agent/rules.md#rules"
+        ]
+
+    def test_only_sections_containing_a_term_are_visited(self, indexer, tmp_path):
+        self._seed_corpus(tmp_path)
+        indexer._maybe_rebuild()
+
+        matches = indexer._lexical.match(["concise"])
+
+        assert [section.source for section, _ in matches] == [
+            "memory/user/prefs.md#prefs"
+        ]
+
+    def test_incremental_update_keeps_postings_in_sync(self, indexer, tmp_path):
+        self._seed_corpus(tmp_path)
+        indexer._maybe_rebuild()
+
+        (tmp_path / "memory/user/prefs.md").write_text(
+            "# Prefs\nPrefers ELISA plate layouts.\n", encoding="utf-8"
+        )
+        (tmp_path / "memory/agent/rules.md").unlink()
+        indexer._maybe_rebuild()
+        if indexer._rebuild_thread is not None:
+            indexer._rebuild_thread.join(timeout=5.0)
+
+        assert indexer._lexical_results("concise", 10) == []
+        assert indexer._lexical_results("label bottle", 10) == []
+        assert [r["source"] for r in indexer._lexical_results("elisa", 10)] == [
+            "memory/user/prefs.md#prefs"
+        ]
+        for query in ("blot buffer", "plate", "fact"):
+            actual = [
+                (result["score"], result["source"])
+                for result in indexer._lexical_results(query, 10)
+            ]
+            assert actual == self._reference_lexical_results(indexer, query, 10)
+
+
 class TestLLMProbeRetrieval:
     """Exercise the LLM-probe retrieval helpers that support rag_mode=llm_probe."""
 
@@ -1247,3 +1696,70 @@ class TestLLMProbeRetrieval:
             tmp_path, "memory/project/one.md", "# One\nBody.\n"
         )
         assert indexer.memory_file_count() == 2
+
+    def test_build_probe_index_reparses_only_changed_files(
+        self, indexer, tmp_path, monkeypatch
+    ):
+        for i in range(5):
+            self._write_typed_file(
+                tmp_path, f"memory/project/n{i}.md", f"Note {i}", f"Desc {i}."
+            )
+        first, _ = indexer.build_probe_index(max_chars=10_000)
+
+        import graph.memory_indexer as memory_indexer_module
+
+        parse_calls: list[str] = []
+        original_parse = memory_indexer_module.parse_memory_document
+
+        def tracking_parse(source, content):
+            parse_calls.append(source)
+            return original_parse(source, content)
+
+        monkeypatch.setattr(
+            memory_indexer_module, "parse_memory_document", tracking_parse
+        )
+
+        assert indexer.build_probe_index(max_chars=10_000)[0] == first
+        assert parse_calls == []
+
+        self._write_typed_file(
+            tmp_path, "memory/project/n3.md", "Note 3", "Rewritten description."
+        )
+        (tmp_path / "memory/project/n1.md").unlink()
+        rendered, valid_sources = indexer.build_probe_index(max_chars=10_000)
+        if indexer._rebuild_thread is not None:
+            indexer._rebuild_thread.join(timeout=5.0)
+
+        assert set(parse_calls) == {"memory/project/n3.md"}
+        assert "Rewritten description." in rendered
+        assert "memory/project/n1.md" not in valid_sources
+        assert valid_sources == [
+            "memory/project/n0.md",
+            "memory/project/n2.md",
+            "memory/project/n3.md",
+            "memory/project/n4.md",
+        ]
+
+    def test_state_snapshot_is_reused_without_rewalking_tree(
+        self, indexer, tmp_path, monkeypatch
+    ):
+        self._write_typed_file(
+            tmp_path, "memory/project/a.md", "Alpha", "A description."
+        )
+        indexer.build_probe_index(max_chars=10_000)
+        expected_digest = indexer.memory_corpus_digest()
+
+        snapshot = indexer.memory_state_snapshot()
+
+        def _fail():
+            raise AssertionError("memory/ must not be re-walked")
+
+        monkeypatch.setattr(indexer, "_memory_files", _fail)
+
+        assert indexer.memory_file_count(snapshot) == 1
+        assert indexer.memory_corpus_digest(snapshot) == expected_digest
+        rendered, valid_sources = indexer.build_probe_index(
+            max_chars=10_000, state_map=snapshot
+        )
+        assert valid_sources == ["memory/project/a.md"]
+        assert "Alpha" in rendered
@@ -6,6 +6,7 @@ the Prometheus exposition text carries the expected metric name and value.
 from __future__ import annotations
 
 import sys
+import threading
 from pathlib import Path
 
 import pytest
@@ -266,11 +267,64 @@ def test_exposition_lists_every_core_metric_name(
         "bioapex_prompt_cache_creation_tokens_total",
         "bioapex_prompt_cache_uncached_tokens_total",
         "bioapex_prompt_cache_hit_rate",
+        "bioapex_audit_queue_depth",
+        "bioapex_audit_events_written_total",
+        "bioapex_audit_events_dropped_total",
+        "bioapex_turn_phase_duration_seconds",
     }
     for name in expected_names:
         assert f"# TYPE {name} " in text, f"missing TYPE header for {name}"
 
 
+# ---------------------------------------------------------------------- #
+# Sharded accumulators and cached exposition                              #
+# ---------------------------------------------------------------------- #
+
+
+def test_concurrent_threads_lose_no_increments(collector: MetricsCollector) -> None:
+    def record() -> None:
+        for _ in range(2_000):
+            collector.record_output_tokens(1)
+            collector._observe_histogram("bioapex_tool_duration_seconds", 0.2, labels={"tool": "t"})
+
+    threads = [threading.Thread(target=record) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    # Snapshots taken mid-run fold finished threads into the retired shard.
+    while any(thread.is_alive() for thread in threads):
+        collector.render_exposition()
+    for thread in threads:
+        thread.join()
+
+    text = collector.render_exposition()
+    assert "bioapex_tokens_output_total 16000" in text
+    assert 'bioapex_tool_duration_seconds_count{tool="t"} 16000' in text
+    assert 'bioapex_tool_duration_seconds_bucket{le="0.25",tool="t"} 16000' in text
+    assert 'bioapex_tool_duration_seconds_bucket{le="0.1",tool="t"} 0' in text
+
+
+def test_histogram_bounds_are_inclusive(collector: MetricsCollector) -> None:
+    for value in (0.005, 0.0051, 60.0, 61.0):
+        collector._observe_histogram("bioapex_tool_duration_seconds", value, labels={"tool": "t"})
+    text = collector.render_exposition()
+    assert 'bioapex_tool_duration_seconds_bucket{le="0.005",tool="t"} 1' in text
+    assert 'bioapex_tool_duration_seconds_bucket{le="0.01",tool="t"} 2' in text
+    assert 'bioapex_tool_duration_seconds_bucket{le="60",tool="t"} 3' in text
+    assert 'bioapex_tool_duration_seconds_bucket{le="+Inf",tool="t"} 4' in text
+
+
+def test_exposition_is_cached_for_its_ttl() -> None:
+    collector = MetricsCollector(exposition_ttl_seconds=3600)
+    collector.observe_event({"type": "done", "turn_status": "ok"})
+    first = collector.exposition()
+    collector.observe_event({"type": "done", "turn_status": "ok"})
+
+    assert collector.exposition() is first
+    assert "bioapex_turns_total 2" in collector.render_exposition()
+    collector.reset()
+    assert "bioapex_turns_total 0" in collector.exposition()
+
+
 # ---------------------------------------------------------------------- #
 # HTTP endpoint                                                            #
 # ---------------------------------------------------------------------- #
@@ -0,0 +1,84 @@
+"""Tests for sharing metric snapshots between worker processes."""
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from runtime.metrics_collector import MetricsCollector, MetricsSnapshot  # noqa: E402
+from runtime.metrics_store import MetricsFileStore, MetricsPublisher  # noqa: E402
+
+
+def _worker(hits: int, misses: int, queue_depth: int) -> MetricsCollector:
+    collector = MetricsCollector()
+    for _ in range(hits):
+        collector.observe_retrieval(hit=True)
+    for _ in range(misses):
+        collector.observe_retrieval(hit=False)
+    collector._observe_histogram("bioapex_tool_duration_seconds", 0.3, labels={"tool": "terminal"})
+    collector.observe_audit_writer(queue_depth=queue_depth)
+    return collector
+
+
+def _exited_pid() -> int:
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def test_snapshot_payload_round_trips() -> None:
+    snapshot = _worker(3, 1, 2).snapshot()
+    restored = MetricsSnapshot.from_payload(json.loads(json.dumps(snapshot.to_payload())))
+    assert restored == snapshot
+
+
+def test_scrape_merges_live_peer_workers(tmp_path: Path) -> None:
+    local = _worker(3, 1, 2)
+    peer = _worker(0, 4, 5)
+    local.attach_store(MetricsFileStore(tmp_path))
+    MetricsFileStore(tmp_path, pid=os.getppid()).publish(peer.snapshot())
+
+    text = local.exposition()
+
+    assert "bioapex_retrieval_queries_total 8" in text
+    assert "bioapex_retrieval_cache_hit_ratio 0.375" in text
+    assert "bioapex_audit_queue_depth 7" in text
+    assert 'bioapex_tool_duration_seconds_count{tool="terminal"} 2' in text
+    # The local process reads its own counters live, never from its file.
+    assert "bioapex_retrieval_queries_total 4" in local.render_exposition()
+
+
+def test_exited_and_stale_workers_are_dropped(tmp_path: Path) -> None:
+    local = MetricsCollector()
+    store = MetricsFileStore(tmp_path, stale_after_seconds=30)
+    local.attach_store(store)
+    dead = MetricsFileStore(tmp_path, pid=_exited_pid())
+    dead.publish(_worker(5, 0, 0).snapshot())
+    stale = MetricsFileStore(tmp_path, pid=os.getppid())
+    stale.publish(_worker(7, 0, 0).snapshot())
+    payload = json.loads(stale.path.read_text(encoding="utf-8"))
+    stale.path.write_text(json.dumps(payload | {"published_at": payload["published_at"] - 120}), encoding="utf-8")
+    (tmp_path / "worker-garbage.json").write_text("{not json", encoding="utf-8")
+
+    assert "bioapex_retrieval_queries_total 0" in local.exposition()
+    assert not dead.path.exists()
+    assert stale.path.exists()
+
+
+def test_publisher_writes_and_withdraws_its_snapshot(tmp_path: Path) -> None:
+    collector = _worker(1, 1, 0)
+    store = MetricsFileStore(tmp_path)
+    publisher = MetricsPublisher(store, collector, interval_seconds=60)
+    publisher.start()
+    publisher.close(timeout=5)
+
+    assert not store.path.exists()
+    publisher.publish_now()
+    reader = MetricsFileStore(tmp_path, pid=os.getppid())
+    assert [snapshot.counters["bioapex_retrieval_queries_total"] for snapshot in reader.peer_snapshots()] == [
+        {(): 2.0}
+    ]
@@ -0,0 +1,359 @@
+"""Tests for the array-based RNA-seq differential-expression engine.
+
+The ``_reference_*`` functions are the per-gene implementation the engine
+replaced, kept verbatim as the oracle: the engine must reproduce its output
+exactly, not approximately.
+"""
+
+import math
+import random
+import sys
+from pathlib import Path
+from typing import Any, Mapping, Sequence
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tests.runner_modules import load_runner_module  # noqa: E402
+
+rnaseq_de_engine = load_runner_module("rnaseq_de_engine")
+write_matrix_tsv = load_runner_module("count_matrix_io").write_matrix_tsv
+batch_mean_center = rnaseq_de_engine.batch_mean_center
+benjamini_hochberg = rnaseq_de_engine.benjamini_hochberg
+normalize_counts = rnaseq_de_engine.normalize_counts
+welch_statistics = rnaseq_de_engine.welch_statistics
+
+
+def _reference_mean(values: Sequence[float] | Any) -> float:
+    value_list = [float(item) for item in values]
+    if not value_list:
+        raise ValueError("Mean requires at least one value.")
+    return sum(value_list) / len(value_list)
+
+
+def _reference_sample_variance(values: Sequence[float]) -> float:
+    if len(values) <= 1:
+        return 0.0
+    mean_value = _reference_mean(values)
+    return sum((float(item) - mean_value) ** 2 for item in values) / (len(values) - 1)
+
+
+def _reference_normalize_count_matrix(
+    count_rows: Sequence[Mapping[str, Any]],
+    sample_ids: Sequence[str],
+    size_factors: Mapping[str, float],
+) -> list[dict[str, Any]]:
+    normalized_rows: list[dict[str, Any]] = []
+    for row in count_rows:
+        counts = row.get("counts")
+        if not isinstance(counts, Mapping):
+            raise ValueError("Count matrix rows must include a counts mapping.")
+        normalized_counts = {
+            sample_id: round(int(counts[sample_id]) / float(size_factors[sample_id]), 6)
+            for sample_id in sample_ids
+        }
+        normalized_rows.append(
+            {
+                "gene_id": row["gene_id"],
+                "gene_symbol": row["gene_symbol"],
+                "normalized_counts": normalized_counts,
+            }
+        )
+    return normalized_rows
+
+
+def _reference_apply_batch_mean_centering(
+    normalized_rows: Sequence[Mapping[str, Any]],
+    sample_index: Mapping[str, Mapping[str, str]],
+    *,
+    batch_fields: Sequence[str],
+) -> list[dict[str, Any]]:
+    if not batch_fields:
+        return [
+            {
+                "gene_id": row["gene_id"],
+                "gene_symbol": row["gene_symbol"],
+                "normalized_counts": dict(row["normalized_counts"]),
+                "adjusted_counts": dict(row["normalized_counts"]),
+            }
+            for row in normalized_rows
+        ]
+
+    adjusted_rows: list[dict[str, Any]] = []
+    for row in normalized_rows:
+        normalized_counts = row["normalized_counts"]
+        global_mean = _reference_mean(normalized_counts.values())
+        batch_means: dict[tuple[str, ...], float] = {}
+        batch_members: dict[tuple[str, ...], list[str]] = {}
+        for sample_id in normalized_counts:
+            batch_key = tuple(str(sample_index[sample_id].get(field, "")).strip() for field in batch_fields)
+            batch_members.setdefault(batch_key, []).append(sample_id)
+        for batch_key, sample_ids in batch_members.items():
+            batch_means[batch_key] = _reference_mean(normalized_counts[sample_id] for sample_id in sample_ids)
+
+        adjusted_counts = {}
+        for sample_id, value in normalized_counts.items():
+            batch_key = tuple(str(sample_index[sample_id].get(field, "")).strip() for field in batch_fields)
+            adjusted_counts[sample_id] = round(value - batch_means[batch_key] + global_mean, 6)
+
+        adjusted_rows.append(
+            {
+                "gene_id": row["gene_id"],
+                "gene_symbol": row["gene_symbol"],
+                "normalized_counts": dict(normalized_counts),
+                "adjusted_counts": adjusted_counts,
+            }
+        )
+    return adjusted_rows
+
+
+def _reference_summarize_differential_expression(
+    adjusted_rows: Sequence[Mapping[str, Any]],
+    sample_index: Mapping[str, Mapping[str, str]],
+    *,
+    condition_field: str,
+    baseline_condition: str,
+    comparison_condition: str,
+) -> list[dict[str, Any]]:
+    result_rows: list[dict[str, Any]] = []
+    for row in adjusted_rows:
+        adjusted_counts = row["adjusted_counts"]
+        normalized_counts = row["normalized_counts"]
+        baseline_values = [
+            float(adjusted_counts[sample_id])
+            for sample_id in adjusted_counts
+            if sample_index.get(sample_id, {}).get(condition_field) == baseline_condition
+        ]
+        comparison_values = [
+            float(adjusted_counts[sample_id])
+            for sample_id in adjusted_counts
+            if sample_index.get(sample_id, {}).get(condition_field) == comparison_condition
+        ]
+        if not baseline_values or not comparison_values:
+            continue
+
+        baseline_mean = _reference_mean(baseline_values)
+        comparison_mean = _reference_mean(comparison_values)
+        log2_fold_change = math.log2((comparison_mean + 1.0) / (baseline_mean + 1.0))
+        standard_error = math.sqrt(
+            (_reference_sample_variance(baseline_values) / max(len(baseline_values), 1))
+            + (_reference_sample_variance(comparison_values) / max(len(comparison_values), 1))
+        )
+        if standard_error <= 0:
+            z_score = 0.0 if abs(comparison_mean - baseline_mean) < 1e-9 else 12.0
+        else:
+            z_score = abs(comparison_mean - baseline_mean) / standard_error
+        p_value = min(max(math.erfc(z_score / math.sqrt(2.0)), 1e-12), 1.0)
+
+        result_rows.append(
+            {
+                "gene_id": row["gene_id"],
+                "gene_symbol": row["gene_symbol"],
+                "baseline_mean": round(_reference_mean(
+                    normalized_counts[sample_id]
+                    for sample_id in normalized_counts
+                    if sample_index.get(sample_id, {}).get(condition_field) == baseline_condition
+                ), 6),
+                "comparison_mean": round(_reference_mean(
+                    normalized_counts[sample_id]
+                    for sample_id in normalized_counts
+                    if sample_index.get(sample_id, {}).get(condition_field) == comparison_condition
+                ), 6),
+                "log2_fold_change": round(log2_fold_change, 6),
+                "p_value": round(p_value, 12),
+                "baseline_replicates": len(baseline_values),
+                "comparison_replicates": len(comparison_values),
+            }
+        )
+    return result_rows
+
+
+def _reference_benjamini_hochberg(p_values: Sequence[float]) -> list[float]:
+    if not p_values:
+        return []
+    indexed = sorted(enumerate(p_values), key=lambda item: item[1])
+    adjusted = [1.0] * len(p_values)
+    running_min = 1.0
+    total = len(p_values)
+    for rank, (original_index, p_value) in enumerate(reversed(indexed), start=1):
+        adjusted_value = min(1.0, p_value * total / (total - rank + 1))
+        running_min = min(running_min, adjusted_value)
+        adjusted[original_index] = round(running_min, 12)
+    return adjusted
+
+
+def _reference_normalized_tsv(sample_ids: Sequence[str], rows: Sequence[Mapping[str, Any]]) -> str:
+    lines = ["\t".join(["gene_id", "gene_symbol", *sample_ids])]
+    for row in rows:
+        normalized_counts = row["normalized_counts"]
+        values = [str(row["gene_id"]), str(row["gene_symbol"])]
+        values.extend(f"{float(normalized_counts[sample_id]):.6f}" for sample_id in sample_ids)
+        lines.append("\t".join(values))
+    return "\n".join(lines)
+
+
+def _synthetic_contrast(seed: int, *, genes: int, samples: int, batches: int) -> dict[str, Any]:
+    rng = random.Random(seed)
+    sample_ids = [f"S{index:03d}" for index in range(samples)]
+    sample_index = {
+        sample_id: {
+            "sample_id": sample_id,
+            "condition": "treated" if index % 2 else "control",
+            "batch": f"b{rng.randrange(batches)}",
+            "lane": f"L{index % 3}",
+        }
+        for index, sample_id in enumerate(sample_ids)
+    }
+    count_rows = []
+    for gene in range(genes):
+        base = rng.choice([0, 0, 3, 40, 900, 25_000])
+        count_rows.append(
+            {
+                "gene_id": f"ENSG{gene:011d}",
+                "gene_symbol": f"G{gene}",
+                "counts": {
+                    sample_id: max(0, int(rng.gauss(base * (1.5 if gene % 7 == 0 and index % 2 else 1.0), base / 4 + 1)))
+                    for index, sample_id in enumerate(sample_ids)
+                },
+            }
+        )
+    library_sizes = {sample_id: sum(row["counts"][sample_id] for row in count_rows) + 1 for sample_id in sample_ids}
+    median_size = sorted(library_sizes.values())[samples // 2]
+    size_factors = {sample_id: round(library_sizes[sample_id] / median_size, 6) for sample_id in sample_ids}
+    return {
+        "sample_ids": sample_ids,
+        "sample_index": sample_index,
+        "count_rows": count_rows,
+        "size_factors": size_factors,
+    }
+
+
+def _reference_results(contrast: Mapping[str, Any], batch_fields: Sequence[str]) -> tuple[list, list]:
+    normalized_rows = _reference_normalize_count_matrix(
+        contrast["count_rows"], contrast["sample_ids"], contrast["size_factors"]
+    )
+    adjusted_rows = _reference_apply_batch_mean_centering(
+        normalized_rows, contrast["sample_index"], batch_fields=batch_fields
+    )
+    result_rows = _reference_summarize_differential_expression(
+        adjusted_rows,
+        contrast["sample_index"],
+        condition_field="condition",
+        baseline_condition="control",
+        comparison_condition="treated",
+    )
+    adjusted_p_values = _reference_benjamini_hochberg([float(item["p_value"]) for item in result_rows])
+    for row, adjusted_p_value in zip(result_rows, adjusted_p_values, strict=True):
+        row["adjusted_p_value"] = adjusted_p_value
+    return normalized_rows, result_rows
+
+
+def _engine_results(contrast: Mapping[str, Any], batch_fields: Sequence[str]) -> tuple[np.ndarray, list]:
+    sample_ids = contrast["sample_ids"]
+    sample_index = contrast["sample_index"]
+    counts = np.array(
+        [[row["counts"][sample_id] for sample_id in sample_ids] for row in contrast["count_rows"]],
+        dtype=np.int64,
+    )
+    normalized = normalize_counts(counts, [contrast["size_factors"][sample_id] for sample_id in sample_ids])
+    adjusted = (
+        batch_mean_center(
+            normalized,
+            [tuple(sample_index[sample_id][field] for field in batch_fields) for sample_id in sample_ids],
+        )
+        if batch_fields
+        else normalized
+    )
+    conditions = [sample_index[sample_id]["condition"] for sample_id in sample_ids]
+    statistics = welch_statistics(
+        normalized,
+        adjusted,
+        [index for index, value in enumerate(conditions) if value == "control"],
+        [index for index, value in enumerate(conditions) if value == "treated"],
+    )
+    adjusted_p_values = benjamini_hochberg(statistics.p_value)
+    rows = [
+        {
+            "gene_id": row["gene_id"],
+            "gene_symbol": row["gene_symbol"],
+            "baseline_mean": values[0],
+            "comparison_mean": values[1],
+            "log2_fold_change": values[2],
+            "p_value": values[3],
+            "baseline_replicates": statistics.baseline_replicates,
+            "comparison_replicates": statistics.comparison_replicates,
+            "adjusted_p_value": values[4],
+        }
+        for row, *values in zip(
+            contrast["count_rows"],
+            statistics.baseline_mean.tolist(),
+            statistics.comparison_mean.tolist(),
+            statistics.log2_fold_change.tolist(),
+            statistics.p_value.tolist(),
+            adjusted_p_values.tolist(),
+        )
+    ]
+    return normalized, rows
+
+
+class TestDifferentialExpressionEngine:
+    @pytest.mark.parametrize(
+        ("seed", "samples", "batch_fields"),
+        [
+            (1, 6, []),
+            (2, 12, ["batch"]),
+            (3, 25, ["batch", "lane"]),
+            (4, 3, ["batch"]),
+        ],
+    )
+    def test_matches_reference_implementation_exactly(self, tmp_path, seed, samples, batch_fields):
+        contrast = _synthetic_contrast(seed, genes=400, samples=samples, batches=3)
+
+        reference_normalized, reference_rows = _reference_results(contrast, batch_fields)
+        normalized, rows = _engine_results(contrast, batch_fields)
+
+        assert rows == reference_rows
+        normalized_path = tmp_path / "normalized_counts.tsv"
+        write_matrix_tsv(
+            normalized_path,
+            gene_ids=[row["gene_id"] for row in contrast["count_rows"]],
+            gene_symbols=[row["gene_symbol"] for row in contrast["count_rows"]],
+            sample_ids=contrast["sample_ids"],
+            values=normalized,
+            chunk_rows=64,
+        )
+        assert normalized_path.read_text(encoding="utf-8") == (
+            _reference_normalized_tsv(contrast["sample_ids"], reference_normalized) + "\n"
+        )
+
+    def test_rounding_and_squares_match_python(self):
+        rng = np.random.default_rng(7)
+        values = np.concatenate(
+            [
+                rng.uniform(-1e4, 1e4, 50_000),
+                rng.lognormal(0.0, 4.0, 50_000),
+                # Exact and near decimal ties, where np.round and round disagree.
+                (np.arange(-5_000, 5_000) + 0.5) / 1e6,
+                np.nextafter((np.arange(5_000) + 0.5) / 1e6, 1.0),
+                np.array([0.0, -0.0, 2.0**53, -1e-13, 5e-13]),
+            ]
+        )
+
+        assert rnaseq_de_engine._round(values, 6).tolist() == [round(value, 6) for value in values.tolist()]
+        assert rnaseq_de_engine._round(values, 12).tolist() == [round(value, 12) for value in values.tolist()]
+        assert rnaseq_de_engine._python_square(values).tolist() == [value**2 for value in values.tolist()]
+
+    def test_benjamini_hochberg_matches_reference_with_ties(self):
+        p_values = [0.01, 0.04, 0.04, 0.2, 1e-12, 0.04, 0.5, 0.01, 1.0]
+
+        assert benjamini_hochberg(np.array(p_values)).tolist() == _reference_benjamini_hochberg(p_values)
+        assert benjamini_hochberg(np.array([])).tolist() == []
+
+    def test_negative_shifted_baseline_raises_like_reference(self):
+        normalized = np.array([[0.0, 0.0]])
+        adjusted = np.array([[-3.0, 1.0]])
+
+        with pytest.raises(ValueError, match="math domain error"):
+            welch_statistics(normalized, adjusted, [0], [1])
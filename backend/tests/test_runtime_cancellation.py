@@ -119,10 +119,16 @@ class _RecordingSessionManager:
         self.saved: list[dict[str, Any]] = []
         self.batches: list[list[dict[str, Any]]] = []
 
-    async def auto_compress_if_needed(self, session_id: str, llm) -> None:
+    def read_snapshot(self, session_id: str) -> None:
         return None
 
-    def load_session_for_agent(self, session_id: str) -> list[dict]:
+    def flush_snapshot(self, snapshot) -> None:
+        return None
+
+    async def auto_compress_if_needed(self, session_id: str, llm, *, snapshot=None) -> None:
+        return None
+
+    def load_session_for_agent(self, session_id: str, *, snapshot=None) -> list[dict]:
         return list(self._history)
 
     def save_message(
@@ -8,7 +8,9 @@ build on drift.
 """
 from __future__ import annotations
 
+import enum
 import json
+from datetime import datetime, timezone
 from pathlib import Path
 
 import pytest
@@ -21,6 +23,7 @@ from runtime.events import (
     TurnExit,
     build_runtime_event,
     dump_runtime_event,
+    encode_runtime_event_sse,
     generate_runtime_events_schema,
     turn_status_to_exit,
 )
@@ -282,3 +285,96 @@ def test_warning_runtime_event_accepts_schema_version_deprecated_kind() -> None:
     )
     assert event.type == "warning"
     assert event.kind == "schema_version_deprecated"
+
+
+def _strict_sse(payload: dict) -> str:
+    return f"data: {json.dumps(dump_runtime_event(payload), ensure_ascii=False)}\n\n"
+
+
+_ENVELOPE = {"request_id": "req-1", "event_index": 12}
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        {"type": "token", "content": "h\u00e9llo \"quoted\"\n\u2028\U0001f9ec"},
+        {"type": "token", "content": "", **_ENVELOPE},
+        {"type": "tool_start", "tool": "read_file", "input": "{}", "run_id": "run-1", **_ENVELOPE},
+        {
+            "type": "tool_end",
+            "tool": "read_file",
+            "output": "x",
+            "run_id": "run-1",
+            "result": {
+                "status": "success",
+                "missing": None,
+                "when": datetime(2026, 1, 2, tzinfo=timezone.utc),
+                "pair": (1, 2.5),
+                "ratio": float("nan"),
+                "nested": {"ids": {3, 1}, "raw": b"bytes"},
+            },
+            "policy": None,
+            **_ENVELOPE,
+        },
+        {"type": "tool_chunk", "tool": "terminal", "run_id": "run-2", "chunk_index": 0, "chunk": "out"},
+        {"type": "retrieval", "query": "brca1", "results": [{"text": "x", "score": 0.1}], **_ENVELOPE},
+        {"type": "verification_result", "summary": "ok", "verdict": "pass", "verification": {}, "tool_trace": []},
+        {"type": "compaction_event", "from_turn": 1, "to_turn": 4, "summary": "s", "saved_tokens": 0, "phase": "snip"},
+        {"type": "warning", "kind": "citation_mismatch", "message": "m", "cited": ["PMID:1"]},
+        {"type": "new_response", **_ENVELOPE},
+        {"type": "done", "content": "final", "exit": {"reason": "success", "exit_code": 0}, **_ENVELOPE},
+        {
+            "type": "workflow_step_started",
+            "workflow_id": "wf",
+            "run_id": "r",
+            "step_id": "s",
+            "step_index": 1,
+            "total_steps": 2,
+        },
+        # Values validation would coerce are handed back to it.
+        {"type": "token", "content": "x", "request_id": "req-1", "event_index": 2.0},
+        {"type": "tool_end", "tool": "t", "output": "o", "run_id": "r", "result": {"k": "v"}, "policy": {}},
+    ],
+)
+def test_trusted_sse_encoding_is_byte_identical_to_validated_dump(payload: dict) -> None:
+    assert encode_runtime_event_sse(payload, trusted=True) == _strict_sse(payload)
+    assert encode_runtime_event_sse(payload) == _strict_sse(payload)
+
+
+def test_trusted_sse_encoding_defers_str_subclasses_to_validation() -> None:
+    class Channel(str, enum.Enum):
+        MAIN = "main"
+
+    payload = {"type": "token", "content": Channel.MAIN}
+    assert encode_runtime_event_sse(payload, trusted=True) == 'data: {"schema_version": 2, "type": "token", "content": "main"}\n\n'
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        {"type": "token", "content": 42},
+        {"type": "token", "content": "x", "surprise": True},
+        {"type": "token", "content": "x", "event_index": 0},
+        {"type": "token"},
+        {"type": "tool_chunk", "tool": "t", "run_id": "r", "chunk_index": -1, "chunk": "x"},
+        {"type": "verification_result", "summary": "x", "verdict": "maybe", "verification": {}},
+        {"type": "tool_end", "tool": "t", "output": "o", "run_id": "r", "result": {1: "int key"}},
+        {"type": "tool_start", "tool": None, "input": "x", "run_id": "r"},
+        {"type": "not_a_type"},
+    ],
+)
+def test_trusted_sse_encoding_still_rejects_invalid_payloads(payload: dict) -> None:
+    with pytest.raises(ValidationError):
+        encode_runtime_event_sse(payload, trusted=True)
+
+
+def test_trusted_token_events_skip_union_validation(monkeypatch: pytest.MonkeyPatch) -> None:
+    from runtime import events
+
+    def fail(payload: dict) -> dict:
+        raise AssertionError("trusted token event went through full validation")
+
+    monkeypatch.setattr(events, "dump_runtime_event", fail)
+    frame = encode_runtime_event_sse({"type": "token", "content": "hi", "request_id": "r", "event_index": 1}, trusted=True)
+
+    assert frame == 'data: {"schema_version": 2, "request_id": "r", "event_index": 1, "type": "token", "content": "hi"}\n\n'
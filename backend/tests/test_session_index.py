@@ -299,3 +299,95 @@ class TestSessionIndexSidecar:
         # a valid payload with no leftover ``.tmp`` files.
         assert payload["schema_version"] == SESSION_INDEX_SCHEMA_VERSION
         assert not list(sessions_dir.glob(f"{SESSION_INDEX_FILENAME}.*.tmp"))
+
+
+class TestDebouncedSessionIndexWriter:
+    @pytest.fixture
+    def buffered_sm(self, tmp_path):
+        # Long interval: the tests drive flushes explicitly.
+        return SessionManager(base_dir=tmp_path, index_flush_interval=60.0)
+
+    def _sidecar_sessions(self, tmp_path) -> dict:
+        sidecar = tmp_path / "sessions" / SESSION_INDEX_FILENAME
+        if not sidecar.exists():
+            return {}
+        return json.loads(sidecar.read_text())["sessions"]
+
+    def test_saves_are_buffered_until_flush(self, buffered_sm, tmp_path):
+        sid = buffered_sm.create_session()
+        for i in range(5):
+            buffered_sm.save_message(sid, "user", f"m{i}")
+
+        assert sid not in self._sidecar_sessions(tmp_path)
+
+        buffered_sm.flush_session_index()
+
+        assert self._sidecar_sessions(tmp_path)[sid]["message_count"] == 5
+
+    def test_listing_overlays_unflushed_entries(self, buffered_sm):
+        sid = buffered_sm.create_session()
+        buffered_sm.save_message(sid, "user", "hello")
+        buffered_sm.rename_session(sid, "Buffered title")
+
+        listed = {row["id"]: row for row in buffered_sm.list_sessions()}
+
+        assert listed[sid]["title"] == "Buffered title"
+        assert listed[sid]["message_count"] == 1
+
+    def test_flush_merges_with_entries_from_other_workers(self, buffered_sm, tmp_path):
+        other = SessionManager(base_dir=tmp_path, index_flush_interval=60.0)
+        ours = buffered_sm.create_session()
+        theirs = other.create_session()
+        other.flush_session_index()
+
+        buffered_sm.flush_session_index()
+
+        assert set(self._sidecar_sessions(tmp_path)) == {ours, theirs}
+
+    def test_stale_buffered_entry_does_not_roll_back_a_newer_one(
+        self, buffered_sm, tmp_path
+    ):
+        sid = buffered_sm.create_session()
+        buffered_sm.save_message(sid, "user", "first")
+        other = SessionManager(base_dir=tmp_path)
+        other.save_message(sid, "user", "second")
+
+        buffered_sm.flush_session_index()
+
+        assert self._sidecar_sessions(tmp_path)[sid]["message_count"] == 2
+
+    def test_deleted_session_is_not_resurrected_by_a_flush(self, buffered_sm, tmp_path):
+        keep = buffered_sm.create_session()
+        gone = buffered_sm.create_session()
+        SessionManager(base_dir=tmp_path).delete_session(gone)
+
+        buffered_sm.flush_session_index()
+
+        assert set(self._sidecar_sessions(tmp_path)) == {keep}
+        assert [row["id"] for row in buffered_sm.list_sessions()] == [keep]
+
+    def test_timer_flushes_without_an_explicit_call(self, tmp_path):
+        sm = SessionManager(base_dir=tmp_path, index_flush_interval=0.05)
+        sid = sm.create_session()
+
+        deadline = time.monotonic() + 5.0
+        while sid not in self._sidecar_sessions(tmp_path):
+            assert time.monotonic() < deadline, "buffered index was never flushed"
+            time.sleep(0.02)
+
+    def test_write_through_upserts_from_threads_are_all_kept(self, tmp_path):
+        sessions_dir = tmp_path / "sessions"
+        sessions_dir.mkdir()
+        ids = [_new_session_id() for _ in range(30)]
+        for sid in ids:
+            (sessions_dir / f"{sid}.json").write_text("{}", encoding="utf-8")
+
+        def do_upsert(sid: str) -> None:
+            upsert_session_entry(
+                sessions_dir, sid, title=sid, updated_at=1.0, message_count=0
+            )
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as ex:
+            list(ex.map(do_upsert, ids))
+
+        assert set(self._sidecar_sessions(tmp_path)) == set(ids)
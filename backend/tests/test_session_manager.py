@@ -923,7 +923,7 @@ class TestAutoCompress:
         for i in range(40):
             sm.save_message(sid, "user", f"m{i}")
 
-        async def _boom(self, session_id, llm, threshold):
+        async def _boom(self, session_id, llm, threshold, *, snapshot=None):
             raise RuntimeError("simulated unexpected failure inside lock")
 
         monkeypatch.setattr(
@@ -961,7 +961,7 @@ class TestAutoCompress:
         original = sm.get_or_create_compress_lock(sid)
         assert session_store._compress_locks.get(sid) is original
 
-        async def _boom(self, session_id, llm, threshold):
+        async def _boom(self, session_id, llm, threshold, *, snapshot=None):
             raise RuntimeError("boom")
 
         monkeypatch.setattr(
@@ -1390,3 +1390,341 @@ class TestAtomicSessionWrite:
         assert any(
             "session_read_fallback" in record.message for record in caplog.records
         )
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Append-only "log" storage format
+# ──────────────────────────────────────────────────────────────────────────────
+
+
+@pytest.fixture
+def log_sm(tmp_path):
+    return SessionManager(base_dir=tmp_path, storage_format="log")
+
+
+class TestLogStorageFormat:
+    def _paths(self, tmp_path, sid):
+        snapshot = tmp_path / "sessions" / f"{sid}.json"
+        return snapshot, snapshot.with_name(f"{sid}.log.jsonl")
+
+    def test_saves_append_records_without_rewriting_the_snapshot(
+        self, log_sm, tmp_path
+    ):
+        sid = log_sm.create_session()
+        snapshot, log = self._paths(tmp_path, sid)
+        inode = snapshot.stat().st_ino
+
+        log_sm.save_message(sid, "user", "hello")
+        log_sm.save_messages_batch(
+            sid,
+            [
+                {"role": "assistant", "content": "hi"},
+                {"role": "assistant", "content": "more"},
+            ],
+        )
+
+        assert snapshot.stat().st_ino == inode
+        assert json.loads(snapshot.read_text())["messages"] == []
+        records = [json.loads(line) for line in log.read_text().splitlines()]
+        assert [len(r.get("append", [])) for r in records] == [0, 1, 2]
+        assert [m["content"] for m in log_sm.load_session(sid)] == [
+            "hello",
+            "hi",
+            "more",
+        ]
+        listed = {row["id"]: row for row in log_sm.list_sessions()}
+        assert listed[sid]["message_count"] == 3
+
+    def test_v2_session_is_migrated_on_first_save(self, sm, log_sm, tmp_path):
+        sid = sm.create_session()
+        sm.save_message(sid, "user", "written as v2 json")
+        snapshot, log = self._paths(tmp_path, sid)
+        assert "message_log" not in json.loads(snapshot.read_text())
+
+        log_sm.save_message(sid, "assistant", "first log-format save")
+        log_sm.save_message(sid, "user", "second log-format save")
+
+        assert "message_log" in json.loads(snapshot.read_text())
+        assert log.exists()
+        assert [m["content"] for m in log_sm.load_session(sid)] == [
+            "written as v2 json",
+            "first log-format save",
+            "second log-format save",
+        ]
+
+    def test_torn_trailing_record_is_ignored_then_overwritten(
+        self, log_sm, tmp_path
+    ):
+        sid = log_sm.create_session()
+        log_sm.save_message(sid, "user", "committed")
+        _, log = self._paths(tmp_path, sid)
+        with log.open("ab") as handle:
+            handle.write(b'{"ts": 1.0, "append": [{"role": "user", "cont')
+
+        assert [m["content"] for m in log_sm.load_session(sid)] == ["committed"]
+
+        log_sm.save_message(sid, "assistant", "after crash")
+
+        assert [m["content"] for m in log_sm.load_session(sid)] == [
+            "committed",
+            "after crash",
+        ]
+        assert all(
+            json.loads(line) for line in log.read_text().splitlines()
+        )
+
+    def test_log_is_compacted_into_the_snapshot(self, tmp_path):
+        store = SessionManager(
+            base_dir=tmp_path, storage_format="log", log_compact_min_bytes=0
+        )
+        sid = store.create_session()
+        snapshot, log = self._paths(tmp_path, sid)
+        for i in range(40):
+            store.save_message(sid, "user", f"message {i} " + "x" * 200)
+
+        folded = json.loads(snapshot.read_text())["messages"]
+        assert folded, "log never compacted"
+        assert log.stat().st_size <= max(snapshot.stat().st_size, 1024) * 2
+        assert [m["content"] for m in store.load_session(sid)] == [
+            f"message {i} " + "x" * 200 for i in range(40)
+        ]
+
+    def test_log_from_an_older_snapshot_is_ignored(self, log_sm, tmp_path):
+        sid = log_sm.create_session()
+        log_sm.save_message(sid, "user", "one")
+        snapshot, log = self._paths(tmp_path, sid)
+        stale_log = log.read_bytes()
+
+        # A compaction that crashed after swapping the snapshot but before
+        # resetting the log leaves a log that is already folded in.
+        log_sm.rename_session(sid, "Renamed")
+        log.write_bytes(stale_log)
+
+        assert [m["content"] for m in log_sm.load_session(sid)] == ["one"]
+        log_sm.save_message(sid, "user", "two")
+        assert [m["content"] for m in log_sm.load_session(sid)] == ["one", "two"]
+        assert log_sm.get_session_meta(sid)["title"] == "Renamed"
+
+    def test_read_racing_compactions_falls_back_to_a_locked_read(
+        self, log_sm, monkeypatch
+    ):
+        import graph.session.session_store as session_store
+
+        sid = log_sm.create_session()
+        log_sm.save_message(sid, "user", "one")
+        log_sm.save_message(sid, "assistant", "two")
+
+        real_locked = log_sm._locked
+        real_fingerprint = session_store.snapshot_fingerprint
+        held = []
+        swaps = iter(range(-1, -1000, -1))
+
+        def spying_locked(session_id):
+            held.append(session_id)
+            return real_locked(session_id)
+
+        # Every lock-free stat sees a different snapshot, as if a compaction
+        # swapped it between each stat and read.
+        def racing_fingerprint(stat_result):
+            if held:
+                return real_fingerprint(stat_result)
+            return [next(swaps)]
+
+        monkeypatch.setattr(log_sm, "_locked", spying_locked)
+        monkeypatch.setattr(session_store, "snapshot_fingerprint", racing_fingerprint)
+
+        assert [m["content"] for m in log_sm.load_session(sid)] == ["one", "two"]
+        assert held == [sid]
+
+    def test_read_under_the_session_lock_never_retakes_it(self, log_sm, monkeypatch):
+        import graph.session.session_store as session_store
+
+        sid = log_sm.create_session()
+        log_sm.save_message(sid, "user", "one")
+
+        real_locked = log_sm._locked
+        held = []
+        swaps = iter(range(-1, -1000, -1))
+
+        def spying_locked(session_id):
+            held.append(session_id)
+            return real_locked(session_id)
+
+        # flock is not re-entrant across fds: a read that took the lock again
+        # here would block on the lock read_snapshot already holds.
+        monkeypatch.setattr(log_sm, "_locked", spying_locked)
+        monkeypatch.setattr(session_store, "snapshot_fingerprint", lambda stat_result: [next(swaps)])
+
+        log_sm.read_snapshot(sid)
+        assert held == [sid]
+
+    def test_runtime_config_stamp_and_compression_use_the_log(
+        self, log_sm, tmp_path
+    ):
+        sid = log_sm.create_session()
+        for i in range(6):
+            log_sm.save_message(sid, "user", f"m{i}")
+        snapshot, _ = self._paths(tmp_path, sid)
+        inode = snapshot.stat().st_ino
+
+        log_sm.stamp_runtime_config_snapshot(sid, loaded_at=123.0)
+        assert snapshot.stat().st_ino == inode
+        assert log_sm.get_session_meta(sid)["runtime_config"] == {"_loaded_at": 123.0}
+
+        archived, remaining = log_sm.compress_history(sid, "summary", 4)
+        assert (archived, remaining) == (4, 2)
+        assert [m["content"] for m in log_sm.load_session(sid)] == ["m4", "m5"]
+        log_sm.save_message(sid, "assistant", "after compress")
+        assert len(log_sm.load_session(sid)) == 3
+        assert log_sm.get_compressed_context(sid)
+
+    def test_index_rebuild_reads_live_state_from_the_log(self, log_sm, tmp_path):
+        from graph.session.session_index import rebuild_index
+
+        sid = log_sm.create_session()
+        log_sm.save_message(sid, "user", "a")
+        log_sm.save_message(sid, "assistant", "b")
+
+        rebuilt = rebuild_index(tmp_path / "sessions")
+
+        assert rebuilt[sid]["message_count"] == 2
+
+    def test_switching_back_to_json_folds_and_removes_the_log(
+        self, log_sm, tmp_path
+    ):
+        sid = log_sm.create_session()
+        log_sm.save_message(sid, "user", "from log mode")
+        snapshot, log = self._paths(tmp_path, sid)
+
+        json_sm = SessionManager(base_dir=tmp_path)
+        json_sm.save_message(sid, "assistant", "from json mode")
+
+        assert not log.exists()
+        raw = json.loads(snapshot.read_text())
+        assert "message_log" not in raw
+        assert [m["content"] for m in raw["messages"]] == [
+            "from log mode",
+            "from json mode",
+        ]
+
+    def test_delete_removes_the_log(self, log_sm, tmp_path):
+        sid = log_sm.create_session()
+        log_sm.save_message(sid, "user", "bye")
+        _, log = self._paths(tmp_path, sid)
+
+        log_sm.delete_session(sid)
+
+        assert not log.exists()
+
+    def test_unknown_storage_format_is_rejected(self, tmp_path):
+        with pytest.raises(ValueError):
+            SessionManager(base_dir=tmp_path, storage_format="sqlite")
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Per-turn session snapshot
+# ──────────────────────────────────────────────────────────────────────────────
+
+
+class _CountingJson:
+    def __init__(self) -> None:
+        self.loads_calls = 0
+
+    def loads(self, *args, **kwargs):
+        self.loads_calls += 1
+        return json.loads(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(json, name)
+
+
+class TestSessionSnapshot:
+    @pytest.mark.parametrize("storage_format", ["json", "log"])
+    async def test_turn_parses_the_session_once(
+        self, tmp_path, monkeypatch, storage_format
+    ):
+        from graph.session import session_store
+
+        store = SessionManager(base_dir=tmp_path, storage_format=storage_format)
+        sid = store.create_session()
+        store.save_messages_batch(
+            sid, [{"role": "user", "content": f"m{i}"} for i in range(6)]
+        )
+        counter = _CountingJson()
+        monkeypatch.setattr(session_store, "json", counter)
+
+        snapshot = store.read_snapshot(sid)
+        store.stamp_runtime_config_snapshot(sid, loaded_at=7.0, snapshot=snapshot)
+        assert not await store.auto_compress_if_needed(sid, None, snapshot=snapshot)
+        history = store.load_session_for_agent(sid, snapshot=snapshot)
+        store.save_messages_batch(
+            sid,
+            [{"role": "user", "content": "q"}, {"role": "assistant", "content": "a"}],
+            snapshot=snapshot,
+        )
+
+        assert counter.loads_calls == 1
+        assert len(history) == 6
+        monkeypatch.undo()
+        assert len(store.load_session(sid)) == 8
+        assert store.get_session_meta(sid)["runtime_config"] == {"_loaded_at": 7.0}
+
+    def test_stamp_is_deferred_until_the_write_back(self, sm, tmp_path):
+        sid = sm.create_session()
+        snapshot = sm.read_snapshot(sid)
+
+        sm.stamp_runtime_config_snapshot(sid, loaded_at=3.0, snapshot=snapshot)
+        assert "runtime_config" not in sm.get_session_meta(sid)
+
+        sm.save_messages_batch(sid, [{"role": "user", "content": "hi"}], snapshot=snapshot)
+        assert sm.get_session_meta(sid)["runtime_config"] == {"_loaded_at": 3.0}
+        assert not snapshot.pending
+
+    def test_write_from_another_worker_is_not_clobbered(self, sm, tmp_path):
+        sid = sm.create_session()
+        sm.save_message(sid, "user", "before")
+        snapshot = sm.read_snapshot(sid)
+        sm.stamp_runtime_config_snapshot(sid, loaded_at=5.0, snapshot=snapshot)
+
+        other = SessionManager(base_dir=tmp_path)
+        other.save_message(sid, "user", "from another worker")
+        sm.save_messages_batch(
+            sid, [{"role": "assistant", "content": "reply"}], snapshot=snapshot
+        )
+
+        assert [m["content"] for m in sm.load_session(sid)] == [
+            "before",
+            "from another worker",
+            "reply",
+        ]
+        assert sm.get_session_meta(sid)["runtime_config"] == {"_loaded_at": 5.0}
+
+    def test_compression_through_the_snapshot_keeps_it_current(self, sm):
+        sid = sm.create_session()
+        for i in range(6):
+            sm.save_message(sid, "user", f"m{i}")
+        snapshot = sm.read_snapshot(sid)
+
+        sm.compress_history(sid, "summary", 4, snapshot=snapshot)
+        history = sm.load_session_for_agent(sid, snapshot=snapshot)
+        sm.save_messages_batch(sid, [{"role": "user", "content": "m6"}], snapshot=snapshot)
+
+        assert history[0]["role"] == "system"
+        assert [m["content"] for m in history[1:]] == ["m4", "m5"]
+        assert [m["content"] for m in sm.load_session(sid)] == ["m4", "m5", "m6"]
+        assert sm.get_compressed_context(sid, snapshot=snapshot) == sm.get_compressed_context(
+            sid
+        )
+
+    def test_repeated_write_back_does_not_duplicate_messages(self, sm):
+        sid = sm.create_session()
+        snapshot = sm.read_snapshot(sid)
+
+        sm.save_messages_batch(sid, [{"role": "user", "content": "one"}], snapshot=snapshot)
+        sm.save_messages_batch(sid, [{"role": "assistant", "content": "two"}], snapshot=snapshot)
+
+        assert [m["content"] for m in sm.load_session(sid)] == ["one", "two"]
+        assert [m["content"] for m in sm.load_session(sid, snapshot=snapshot)] == [
+            "one",
+            "two",
+        ]
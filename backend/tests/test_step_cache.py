@@ -0,0 +1,302 @@
+"""Tests for content-addressed step result reuse in ``runtime.workflow_runner``."""
+from __future__ import annotations
+
+import json
+import sys
+import uuid
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from runtime.step_cache import StepResultCache  # noqa: E402
+from runtime.workflow_runner import WorkflowRunResult, run_workflow  # noqa: E402
+from workflow_specs import WorkflowSpec, validate_workflow_spec_payload  # noqa: E402
+
+_STEPS_SOURCE = '''
+import json
+
+CALLS = []
+STEP_CACHE_TOOL_PROBES = {}
+
+
+def quantify(inputs, context):
+    CALLS.append("quantify")
+    with open(context.base_dir / inputs["sample_sheet"], encoding="utf-8") as handle:
+        rows = handle.read().splitlines()[1:]
+    matrix = context.run_dir / "outputs" / "generated" / "quantify" / "counts.tsv"
+    matrix.parent.mkdir(parents=True, exist_ok=True)
+    matrix.write_text("\\n".join(rows) + "\\n", encoding="utf-8")
+    relative = str(context.relative_run_dir / "outputs" / "generated" / "quantify" / "counts.tsv")
+    document = {"artifact_type": "count_matrix", "path": relative, "run_id": context.run_id}
+    (matrix.parent / "count_matrix.json").write_text(json.dumps(document), encoding="utf-8")
+    return {
+        "counts": document,
+        "document": relative[: -len("counts.tsv")] + "count_matrix.json",
+        "sample_count": len(rows),
+    }
+
+
+def contrast(inputs, context):
+    CALLS.append("contrast")
+    path = context.base_dir / inputs["counts"]["path"]
+    return {"summary": f"{inputs['label']}:{len(path.read_text(encoding='utf-8').splitlines())}"}
+'''
+
+
+@pytest.fixture
+def steps_module(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> ModuleType:
+    name = f"cached_steps_{uuid.uuid4().hex}"
+    module_dir = tmp_path / "modules"
+    module_dir.mkdir()
+    (module_dir / f"{name}.py").write_text(_STEPS_SOURCE, encoding="utf-8")
+    monkeypatch.syspath_prepend(str(module_dir))
+    yield __import__(name)
+    sys.modules.pop(name, None)
+
+
+def _spec(module: str, *, quantify_cache_policy: str = "reuse") -> WorkflowSpec:
+    def parameter(name: str) -> dict[str, Any]:
+        return {"name": name, "kind": "parameter", "data_type": "string", "description": f"{name} input."}
+
+    return validate_workflow_spec_payload(
+        {
+            "schema_version": "1.0.0",
+            "kind": "workflow_spec",
+            "workflow_id": "cached_flow",
+            "version": "1.0.0",
+            "name": "Cached Flow",
+            "purpose": "Workflow for step cache tests.",
+            "engine": "internal_dag_runner_v1",
+            "required_inputs": [parameter("sample_sheet"), parameter("label")],
+            "runtime": {
+                "provided_inputs": ["sample_sheet", "label"],
+                "generated_state": ["run_id"],
+                "state_artifact": "workflow_run",
+                "artifact_root_template": "artifacts/{workflow_id}/{date}/{run_id}",
+            },
+            "outputs": [
+                {
+                    "name": "summary",
+                    "kind": "value",
+                    "description": "Contrast summary.",
+                    "source": {"step_id": "contrast", "output_name": "summary"},
+                }
+            ],
+            "steps": [
+                {
+                    "id": "quantify",
+                    "label": "Quantify",
+                    "executor": {"executor_type": "python", "module": module, "function": "quantify"},
+                    "inputs": [
+                        {
+                            "name": "sample_sheet",
+                            "source": {"source_type": "workflow_input", "input_name": "sample_sheet"},
+                        }
+                    ],
+                    "outputs": [
+                        {"name": "counts", "kind": "value", "description": "Count matrix reference."},
+                        {"name": "document", "kind": "value", "description": "Count matrix document."},
+                        {"name": "sample_count", "kind": "value", "description": "Samples counted."},
+                    ],
+                    "failure_policy": "fail_workflow",
+                    "cache_policy": quantify_cache_policy,
+                },
+                {
+                    "id": "contrast",
+                    "label": "Contrast",
+                    "executor": {"executor_type": "python", "module": module, "function": "contrast"},
+                    "inputs": [
+                        {
+                            "name": "counts",
+                            "source": {"source_type": "step_output", "step_id": "quantify", "output_name": "counts"},
+                        },
+                        {"name": "label", "source": {"source_type": "workflow_input", "input_name": "label"}},
+                    ],
+                    "outputs": [{"name": "summary", "kind": "value", "description": "Contrast summary."}],
+                    "prerequisites": ["quantify"],
+                    "failure_policy": "fail_workflow",
+                },
+            ],
+        }
+    )
+
+
+def _run(
+    spec: WorkflowSpec,
+    base_dir: Path,
+    run_id: str,
+    *,
+    label: str = "treated_vs_control",
+    **kwargs: Any,
+) -> WorkflowRunResult:
+    relative_run_dir = f"artifacts/cached_flow/{run_id}"
+    (base_dir / relative_run_dir).mkdir(parents=True, exist_ok=True)
+    result = run_workflow(
+        spec,
+        inputs={"sample_sheet": "inputs/manifest.json", "label": label},
+        base_dir=base_dir,
+        run_id=run_id,
+        emit=lambda event: None,
+        relative_run_dir=relative_run_dir,
+        step_cache=StepResultCache(base_dir),
+        **kwargs,
+    )
+    assert result.status == "ok", [outcome.error for outcome in result.step_outcomes]
+    return result
+
+
+@pytest.fixture
+def project(tmp_path: Path) -> Path:
+    base_dir = tmp_path / "project"
+    (base_dir / "inputs").mkdir(parents=True)
+    (base_dir / "inputs" / "samples.tsv").write_text(
+        "sample_id\tfastq_r1\nS1\tinputs/S1.fastq\nS2\tinputs/S2.fastq\n", encoding="utf-8"
+    )
+    (base_dir / "inputs" / "S1.fastq").write_text("@r1\nACGT\n+\nIIII\n", encoding="utf-8")
+    (base_dir / "inputs" / "S2.fastq").write_text("@r2\nTTGA\n+\nIIII\n", encoding="utf-8")
+    # The step reads the manifest path as its "sample sheet"; the cache has
+    # to follow manifest -> sample sheet -> FASTQs to pin their contents.
+    (base_dir / "inputs" / "manifest.json").write_text(
+        json.dumps({"sample_sheet_path": "inputs/samples.tsv"}), encoding="utf-8"
+    )
+    return base_dir
+
+
+def test_rerun_reuses_upstream_step_and_copies_its_files(project: Path, steps_module: ModuleType) -> None:
+    spec = _spec(steps_module.__name__)
+    first = _run(spec, project, "run-1")
+    second = _run(spec, project, "run-2", label="knockout_vs_control")
+
+    assert steps_module.CALLS == ["quantify", "contrast", "contrast"]
+    assert first.step_outcomes[0].cache_hit is None
+    hit = second.step_outcomes[0].cache_hit
+    assert hit is not None
+    assert hit.source_run_id == "run-1"
+    assert second.step_outcomes[1].cache_hit is None
+    assert second.step_outcomes[1].outputs == {"summary": "knockout_vs_control:1"}
+
+    reused = second.step_outcomes[0].outputs["counts"]
+    assert reused == {
+        "artifact_type": "count_matrix",
+        "path": "artifacts/cached_flow/run-2/outputs/generated/quantify/counts.tsv",
+        "run_id": "run-2",
+    }
+    original_file = project / first.step_outcomes[0].outputs["counts"]["path"]
+    reused_file = project / reused["path"]
+    assert reused_file.read_bytes() == original_file.read_bytes()
+    # A copy, not a hard link: writing to one run's file must not change the other's.
+    assert reused_file.stat().st_ino != original_file.stat().st_ino
+    document_path = second.step_outcomes[0].outputs["document"]
+    assert document_path == "artifacts/cached_flow/run-2/outputs/generated/quantify/count_matrix.json"
+    assert json.loads((project / document_path).read_text(encoding="utf-8")) == reused
+    assert hit.key.input_digests.keys() == {
+        "inputs/manifest.json",
+        "inputs/samples.tsv",
+        "inputs/S1.fastq",
+        "inputs/S2.fastq",
+    }
+
+    provenance = json.loads((project / hit.provenance_path).read_text(encoding="utf-8"))
+    assert hit.provenance_path == "artifacts/cached_flow/run-2/outputs/generated/quantify/step_cache.json"
+    assert provenance["source_run_id"] == "run-1"
+    assert provenance["cache_key"] == hit.key.digest
+    assert [(item["source"], item["target"]) for item in provenance["materialized"]] == [
+        ("artifacts/cached_flow/run-1/outputs/generated/quantify/count_matrix.json", document_path),
+        ("artifacts/cached_flow/run-1/outputs/generated/quantify/counts.tsv", reused["path"]),
+    ]
+    assert provenance["materialized"][0]["method"] == "rewrite"
+    assert provenance["materialized"][1]["method"] in {"reflink", "copy"}
+
+
+def test_rerun_into_the_same_run_directory_keeps_rewritten_documents(
+    project: Path, steps_module: ModuleType
+) -> None:
+    spec = _spec(steps_module.__name__)
+    _run(spec, project, "run-1")
+    _run(spec, project, "run-2")
+    third = _run(spec, project, "run-2")
+
+    assert steps_module.CALLS.count("quantify") == 1
+    hit = third.step_outcomes[0].cache_hit
+    assert hit is not None and [item["method"] for item in hit.materialized] == ["existing", "existing"]
+
+
+def test_changed_external_tool_version_misses(
+    project: Path, steps_module: ModuleType, tmp_path: Path
+) -> None:
+    version_file = tmp_path / "tool_version.txt"
+    version_file.write_text("quantifier 1.0", encoding="utf-8")
+    steps_module.STEP_CACHE_TOOL_PROBES["quantify"] = lambda inputs, base_dir: {
+        "quantifier": version_file.read_text(encoding="utf-8")
+    }
+    spec = _spec(steps_module.__name__)
+    _run(spec, project, "run-1")
+    assert _run(spec, project, "run-2").step_outcomes[0].cache_hit is not None
+
+    version_file.write_text("quantifier 1.1", encoding="utf-8")
+    third = _run(spec, project, "run-3")
+
+    assert steps_module.CALLS.count("quantify") == 2
+    assert third.step_outcomes[0].cache_hit is None
+
+
+def test_changed_referenced_input_content_misses(project: Path, steps_module: ModuleType) -> None:
+    spec = _spec(steps_module.__name__)
+    _run(spec, project, "run-1")
+    (project / "inputs" / "S2.fastq").write_text("@r2\nTTGACC\n+\nIIIIII\n", encoding="utf-8")
+    second = _run(spec, project, "run-2")
+
+    assert steps_module.CALLS == ["quantify", "contrast", "quantify", "contrast"]
+    assert second.step_outcomes[0].cache_hit is None
+
+
+def test_changed_executor_code_misses(project: Path, steps_module: ModuleType) -> None:
+    spec = _spec(steps_module.__name__)
+    _run(spec, project, "run-1")
+    module_path = Path(steps_module.__file__)
+    module_path.write_text(module_path.read_text(encoding="utf-8") + "\n# revised\n", encoding="utf-8")
+    _run(spec, project, "run-2")
+
+    assert steps_module.CALLS.count("quantify") == 2
+
+
+def test_modified_cached_output_file_misses(project: Path, steps_module: ModuleType) -> None:
+    spec = _spec(steps_module.__name__)
+    first = _run(spec, project, "run-1")
+    (project / first.step_outcomes[0].outputs["counts"]["path"]).write_text("tampered\n", encoding="utf-8")
+    _run(spec, project, "run-2")
+
+    assert steps_module.CALLS.count("quantify") == 2
+
+
+def test_cache_policy_disabled_always_runs(project: Path, steps_module: ModuleType) -> None:
+    spec = _spec(steps_module.__name__, quantify_cache_policy="disabled")
+    _run(spec, project, "run-1")
+    second = _run(spec, project, "run-2")
+
+    assert steps_module.CALLS == ["quantify", "contrast", "quantify", "contrast"]
+    assert second.step_outcomes[0].cache_hit is None
+    assert not (project / "artifacts/cached_flow/run-2/outputs/generated/quantify/step_cache.json").exists()
+
+
+def test_copy_mode_never_reflinks(project: Path, steps_module: ModuleType) -> None:
+    spec = _spec(steps_module.__name__)
+    first = _run(spec, project, "run-1")
+    second = run_workflow(
+        spec,
+        inputs={"sample_sheet": "inputs/manifest.json", "label": "treated_vs_control"},
+        base_dir=project,
+        run_id="run-2",
+        emit=lambda event: None,
+        relative_run_dir="artifacts/cached_flow/run-2",
+        step_cache=StepResultCache(project, materialize="copy"),
+    )
+
+    hit = second.step_outcomes[0].cache_hit
+    assert hit is not None and [item["method"] for item in hit.materialized] == ["rewrite", "copy"]
+    reused_file = project / second.step_outcomes[0].outputs["counts"]["path"]
+    assert reused_file.stat().st_ino != (project / first.step_outcomes[0].outputs["counts"]["path"]).stat().st_ino
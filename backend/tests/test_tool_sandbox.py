@@ -18,7 +18,6 @@ from langchain_core.tools import BaseTool
 from pydantic import BaseModel, Field
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
-sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
 
 from tools import get_runtime_tools
 from tools.policy import (
@@ -64,7 +63,9 @@ def test_high_risk_tools_declare_sandbox_spec(tmp_path):
 
 
 def test_workflow_runner_sandbox_specs_cover_all_runners():
-    from workflows.runners import WORKFLOW_RUNNER_SANDBOX_SPECS
+    from tests.runner_modules import load_runner_module
+
+    WORKFLOW_RUNNER_SANDBOX_SPECS = load_runner_module("__init__").WORKFLOW_RUNNER_SANDBOX_SPECS
 
     expected = {
         "workflows.runners.rna_seq_qc",
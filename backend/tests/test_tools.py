@@ -1211,6 +1211,145 @@ class TestSearchKnowledgeBaseTool:
         assert contract["outcome"] == "success_empty"
 
 
+def _hashing_embed_model():
+    """Offline embed model: a tiny deterministic vector per text, with a call log."""
+    from llama_index.core.bridge.pydantic import PrivateAttr
+    from llama_index.core.embeddings import BaseEmbedding
+
+    class HashingEmbedding(BaseEmbedding):
+        _texts: list = PrivateAttr(default_factory=list)
+
+        def __init__(self) -> None:
+            super().__init__(model_name="hashing-test")
+
+        @property
+        def texts(self) -> list:
+            return self._texts
+
+        def _vector(self, text: str) -> list:
+            return [float(len(text)), float(sum(map(ord, text)) % 101), 1.0]
+
+        def _get_text_embedding(self, text: str) -> list:
+            self._texts.append(text)
+            return self._vector(text)
+
+        def _get_query_embedding(self, query: str) -> list:
+            return self._vector(query)
+
+        async def _aget_query_embedding(self, query: str) -> list:
+            return self._vector(query)
+
+    return HashingEmbedding()
+
+
+class TestSearchKnowledgeIncrementalIndex:
+    @pytest.fixture
+    def knowledge(self, tmp_path, monkeypatch):
+        from llama_index.core import Settings
+
+        monkeypatch.setattr(Settings, "_embed_model", _hashing_embed_model())
+        knowledge = tmp_path / "knowledge"
+        knowledge.mkdir()
+        (knowledge / "western.md").write_text(
+            "# Western blot\nTransfer to PVDF at 100 V.\n", encoding="utf-8"
+        )
+        (knowledge / "pcr.md").write_text(
+            "# PCR\nAnneal at 58 C for thirty seconds.\n", encoding="utf-8"
+        )
+        (knowledge / "elisa.txt").write_text(
+            "ELISA plates are blocked with BSA overnight.\n", encoding="utf-8"
+        )
+        return knowledge
+
+    def _tool(self, tmp_path, knowledge):
+        from tools.search_knowledge_tool import SearchKnowledgeBaseTool
+
+        return SearchKnowledgeBaseTool(
+            knowledge_dir=str(knowledge), storage_dir=str(tmp_path / "storage")
+        )
+
+    @staticmethod
+    def _bump(path: Path, text: str) -> None:
+        import os
+
+        path.write_text(text, encoding="utf-8")
+        stat = path.stat()
+        os.utime(path, (stat.st_atime, stat.st_mtime + 5))
+
+    def test_edit_reloads_only_the_changed_file(self, tmp_path, knowledge):
+        tool = self._tool(tmp_path, knowledge)
+        tool._ensure_index()
+        untouched = {
+            node.node_id for node in tool._nodes if "pcr" not in node.ref_doc_id
+        }
+
+        loaded: list = []
+        original = tool._load_documents
+
+        def spy(sources):
+            loaded.append(list(sources))
+            return original(sources)
+
+        with patch.object(tool, "_load_documents", side_effect=spy):
+            self._bump(knowledge / "pcr.md", "# PCR\nAnneal at 62 C with Q5.\n")
+            tool._ensure_index()
+            # No further change: nothing is reloaded.
+            tool._ensure_index()
+
+        assert loaded == [["pcr.md"]]
+        assert untouched <= {node.node_id for node in tool._nodes}
+        texts = [node.text for node in tool._index.docstore.docs.values()]
+        assert any("Q5" in text for text in texts)
+        assert not any("58 C" in text for text in texts)
+        hits = tool._bm25.retrieve("Q5 anneal", 3)
+        assert hits and "Q5" in hits[0][0].text
+
+    def test_removed_file_is_dropped_from_both_indexes(self, tmp_path, knowledge):
+        tool = self._tool(tmp_path, knowledge)
+        tool._ensure_index()
+
+        (knowledge / "elisa.txt").unlink()
+        tool._ensure_index()
+
+        assert "elisa.txt" not in tool._file_states
+        assert not any(
+            "ELISA" in node.text for node in tool._index.docstore.docs.values()
+        )
+        assert tool._bm25.retrieve("ELISA BSA", 3) == []
+
+    def test_cold_start_reuses_persisted_index_without_embedding(
+        self, tmp_path, knowledge
+    ):
+        from llama_index.core import Settings
+
+        self._tool(tmp_path, knowledge)._ensure_index()
+        Settings.embed_model.texts.clear()
+
+        tool = self._tool(tmp_path, knowledge)
+        with patch.object(tool, "_full_rebuild", side_effect=AssertionError):
+            tool._ensure_index()
+
+        assert tool._index is not None
+        assert Settings.embed_model.texts == []
+        assert set(tool._file_states) == {"western.md", "pcr.md", "elisa.txt"}
+
+    def test_bm25_is_not_rebuilt_per_query(self, tmp_path, knowledge):
+        tool = self._tool(tmp_path, knowledge)
+        tool._ensure_index()
+
+        with patch(
+            "llama_index.retrievers.bm25.BM25Retriever.from_defaults",
+            side_effect=AssertionError("per-query BM25 rebuild"),
+        ):
+            _, artifact = tool._run("PVDF transfer")
+
+        modes = {hit["retrieval_mode"] for hit in artifact["structured_payload"]["results"]}
+        assert "bm25" in modes or "vector" in modes
+        assert any(
+            "PVDF" in hit["text"] for hit in artifact["structured_payload"]["results"]
+        )
+
+
 # ──────────────────────────────────────────────────────────────────────────────
 # WriteFileTool
 # ──────────────────────────────────────────────────────────────────────────────
@@ -199,6 +199,27 @@ class TestTurnLedgerBatchPersistence:
         assert [m["role"] for m in msgs] == ["user", "assistant", "assistant"]
         assert [m["content"] for m in msgs] == ["streaming ask", "partial", "rest"]
 
+    def test_persist_segments_writes_back_through_the_turn_snapshot(self, sm):
+        sid = sm.create_session()
+        snapshot = sm.read_snapshot(sid)
+        sm.stamp_runtime_config_snapshot(sid, loaded_at=11.0, snapshot=snapshot)
+        ledger = TurnLedger(
+            session_manager=sm,
+            session_id=sid,
+            request_id="turn-snapshot",
+            user_message="ask",
+            snapshot=snapshot,
+        )
+        ledger.consume({"type": "token", "content": "answer"})
+        ledger.persist_segments(ledger.finalize(turn_status="ok"))
+
+        assert [m["content"] for m in sm.load_session(sid)] == ["ask", "answer"]
+        assert [m["content"] for m in sm.load_session(sid, snapshot=snapshot)] == [
+            "ask",
+            "answer",
+        ]
+        assert sm.get_session_meta(sid)["runtime_config"] == {"_loaded_at": 11.0}
+
 
 # ──────────────────────────────────────────────────────────────────────────
 # Cross-process atomicity: a reader polling the session JSON while a turn
@@ -0,0 +1,244 @@
+"""Tests for per-turn phase profiling (runtime/turn_profile.py)."""
+from __future__ import annotations
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+from typing import Any, AsyncGenerator
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from runtime.events import build_runtime_event
+from runtime.metrics_collector import METRICS
+from runtime.query_engine import QueryEngine
+from runtime.turn_profile import (
+    TurnProfile,
+    active_turn_profile,
+    record_turn_profile,
+    turn_phase,
+    turn_profile_scope,
+    turn_profile_trace_path,
+)
+
+REQUEST_ID = "8f14e45f-ceea-467f-a1b2-0123456789ab"
+
+
+@pytest.fixture(autouse=True)
+def _reset_metrics():
+    METRICS.reset()
+    yield
+    METRICS.reset()
+
+
+def _profile() -> TurnProfile:
+    return TurnProfile(request_id=REQUEST_ID, session_id="session-1")
+
+
+def test_turn_phase_is_a_no_op_without_an_active_profile():
+    assert active_turn_profile() is None
+    with turn_phase("skill_routing"):
+        pass
+    assert active_turn_profile() is None
+
+
+def test_spans_nest_under_the_enclosing_phase():
+    profile = _profile()
+    with turn_profile_scope(profile):
+        assert active_turn_profile() is profile
+        with turn_phase("agent_build"):
+            with turn_phase("system_prompt"):
+                pass
+        with turn_phase("tool_dispatch", tool="read_file"):
+            pass
+    assert active_turn_profile() is None
+
+    spans = {span.name: span for span in profile.spans()}
+    assert spans["agent_build"].parent_id == 0
+    assert spans["system_prompt"].parent_id == spans["agent_build"].span_id
+    assert spans["tool_dispatch"].parent_id == 0
+    assert spans["tool_dispatch"].attributes == {"tool": "read_file"}
+
+
+def test_spans_opened_in_a_task_nest_under_the_span_that_created_it():
+    profile = _profile()
+
+    async def dispatch() -> None:
+        with turn_phase("tool_dispatch"):
+            await asyncio.sleep(0)
+
+    async def run() -> None:
+        with turn_profile_scope(profile), turn_phase("agent_stream"):
+            await asyncio.gather(dispatch(), dispatch())
+
+    asyncio.run(run())
+    spans = profile.spans()
+    outer = next(span for span in spans if span.name == "agent_stream")
+    dispatches = [span for span in spans if span.name == "tool_dispatch"]
+    assert len(dispatches) == 2
+    assert all(span.parent_id == outer.span_id for span in dispatches)
+
+
+def test_accumulate_folds_repeated_phases_into_one_span():
+    profile = _profile()
+    profile.accumulate("event_serialization", 100, 150)
+    profile.accumulate("event_serialization", 200, 230)
+    profile.accumulate("event_serialization", 300, 320)
+
+    (span,) = profile.spans()
+    assert span.count == 3
+    assert span.duration_ns == 100
+    assert span.start_ns == 100
+
+
+def test_to_event_is_a_valid_turn_profile_runtime_event():
+    profile = _profile()
+    with turn_profile_scope(profile), turn_phase("history_load"):
+        pass
+    profile.record("model", profile.started_ns, profile.started_ns + 2_500_000, model="gpt")
+    profile.accumulate("event_serialization", profile.started_ns, profile.started_ns + 1_000)
+    profile.accumulate("event_serialization", profile.started_ns, profile.started_ns + 1_000)
+
+    event = build_runtime_event(profile.to_event())
+
+    assert event.type == "turn_profile"
+    assert event.total_ms >= 0
+    phases = {phase["name"]: phase for phase in event.phases}
+    assert set(phases) == {"history_load", "model", "event_serialization"}
+    assert phases["model"]["duration_ms"] == 2.5
+    assert phases["model"]["attributes"] == {"model": "gpt"}
+    assert phases["event_serialization"]["count"] == 2
+    assert "count" not in phases["history_load"]
+
+
+def test_to_otlp_links_phase_spans_to_a_root_turn_span():
+    profile = _profile()
+    with turn_profile_scope(profile), turn_phase("agent_build"), turn_phase("system_prompt"):
+        pass
+
+    payload = profile.to_otlp()
+
+    resource_spans = payload["resourceSpans"][0]
+    assert resource_spans["resource"]["attributes"][0]["value"] == {"stringValue": "bioapex"}
+    spans = {span["name"]: span for span in resource_spans["scopeSpans"][0]["spans"]}
+    assert set(spans) == {"turn", "agent_build", "system_prompt"}
+    assert {span["traceId"] for span in spans.values()} == {REQUEST_ID.replace("-", "")}
+    assert "parentSpanId" not in spans["turn"]
+    assert spans["agent_build"]["parentSpanId"] == spans["turn"]["spanId"]
+    assert spans["system_prompt"]["parentSpanId"] == spans["agent_build"]["spanId"]
+    for span in spans.values():
+        assert len(span["spanId"]) == 16
+        assert int(span["endTimeUnixNano"]) >= int(span["startTimeUnixNano"])
+
+
+def test_record_turn_profile_observes_phases_and_appends_otlp_lines(tmp_path):
+    for _ in range(2):
+        profile = _profile()
+        with turn_profile_scope(profile), turn_phase("skill_routing"):
+            pass
+        record_turn_profile(profile, base_dir=tmp_path)
+
+    text = METRICS.render_exposition()
+    assert 'bioapex_turn_phase_duration_seconds_count{phase="turn"} 2' in text
+    assert 'bioapex_turn_phase_duration_seconds_count{phase="skill_routing"} 2' in text
+
+    lines = turn_profile_trace_path(tmp_path).read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 2
+    assert all("resourceSpans" in json.loads(line) for line in lines)
+
+
+def test_record_turn_profile_without_base_dir_writes_no_file(tmp_path):
+    record_turn_profile(_profile())
+    assert not turn_profile_trace_path(tmp_path).parent.exists()
+    assert 'bioapex_turn_phase_duration_seconds_count{phase="turn"} 1' in METRICS.render_exposition()
+
+
+# --------------------------------------------------------------------------- #
+# QueryEngine integration
+# --------------------------------------------------------------------------- #
+
+
+class _SessionManager:
+    def __init__(self) -> None:
+        self.saved: list[dict[str, Any]] = []
+
+    def read_snapshot(self, session_id: str) -> None:
+        return None
+
+    def flush_snapshot(self, snapshot) -> None:
+        return None
+
+    async def auto_compress_if_needed(self, session_id: str, llm, *, snapshot=None) -> None:
+        return None
+
+    def load_session_for_agent(self, session_id: str, *, snapshot=None) -> list[dict]:
+        return []
+
+    def save_message(self, session_id: str, role: str, content: str, **kwargs) -> None:
+        self.saved.append({"role": role, "content": content})
+
+    def save_messages_batch(self, session_id: str, messages: list[dict[str, Any]]) -> None:
+        self.saved.extend(messages)
+
+
+class _TokenAgentManager:
+    def __init__(self) -> None:
+        self.session_manager = _SessionManager()
+        self.base_dir = None
+        self.llm = None
+
+    async def astream(self, message: str, history: list[dict]) -> AsyncGenerator[dict, None]:
+        with turn_phase("skill_routing"):
+            pass
+        yield {"type": "token", "content": "hi"}
+
+
+async def _none_async():
+    return None
+
+
+async def _collect(engine: QueryEngine) -> list[dict[str, Any]]:
+    frames = [frame async for frame in engine.stream_turn_sse(message="hello", session_id="session-1")]
+    return [json.loads(frame.removeprefix("data: ").strip()) for frame in frames]
+
+
+@pytest.mark.asyncio
+async def test_stream_turn_sse_emits_turn_profile_before_done_when_enabled(monkeypatch):
+    monkeypatch.setattr(
+        "runtime.compaction.maybe_compact_turn_boundary",
+        lambda *args, **kwargs: _none_async(),
+    )
+    monkeypatch.setattr(
+        "runtime.query_engine.get_turn_profile_settings",
+        lambda: {"enabled": True, "otlp_file": False},
+    )
+
+    events = await _collect(QueryEngine(_TokenAgentManager()))
+
+    types = [event["type"] for event in events]
+    assert types[-2:] == ["turn_profile", "done"]
+    profile_event = events[-2]
+    assert profile_event["request_id"] == events[-1]["request_id"]
+    names = {phase["name"] for phase in profile_event["phases"]}
+    assert {"session_load", "history_load", "skill_routing", "event_serialization"} <= names
+    assert 'bioapex_turn_phase_duration_seconds_count{phase="turn"} 1' in METRICS.render_exposition()
+
+
+@pytest.mark.asyncio
+async def test_stream_turn_sse_emits_no_turn_profile_when_disabled(monkeypatch):
+    monkeypatch.setattr(
+        "runtime.compaction.maybe_compact_turn_boundary",
+        lambda *args, **kwargs: _none_async(),
+    )
+    monkeypatch.setattr(
+        "runtime.query_engine.get_turn_profile_settings",
+        lambda: {"enabled": False, "otlp_file": False},
+    )
+
+    events = await _collect(QueryEngine(_TokenAgentManager()))
+
+    assert "turn_profile" not in [event["type"] for event in events]
+    assert events[-1]["type"] == "done"
+    assert "bioapex_turn_phase_duration_seconds_count{phase=" not in METRICS.render_exposition()
@@ -8,6 +8,7 @@ the full event-emission path.
 from __future__ import annotations
 
 import sys
+import threading
 from pathlib import Path
 from types import ModuleType
 from typing import Any, Callable
@@ -273,6 +274,9 @@ def test_run_workflow_continues_after_continue_with_warning_step_failure(
         base_dir=tmp_path,
         run_id="wf-run-4",
         emit=events.append,
+        # The two steps are now independent; run them one at a time so the
+        # interleaving of their events is deterministic.
+        max_parallel_steps=1,
     )
 
     assert result.status == "failed"
@@ -306,3 +310,235 @@ def test_run_workflow_rejects_non_python_executor(
     failed = [event for event in events if event["type"] == "workflow_step_failed"]
     assert len(failed) == 1
     assert "python executors" in failed[0]["error"]
+
+
+def test_run_workflow_indexes_step_artifacts_with_one_registry_append(
+    _inprocess_runner_module: ModuleType, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    from datetime import datetime, timezone
+
+    from artifacts import lookup_artifact_registry, prepare_run_directory
+    from artifacts import registry as registry_module
+
+    layout = prepare_run_directory(
+        tmp_path,
+        "demo flow",
+        created_at=datetime(2026, 3, 18, 19, 2, 3, tzinfo=timezone.utc),
+        run_id="run-20260318T190203Z-deadbeef",
+    )
+    appends: list[int] = []
+    original_append = registry_module.append_journal_entries
+
+    def counting_append(path, offset, entries):
+        appends.append(len(entries))
+        return original_append(path, offset, entries)
+
+    monkeypatch.setattr(registry_module, "append_journal_entries", counting_append)
+
+    def step_a(inputs: dict[str, Any], ctx: Any) -> dict[str, Any]:
+        for name in ("stdout.txt", "stderr.txt", "summary.json"):
+            layout.generated_output_path(name, step="qc").write_text("{}\n", encoding="utf-8")
+        return {"doubled": inputs["seed"] * 2}
+
+    _register_step(_inprocess_runner_module, "step_a", step_a)
+    _register_step(_inprocess_runner_module, "step_b", lambda inputs, ctx: {"value": inputs["prior"] + 1})
+
+    result = run_workflow(
+        _minimal_spec(),
+        inputs={"seed": 5},
+        base_dir=tmp_path,
+        run_id="wf-run-1",
+        emit=lambda event: None,
+    )
+
+    assert result.status == "ok"
+    assert appends == [3]
+    indexed = {record.path for record in lookup_artifact_registry(tmp_path).records}
+    for name in ("stdout.txt", "stderr.txt", "summary.json"):
+        assert str(layout.generated_output_relpath(name, step="qc")) in indexed
+
+
+def _dag_spec(steps: list[tuple[str, list[str], str]]) -> WorkflowSpec:
+    """Build a spec from ``(step_id, dependencies, failure_policy)`` triples.
+
+    Every step emits ``value`` and binds each dependency's ``value`` as an
+    input of the same name; the last step feeds the workflow output.
+    """
+    payload = _minimal_spec_payload()
+    payload["outputs"][0]["source"] = {"step_id": steps[-1][0], "output_name": "value"}
+    payload["steps"] = [
+        {
+            "id": step_id,
+            "label": step_id.replace("_", " ").title(),
+            "executor": {
+                "executor_type": "python",
+                "module": _TEST_RUNNER_MODULE_NAME,
+                "function": step_id,
+            },
+            "inputs": [
+                {
+                    "name": dependency,
+                    "source": {"source_type": "step_output", "step_id": dependency, "output_name": "value"},
+                }
+                for dependency in dependencies
+            ],
+            "outputs": [{"name": "value", "kind": "value", "description": "Step value."}],
+            "prerequisites": dependencies,
+            "retry_policy": {"max_attempts": 1, "backoff_seconds": 0},
+            "failure_policy": failure_policy,
+        }
+        for step_id, dependencies, failure_policy in steps
+    ]
+    return validate_workflow_spec_payload(payload)
+
+
+def _fail(message: str) -> Callable[..., Any]:
+    def step(inputs: dict[str, Any], ctx: Any) -> dict[str, Any]:
+        raise RuntimeError(message)
+
+    return step
+
+
+def test_run_workflow_runs_independent_branches_concurrently(
+    _inprocess_runner_module: ModuleType, tmp_path: Path
+) -> None:
+    # Each QC branch waits for the other, so this only finishes if both run at once.
+    barrier = threading.Barrier(2, timeout=10)
+
+    def qc(name: str) -> Callable[..., Any]:
+        def step(inputs: dict[str, Any], ctx: Any) -> dict[str, Any]:
+            barrier.wait()
+            return {"value": f"{name}:{threading.current_thread().name}"}
+
+        return step
+
+    _register_step(_inprocess_runner_module, "qc_a", qc("a"))
+    _register_step(_inprocess_runner_module, "qc_b", qc("b"))
+    _register_step(
+        _inprocess_runner_module,
+        "merge",
+        lambda inputs, ctx: {"value": sorted(value.split(":")[0] for value in inputs.values())},
+    )
+
+    events: list[dict[str, Any]] = []
+    result = run_workflow(
+        _dag_spec(
+            [
+                ("qc_a", [], "fail_workflow"),
+                ("qc_b", [], "fail_workflow"),
+                ("merge", ["qc_a", "qc_b"], "fail_workflow"),
+            ]
+        ),
+        inputs={"seed": 0},
+        base_dir=tmp_path,
+        run_id="wf-run-dag",
+        emit=events.append,
+    )
+
+    assert result.status == "ok"
+    assert [outcome.step_id for outcome in result.step_outcomes] == ["qc_a", "qc_b", "merge"]
+    assert result.step_outcomes[-1].outputs == {"value": ["a", "b"]}
+    for payload in events:
+        build_runtime_event(payload)
+
+    started = {event["step_id"]: event for event in events if event["type"] == "workflow_step_started"}
+    assert {step_id: event["step_index"] for step_id, event in started.items()} == {
+        "qc_a": 1,
+        "qc_b": 2,
+        "merge": 3,
+    }
+    merge_started = events.index(started["merge"])
+    ended_before_merge = {
+        event["step_id"] for event in events[:merge_started] if event["type"] == "workflow_step_ended"
+    }
+    assert ended_before_merge == {"qc_a", "qc_b"}
+
+
+def test_run_workflow_abort_lets_running_steps_finish(
+    _inprocess_runner_module: ModuleType, tmp_path: Path
+) -> None:
+    sibling_started = threading.Event()
+
+    def fail_after_sibling_starts(inputs: dict[str, Any], ctx: Any) -> dict[str, Any]:
+        assert sibling_started.wait(timeout=10)
+        raise RuntimeError("qc failed")
+
+    def sibling(inputs: dict[str, Any], ctx: Any) -> dict[str, Any]:
+        sibling_started.set()
+        return {"value": "done"}
+
+    _register_step(_inprocess_runner_module, "qc_a", fail_after_sibling_starts)
+    _register_step(_inprocess_runner_module, "qc_b", sibling)
+    _register_step(_inprocess_runner_module, "merge", lambda inputs, ctx: {"value": "never"})
+
+    events: list[dict[str, Any]] = []
+    result = run_workflow(
+        _dag_spec(
+            [
+                ("qc_a", [], "block_workflow"),
+                ("qc_b", [], "fail_workflow"),
+                ("merge", ["qc_a", "qc_b"], "fail_workflow"),
+            ]
+        ),
+        inputs={"seed": 0},
+        base_dir=tmp_path,
+        run_id="wf-run-abort",
+        emit=events.append,
+        max_parallel_steps=2,
+    )
+
+    assert result.status == "failed"
+    assert [outcome.status for outcome in result.step_outcomes] == ["failed", "ok", "skipped"]
+    failed = [event for event in events if event["type"] == "workflow_step_failed"]
+    assert [(event["step_id"], event["failure_policy"]) for event in failed] == [("qc_a", "block_workflow")]
+
+
+@pytest.mark.parametrize("failure_policy", ["fail_workflow", "block_workflow"])
+def test_run_workflow_abort_does_not_start_independent_steps(
+    _inprocess_runner_module: ModuleType, tmp_path: Path, failure_policy: str
+) -> None:
+    _register_step(_inprocess_runner_module, "qc_a", _fail("qc failed"))
+    _register_step(_inprocess_runner_module, "qc_b", lambda inputs, ctx: {"value": "never"})
+
+    events: list[dict[str, Any]] = []
+    result = run_workflow(
+        _dag_spec([("qc_a", [], failure_policy), ("qc_b", [], "fail_workflow")]),
+        inputs={"seed": 0},
+        base_dir=tmp_path,
+        run_id="wf-run-abort-queued",
+        emit=events.append,
+        max_parallel_steps=1,
+    )
+
+    assert [outcome.status for outcome in result.step_outcomes] == ["failed", "skipped"]
+    assert {event["step_id"] for event in events} == {"qc_a"}
+
+
+def test_run_workflow_continue_with_warning_skips_only_dependents(
+    _inprocess_runner_module: ModuleType, tmp_path: Path
+) -> None:
+    _register_step(_inprocess_runner_module, "qc_a", _fail("flaky QC"))
+    _register_step(_inprocess_runner_module, "report_a", lambda inputs, ctx: {"value": "never"})
+    _register_step(_inprocess_runner_module, "qc_b", lambda inputs, ctx: {"value": "b"})
+    _register_step(_inprocess_runner_module, "report_b", lambda inputs, ctx: {"value": inputs["qc_b"] + "!"})
+
+    events: list[dict[str, Any]] = []
+    result = run_workflow(
+        _dag_spec(
+            [
+                ("qc_a", [], "continue_with_warning"),
+                ("report_a", ["qc_a"], "fail_workflow"),
+                ("qc_b", [], "fail_workflow"),
+                ("report_b", ["qc_b"], "fail_workflow"),
+            ]
+        ),
+        inputs={"seed": 0},
+        base_dir=tmp_path,
+        run_id="wf-run-warn",
+        emit=events.append,
+    )
+
+    assert result.status == "failed"
+    assert [outcome.status for outcome in result.step_outcomes] == ["failed", "skipped", "ok", "ok"]
+    assert result.step_outcomes[-1].outputs == {"value": "b!"}
+    assert "report_a" not in {event["step_id"] for event in events}
@@ -48,6 +48,7 @@ def _instantiate_all_tools(base_dir: Path) -> list:
         SearchKnowledgeBaseTool(
             knowledge_dir=str(base_dir / "knowledge"),
             storage_dir=str(base_dir / "storage"),
+            embedding_cache_max_bytes=config.get_embedding_cache_max_bytes(),
         ),
     ]
 
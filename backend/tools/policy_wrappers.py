@@ -20,6 +20,7 @@ from config import (
     get_tool_wallclock_override_s,
 )
 from runtime import hooks as runtime_hooks
+from runtime.turn_profile import turn_phase
 
 from .contracts import (
     MAX_STRUCTURED_PAYLOAD_JSON_CHARS,
@@ -753,7 +754,9 @@ class PolicyWrappedTool(BaseTool):
                 raw_output = hook_raw
         if raw_output is None:
             try:
-                with scoped_environment(self._sandbox_env_allowlist()):
+                with turn_phase("tool_dispatch", tool=self.name), scoped_environment(
+                    self._sandbox_env_allowlist()
+                ):
                     raw_output = self._dispatch_sync_with_wall_clock(
                         args, kwargs, self._sandbox_wall_clock()
                     )
@@ -796,7 +799,9 @@ class PolicyWrappedTool(BaseTool):
                 raw_output, speculation_metadata = consumed
         if raw_output is None:
             try:
-                with scoped_environment(self._sandbox_env_allowlist()):
+                with turn_phase("tool_dispatch", tool=self.name), scoped_environment(
+                    self._sandbox_env_allowlist()
+                ):
                     raw_output = await self._dispatch_async_with_wall_clock(
                         args, kwargs, self._sandbox_wall_clock()
                     )
@@ -1,18 +1,35 @@
 """
 Hybrid BM25 + vector search over the knowledge/ directory using LlamaIndex.
-The index is lazily built and persisted to storage/knowledge_index/.
+The index is lazily built and persisted to storage/knowledge_index/. Chunk
+embeddings go through the content-addressed cache in storage/embedding_cache/,
+so a rebuild only sends new or edited chunks to the embedding backend.
+
+Like `MemoryIndexer`, the tool tracks a per-file (mtime, size, md5) state map
+(persisted next to the index as state.json). When files change, only their
+documents are deleted from and re-inserted into the vector index, and the
+resident BM25 index is patched the same way instead of being rebuilt per query.
 """
+import hashlib
+import json
+import logging
+import shutil
+import threading
 from pathlib import Path
 from typing import Any, Optional, Type
 
 from langchain_core.tools import BaseTool
 from pydantic import BaseModel, Field, PrivateAttr
 
+from graph.embedding_cache import DEFAULT_EMBEDDING_CACHE_MAX_BYTES
+
 from .contracts import empty_result, success_result
 from .untrusted_wrapper import wrap_untrusted
 
+logger = logging.getLogger(__name__)
+
 _TOP_K = 3
 _SUPPORTED_EXTS = {".md", ".txt", ".pdf"}
+_STATE_FILE = "state.json"
 # Any file under a directory segment matching one of these names is excluded
 # from the default index. Callers that explicitly want archived content can
 # set include_archive=True on the tool.
@@ -45,53 +62,28 @@ class SearchKnowledgeBaseTool(BaseTool):
     # from indexing and retrieval — superseded docs stay addressable on disk
     # but do not pollute retrieval results.
     include_archive: bool = False
+    embedding_cache_max_bytes: int = DEFAULT_EMBEDDING_CACHE_MAX_BYTES
 
     _index: Optional[Any] = PrivateAttr(default=None)
     _nodes: list = PrivateAttr(default_factory=list)
     _built: bool = PrivateAttr(default=False)
-    _last_mtime: float = PrivateAttr(default=0.0)
-
-    def _dir_mtime(self) -> float:
-        """Return the latest modification time of any supported file in knowledge_dir."""
-        knowledge_path = Path(self.knowledge_dir)
-        if not knowledge_path.exists():
-            return 0.0
-        latest = 0.0
-        for f in knowledge_path.rglob("*"):
-            if not (f.is_file() and f.suffix.lower() in _SUPPORTED_EXTS):
-                continue
-            if not self.include_archive and _is_archived(f.relative_to(knowledge_path)):
-                continue
-            try:
-                latest = max(latest, f.stat().st_mtime)
-            except OSError:
-                pass
-        return latest
-
-    def _ensure_index(self) -> None:
-        current_mtime = self._dir_mtime()
-        # Short-circuit when nothing has changed since the last successful build.
-        # We do NOT require _index is not None here: an empty knowledge dir is a
-        # legitimate "built" state (index=None) and should not trigger a rebuild
-        # on every call just because the index is absent.
-        if self._built and current_mtime <= self._last_mtime:
-            return
-
-        # Reset state — do NOT mark _built=True until build succeeds
-        self._index = None
-        self._nodes = []
-
+    _bm25: Optional[Any] = PrivateAttr(default=None)
+    # relative file path -> (mtime, size, md5) as of the last successful sync
+    _file_states: dict = PrivateAttr(default_factory=dict)
+    # relative file path -> LlamaIndex ref doc ids loaded from that file
+    # (one per file, or one per page for PDFs)
+    _file_docs: dict = PrivateAttr(default_factory=dict)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    @property
+    def _storage_path(self) -> Path:
+        return Path(self.storage_dir) / "knowledge_index"
+
+    def _knowledge_files(self) -> list[Path]:
         knowledge_path = Path(self.knowledge_dir)
-        storage_path = Path(self.storage_dir) / "knowledge_index"
-
         if not knowledge_path.exists():
-            # Nothing to index — record mtime so we don't retry on every call
-            self._built = True
-            self._last_mtime = current_mtime
-            return
-
-        # Check for any supported files (excluding archived unless opted in)
-        files = [
+            return []
+        return sorted(
             f
             for f in knowledge_path.rglob("*")
             if f.is_file()
@@ -100,69 +92,271 @@ class SearchKnowledgeBaseTool(BaseTool):
                 self.include_archive
                 or not _is_archived(f.relative_to(knowledge_path))
             )
-        ]
-        if not files:
-            self._built = True
-            self._last_mtime = current_mtime
-            return
+        )
+
+    def _file_state_map(self) -> dict[str, tuple[float, int, str]]:
+        """Return {relative path: (mtime, size, md5)} for every indexable file.
+
+        Files whose mtime and size match the last sync reuse the cached md5, so
+        the no-change path is a stat scan rather than a content hash.
+        """
+        knowledge_path = Path(self.knowledge_dir)
+        states: dict[str, tuple[float, int, str]] = {}
+        for path in self._knowledge_files():
+            try:
+                stat_result = path.stat()
+            except OSError:
+                continue
+            source = path.relative_to(knowledge_path).as_posix()
+            cached = self._file_states.get(source)
+            if (
+                cached is not None
+                and cached[0] == stat_result.st_mtime
+                and cached[1] == stat_result.st_size
+            ):
+                states[source] = cached
+                continue
+            try:
+                content = path.read_bytes()
+            except OSError:
+                continue
+            file_md5 = hashlib.md5(content).hexdigest()
+            states[source] = (stat_result.st_mtime, stat_result.st_size, file_md5)
+        return states
+
+    @staticmethod
+    def _diff_state_maps(
+        old: dict[str, tuple[float, int, str]],
+        new: dict[str, tuple[float, int, str]],
+    ) -> tuple[set[str], set[str], set[str]]:
+        old_keys = set(old)
+        new_keys = set(new)
+        added = new_keys - old_keys
+        removed = old_keys - new_keys
+        modified = {
+            source
+            for source in (old_keys & new_keys)
+            if old[source][2] != new[source][2]
+        }
+        return added, modified, removed
+
+    def _persist_state(self) -> None:
+        payload = {
+            source: [mtime, size, file_md5, self._file_docs.get(source, [])]
+            for source, (mtime, size, file_md5) in self._file_states.items()
+        }
+        try:
+            (self._storage_path / _STATE_FILE).write_text(
+                json.dumps(payload), encoding="utf-8"
+            )
+        except OSError:
+            pass
 
+    def _load_persisted_state(
+        self,
+    ) -> tuple[dict[str, tuple[float, int, str]], dict[str, list[str]]]:
         try:
-            from llama_index.core import (
-                SimpleDirectoryReader,
-                StorageContext,
-                VectorStoreIndex,
-                load_index_from_storage,
+            raw = json.loads(
+                (self._storage_path / _STATE_FILE).read_text(encoding="utf-8")
             )
-            from llama_index.core.node_parser import SentenceSplitter
+        except (OSError, ValueError):
+            return {}, {}
+        states: dict[str, tuple[float, int, str]] = {}
+        docs: dict[str, list[str]] = {}
+        for source, entry in (raw or {}).items():
+            try:
+                mtime, size, file_md5, doc_ids = entry
+                states[str(source)] = (float(mtime), int(size), str(file_md5))
+                docs[str(source)] = [str(doc_id) for doc_id in doc_ids]
+            except (TypeError, ValueError):
+                continue
+        return states, docs
 
-            storage_path.mkdir(parents=True, exist_ok=True)
+    def _embedding_pipeline(self) -> Any:
+        from graph.embedding_cache import shared_embedding_cache
+        from graph.memory_embedding import EmbeddingPipeline
 
-            # Only load the persisted index when mtime has NOT changed (cold start).
-            # If mtime DID change (files added/modified) we skip the stale persisted
-            # index and always do a full rebuild so new content is included.
-            if self._last_mtime == 0.0 or current_mtime <= self._last_mtime:
-                try:
-                    storage_context = StorageContext.from_defaults(
-                        persist_dir=str(storage_path)
-                    )
-                    self._index = load_index_from_storage(storage_context)
-                    # Rebuild nodes list for BM25
-                    self._nodes = list(self._index.docstore.docs.values())
-                    self._built = True
-                    self._last_mtime = current_mtime
-                    return
-                except Exception:
-                    pass
-
-            # Fresh build (first build or mtime changed) — wipe stale persisted index
-            import shutil
-            if storage_path.exists():
-                try:
-                    shutil.rmtree(str(storage_path))
-                except Exception:
-                    pass
-            storage_path.mkdir(parents=True, exist_ok=True)
+        return EmbeddingPipeline(
+            cache=shared_embedding_cache(
+                Path(self.storage_dir), max_bytes=self.embedding_cache_max_bytes
+            )
+        )
 
+    def _load_documents(self, sources: list[str]) -> dict[str, list[Any]]:
+        """Read each source with `SimpleDirectoryReader`, keyed by relative path.
+
+        ``filename_as_id`` makes the ref doc ids deterministic (the file path,
+        or ``<path>_part_<n>`` per PDF page) so they can be deleted later.
+        """
+        from llama_index.core import SimpleDirectoryReader
+
+        knowledge_path = Path(self.knowledge_dir)
+        loaded: dict[str, list[Any]] = {}
+        for source in sources:
             reader = SimpleDirectoryReader(
-                input_files=[str(f) for f in files],
+                input_files=[str(knowledge_path / source)],
+                filename_as_id=True,
             )
-            docs = reader.load_data()
-            splitter = SentenceSplitter(chunk_size=512, chunk_overlap=64)
-            self._nodes = splitter.get_nodes_from_documents(docs)
+            loaded[source] = reader.load_data()
+        return loaded
+
+    def _nodes_for_documents(self, docs: list[Any]) -> list:
+        from llama_index.core.node_parser import SentenceSplitter
+
+        splitter = SentenceSplitter(chunk_size=512, chunk_overlap=64)
+        nodes = splitter.get_nodes_from_documents(docs)
+        self._embedding_pipeline().embed_nodes(nodes)
+        return nodes
 
-            storage_context = StorageContext.from_defaults()
-            self._index = VectorStoreIndex(
-                self._nodes, storage_context=storage_context
+    def _reset_bm25_index(self) -> None:
+        try:
+            from graph.memory_bm25 import MemoryBM25Index
+
+            bm25 = MemoryBM25Index()
+            bm25.add_nodes(self._nodes)
+        except Exception:
+            logger.warning("Knowledge BM25 index unavailable", exc_info=True)
+            bm25 = None
+        self._bm25 = bm25
+
+    def _persist_index(self) -> None:
+        self._storage_path.mkdir(parents=True, exist_ok=True)
+        self._index.storage_context.persist(persist_dir=str(self._storage_path))
+        self._persist_state()
+
+    def _full_rebuild(self, current_map: dict[str, tuple[float, int, str]]) -> None:
+        from llama_index.core import StorageContext, VectorStoreIndex
+
+        # Wipe any stale or legacy persisted index before writing a fresh one.
+        if self._storage_path.exists():
+            try:
+                shutil.rmtree(str(self._storage_path))
+            except Exception:
+                pass
+        self._storage_path.mkdir(parents=True, exist_ok=True)
+
+        loaded = self._load_documents(sorted(current_map))
+        docs = [doc for source in sorted(loaded) for doc in loaded[source]]
+        self._nodes = self._nodes_for_documents(docs)
+        self._index = VectorStoreIndex(
+            self._nodes, storage_context=StorageContext.from_defaults()
+        )
+        self._file_docs = {
+            source: [doc.id_ for doc in source_docs]
+            for source, source_docs in loaded.items()
+        }
+        self._file_states = current_map
+        self._persist_index()
+        self._reset_bm25_index()
+
+    def _load_persisted_index(self) -> bool:
+        """Adopt the persisted index and its state map; False if unusable."""
+        from llama_index.core import StorageContext, load_index_from_storage
+
+        states, docs = self._load_persisted_state()
+        if not states:
+            return False
+        try:
+            storage_context = StorageContext.from_defaults(
+                persist_dir=str(self._storage_path)
             )
-            self._index.storage_context.persist(persist_dir=str(storage_path))
+            index = load_index_from_storage(storage_context)
+        except Exception:
+            return False
+        self._index = index
+        self._nodes = list(index.docstore.docs.values())
+        self._file_states = states
+        self._file_docs = docs
+        self._reset_bm25_index()
+        return True
+
+    def _apply_incremental_update(
+        self, current_map: dict[str, tuple[float, int, str]]
+    ) -> None:
+        """Delete and re-insert only the files that changed since the last sync."""
+        added, modified, removed = self._diff_state_maps(self._file_states, current_map)
+        if not (added or modified or removed):
+            # Touched but byte-identical files: refresh the cached mtimes only.
+            self._file_states = current_map
+            self._persist_state()
+            return
+
+        stale_ids = [
+            doc_id
+            for source in sorted(modified | removed)
+            for doc_id in self._file_docs.pop(source, [])
+        ]
+        for doc_id in stale_ids:
+            self._index.delete_ref_doc(doc_id, delete_from_docstore=True)
+
+        loaded = self._load_documents(sorted(added | modified))
+        docs = [doc for source in sorted(loaded) for doc in loaded[source]]
+        new_nodes = self._nodes_for_documents(docs) if docs else []
+        if new_nodes:
+            self._index.insert_nodes(new_nodes)
+        for doc in docs:
+            self._index.docstore.set_document_hash(doc.id_, doc.hash)
+        for source, source_docs in loaded.items():
+            self._file_docs[source] = [doc.id_ for doc in source_docs]
+
+        stale = set(stale_ids)
+        self._nodes = [
+            node for node in self._nodes if node.ref_doc_id not in stale
+        ] + new_nodes
+        self._file_states = current_map
+        self._persist_index()
+        if self._bm25 is None:
+            self._reset_bm25_index()
+        else:
+            self._bm25.remove_ref_docs(stale_ids)
+            self._bm25.add_nodes(new_nodes)
+        logger.info(
+            "Knowledge index updated: %d added, %d modified, %d removed",
+            len(added),
+            len(modified),
+            len(removed),
+        )
+
+    def _ensure_index(self) -> None:
+        with self._lock:
+            self._sync_index()
+
+    def _sync_index(self) -> None:
+        current_map = self._file_state_map()
+        # Short-circuit when nothing has changed since the last successful sync.
+        # We do NOT require _index is not None here: an empty knowledge dir is a
+        # legitimate "built" state (index=None) and should not trigger a rebuild
+        # on every call just because the index is absent.
+        if self._built and current_map == self._file_states:
+            return
+
+        if not current_map:
+            # Nothing to index — record the empty state so we don't retry on
+            # every call.
+            self._index = None
+            self._nodes = []
+            self._bm25 = None
+            self._file_states = {}
+            self._file_docs = {}
             self._built = True
-            self._last_mtime = current_mtime
+            return
 
+        try:
+            if self._index is None and not self._load_persisted_index():
+                self._full_rebuild(current_map)
+            else:
+                self._apply_incremental_update(current_map)
+            self._built = True
         except Exception:
-            # Build failed — leave _built=False and _last_mtime unchanged so the
-            # next call will retry instead of permanently skipping the rebuild.
+            # Build failed — leave _built=False and drop the in-memory state so
+            # the next call retries from the persisted index or from scratch.
+            logger.warning("Knowledge index sync failed", exc_info=True)
             self._index = None
             self._nodes = []
+            self._bm25 = None
+            self._file_states = {}
+            self._file_docs = {}
+            self._built = False
 
     def _run(self, query: str) -> tuple[str, dict]:
         self._ensure_index()
@@ -201,16 +395,11 @@ class SearchKnowledgeBaseTool(BaseTool):
         except Exception:
             pass
 
-        # BM25 retrieval
+        # BM25 retrieval over the resident index
         try:
-            from llama_index.retrievers.bm25 import BM25Retriever
-
-            if self._nodes:
-                bm25 = BM25Retriever.from_defaults(
-                    nodes=self._nodes, similarity_top_k=_TOP_K
-                )
-                for node in bm25.retrieve(query):
-                    nid = node.node.node_id
+            if self._bm25 is not None:
+                for node, _score in self._bm25.retrieve(query, _TOP_K):
+                    nid = node.node_id
                     if nid not in seen:
                         seen.add(nid)
                         src = node.metadata.get("file_name", "document")
@@ -26,6 +26,7 @@ WorkflowQCGateStage = Literal["before_execution", "before_step", "after_step", "
 QCGateFailurePolicy = Literal["warn", "block"]
 ComplianceHookStage = Literal["before_execution", "before_step", "after_step", "before_publish"]
 StepFailurePolicy = Literal["fail_workflow", "block_workflow", "continue_with_warning"]
+StepCachePolicy = Literal["reuse", "disabled"]
 
 
 def _require_non_empty(value: str, *, field_name: str) -> str:
@@ -520,6 +521,7 @@ class WorkflowStepDefinition(BaseModel):
     prerequisites: list[str] = Field(default_factory=list)
     retry_policy: RetryPolicy = Field(default_factory=RetryPolicy)
     failure_policy: StepFailurePolicy
+    cache_policy: StepCachePolicy = "reuse"
 
     @field_validator("id")
     @classmethod
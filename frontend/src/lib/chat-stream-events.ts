@@ -171,6 +171,13 @@ export function parseChatStreamEventPayload(payload: unknown): ChatStreamEvent {
         review_path: event.review_path ?? null,
         ...base,
       };
+    case "turn_profile":
+      return {
+        type: "turn_profile",
+        total_ms: event.total_ms,
+        phases: event.phases as JsonObject[],
+        ...base,
+      };
     case "done":
       return {
         type: "done",
@@ -205,6 +205,7 @@ export function applyStreamEvent(
     case "new_response":
       return reduceNewResponseEvent(state, event, options);
     case "compaction_event":
+    case "turn_profile":
       return {
         messages: state.messages,
         streamingMessageId: state.streamingMessageId,
@@ -188,6 +188,17 @@ export const WarningRuntimeEventSchema = z
     type: z.literal("warning"),
   })
   .strict();
+/** Phase timings for the turn, emitted just before ``done`` when profiling is on. */
+export const TurnProfileRuntimeEventSchema = z
+  .object({
+    event_index: z.number().int().min(1).nullish(),
+    phases: z.array(z.record(z.string(), z.unknown())).default([]),
+    request_id: z.string().nullish(),
+    schema_version: z.number().int().default(RUNTIME_EVENT_SCHEMA_VERSION),
+    total_ms: z.number(),
+    type: z.literal("turn_profile"),
+  })
+  .strict();
 export const DoneRuntimeEventSchema = z
   .object({
     content: z.string(),
@@ -272,6 +283,7 @@ export const ChatStreamEventSchema = z.discriminatedUnion("type", [
   NewResponseRuntimeEventSchema,
   CompactionRuntimeEventSchema,
   WarningRuntimeEventSchema,
+  TurnProfileRuntimeEventSchema,
   DoneRuntimeEventSchema,
   ErrorRuntimeEventSchema,
   WorkflowStepStartedRuntimeEventSchema,
@@ -282,7 +294,7 @@ export const RuntimeEventSchema = ChatStreamEventSchema;
 export type ChatStreamEvent = z.infer<typeof ChatStreamEventSchema>;
 export type RuntimeEvent = ChatStreamEvent;
 
-export const RUNTIME_EVENT_TYPES = ["retrieval", "retrieval_error", "token", "tool_start", "tool_end", "tool_awaiting_approval", "tool_chunk", "plan_created", "plan_updated", "verification_result", "new_response", "compaction_event", "warning", "done", "error", "workflow_step_started", "workflow_step_ended", "workflow_step_failed"] as const;
+export const RUNTIME_EVENT_TYPES = ["retrieval", "retrieval_error", "token", "tool_start", "tool_end", "tool_awaiting_approval", "tool_chunk", "plan_created", "plan_updated", "verification_result", "new_response", "compaction_event", "warning", "turn_profile", "done", "error", "workflow_step_started", "workflow_step_ended", "workflow_step_failed"] as const;
 export type RuntimeEventType = (typeof RUNTIME_EVENT_TYPES)[number];
 
 export const RUNTIME_EVENT_SCHEMAS: Record<RuntimeEventType, z.ZodTypeAny> = {
@@ -299,6 +311,7 @@ export const RUNTIME_EVENT_SCHEMAS: Record<RuntimeEventType, z.ZodTypeAny> = {
   new_response: NewResponseRuntimeEventSchema,
   compaction_event: CompactionRuntimeEventSchema,
   warning: WarningRuntimeEventSchema,
+  turn_profile: TurnProfileRuntimeEventSchema,
   done: DoneRuntimeEventSchema,
   error: ErrorRuntimeEventSchema,
   workflow_step_started: WorkflowStepStartedRuntimeEventSchema,
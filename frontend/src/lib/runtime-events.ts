@@ -40,6 +40,7 @@ export {
   NewResponseRuntimeEventSchema,
   CompactionRuntimeEventSchema,
   WarningRuntimeEventSchema,
+  TurnProfileRuntimeEventSchema,
   DoneRuntimeEventSchema,
   ErrorRuntimeEventSchema,
   WorkflowStepStartedRuntimeEventSchema,
@@ -247,6 +247,15 @@ export interface TurnExit {
   reason: "success" | "tool_error" | "user_abort" | "context_limit" | "token_budget" | "approval_denied" | "awaiting_approval";
   summary?: string;
 }
+/** Phase timings for the turn, emitted just before ``done`` when profiling is on. */
+export interface ChatStreamTurnProfileEvent {
+  event_index?: number;
+  phases?: JsonObject[];
+  request_id?: string;
+  schema_version?: number;
+  total_ms: number;
+  type: "turn_profile";
+}
 export interface ChatStreamVerificationResultEvent {
   event_index?: number;
   request_id?: string;
@@ -328,6 +337,7 @@ export type ChatStreamEventDTO =
   | ChatStreamNewResponseEvent
   | ChatStreamCompactionEvent
   | WarningRuntimeEvent
+  | ChatStreamTurnProfileEvent
   | ChatStreamDoneEvent
   | ChatStreamErrorEvent
   | ChatStreamWorkflowStepStartedEvent
@@ -32,6 +32,7 @@ export type {
   ChatStreamVerificationResultEvent,
   ChatStreamNewResponseEvent,
   ChatStreamCompactionEvent,
+  ChatStreamTurnProfileEvent,
   ChatStreamDoneEvent,
   ChatStreamErrorEvent,
   ChatStreamRetrievalErrorEvent,
@@ -59,6 +60,7 @@ import type {
   ChatStreamVerificationResultEvent,
   ChatStreamNewResponseEvent,
   ChatStreamCompactionEvent,
+  ChatStreamTurnProfileEvent,
   ChatStreamDoneEvent,
   ChatStreamErrorEvent,
   ChatStreamRetrievalErrorEvent,
@@ -282,6 +284,7 @@ export type ChatStreamEvent =
   | ChatStreamNewResponseEvent
   | ChatStreamCompactionEvent
   | ChatStreamWarningEvent
+  | ChatStreamTurnProfileEvent
   | ChatStreamDoneEvent
   | ChatStreamErrorEvent
   | ChatStreamWorkflowStepStartedEvent
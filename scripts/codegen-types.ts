@@ -106,6 +106,7 @@ const EVENT_NAME_MAP: Record<string, string> = {
   VerificationResultRuntimeEvent: "ChatStreamVerificationResultEvent",
   NewResponseRuntimeEvent: "ChatStreamNewResponseEvent",
   CompactionRuntimeEvent: "ChatStreamCompactionEvent",
+  TurnProfileRuntimeEvent: "ChatStreamTurnProfileEvent",
   DoneRuntimeEvent: "ChatStreamDoneEvent",
   ErrorRuntimeEvent: "ChatStreamErrorEvent",
   WorkflowStepStartedRuntimeEvent: "ChatStreamWorkflowStepStartedEvent",
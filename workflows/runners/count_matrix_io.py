@@ -0,0 +1,299 @@
+"""Chunked, columnar I/O for gene x sample matrices in the RNA-seq workflow.
+
+Count matrices are published as TSV (``gene_id``, ``gene_symbol``, one column
+per sample). Reading them with ``csv.DictReader`` built a dict and one Python
+int per cell, and writing them joined every line in memory first, so both
+peaked at several times the matrix size. Here:
+
+* :func:`read_count_matrix` parses the TSV ``chunk_rows`` lines at a time
+  straight into one preallocated ``int64`` array. Unquoted chunks go through
+  ``np.loadtxt``; any chunk it rejects is re-read with :mod:`csv` and
+  ``int()``, so the values (and errors) are exactly those of the csv path.
+* :func:`write_count_matrix` and :func:`write_matrix_tsv` stream rows to disk
+  one chunk at a time.
+* :func:`write_count_matrix` also leaves a binary sidecar next to the TSV:
+  ``<name>.counts.npy`` with the counts and ``<name>.index.json`` with the gene
+  and sample ids plus the TSV's stat fingerprint. Later steps reopen the
+  counts memory-mapped without parsing; a sidecar whose fingerprint or sample
+  ids do not match is ignored and the TSV stays authoritative.
+"""
+
+from __future__ import annotations
+
+import csv
+import itertools
+import json
+import os
+import warnings
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+
+from snapshot_journal import path_fingerprint
+
+COUNT_MATRIX_SIDECAR_SUFFIX = ".counts.npy"
+COUNT_MATRIX_INDEX_SUFFIX = ".index.json"
+COUNT_MATRIX_SIDECAR_FORMAT_VERSION = 1
+DEFAULT_CHUNK_ROWS = 8192
+
+_BLANK_LINES = frozenset({"\n", "\r\n", "\r", ""})
+
+
+@dataclass(frozen=True)
+class CountTable:
+    gene_ids: list[str]
+    gene_symbols: list[str]
+    sample_ids: tuple[str, ...]
+    counts: np.ndarray  # int64, genes x samples; memory-mapped when read from a sidecar
+
+    def select(self, sample_ids: Sequence[str]) -> np.ndarray:
+        column_index = {sample_id: index for index, sample_id in enumerate(self.sample_ids)}
+        return self.counts[:, [column_index[sample_id] for sample_id in sample_ids]]
+
+
+def sidecar_paths(tsv_path: Path) -> tuple[Path, Path]:
+    """Return ``(counts_npy_path, index_json_path)`` for *tsv_path*."""
+    return (
+        tsv_path.with_name(tsv_path.name + COUNT_MATRIX_SIDECAR_SUFFIX),
+        tsv_path.with_name(tsv_path.name + COUNT_MATRIX_INDEX_SUFFIX),
+    )
+
+
+def read_count_matrix(
+    path: Path,
+    sample_ids: Sequence[str],
+    *,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    use_sidecar: bool = True,
+) -> CountTable:
+    """Read the counts for *sample_ids* from the count-matrix TSV at *path*.
+
+    Blank cells and sample columns missing from the header count as 0. A
+    current sidecar is used instead of the TSV when ``use_sidecar`` is set.
+    """
+    if use_sidecar:
+        table = _open_sidecar(path, sample_ids)
+        if table is not None:
+            return table
+    return _parse_tsv(path, sample_ids, chunk_rows=max(1, int(chunk_rows)))
+
+
+def write_count_matrix(
+    path: Path,
+    *,
+    gene_ids: Sequence[str],
+    gene_symbols: Sequence[str],
+    sample_ids: Sequence[str],
+    counts: np.ndarray,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    sidecar: bool = True,
+) -> None:
+    """Stream an integer count matrix to *path* and, by default, its sidecar."""
+    counts = np.asarray(counts, dtype=np.int64)
+    write_matrix_tsv(
+        path,
+        gene_ids=gene_ids,
+        gene_symbols=gene_symbols,
+        sample_ids=sample_ids,
+        values=counts,
+        cell_format="%d",
+        chunk_rows=chunk_rows,
+    )
+    if sidecar:
+        _write_sidecar(
+            path,
+            CountTable(
+                gene_ids=list(gene_ids),
+                gene_symbols=list(gene_symbols),
+                sample_ids=tuple(sample_ids),
+                counts=counts,
+            ),
+        )
+
+
+def write_matrix_tsv(
+    path: Path,
+    *,
+    gene_ids: Sequence[str],
+    gene_symbols: Sequence[str],
+    sample_ids: Sequence[str],
+    values: np.ndarray,
+    cell_format: str = "%.6f",
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+) -> None:
+    """Stream a genes x samples matrix to *path* as TSV, *chunk_rows* rows per write."""
+    if values.shape != (len(gene_ids), len(sample_ids)):
+        raise ValueError(
+            f"Matrix shape {values.shape} does not match {len(gene_ids)} genes x {len(sample_ids)} samples."
+        )
+    chunk_rows = max(1, int(chunk_rows))
+    row_format = "\t".join(["%s", "%s", *([cell_format] * len(sample_ids))])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8", newline="") as handle:
+        handle.write("\t".join(["gene_id", "gene_symbol", *sample_ids]) + "\n")
+        for start in range(0, len(gene_ids), chunk_rows):
+            stop = start + chunk_rows
+            handle.write(
+                "".join(
+                    row_format % (gene_id, gene_symbol, *row) + "\n"
+                    for gene_id, gene_symbol, row in zip(
+                        gene_ids[start:stop],
+                        gene_symbols[start:stop],
+                        values[start:stop].tolist(),
+                    )
+                )
+            )
+
+
+def _parse_tsv(path: Path, sample_ids: Sequence[str], *, chunk_rows: int) -> CountTable:
+    counts = np.zeros((_line_count_upper_bound(path), len(sample_ids)), dtype=np.int64)
+    gene_ids: list[str] = []
+    gene_symbols: list[str] = []
+
+    with path.open("r", encoding="utf-8", newline="") as handle:
+        header = next(csv.reader([handle.readline()], delimiter="\t"), [])
+        column_index = {name: index for index, name in enumerate(header)}
+        gene_id_index = column_index.get("gene_id")
+        gene_symbol_index = column_index.get("gene_symbol")
+        sample_indexes = [column_index.get(sample_id) for sample_id in sample_ids]
+        present = [position for position, index in enumerate(sample_indexes) if index is not None]
+        present_columns = [sample_indexes[position] for position in present]
+        split_limit = max((index for index in (gene_id_index, gene_symbol_index) if index is not None), default=-1) + 1
+
+        def parse_rows_exactly(rows: Iterable[list[str]]) -> None:
+            for row in rows:
+                if not row:
+                    continue
+                width = len(row)
+                counts[len(gene_ids)] = [
+                    int(row[index] or "0") if index is not None and index < width else 0
+                    for index in sample_indexes
+                ]
+                gene_ids.append(_text_cell(row, gene_id_index, width))
+                gene_symbols.append(_text_cell(row, gene_symbol_index, width))
+
+        while lines := list(itertools.islice(handle, chunk_rows)):
+            if any('"' in line for line in lines):
+                # Quoted fields may span lines and chunks; finish with the csv module.
+                parse_rows_exactly(csv.reader(itertools.chain(lines, handle), delimiter="\t"))
+                break
+            lines = [line for line in lines if line not in _BLANK_LINES]
+            if not lines:
+                continue
+            parsed = _load_chunk(lines, present_columns)
+            if parsed is None:
+                parse_rows_exactly(csv.reader(lines, delimiter="\t"))
+                continue
+            start = len(gene_ids)
+            if present:
+                counts[start : start + len(lines), present] = parsed
+            for line in lines:
+                cells = line.rstrip("\r\n").split("\t", split_limit)
+                width = len(cells)
+                gene_ids.append(_text_cell(cells, gene_id_index, width))
+                gene_symbols.append(_text_cell(cells, gene_symbol_index, width))
+
+    return CountTable(
+        gene_ids=gene_ids,
+        gene_symbols=gene_symbols,
+        sample_ids=tuple(sample_ids),
+        counts=counts[: len(gene_ids)],
+    )
+
+
+def _load_chunk(lines: list[str], columns: Sequence[int]) -> Optional[np.ndarray]:
+    """Parse the integer *columns* of unquoted *lines*, or ``None`` to use csv instead."""
+    if not columns:
+        return np.zeros((len(lines), 0), dtype=np.int64)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        try:
+            parsed = np.loadtxt(
+                lines,
+                dtype=np.int64,
+                delimiter="\t",
+                usecols=columns,
+                comments=None,
+                quotechar=None,
+                ndmin=2,
+            )
+        except (ValueError, Warning):
+            return None
+    return parsed if parsed.shape[0] == len(lines) else None
+
+
+def _line_count_upper_bound(path: Path) -> int:
+    newlines = carriage_returns = 0
+    with open(path, "rb") as handle:
+        while block := handle.read(1024 * 1024):
+            newlines += block.count(b"\n")
+            carriage_returns += block.count(b"\r")
+    return max(newlines, carriage_returns) + 1
+
+
+def _text_cell(row: Sequence[str], index: Optional[int], width: int) -> str:
+    if index is None:
+        return ""
+    # ``csv.DictReader`` fills cells past the end of a short row with ``None``.
+    return str(row[index] if index < width else None).strip()
+
+
+def _write_sidecar(path: Path, table: CountTable) -> None:
+    counts_path, index_path = sidecar_paths(path)
+    tmp_counts = counts_path.with_name(counts_path.name + ".tmp")
+    with open(tmp_counts, "wb") as handle:
+        np.save(handle, np.ascontiguousarray(table.counts, dtype=np.int64))
+    os.replace(tmp_counts, counts_path)
+    # The index is written last and names the TSV it mirrors, so a reader
+    # never pairs a half-written or outdated sidecar with the TSV.
+    tmp_index = index_path.with_name(index_path.name + ".tmp")
+    tmp_index.write_text(
+        json.dumps(
+            {
+                "format_version": COUNT_MATRIX_SIDECAR_FORMAT_VERSION,
+                "source": path_fingerprint(path),
+                "shape": list(table.counts.shape),
+                "sample_ids": list(table.sample_ids),
+                "gene_ids": table.gene_ids,
+                "gene_symbols": table.gene_symbols,
+            },
+            ensure_ascii=False,
+            separators=(",", ":"),
+        ),
+        encoding="utf-8",
+    )
+    os.replace(tmp_index, index_path)
+
+
+def _open_sidecar(path: Path, sample_ids: Sequence[str]) -> Optional[CountTable]:
+    counts_path, index_path = sidecar_paths(path)
+    try:
+        index = json.loads(index_path.read_text(encoding="utf-8"))
+        if (
+            not isinstance(index, dict)
+            or index.get("format_version") != COUNT_MATRIX_SIDECAR_FORMAT_VERSION
+            or index.get("source") != path_fingerprint(path)
+            or index.get("sample_ids") != list(sample_ids)
+        ):
+            return None
+        counts = np.load(counts_path, mmap_mode="r")
+    except (OSError, ValueError):
+        return None
+    gene_ids = index.get("gene_ids")
+    gene_symbols = index.get("gene_symbols")
+    if (
+        not isinstance(gene_ids, list)
+        or not isinstance(gene_symbols, list)
+        or counts.dtype != np.int64
+        or counts.shape != (len(gene_ids), len(sample_ids))
+        or len(gene_symbols) != len(gene_ids)
+    ):
+        return None
+    return CountTable(
+        gene_ids=gene_ids,
+        gene_symbols=gene_symbols,
+        sample_ids=tuple(sample_ids),
+        counts=counts,
+    )
@@ -0,0 +1,206 @@
+"""Array-based differential expression for the RNA-seq workflow.
+
+``plan_differential_expression`` used to carry the count matrix as one dict
+per gene keyed by sample id and recomputed each sample's batch key for every
+gene, which made a 60k-gene x 200-sample contrast take minutes. This module
+takes the counts as one NumPy array (see ``count_matrix_io``) and runs
+size-factor normalisation, batch mean-centring, the Welch statistics and
+Benjamini-Hochberg adjustment as array operations over all genes at once.
+
+Output is bit-for-bit identical to the per-gene Python arithmetic it
+replaced, because the published TSVs and artifacts must not drift between
+releases. That rules out the obvious NumPy reductions:
+
+* means are accumulated column by column, in sample order, exactly as the
+  builtin ``sum`` does (including its compensated summation on 3.12+) rather
+  than with NumPy's pairwise summation;
+* ``round(x, n)`` is correctly rounded decimal rounding, which ``np.round``
+  is not, so :func:`_round` only trusts ``np.rint`` away from ties and
+  defers the rest to ``round``;
+* ``x ** 2`` goes through libm ``pow``, which can differ from ``x * x`` in
+  the last bit when the exact square sits near a rounding midpoint; those
+  elements are found with an exact product error and squared with ``**``;
+* ``log2`` and ``erfc`` only run once per gene and use :mod:`math`.
+"""
+
+from __future__ import annotations
+
+import math
+import sys
+from dataclasses import dataclass
+from typing import Callable, Hashable, Sequence
+
+import numpy as np
+
+_COMPENSATED_BUILTIN_SUM = sys.version_info >= (3, 12)
+# Veltkamp split constant for exact float64 products (2**27 + 1).
+_SPLITTER = 134217729.0
+
+
+@dataclass(frozen=True)
+class DifferentialExpressionStatistics:
+    baseline_mean: np.ndarray
+    comparison_mean: np.ndarray
+    log2_fold_change: np.ndarray
+    p_value: np.ndarray
+    baseline_replicates: int
+    comparison_replicates: int
+
+
+def normalize_counts(counts: np.ndarray, size_factors: Sequence[float]) -> np.ndarray:
+    """Divide each sample column by its size factor, rounded to 6 decimals."""
+    return _round(counts.astype(np.float64) / np.asarray(size_factors, dtype=np.float64), 6)
+
+
+def batch_mean_center(normalized: np.ndarray, batch_keys: Sequence[Hashable]) -> np.ndarray:
+    """Shift every batch to the gene's overall mean, rounded to 6 decimals.
+
+    ``batch_keys`` gives each sample column's batch; columns with equal keys
+    form one batch.
+    """
+    columns = np.asfortranarray(normalized)
+    global_mean = _mean_of_columns(columns, range(columns.shape[1]))
+    members: dict[Hashable, list[int]] = {}
+    for column, batch_key in enumerate(batch_keys):
+        members.setdefault(batch_key, []).append(column)
+
+    adjusted = np.empty_like(columns)
+    for batch_columns in members.values():
+        batch_mean = _mean_of_columns(columns, batch_columns)
+        for column in batch_columns:
+            adjusted[:, column] = columns[:, column] - batch_mean + global_mean
+    return _round(adjusted, 6)
+
+
+def welch_statistics(
+    normalized: np.ndarray,
+    adjusted: np.ndarray,
+    baseline_columns: Sequence[int],
+    comparison_columns: Sequence[int],
+) -> DifferentialExpressionStatistics:
+    """Per-gene group means, log2 fold change and two-sided Welch-z p-value.
+
+    Fold changes and p-values use the batch-adjusted values; the reported
+    group means use the normalised values.
+    """
+    adjusted_columns = np.asfortranarray(adjusted)
+    normalized_columns = np.asfortranarray(normalized)
+    baseline_count = len(baseline_columns)
+    comparison_count = len(comparison_columns)
+
+    baseline_mean = _mean_of_columns(adjusted_columns, baseline_columns)
+    comparison_mean = _mean_of_columns(adjusted_columns, comparison_columns)
+    shifted_baseline = baseline_mean + 1.0
+    if not shifted_baseline.all():
+        raise ZeroDivisionError("float division by zero")
+    log2_fold_change = _map_math(math.log2, (comparison_mean + 1.0) / shifted_baseline)
+    standard_error = np.sqrt(
+        _sample_variance(adjusted_columns, baseline_columns) / max(baseline_count, 1)
+        + _sample_variance(adjusted_columns, comparison_columns) / max(comparison_count, 1)
+    )
+    difference = np.abs(comparison_mean - baseline_mean)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z_score = np.where(
+            standard_error <= 0,
+            np.where(difference < 1e-9, 0.0, 12.0),
+            difference / standard_error,
+        )
+    p_value = np.minimum(np.maximum(_map_math(math.erfc, z_score / math.sqrt(2.0)), 1e-12), 1.0)
+
+    return DifferentialExpressionStatistics(
+        baseline_mean=_round(_mean_of_columns(normalized_columns, baseline_columns), 6),
+        comparison_mean=_round(_mean_of_columns(normalized_columns, comparison_columns), 6),
+        log2_fold_change=_round(log2_fold_change, 6),
+        p_value=_round(p_value, 12),
+        baseline_replicates=baseline_count,
+        comparison_replicates=comparison_count,
+    )
+
+
+def benjamini_hochberg(p_values: np.ndarray) -> np.ndarray:
+    """Benjamini-Hochberg adjusted p-values, rounded to 12 decimals."""
+    total = len(p_values)
+    if not total:
+        return np.empty(0, dtype=np.float64)
+    descending = np.argsort(p_values, kind="stable")[::-1]
+    remaining = np.arange(total, 0, -1, dtype=np.float64)
+    scaled = np.minimum(1.0, p_values[descending] * float(total) / remaining)
+    adjusted = np.empty(total, dtype=np.float64)
+    adjusted[descending] = _round(np.minimum.accumulate(scaled), 12)
+    return adjusted
+
+
+def _mean_of_columns(columns: np.ndarray, selected: Sequence[int]) -> np.ndarray:
+    """Row-wise ``sum(values) / len(values)`` over *selected* columns, in order."""
+    selected = list(selected)
+    if not selected:
+        raise ValueError("Mean requires at least one value.")
+    return _sum_of_columns(columns, selected) / len(selected)
+
+
+def _sum_of_columns(columns: np.ndarray, selected: Sequence[int]) -> np.ndarray:
+    total = 0.0 + columns[:, selected[0]]
+    if not _COMPENSATED_BUILTIN_SUM:
+        for column in selected[1:]:
+            total = total + columns[:, column]
+        return total
+
+    # Neumaier summation, as ``sum`` does for floats since Python 3.12.
+    compensation = np.zeros_like(total)
+    for column in selected[1:]:
+        value = columns[:, column]
+        running = total + value
+        compensation += np.where(
+            np.abs(total) >= np.abs(value),
+            (total - running) + value,
+            (value - running) + total,
+        )
+        total = running
+    return np.where((compensation != 0) & np.isfinite(compensation), total + compensation, total)
+
+
+def _sample_variance(columns: np.ndarray, selected: Sequence[int]) -> np.ndarray:
+    selected = list(selected)
+    if len(selected) <= 1:
+        return np.zeros(columns.shape[0], dtype=np.float64)
+    mean = _mean_of_columns(columns, selected)
+    squares = np.empty((columns.shape[0], len(selected)), dtype=np.float64, order="F")
+    for position, column in enumerate(selected):
+        squares[:, position] = _python_square(columns[:, column] - mean)
+    return _sum_of_columns(squares, range(len(selected))) / (len(selected) - 1)
+
+
+def _python_square(values: np.ndarray) -> np.ndarray:
+    """``values ** 2`` as Python computes it for floats (via libm ``pow``)."""
+    product = values * values
+    # Exact rounding error of the product (Dekker); libm pow agrees with the
+    # correctly rounded ``x * x`` unless the exact square is near a midpoint.
+    split = _SPLITTER * values
+    high = split - (split - values)
+    low = values - high
+    error = ((high * high - product) + 2.0 * high * low) + low * low
+    mantissa, _ = np.frexp(product)
+    near_midpoint = (np.abs(error) >= 0.47 * np.spacing(np.abs(product))) | (np.abs(mantissa) == 0.5)
+    near_midpoint |= ~np.isfinite(product)
+    if near_midpoint.any():
+        product[near_midpoint] = [value**2 for value in values[near_midpoint].tolist()]
+    return product
+
+
+def _round(values: np.ndarray, ndigits: int) -> np.ndarray:
+    """Elementwise ``round(value, ndigits)`` with Python's exact semantics."""
+    scale = 10.0**ndigits
+    scaled = values * scale
+    rounded = np.rint(scaled) / scale
+    magnitude = np.abs(scaled)
+    with np.errstate(invalid="ignore"):
+        # rint of the inexact product is only trustworthy away from .5 ties.
+        near_tie = np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5) <= 2.0 * np.spacing(magnitude)
+    unsure = near_tie | (magnitude >= 2.0**52) | ~np.isfinite(scaled)
+    if unsure.any():
+        rounded[unsure] = [round(value, ndigits) for value in values[unsure].tolist()]
+    return rounded
+
+
+def _map_math(function: Callable[[float], float], values: np.ndarray) -> np.ndarray:
+    return np.fromiter(map(function, values.tolist()), dtype=np.float64, count=values.size).reshape(values.shape)
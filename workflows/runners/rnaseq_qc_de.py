@@ -5,9 +5,11 @@ from __future__ import annotations
 import csv
 import math
 import os
-from pathlib import PurePosixPath
+from pathlib import Path, PurePosixPath
 from typing import Any, Mapping, Sequence
 
+import numpy as np
+
 from artifacts import (
     ComplianceReport,
     CountMatrix,
@@ -32,12 +34,25 @@ from dataset_intake import ensure_valid_dataset_intake_manifest
 from fastqc import (
     FastQCParsedReport,
     fastqc_output_prefix,
-    hash_file,
     load_fastqc_inputs,
     parse_fastqc_archive,
+    probe_fastqc_version,
     run_fastqc,
 )
-from multiqc import inspect_multiqc_report, run_multiqc
+from file_digests import hash_files, shared_file_digest_cache
+from multiqc import inspect_multiqc_report, probe_multiqc_version, run_multiqc
+from workflows.runners.count_matrix_io import (
+    CountTable,
+    read_count_matrix,
+    write_count_matrix,
+    write_matrix_tsv,
+)
+from workflows.runners.rnaseq_de_engine import (
+    batch_mean_center,
+    benjamini_hochberg,
+    normalize_counts,
+    welch_statistics,
+)
 
 
 _RNASEQ_WORKFLOW_VERSION = "1.0.0"
@@ -177,19 +192,58 @@ def run_raw_qc(inputs, context):
         raise ValueError("RNA-seq FastQC stage requires dataset_manifest.sample_sheet_path.")
 
     sequencing_layout, fastqc_inputs = load_fastqc_inputs(context.base_dir, manifest.sample_sheet_path)
-    executable, extra_args = _fastqc_config(manifest)
+    executable, extra_args, shard_size, max_parallel_shards = _fastqc_config(manifest)
 
     fastqc_output_dir = _generated_subdir_relative_path(context, step="raw_qc", name="fastqc")
     fastqc_output_dir_relpath = _join_run_relative(context, fastqc_output_dir)
     fastqc_output_dir_abs = context.base_dir / fastqc_output_dir_relpath
     fastqc_output_dir_abs.mkdir(parents=True, exist_ok=True)
 
+    input_digests = hash_files(
+        [item.absolute_path for item in fastqc_inputs],
+        cache=shared_file_digest_cache(context.base_dir),
+    )
+    inputs_by_relpath = {item.relative_path: item for item in fastqc_inputs}
+    ready_reports: dict[str, tuple[str, str, FastQCParsedReport]] = {}
+
+    def _parse_ready_reports(relative_paths):
+        for relative_path in relative_paths:
+            read_input = inputs_by_relpath[relative_path]
+            output_prefix = fastqc_output_prefix(relative_path)
+            html_relpath = _join_run_relative(context, fastqc_output_dir, f"{output_prefix}_fastqc.html")
+            zip_relpath = _join_run_relative(context, fastqc_output_dir, f"{output_prefix}_fastqc.zip")
+            if not (context.base_dir / html_relpath).exists():
+                raise RuntimeError(
+                    f"FastQC completed without producing expected HTML report {html_relpath!r}."
+                )
+            zip_abspath = context.base_dir / zip_relpath
+            if not zip_abspath.exists():
+                raise RuntimeError(
+                    f"FastQC completed without producing expected ZIP archive {zip_relpath!r}."
+                )
+            ready_reports[relative_path] = (
+                html_relpath,
+                zip_relpath,
+                parse_fastqc_archive(
+                    zip_abspath,
+                    sample_id=read_input.sample_id,
+                    read_label=read_input.read_label,
+                    input_relpath=read_input.relative_path,
+                ),
+            )
+
     command_result = run_fastqc(
         executable=executable,
         input_paths=[item.relative_path for item in fastqc_inputs],
         output_dir=fastqc_output_dir_relpath,
         extra_args=extra_args,
         base_dir=context.base_dir,
+        shard_size=shard_size or (2 if sequencing_layout == "paired_end" else 1),
+        max_workers=max_parallel_shards,
+        input_digests={
+            item.relative_path: input_digests[item.absolute_path] for item in fastqc_inputs
+        },
+        on_reports_ready=_parse_ready_reports,
     )
 
     stdout_relpath = _write_generated_text(
@@ -217,26 +271,13 @@ def run_raw_qc(inputs, context):
                 "sample_id": read_input.sample_id,
                 "read_label": read_input.read_label,
                 "path": read_input.relative_path,
-                "sha256": hash_file(read_input.absolute_path),
+                "sha256": input_digests[read_input.absolute_path],
                 "size_bytes": read_input.absolute_path.stat().st_size,
                 "row_number": read_input.row_number,
             }
         )
 
-        output_prefix = fastqc_output_prefix(read_input.relative_path)
-        html_relpath = _join_run_relative(context, fastqc_output_dir, f"{output_prefix}_fastqc.html")
-        zip_relpath = _join_run_relative(context, fastqc_output_dir, f"{output_prefix}_fastqc.zip")
-        html_abspath = context.base_dir / html_relpath
-        zip_abspath = context.base_dir / zip_relpath
-        if not html_abspath.exists():
-            raise RuntimeError(
-                f"FastQC completed without producing expected HTML report {html_relpath!r}."
-            )
-        if not zip_abspath.exists():
-            raise RuntimeError(
-                f"FastQC completed without producing expected ZIP archive {zip_relpath!r}."
-            )
-
+        html_relpath, zip_relpath, parsed = ready_reports[read_input.relative_path]
         html_ref = _artifact_ref("fastqc_html_report", html_relpath, run_id=context.run_id)
         zip_ref = _artifact_ref("fastqc_zip_archive", zip_relpath, run_id=context.run_id)
         raw_report_refs.extend([html_ref, zip_ref])
@@ -249,12 +290,6 @@ def run_raw_qc(inputs, context):
             }
         )
 
-        parsed = parse_fastqc_archive(
-            zip_abspath,
-            sample_id=read_input.sample_id,
-            read_label=read_input.read_label,
-            input_relpath=read_input.relative_path,
-        )
         parsed_reports.append(parsed)
         sample_metrics.append(
             {
@@ -320,10 +355,12 @@ def run_raw_qc(inputs, context):
         "sequencing_layout": sequencing_layout,
         "sample_sheet_path": manifest.sample_sheet_path,
         "output_directory": fastqc_output_dir_relpath,
-        "command": list(command_result.command),
+        "commands": [list(command) for command in command_result.commands],
         "parameters": {
             "extra_args": list(extra_args),
             "input_count": len(fastqc_inputs),
+            "shard_count": command_result.shard_count,
+            "reused_input_count": len(command_result.reused_inputs),
         },
         "input_files": input_file_records,
         "reports": report_sets,
@@ -733,7 +770,7 @@ def plan_differential_expression(inputs, context):
         "baseline_condition": baseline_condition,
         "comparison_condition": comparison_condition,
     }
-    count_rows = _load_count_matrix_rows(context, count_matrix)
+    count_table = _load_count_table(context, count_matrix)
     sample_index = _sample_rows_by_id(sample_rows)
     selected_samples = [
         sample_id
@@ -746,38 +783,71 @@ def plan_differential_expression(inputs, context):
         )
 
     size_factors = _library_size_factors(count_matrix.library_sizes, selected_samples)
-    normalized_rows = _normalize_count_matrix(count_rows, selected_samples, size_factors)
-    adjusted_rows = _apply_batch_mean_centering(
-        normalized_rows,
-        sample_index,
-        batch_fields=design["batch_fields_modeled"],
-    )
-    result_rows = _summarize_differential_expression(
-        adjusted_rows,
-        sample_index,
-        condition_field=condition_field,
-        baseline_condition=baseline_condition,
-        comparison_condition=comparison_condition,
+    normalized_counts = normalize_counts(
+        count_table.select(selected_samples),
+        [size_factors[sample_id] for sample_id in selected_samples],
+    )
+    batch_fields = design["batch_fields_modeled"]
+    adjusted_counts = (
+        batch_mean_center(
+            normalized_counts,
+            [
+                tuple(str(sample_index[sample_id].get(field, "")).strip() for field in batch_fields)
+                for sample_id in selected_samples
+            ],
+        )
+        if batch_fields
+        else normalized_counts
     )
-    if not result_rows:
+    sample_conditions = [sample_index[sample_id].get(condition_field) for sample_id in selected_samples]
+    baseline_columns = [index for index, value in enumerate(sample_conditions) if value == baseline_condition]
+    comparison_columns = [index for index, value in enumerate(sample_conditions) if value == comparison_condition]
+    if not baseline_columns or not comparison_columns or not count_table.gene_ids:
         raise ValueError("Differential expression stage did not produce any gene-level results.")
 
-    adjusted_p_values = _benjamini_hochberg([float(item["p_value"]) for item in result_rows])
-    for row, adjusted_p_value in zip(result_rows, adjusted_p_values, strict=True):
-        row["adjusted_p_value"] = adjusted_p_value
-        row["is_significant"] = (
-            adjusted_p_value <= _DE_SIGNIFICANCE_THRESHOLD
-            and abs(float(row["log2_fold_change"])) >= _DE_LOG2_EFFECT_FLOOR
+    statistics = welch_statistics(normalized_counts, adjusted_counts, baseline_columns, comparison_columns)
+    adjusted_p_values = benjamini_hochberg(statistics.p_value)
+    result_rows = [
+        {
+            "gene_id": gene_id,
+            "gene_symbol": gene_symbol,
+            "baseline_mean": baseline_mean,
+            "comparison_mean": comparison_mean,
+            "log2_fold_change": log2_fold_change,
+            "p_value": p_value,
+            "baseline_replicates": statistics.baseline_replicates,
+            "comparison_replicates": statistics.comparison_replicates,
+            "adjusted_p_value": adjusted_p_value,
+            "is_significant": (
+                adjusted_p_value <= _DE_SIGNIFICANCE_THRESHOLD
+                and abs(log2_fold_change) >= _DE_LOG2_EFFECT_FLOOR
+            ),
+        }
+        for gene_id, gene_symbol, baseline_mean, comparison_mean, log2_fold_change, p_value, adjusted_p_value in zip(
+            count_table.gene_ids,
+            count_table.gene_symbols,
+            statistics.baseline_mean.tolist(),
+            statistics.comparison_mean.tolist(),
+            statistics.log2_fold_change.tolist(),
+            statistics.p_value.tolist(),
+            adjusted_p_values.tolist(),
         )
+    ]
 
     result_rows.sort(key=lambda item: (float(item["adjusted_p_value"]), -abs(float(item["log2_fold_change"]))))
     contrast_slug = contrast["contrast_label"]
-    normalized_counts_relpath = _write_normalized_count_matrix_tsv(
+    normalized_counts_path, normalized_counts_relpath = _generated_file_path(
         context,
-        sample_ids=selected_samples,
-        rows=normalized_rows,
+        step="differential_expression",
         filename=f"{contrast_slug}.normalized_counts.tsv",
     )
+    write_matrix_tsv(
+        normalized_counts_path,
+        gene_ids=count_table.gene_ids,
+        gene_symbols=count_table.gene_symbols,
+        sample_ids=selected_samples,
+        values=normalized_counts,
+    )
     results_relpath = _write_differential_expression_results_tsv(
         context,
         rows=result_rows,
@@ -922,7 +992,7 @@ def plan_differential_expression(inputs, context):
             "matrix_path": normalized_counts_relpath,
             "matrix_format": "tsv",
             "sample_ids": selected_samples,
-            "gene_count": len(normalized_rows),
+            "gene_count": len(count_table.gene_ids),
             "library_size_factors": size_factors,
             "source_count_matrix": count_matrix_ref,
             "related_artifacts": [count_matrix_ref],
@@ -1136,16 +1206,21 @@ def _write_count_matrix_tsv(
     rows: Sequence[Mapping[str, Any]],
     filename: str,
 ) -> str:
-    headers = ["gene_id", "gene_symbol", *sample_ids]
-    lines = ["\t".join(headers)]
+    counts: list[list[int]] = []
     for row in rows:
-        counts = row.get("counts")
-        if not isinstance(counts, Mapping):
+        row_counts = row.get("counts")
+        if not isinstance(row_counts, Mapping):
             raise ValueError("Count matrix rows must include a counts mapping.")
-        values = [str(row["gene_id"]), str(row["gene_symbol"])]
-        values.extend(str(int(counts.get(sample_id, 0))) for sample_id in sample_ids)
-        lines.append("\t".join(values))
-    return _write_generated_text(context, step="quantification", filename=filename, content="\n".join(lines))
+        counts.append([int(row_counts.get(sample_id, 0)) for sample_id in sample_ids])
+    absolute_path, relative_path = _generated_file_path(context, step="quantification", filename=filename)
+    write_count_matrix(
+        absolute_path,
+        gene_ids=[str(row["gene_id"]) for row in rows],
+        gene_symbols=[str(row["gene_symbol"]) for row in rows],
+        sample_ids=sample_ids,
+        counts=np.array(counts, dtype=np.int64).reshape(len(rows), len(sample_ids)),
+    )
+    return relative_path
 
 
 def _load_count_matrix_document(context, artifact_path: str) -> CountMatrix:
@@ -1155,27 +1230,11 @@ def _load_count_matrix_document(context, artifact_path: str) -> CountMatrix:
     return document
 
 
-def _load_count_matrix_rows(context, count_matrix: CountMatrix) -> list[dict[str, Any]]:
+def _load_count_table(context, count_matrix: CountMatrix) -> CountTable:
     matrix_path = context.base_dir / count_matrix.matrix_path
     if not matrix_path.exists():
         raise ValueError(f"Count matrix file {count_matrix.matrix_path!r} does not exist.")
-
-    with matrix_path.open("r", encoding="utf-8", newline="") as handle:
-        reader = csv.DictReader(handle, delimiter="\t")
-        rows: list[dict[str, Any]] = []
-        for raw_row in reader:
-            counts = {
-                sample_id: int(str(raw_row.get(sample_id, "0") or "0"))
-                for sample_id in count_matrix.sample_ids
-            }
-            rows.append(
-                {
-                    "gene_id": str(raw_row.get("gene_id", "")).strip(),
-                    "gene_symbol": str(raw_row.get("gene_symbol", "")).strip(),
-                    "counts": counts,
-                }
-            )
-    return rows
+    return read_count_matrix(matrix_path, count_matrix.sample_ids)
 
 
 def _sample_rows_by_id(sample_rows: Sequence[Mapping[str, str]]) -> dict[str, dict[str, str]]:
@@ -1267,172 +1326,6 @@ def _library_size_factors(
     }
 
 
-def _normalize_count_matrix(
-    count_rows: Sequence[Mapping[str, Any]],
-    sample_ids: Sequence[str],
-    size_factors: Mapping[str, float],
-) -> list[dict[str, Any]]:
-    normalized_rows: list[dict[str, Any]] = []
-    for row in count_rows:
-        counts = row.get("counts")
-        if not isinstance(counts, Mapping):
-            raise ValueError("Count matrix rows must include a counts mapping.")
-        normalized_counts = {
-            sample_id: round(int(counts[sample_id]) / float(size_factors[sample_id]), 6)
-            for sample_id in sample_ids
-        }
-        normalized_rows.append(
-            {
-                "gene_id": row["gene_id"],
-                "gene_symbol": row["gene_symbol"],
-                "normalized_counts": normalized_counts,
-            }
-        )
-    return normalized_rows
-
-
-def _apply_batch_mean_centering(
-    normalized_rows: Sequence[Mapping[str, Any]],
-    sample_index: Mapping[str, Mapping[str, str]],
-    *,
-    batch_fields: Sequence[str],
-) -> list[dict[str, Any]]:
-    if not batch_fields:
-        return [
-            {
-                "gene_id": row["gene_id"],
-                "gene_symbol": row["gene_symbol"],
-                "normalized_counts": dict(row["normalized_counts"]),
-                "adjusted_counts": dict(row["normalized_counts"]),
-            }
-            for row in normalized_rows
-        ]
-
-    adjusted_rows: list[dict[str, Any]] = []
-    for row in normalized_rows:
-        normalized_counts = row["normalized_counts"]
-        global_mean = _mean(normalized_counts.values())
-        batch_means: dict[tuple[str, ...], float] = {}
-        batch_members: dict[tuple[str, ...], list[str]] = {}
-        for sample_id in normalized_counts:
-            batch_key = tuple(str(sample_index[sample_id].get(field, "")).strip() for field in batch_fields)
-            batch_members.setdefault(batch_key, []).append(sample_id)
-        for batch_key, sample_ids in batch_members.items():
-            batch_means[batch_key] = _mean(normalized_counts[sample_id] for sample_id in sample_ids)
-
-        adjusted_counts = {}
-        for sample_id, value in normalized_counts.items():
-            batch_key = tuple(str(sample_index[sample_id].get(field, "")).strip() for field in batch_fields)
-            adjusted_counts[sample_id] = round(value - batch_means[batch_key] + global_mean, 6)
-
-        adjusted_rows.append(
-            {
-                "gene_id": row["gene_id"],
-                "gene_symbol": row["gene_symbol"],
-                "normalized_counts": dict(normalized_counts),
-                "adjusted_counts": adjusted_counts,
-            }
-        )
-    return adjusted_rows
-
-
-def _summarize_differential_expression(
-    adjusted_rows: Sequence[Mapping[str, Any]],
-    sample_index: Mapping[str, Mapping[str, str]],
-    *,
-    condition_field: str,
-    baseline_condition: str,
-    comparison_condition: str,
-) -> list[dict[str, Any]]:
-    result_rows: list[dict[str, Any]] = []
-    for row in adjusted_rows:
-        adjusted_counts = row["adjusted_counts"]
-        normalized_counts = row["normalized_counts"]
-        baseline_values = [
-            float(adjusted_counts[sample_id])
-            for sample_id in adjusted_counts
-            if sample_index.get(sample_id, {}).get(condition_field) == baseline_condition
-        ]
-        comparison_values = [
-            float(adjusted_counts[sample_id])
-            for sample_id in adjusted_counts
-            if sample_index.get(sample_id, {}).get(condition_field) == comparison_condition
-        ]
-        if not baseline_values or not comparison_values:
-            continue
-
-        baseline_mean = _mean(baseline_values)
-        comparison_mean = _mean(comparison_values)
-        log2_fold_change = math.log2((comparison_mean + 1.0) / (baseline_mean + 1.0))
-        standard_error = math.sqrt(
-            (_sample_variance(baseline_values) / max(len(baseline_values), 1))
-            + (_sample_variance(comparison_values) / max(len(comparison_values), 1))
-        )
-        if standard_error <= 0:
-            z_score = 0.0 if abs(comparison_mean - baseline_mean) < 1e-9 else 12.0
-        else:
-            z_score = abs(comparison_mean - baseline_mean) / standard_error
-        p_value = min(max(math.erfc(z_score / math.sqrt(2.0)), 1e-12), 1.0)
-
-        result_rows.append(
-            {
-                "gene_id": row["gene_id"],
-                "gene_symbol": row["gene_symbol"],
-                "baseline_mean": round(_mean(
-                    normalized_counts[sample_id]
-                    for sample_id in normalized_counts
-                    if sample_index.get(sample_id, {}).get(condition_field) == baseline_condition
-                ), 6),
-                "comparison_mean": round(_mean(
-                    normalized_counts[sample_id]
-                    for sample_id in normalized_counts
-                    if sample_index.get(sample_id, {}).get(condition_field) == comparison_condition
-                ), 6),
-                "log2_fold_change": round(log2_fold_change, 6),
-                "p_value": round(p_value, 12),
-                "baseline_replicates": len(baseline_values),
-                "comparison_replicates": len(comparison_values),
-            }
-        )
-    return result_rows
-
-
-def _benjamini_hochberg(p_values: Sequence[float]) -> list[float]:
-    if not p_values:
-        return []
-    indexed = sorted(enumerate(p_values), key=lambda item: item[1])
-    adjusted = [1.0] * len(p_values)
-    running_min = 1.0
-    total = len(p_values)
-    for rank, (original_index, p_value) in enumerate(reversed(indexed), start=1):
-        adjusted_value = min(1.0, p_value * total / (total - rank + 1))
-        running_min = min(running_min, adjusted_value)
-        adjusted[original_index] = round(running_min, 12)
-    return adjusted
-
-
-def _write_normalized_count_matrix_tsv(
-    context,
-    *,
-    sample_ids: Sequence[str],
-    rows: Sequence[Mapping[str, Any]],
-    filename: str,
-) -> str:
-    headers = ["gene_id", "gene_symbol", *sample_ids]
-    lines = ["\t".join(headers)]
-    for row in rows:
-        normalized_counts = row["normalized_counts"]
-        values = [str(row["gene_id"]), str(row["gene_symbol"])]
-        values.extend(f"{float(normalized_counts[sample_id]):.6f}" for sample_id in sample_ids)
-        lines.append("\t".join(values))
-    return _write_generated_text(
-        context,
-        step="differential_expression",
-        filename=filename,
-        content="\n".join(lines),
-    )
-
-
 def _write_differential_expression_results_tsv(
     context,
     *,
@@ -2903,13 +2796,6 @@ def _contrast_slug(comparison_condition: str, baseline_condition: str) -> str:
     return f"{comparison_slug}-vs-{baseline_slug}"
 
 
-def _mean(values: Sequence[float] | Any) -> float:
-    value_list = [float(item) for item in values]
-    if not value_list:
-        raise ValueError("Mean requires at least one value.")
-    return sum(value_list) / len(value_list)
-
-
 def _median(values: Sequence[int]) -> float:
     ordered = sorted(int(item) for item in values)
     if not ordered:
@@ -2920,13 +2806,6 @@ def _median(values: Sequence[int]) -> float:
     return (ordered[middle - 1] + ordered[middle]) / 2.0
 
 
-def _sample_variance(values: Sequence[float]) -> float:
-    if len(values) <= 1:
-        return 0.0
-    mean_value = _mean(values)
-    return sum((float(item) - mean_value) ** 2 for item in values) / (len(values) - 1)
-
-
 def _load_manifest(context, manifest_path: str) -> DatasetManifest:
     document = load_artifact_document(context.resolve_path(manifest_path))
     if not isinstance(document, DatasetManifest):
@@ -2955,7 +2834,7 @@ def _load_workflow_run_document(context) -> WorkflowRun:
     return document
 
 
-def _fastqc_config(manifest: DatasetManifest) -> tuple[str, list[str]]:
+def _fastqc_config(manifest: DatasetManifest) -> tuple[str, list[str], int | None, int | None]:
     raw_config = manifest.assay_extensions.get("fastqc")
     if raw_config is None:
         raw_config = {}
@@ -2978,7 +2857,20 @@ def _fastqc_config(manifest: DatasetManifest) -> tuple[str, list[str]]:
     if any(not item for item in extra_args):
         raise ValueError("FastQC extra_args entries must not be empty.")
 
-    return executable_text, extra_args
+    shard_size = _optional_positive_int(raw_config.get("shard_size"), field_name="fastqc.shard_size")
+    max_parallel_shards = _optional_positive_int(
+        raw_config.get("max_parallel_shards"),
+        field_name="fastqc.max_parallel_shards",
+    )
+    return executable_text, extra_args, shard_size, max_parallel_shards
+
+
+def _optional_positive_int(value: Any, *, field_name: str) -> int | None:
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+        raise ValueError(f"dataset_manifest.assay_extensions.{field_name} must be a positive integer.")
+    return value
 
 
 def _multiqc_config(manifest: DatasetManifest) -> tuple[str, list[str]]:
@@ -3007,6 +2899,31 @@ def _multiqc_config(manifest: DatasetManifest) -> tuple[str, list[str]]:
     return executable_text, extra_args
 
 
+def _raw_qc_tool_versions(inputs: Mapping[str, Any], base_dir: Path) -> dict[str, str]:
+    executable, _, _, _ = _fastqc_config(_manifest_for_tool_probe(inputs, base_dir))
+    return {"fastqc": probe_fastqc_version(executable, base_dir=base_dir)}
+
+
+def _aggregate_qc_tool_versions(inputs: Mapping[str, Any], base_dir: Path) -> dict[str, str]:
+    executable, _ = _multiqc_config(_manifest_for_tool_probe(inputs, base_dir))
+    return {"multiqc": probe_multiqc_version(executable, base_dir=base_dir)}
+
+
+def _manifest_for_tool_probe(inputs: Mapping[str, Any], base_dir: Path) -> DatasetManifest:
+    document = load_artifact_document(Path(base_dir) / str(inputs["dataset_manifest"]))
+    if not isinstance(document, DatasetManifest):
+        raise ValueError(f"Expected dataset_manifest artifact at {inputs['dataset_manifest']!r}.")
+    return document
+
+
+# Read by runtime.step_cache: the external tool versions each step's cached
+# result depends on.
+STEP_CACHE_TOOL_PROBES = {
+    "run_raw_qc": _raw_qc_tool_versions,
+    "aggregate_qc": _aggregate_qc_tool_versions,
+}
+
+
 def _stage_stub_config(manifest: DatasetManifest, stage_name: str) -> Mapping[str, Any]:
     workflow_stub = manifest.assay_extensions.get("workflow_stub")
     if not isinstance(workflow_stub, Mapping):
@@ -3166,11 +3083,16 @@ def _write_generated_text(
     filename: str,
     content: str,
 ) -> str:
+    absolute_path, relative_path = _generated_file_path(context, step=step, filename=filename)
+    absolute_path.write_text(content if content.endswith("\n") or not content else f"{content}\n", encoding="utf-8")
+    return relative_path
+
+
+def _generated_file_path(context, *, step: str, filename: str) -> tuple[Path, str]:
     relative_under_run = build_generated_output_relpath(filename, step=step)
     absolute_path = context.run_dir / relative_under_run
     absolute_path.parent.mkdir(parents=True, exist_ok=True)
-    absolute_path.write_text(content if content.endswith("\n") or not content else f"{content}\n", encoding="utf-8")
-    return _join_run_relative(context, relative_under_run)
+    return absolute_path, _join_run_relative(context, relative_under_run)
 
 
 def _generated_subdir_relative_path(context, *, step: str, name: str) -> PurePosixPath: